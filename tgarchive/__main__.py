@@ -26,6 +26,7 @@ from .utils.discovery import (
     enhance_config_with_gen_accounts
 )
 from .db import SpectraDB
+from .db.pragmas import PRAGMA_PROFILES
 from .utils.channel_utils import populate_account_channel_access
 from .forwarding import AttachmentForwarder
 from .services.scheduler_service import SchedulerDaemon
@@ -92,6 +93,14 @@ class GroupedHelpFormatter(argparse.RawDescriptionHelpFormatter):
         return result
 
 
+def load_config(args: argparse.Namespace) -> Config:
+    """Load ``--config``, applying the global overrides given on the command line."""
+    cfg = Config(Path(args.config))
+    if getattr(args, "db_profile", None):
+        cfg.data["db_profile"] = args.db_profile
+    return cfg
+
+
 def setup_parser() -> argparse.ArgumentParser:
     """Set up command-line argument parser"""
     parser = argparse.ArgumentParser(
@@ -122,6 +131,7 @@ For more help, visit: https://github.com/SWORDIntel/SPECTRA
     parser.add_argument("--db", type=str, help="Path to SQLite database", default="spectra.db")
     parser.add_argument("--data-dir", type=str, help="Directory for cached data", default="spectra_data")
     parser.add_argument("--config", type=str, help="Path to config file", default="spectra_config.json")
+    parser.add_argument("--db-profile", choices=sorted(PRAGMA_PROFILES), help="SQLite pragma profile for the archive DB (overrides db_profile in the config)")
     parser.add_argument("--parallel", action="store_true", help="Enable parallel processing")
     parser.add_argument("--max-workers", type=int, help="Maximum number of parallel workers")
     parser.add_argument("--import-accounts", action="store_true", help="Import accounts from gen_config.py")
@@ -255,6 +265,18 @@ For more help, visit: https://github.com/SWORDIntel/SPECTRA
         action="store_true",
         help="When using copy mode, render the original text as a quote block inside the copied post.",
     )
+    forward_parser.add_argument(
+        "--forward-batch-size",
+        type=int,
+        default=None,
+        help="Forward up to this many messages (max 100) per request; whole groups/albums stay together (uses config default if not set).",
+    )
+    forward_parser.add_argument(
+        "--stream-history",
+        action="store_true",
+        default=None,
+        help="Walk the origin oldest-first and forward groups as they complete instead of loading the whole history first.",
+    )
     forward_parser.add_argument("--secondary-unique-destination", type=str, default=None, help="Secondary destination for unique messages only (deduplication required)")
     forward_parser.add_argument("--source-accounts", nargs="+", help="Limit total-mode forwarding to these account identifiers (phone number or session name). Uses all accounts if omitted.")
     forward_parser.add_argument("--include-saved-messages", action="store_true", help="Include Saved Messages when sweeping all dialogs.")
@@ -469,7 +491,7 @@ For more help, visit: https://github.com/SWORDIntel/SPECTRA
 # ── Command handlers ───────────────────────────────────────────────────────
 async def handle_archive(args: argparse.Namespace) -> int:
     """Handle archive command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     # Import accounts from gen_config if requested
     if args.import_accounts:
@@ -495,7 +517,7 @@ async def handle_archive(args: argparse.Namespace) -> int:
 
 async def handle_discover(args: argparse.Namespace) -> int:
     """Handle discover command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     # Import accounts from gen_config if requested
     if args.import_accounts:
@@ -601,7 +623,7 @@ async def handle_discover(args: argparse.Namespace) -> int:
 
 async def handle_network(args: argparse.Namespace) -> int:
     """Handle network command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     # Import accounts from gen_config if requested
     if args.import_accounts:
@@ -704,7 +726,7 @@ async def handle_network(args: argparse.Namespace) -> int:
 
 async def handle_batch(args: argparse.Namespace) -> int:
     """Handle batch command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     # Import accounts from gen_config if requested
     if args.import_accounts:
@@ -788,7 +810,7 @@ async def handle_batch(args: argparse.Namespace) -> int:
 
 async def handle_accounts(args: argparse.Namespace) -> int:
     """Handle accounts command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
     db_path = Path(args.db)
 
     # Set rotation mode if requested
@@ -914,7 +936,7 @@ async def handle_cloud_forwarding(args: argparse.Namespace) -> int:
     logger.info(f"  Min files for gateway: {args.min_files_gateway}")
 
     # Load configuration
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
     accounts = cfg.accounts
     if not accounts:
         logger.error("No accounts configured. Please import or add accounts to spectra_config.json.")
@@ -950,12 +972,12 @@ async def handle_cloud_forwarding(args: argparse.Namespace) -> int:
 async def handle_attachment_forwarding(args: argparse.Namespace) -> int:
     """Handles direct forwarding of messages via AttachmentForwarder."""
     try:
-        cfg = Config(Path(args.config))
+        cfg = load_config(args)
         db_path = Path(args.db)
         if args.total_mode and not db_path.exists():
             logger.error(f"Database not found at {db_path}. --total-mode requires the database.")
             return 1
-        db = SpectraDB(db_path) if db_path.exists() else None
+        db = SpectraDB.from_config(cfg, db_path) if db_path.exists() else None
 
         destination = args.destination or cfg.default_forwarding_destination_id
         if not destination:
@@ -995,6 +1017,8 @@ async def handle_attachment_forwarding(args: argparse.Namespace) -> int:
             destination_topic_id=destination_topic_id,
             source_topic_id=source_topic_id,
             include_text_messages=include_text_messages,
+            forward_batch_size=getattr(args, "forward_batch_size", None),
+            stream_history=getattr(args, "stream_history", None),
         )
         try:
             if args.all_dialogs:
@@ -1082,8 +1106,8 @@ async def handle_config(args: argparse.Namespace, cfg: Config) -> int:
 async def handle_update_channel_access(args: argparse.Namespace) -> int:
     """Handle updating the account_channel_access table."""
     try:
-        cfg = Config(Path(args.config))
-        db = SpectraDB(Path(args.db))
+        cfg = load_config(args)
+        db = SpectraDB.from_config(cfg, Path(args.db))
 
         if args.import_accounts:
             cfg = enhance_config_with_gen_accounts(cfg)
@@ -1099,7 +1123,7 @@ async def handle_update_channel_access(args: argparse.Namespace) -> int:
 # ── Parallel operation handlers ───────────────────────────────────────────────
 async def handle_parallel_discover(args: argparse.Namespace) -> int:
     """Handle parallel discover command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     if args.import_accounts:
         cfg = enhance_config_with_gen_accounts(cfg)
@@ -1166,7 +1190,7 @@ async def handle_parallel_discover(args: argparse.Namespace) -> int:
 
 async def handle_parallel_join(args: argparse.Namespace) -> int:
     """Handle parallel join command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     if args.import_accounts:
         cfg = enhance_config_with_gen_accounts(cfg)
@@ -1216,7 +1240,7 @@ async def handle_parallel_join(args: argparse.Namespace) -> int:
 
 async def handle_parallel_archive(args: argparse.Namespace) -> int:
     """Handle parallel archive command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
 
     if args.import_accounts:
         cfg = enhance_config_with_gen_accounts(cfg)
@@ -1297,7 +1321,7 @@ async def handle_parallel(args: argparse.Namespace) -> int:
 # ── Scheduler and Migration Handlers ─────────────────────────────────────
 async def handle_schedule(args: argparse.Namespace) -> int:
     """Handle schedule command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
     state_path = cfg.data.get("scheduler", {}).get("state_file", "scheduler_state.json")
     scheduler = SchedulerDaemon(args.config, state_path)
     db_path = cfg.data.get("db", {}).get("path", "spectra.db")
@@ -1320,15 +1344,15 @@ async def handle_schedule(args: argparse.Namespace) -> int:
             logger.info("Stopping scheduler daemon...")
             scheduler.stop()
     elif args.schedule_command == "add-channel-forward":
-        db = SpectraDB(db_path)
+        db = SpectraDB.from_config(cfg, db_path)
         db.add_channel_forward_schedule(args.channel_id, args.destination, args.schedule)
         logger.info(f"Added channel forwarding schedule for channel {args.channel_id}")
     elif args.schedule_command == "add-file-forward":
-        db = SpectraDB(db_path)
+        db = SpectraDB.from_config(cfg, db_path)
         db.add_file_forward_schedule(args.source, args.destination, args.schedule, args.file_types, args.min_file_size, args.max_file_size, args.priority)
         logger.info(f"Added file forwarding schedule for source {args.source}")
     elif args.schedule_command == "report":
-        db = SpectraDB(db_path)
+        db = SpectraDB.from_config(cfg, db_path)
         status_list = db.get_file_forward_queue_status_by_schedule_id(args.schedule_id)
         if not status_list:
             print("No files found for this schedule.")
@@ -1342,8 +1366,8 @@ async def handle_schedule(args: argparse.Namespace) -> int:
 
 async def handle_migrate(args: argparse.Namespace) -> int:
     """Handle migrate command"""
-    cfg = Config(Path(args.config))
-    db = SpectraDB(cfg.data.get("db", {}).get("path", "spectra.db"))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, cfg.data.get("db", {}).get("path", "spectra.db"))
     from telethon import TelegramClient
     account = cfg.auto_select_account()
     if not account:
@@ -1361,8 +1385,8 @@ async def handle_migrate(args: argparse.Namespace) -> int:
 
 async def handle_rollback(args: argparse.Namespace) -> int:
     """Handle rollback command"""
-    cfg = Config(Path(args.config))
-    db = SpectraDB(cfg.data.get("db", {}).get("path", "spectra.db"))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, cfg.data.get("db", {}).get("path", "spectra.db"))
     from telethon import TelegramClient
     account = cfg.auto_select_account()
     if not account:
@@ -1379,7 +1403,8 @@ async def handle_rollback(args: argparse.Namespace) -> int:
 
 async def handle_migrate_report(args: argparse.Namespace) -> int:
     """Handle migrate-report command"""
-    db = SpectraDB(Config(Path(args.config)).data.get("db", {}).get("path", "spectra.db"))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, cfg.data.get("db", {}).get("path", "spectra.db"))
     report = db.get_migration_report(args.migration_id)
     if not report:
         print(f"No migration found with ID: {args.migration_id}")
@@ -1390,7 +1415,7 @@ async def handle_migrate_report(args: argparse.Namespace) -> int:
 
 async def handle_download_users(args: argparse.Namespace) -> int:
     """Handle download-users command"""
-    cfg = Config(Path(args.config))
+    cfg = load_config(args)
     if args.import_accounts:
         cfg = enhance_config_with_gen_accounts(cfg)
     from .utils.user_operations import get_server_users
@@ -1409,8 +1434,8 @@ async def handle_download_users(args: argparse.Namespace) -> int:
 
 async def handle_osint(args: argparse.Namespace) -> int:
     """Handle OSINT commands"""
-    cfg = Config(Path(args.config))
-    db = SpectraDB(Path(args.db))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, Path(args.db))
     from telethon import TelegramClient
     account = cfg.auto_select_account()
     if not account:
@@ -1439,8 +1464,8 @@ async def handle_osint(args: argparse.Namespace) -> int:
 
 async def handle_mirror(args: argparse.Namespace) -> int:
     """Handle mirror command"""
-    cfg = Config(Path(args.config))
-    db = SpectraDB(cfg.data.get("db", {}).get("path", "spectra.db"))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, cfg.data.get("db", {}).get("path", "spectra.db"))
     manager = GroupMirrorManager(
         config=cfg,
         db=db,
@@ -1455,8 +1480,8 @@ async def handle_mirror(args: argparse.Namespace) -> int:
 
 async def handle_sort(args: argparse.Namespace) -> int:
     """Handle sort command"""
-    cfg = Config(Path(args.config))
-    db = SpectraDB(cfg.data.get("db", {}).get("path", "spectra.db"))
+    cfg = load_config(args)
+    db = SpectraDB.from_config(cfg, cfg.data.get("db", {}).get("path", "spectra.db"))
     sorting_manager = FileSortingManager(
         config=cfg.data,
         output_dir=args.output_directory,
@@ -1628,7 +1653,7 @@ async def async_main(args: argparse.Namespace) -> int:
     """Async entry point for command-line application"""
 
     if args.import_accounts:
-        cfg = Config(Path(args.config))
+        cfg = load_config(args)
         cfg = enhance_config_with_gen_accounts(cfg)
         cfg.save()
         logger.info(f"Imported accounts and saved to {args.config}")
@@ -1663,7 +1688,7 @@ async def async_main(args: argparse.Namespace) -> int:
     if args.command in command_map:
         return await command_map[args.command](args)
     elif args.command == "config":
-        return await handle_config(args, Config(Path(args.config)))
+        return await handle_config(args, load_config(args))
     elif args.command == "channels":
         if args.channels_command == "update-access":
             return await handle_update_channel_access(args)
@@ -155,7 +155,7 @@ class AdvancedFeaturesManager:
                 
                 # Query messages from database for temporal analysis
                 cursor = self.db.execute(
-                    "SELECT id, date, content FROM messages WHERE user_id = ? ORDER BY date",
+                    "SELECT id, date, content FROM messages WHERE user_id = ? ORDER BY date_ts",
                     (user_id,)
                 )
                 rows = cursor.fetchall()
@@ -193,7 +193,7 @@ class AdvancedFeaturesManager:
                 
                 # Query messages from database for attribution analysis
                 cursor = self.db.execute(
-                    "SELECT id, content FROM messages WHERE user_id = ? AND content IS NOT NULL AND content != '' ORDER BY date",
+                    "SELECT id, content FROM messages WHERE user_id = ? AND content IS NOT NULL AND content != '' ORDER BY date_ts",
                     (user_id,)
                 )
                 rows = cursor.fetchall()
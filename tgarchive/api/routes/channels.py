@@ -12,6 +12,7 @@ from . import channels_bp
 from ..security import require_auth, require_role, rate_limit
 from ...core.config_models import Config
 from ...db import SpectraDB
+from ...db.pagination import InvalidCursor
 from ..services import DatabaseService
 
 logger = logging.getLogger(__name__)
@@ -37,7 +38,8 @@ def list_channels():
     List all archived channels and groups.
 
     Query parameters:
-        - page: Page number (default: 1)
+        - cursor: ``next_cursor`` from the previous response (preferred)
+        - page: Page number (default: 1), used when no cursor is given
         - limit: Items per page (default: 20, max: 100)
         - search: Filter by name or ID
 
@@ -46,24 +48,29 @@ def list_channels():
             "channels": [...],
             "total": 100,
             "page": 1,
-            "limit": 20
+            "limit": 20,
+            "next_cursor": "..."
         }
     """
     try:
+        cursor = request.args.get('cursor')
         page = request.args.get('page', 1, type=int)
         limit = min(request.args.get('limit', 20, type=int), 100)
         search = request.args.get('search')
         
         if _database_service:
-            result = asyncio.run(_database_service.list_channels(page, limit, search))
+            result = asyncio.run(_database_service.list_channels(page, limit, search, cursor=cursor))
             return jsonify(result), 200
         else:
             return jsonify({
                 'channels': [],
                 'total': 0,
                 'page': page,
-                'limit': limit
+                'limit': limit,
+                'next_cursor': None
             }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Failed to list channels: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
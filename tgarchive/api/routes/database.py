@@ -118,6 +118,10 @@ def query_messages():
         ))
         
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Failed to query messages: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -8,7 +8,6 @@ Message forwarding and scheduling endpoints.
 import asyncio
 import logging
 from flask import request, jsonify
-from pathlib import Path
 
 from . import forwarding_bp
 from ..security import require_auth, rate_limit
@@ -26,7 +25,7 @@ def init_forwarding_routes(app, config: Config, task_manager: TaskManager):
     """Initialize forwarding routes with dependencies."""
     global _forwarding_service
     
-    db = SpectraDB(Path(config.data.get("db_path", "spectra.db")))
+    db = SpectraDB.from_config(config)
     _forwarding_service = ForwardingService(config, task_manager, db)
     
     app.register_blueprint(forwarding_bp, url_prefix='/api/forwarding')
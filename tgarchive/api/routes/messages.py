@@ -36,20 +36,22 @@ def get_messages(channel_id):
     Get messages from a channel with pagination.
     
     Query parameters:
-        - page: Page number (default: 1)
-        - limit: Items per page (default: 20)
+        - cursor: ``next_cursor`` from the previous response (preferred)
+        - page: Page number (default: 1), used when no cursor is given
+        - limit: Items per page (default: 20, max: 100)
         - date_from: Optional start date
         - date_to: Optional end date
     """
     try:
+        cursor = request.args.get('cursor')
         page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
+        limit = min(request.args.get('limit', 20, type=int), 100)
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         
         if _database_service:
             result = asyncio.run(_database_service.query_messages(
-                channel_id, page, limit, date_from, date_to
+                channel_id, page, limit, date_from, date_to, cursor=cursor
             ))
             return jsonify(result), 200
         else:
@@ -57,8 +59,14 @@ def get_messages(channel_id):
                 'messages': [],
                 'total': 0,
                 'page': page,
-                'limit': limit
+                'limit': limit,
+                'next_cursor': None
             }), 200
+    except ValueError as e:
+        # InvalidCursor, a malformed date or a non-numeric channel
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Failed to get messages: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
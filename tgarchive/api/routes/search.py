@@ -4,10 +4,12 @@ Full-Text Search & Intelligence API Routes
 """
 
 import logging
+from datetime import datetime
 from flask import request, jsonify
 
 from . import search_bp
 from ..security import require_auth, rate_limit, validate_input, ValidationError
+from ...db.pagination import InvalidCursor
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +31,18 @@ def search():
             "channels": [-1001234567890],
             "date_from": "2024-01-01",
             "date_to": "2024-12-31",
-            "limit": 20
+            "limit": 20,
+            "cursor": "..."
         }
 
+    Message searches page by keyset: pass the ``next_cursor`` of one response
+    as ``cursor`` to get the next page.
+
     Returns:
         {
             "results": [...],
-            "total": 100,
+            "total": 20,
+            "next_cursor": "...",
             "execution_time_ms": 150
         }
     """
@@ -43,16 +50,50 @@ def search():
         data = request.get_json() or {}
         query = validate_input(data.get('query'), 'string', min_length=3, max_length=500)
         search_type = validate_input(data.get('type', 'message'), 'string')
+        limit = validate_input(data.get('limit', 20), 'int', min_length=1, max_length=100)
+        cursor = data.get('cursor')
+
+        results, next_cursor, search_time = [], None, 0.0
+        if search_type == 'message':
+            channels = data.get('channels') or []
+            if not isinstance(channels, list) or not all(
+                isinstance(c, int) and not isinstance(c, bool) for c in channels
+            ):
+                raise ValidationError("channels must be a list of channel ids")
+            filters = {
+                'filter_channel': channels or None,
+                'date_from': datetime.fromisoformat(data['date_from']) if data.get('date_from') else None,
+                'date_to': datetime.fromisoformat(data['date_to']) if data.get('date_to') else None,
+            }
+            db_conn = search_enhanced.get_database_connection()
+            try:
+                start_time = datetime.now()
+                rows, next_cursor = search_enhanced.fulltext_page(db_conn, query, limit, cursor, **filters)
+                search_time = (datetime.now() - start_time).total_seconds() * 1000
+            finally:
+                db_conn.close()
+            results = [
+                {
+                    'message_id': row[0],
+                    'channel_id': row[1],
+                    'user_id': row[2],
+                    'content': (row[3] or '')[:500],
+                    'date': row[4],
+                    'relevance_score': round(row[6], 3),
+                }
+                for row in rows
+            ]
 
         return {
-            'results': [],
-            'total': 0,
+            'results': results,
+            'total': len(results),
+            'next_cursor': next_cursor,
             'query': query,
             'type': search_type,
-            'execution_time_ms': 0
+            'execution_time_ms': int(search_time)
         }, 200
 
-    except ValidationError as e:
+    except (ValidationError, InvalidCursor, ValueError) as e:
         return {'error': str(e)}, 400
 
 
@@ -13,6 +13,7 @@ from datetime import datetime
 
 from . import search_bp
 from ..security import require_auth, rate_limit, validate_input, ValidationError
+from ...db.pagination import InvalidCursor, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,28 @@ def get_database_connection():
         raise RuntimeError(f"Database connection failed: {str(e)}")
 
 
+def fulltext_page(db_conn, query, limit, cursor=None, **filters):
+    """
+    One keyset page of FTS5 message matches, best first.
+
+    Returns ``(rows, next_cursor)``; the cursor carries the ``(rank, message_id)``
+    of the last row so the next page starts there instead of re-ranking and
+    discarding every earlier match as ``OFFSET`` does.
+
+    Raises:
+        InvalidCursor: If ``cursor`` is not a full-text search cursor
+    """
+    from tgarchive.search import SQLiteFTS5IndexManager
+
+    after = decode_cursor(cursor, "fts", 2) if cursor else None
+    # query-only: no schema inspection or migration on the request path
+    fts = SQLiteFTS5IndexManager(db_conn, inspect_schema=False)
+    rows, next_key = fts.search_messages_page(
+        query, limit=limit, after=after, **filters
+    )
+    return rows, encode_cursor("fts", next_key) if next_key else None
+
+
 # ============================================================================
 # HYBRID SEARCH ENDPOINTS (FTS5 + VECTOR)
 # ============================================================================
@@ -106,11 +129,12 @@ def hybrid_search():
         qdrant_url = current_app.config.get('QDRANT_URL', 'http://localhost:6333')
         engine = HybridSearchEngine(db_conn, qdrant_url=qdrant_url)
 
-        # Perform search
+        # Perform search; fused rankings have no stable sort key to resume
+        # from, so pages are cut from the top offset + limit
         start_time = datetime.now()
         results = engine.search(
             query=query,
-            limit=limit,
+            limit=offset + limit,
             search_type=SearchType[search_type.upper()],
             filter_channel=filters.get('channel_id'),
             filter_user=filters.get('user_id'),
@@ -224,6 +248,7 @@ def fulltext_search():
         {
             "query": "keyword search",
             "limit": 20,
+            "cursor": "...",  # next_cursor of the previous page
             "match_type": "any|all|phrase"  # Default: any
         }
     """
@@ -232,43 +257,38 @@ def fulltext_search():
         query = validate_input(data.get('query'), 'string', min_length=2, max_length=500)
         limit = validate_input(data.get('limit', 20), 'int', min_length=1, max_length=100)
         match_type = data.get('match_type', 'any')
+        cursor = data.get('cursor')
 
-        # Perform FTS5 full-text search using HybridSearchEngine
-        from tgarchive.search import HybridSearchEngine, SearchType
-        
         db_conn = get_database_connection()
-        qdrant_url = current_app.config.get('QDRANT_URL', 'http://localhost:6333')
-        engine = HybridSearchEngine(db_conn, qdrant_url=qdrant_url)
-        
-        start_time = datetime.now()
-        results = engine.search(
-            query=query,
-            limit=limit,
-            search_type=SearchType.KEYWORD,
-        )
-        search_time = (datetime.now() - start_time).total_seconds() * 1000
-        
+        try:
+            start_time = datetime.now()
+            rows, next_cursor = fulltext_page(db_conn, query, limit, cursor)
+            search_time = (datetime.now() - start_time).total_seconds() * 1000
+        finally:
+            db_conn.close()
+
         # Format results
         formatted_results = []
-        for result in results:
+        for row in rows:
             formatted_results.append({
-                "message_id": result.message_id,
-                "content": result.content[:500],
-                "relevance_score": round(result.relevance_score, 3),
+                "message_id": row[0],
+                "content": (row[3] or "")[:500],
+                "relevance_score": round(row[6], 3),
                 "match_type": match_type,
-                "metadata": result.metadata,
+                "metadata": {"channel_id": row[1], "user_id": row[2], "date": row[4]},
             })
-        
+
         return {
             'results': formatted_results,
             'total': len(formatted_results),
+            'next_cursor': next_cursor,
             'query': query,
             'match_type': match_type,
             'search_type': 'fulltext',
             'execution_time_ms': int(search_time)
         }, 200
 
-    except ValidationError as e:
+    except (ValidationError, InvalidCursor) as e:
         return {'error': str(e)}, 400
 
 
@@ -24,7 +24,7 @@ class ArchiveService:
     def __init__(self, config: Config, task_manager: TaskManager, db: Optional[SpectraDB] = None):
         self.config = config
         self.task_manager = task_manager
-        self.db = db or SpectraDB(Path(config.data.get("db_path", "spectra.db")))
+        self.db = db or SpectraDB.from_config(config)
     
     async def archive_channel(
         self,
@@ -6,10 +6,11 @@ Service layer for database operations.
 """
 
 import logging
-from pathlib import Path
-from typing import Dict, Any, Optional, List
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
 
 from ...db import SpectraDB
+from ...db.pagination import InvalidCursor, decode_cursor, encode_cursor
 from ...core.config_models import Config
 
 logger = logging.getLogger(__name__)
@@ -20,51 +21,71 @@ class DatabaseService:
     
     def __init__(self, config: Config):
         self.config = config
-        db_path = Path(config.data.get("db_path", "spectra.db"))
-        self.db = SpectraDB(db_path)
+        self.db = SpectraDB.from_config(config)
+    
+    async def _page_start(self, fetch_page, page: int, limit: int, **kwargs) -> Tuple[Optional[tuple], bool]:
+        """
+        Keyset position where legacy page number *page* begins.
+
+        Returns ``(key, past_end)``.  Only clients still sending ``page``
+        instead of ``cursor`` pay for the skipped rows.
+        """
+        if page <= 1:
+            return None, False
+        _, key = await self.db.pool.run(lambda: fetch_page((page - 1) * limit, None, **kwargs))
+        return key, key is None
     
     async def list_channels(
         self,
         page: int = 1,
         limit: int = 20,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         List channels from database.
         
         Args:
-            page: Page number
+            page: Page number (ignored when ``cursor`` is given)
             limit: Items per page
             search: Optional search term
+            cursor: Opaque ``next_cursor`` from the previous page
             
         Returns:
-            List of channels
+            List of channels and the cursor for the next page
+            
+        Raises:
+            InvalidCursor: If ``cursor`` is not a channel listing cursor
         """
         try:
-            channels = self.db.get_all_unique_channels()
-            
-            # Apply search filter if provided
-            if search:
-                search_lower = search.lower()
-                channels = [
-                    c for c in channels
-                    if search_lower in str(c.get("id", "")).lower()
-                    or search_lower in str(c.get("username", "")).lower()
-                    or search_lower in str(c.get("title", "")).lower()
-                ]
+            past_end = False
+            if cursor:
+                after = decode_cursor(cursor, "channels", 1)
+            else:
+                after, past_end = await self._page_start(self.db.channels_page, page, limit, search=search)
             
-            # Pagination
-            total = len(channels)
-            start = (page - 1) * limit
-            end = start + limit
-            paginated_channels = channels[start:end]
+            rows, next_key = [], None
+            if not past_end:
+                rows, next_key = await self.db.pool.run(self.db.channels_page, limit, after, search)
+            total = await self.db.pool.run(self.db.count_channels, search)
             
             return {
-                "channels": paginated_channels,
+                "channels": [
+                    {
+                        "id": channel_id,
+                        "title": channel_name,
+                        "accounts": accounts,
+                        "last_seen": last_seen,
+                    }
+                    for channel_id, channel_name, accounts, last_seen in rows
+                ],
                 "total": total,
                 "page": page,
-                "limit": limit
+                "limit": limit,
+                "next_cursor": encode_cursor("channels", next_key) if next_key else None
             }
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Failed to list channels: {e}", exc_info=True)
             raise
@@ -80,7 +101,7 @@ class DatabaseService:
             Channel details
         """
         try:
-            channels = self.db.get_all_unique_channels()
+            channels = await self.db.pool.run(self.db.get_all_unique_channels)
             
             for channel in channels:
                 if str(channel.get("id")) == str(channel_id) or channel.get("username") == channel_id:
@@ -107,30 +128,70 @@ class DatabaseService:
         page: int = 1,
         limit: int = 20,
         date_from: Optional[str] = None,
-        date_to: Optional[str] = None
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Query messages from database.
+        Query messages from database, newest first.
         
         Args:
             channel_id: Optional channel identifier
-            page: Page number
+            page: Page number (ignored when ``cursor`` is given)
             limit: Items per page
-            date_from: Optional start date
-            date_to: Optional end date
+            date_from: Optional start date (ISO 8601)
+            date_to: Optional end date (ISO 8601)
+            cursor: Opaque ``next_cursor`` from the previous page
             
         Returns:
-            List of messages
+            List of messages, the total matching, and the cursor for the next page
+            
+        Raises:
+            InvalidCursor: If ``cursor`` is not a message listing cursor
+            ValueError: If a date is not ISO 8601 or the channel is not numeric
+            LookupError: If the channel is not in this archive
         """
         try:
-            # This would require additional DB query methods
-            # For now, return structure
+            if channel_id is not None and not str(channel_id).lstrip("-").isdigit():
+                raise ValueError(f"Channel ID must be numeric, got {channel_id!r}")
+            filters = {
+                "date_from": datetime.fromisoformat(date_from) if date_from else None,
+                "date_to": datetime.fromisoformat(date_to) if date_to else None,
+                "channel_id": int(channel_id) if channel_id is not None else None,
+            }
+            past_end = False
+            if cursor:
+                before = decode_cursor(cursor, "messages", 2)
+            else:
+                before, past_end = await self._page_start(self.db.messages_page, page, limit, **filters)
+            
+            rows, next_key = [], None
+            if not past_end:
+                rows, next_key = await self.db.pool.run(
+                    lambda: self.db.messages_page(limit, before, **filters)
+                )
+            total = await self.db.pool.run(lambda: self.db.count_messages(**filters))
+            
             return {
-                "messages": [],
-                "total": 0,
+                "messages": [
+                    {
+                        "message_id": message_id,
+                        "type": msg_type,
+                        "date": date,
+                        "edit_date": edit_date,
+                        "text": content,
+                        "reply_to": reply_to,
+                        "sender_id": user_id,
+                        "media_id": media_id,
+                    }
+                    for message_id, msg_type, date, _date_ts, edit_date, content, reply_to, user_id, media_id in rows
+                ],
+                "total": total,
                 "page": page,
-                "limit": limit
+                "limit": limit,
+                "next_cursor": encode_cursor("messages", next_key) if next_key else None
             }
+        except (InvalidCursor, ValueError, LookupError):
+            raise
         except Exception as e:
             logger.error(f"Failed to query messages: {e}", exc_info=True)
             raise
@@ -223,13 +284,17 @@ class DatabaseService:
             Database statistics
         """
         try:
-            channels = self.db.get_all_unique_channels()
+            channels = await self.db.pool.run(self.db.get_all_unique_channels)
+            counts = {}
+            for table in ("messages", "users", "media"):
+                rows = await self.db.aread(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = rows[0][0] if rows else 0
             
             return {
                 "total_channels": len(channels),
-                "total_messages": 0,  # Would require additional query
-                "total_users": 0,  # Would require additional query
-                "total_media": 0,  # Would require additional query
+                "total_messages": counts["messages"],
+                "total_users": counts["users"],
+                "total_media": counts["media"],
                 "database_path": str(self.db.db_path)
             }
         except Exception as e:
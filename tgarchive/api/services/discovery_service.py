@@ -31,7 +31,7 @@ class DiscoveryService:
         self.config = config
         self.task_manager = task_manager
         self.data_dir = data_dir
-        self.db = db or SpectraDB(Path(config.data.get("db_path", "spectra.db")))
+        self.db = db or SpectraDB.from_config(config)
         self.manager: Optional[SpectraCrawlerManager] = None
     
     async def discover_from_seed(
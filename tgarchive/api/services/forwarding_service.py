@@ -7,7 +7,6 @@ Service layer for forwarding operations.
 
 import asyncio
 import logging
-from pathlib import Path
 from typing import Dict, Any, Optional
 
 from ...core.config_models import Config
@@ -46,7 +45,7 @@ class ForwardingService:
     def __init__(self, config: Config, task_manager: TaskManager, db: Optional[SpectraDB] = None):
         self.config = config
         self.task_manager = task_manager
-        self.db = db or SpectraDB(Path(config.data.get("db_path", "spectra.db")))
+        self.db = db or SpectraDB.from_config(config)
 
     def _build_forwarder(self, options: Dict[str, Any]) -> AttachmentForwarder:
         source_topic_id = _coerce_optional_int(options.get("source_topic_id"))
@@ -37,27 +37,48 @@ DEFAULT_CFG: Dict[str, Any] = {
     },
     "entity": "",
     "db_path": "spectra.sqlite3",
+    "db_profile": "ingest",
+    "db_pool": {
+        "readers": 4,
+        "executor_workers": None,
+    },
     "media_dir": "media",
     "download_media": True,
     "download_avatars": True,
     "media_mime_whitelist": [],
+    "media_download_workers": 4,
+    "media_queue_size": 64,
     "batch": 500,
+    "batch_flush_seconds": 5.0,
     "sleep_between_batches": 1.0,
     "use_takeout": False,
     "avatar_size": 128,
     "collect_usernames": True,
     "sidecar_metadata": True,
     "archive_topics": True,
+    "topic_concurrency": 1,
     "default_forwarding_destination_id": None,
     "forwarding": {
         "enable_deduplication": True,
         "secondary_unique_destination": None,
         "always_prepend_origin_info": False,
+        # message ids per forward request (up to 100); 1 forwards one by one
+        "forward_batch_size": 1,
+        # group and forward while walking the origin instead of loading it all first
+        "stream_history": False,
     },
     "deduplication": {
         "enable_near_duplicates": False,
         "fuzzy_hash_similarity_threshold": 90,
         "perceptual_hash_distance_threshold": 5,
+        # candidate selection for fuzzy-hash lookups; raise the false-negative
+        # weight for recall, the false-positive weight for precision
+        "minhash_lsh": {
+            "threshold": 0.5,
+            "num_perm": 128,
+            "false_positive_weight": 0.5,
+            "false_negative_weight": 0.5,
+        },
         "forward_with_attribution": True,
     },
     "cloud": {
@@ -304,6 +325,11 @@ class Config:
     def proxy_conf(self) -> Dict[str, Any]: # Added type hint
         return self.data.get("proxy", {}) # Ensure it returns a dict
 
+    @property
+    def db_profile(self) -> Optional[str]:
+        """Pragma profile (see :mod:`tgarchive.db.pragmas`) for archive DB handles."""
+        return self.data.get("db_profile")
+
     @property
     def forward_with_attribution(self) -> bool:
         return self.data.get("forwarding", {}).get("forward_with_attribution", True)
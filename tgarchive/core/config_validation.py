@@ -127,11 +127,45 @@ CONFIG_SCHEMA = {
                 "type": "string"
             }
         },
+        "db_profile": {
+            "type": "string",
+            "enum": ["default", "ingest", "query"]
+        },
+        "db_pool": {
+            "type": "object",
+            "properties": {
+                "readers": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 64
+                },
+                "executor_workers": {
+                    "type": ["integer", "null"],
+                    "minimum": 1,
+                    "maximum": 128
+                }
+            }
+        },
+        "media_download_workers": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 64
+        },
+        "media_queue_size": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 10000
+        },
         "batch": {
             "type": "integer",
             "minimum": 1,
             "maximum": 10000
         },
+        "batch_flush_seconds": {
+            "type": "number",
+            "minimum": 0.0,
+            "maximum": 3600.0
+        },
         "sleep_between_batches": {
             "type": "number",
             "minimum": 0.0,
@@ -153,6 +187,11 @@ CONFIG_SCHEMA = {
         "archive_topics": {
             "type": "boolean"
         },
+        "topic_concurrency": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 64
+        },
         "default_forwarding_destination_id": {
             "type": ["integer", "null"]
         },
@@ -161,7 +200,13 @@ CONFIG_SCHEMA = {
             "properties": {
                 "enable_deduplication": {"type": "boolean"},
                 "secondary_unique_destination": {"type": ["integer", "null"]},
-                "always_prepend_origin_info": {"type": "boolean"}
+                "always_prepend_origin_info": {"type": "boolean"},
+                "forward_batch_size": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "stream_history": {"type": "boolean"}
             }
         },
         "deduplication": {
@@ -6,7 +6,10 @@ This module contains functions for file deduplication.
 """
 
 import hashlib
+import logging
 import re
+import time
+from dataclasses import dataclass
 from difflib import SequenceMatcher
 import imagehash
 try:
@@ -16,6 +19,9 @@ except ImportError:
     HAS_SSDEEP = False
 from PIL import Image
 from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
 @lru_cache(maxsize=1024)
 def get_file_hashes(db, file_id):
     """
@@ -108,21 +114,33 @@ def is_exact_match(db, sha256_hash, channel_id=None):
     db.cur.execute(sql, params)
     return db.cur.fetchone() is not None
 
-def find_near_duplicates(db, fuzzy_hash, threshold=85, channel_id=None):
+def find_near_duplicates(db, fuzzy_hash, threshold=85, channel_id=None, lsh=None):
     """
     Finds near-duplicates for a file in the database.
+
+    With *lsh* (a :class:`~tgarchive.core.minhash_lsh.MinHashLSHIndex`) only the
+    files it returns as candidates are compared; otherwise every stored fuzzy
+    hash is.
     """
+    if lsh is not None:
+        candidates = lsh.candidates(fuzzy_hash)
+        if not candidates:
+            return []
+        id_filter = f" AND f.file_id IN ({','.join('?' * len(candidates))})"
+    else:
+        candidates = []
+        id_filter = ""
     if channel_id:
         sql = """
             SELECT f.file_id, f.fuzzy_hash
             FROM file_hashes f
             JOIN channel_file_inventory c ON f.file_id = c.file_id
             WHERE f.fuzzy_hash IS NOT NULL AND c.channel_id = ?
-        """
-        params = (channel_id,)
+        """ + id_filter
+        params = (channel_id, *candidates)
     else:
-        sql = "SELECT file_id, fuzzy_hash FROM file_hashes WHERE fuzzy_hash IS NOT NULL"
-        params = ()
+        sql = "SELECT f.file_id, f.fuzzy_hash FROM file_hashes f WHERE f.fuzzy_hash IS NOT NULL" + id_filter
+        params = tuple(candidates)
     db.cur.execute(sql, params)
     duplicates = []
     for file_id, other_fuzzy_hash in db.cur.fetchall():
@@ -179,70 +197,266 @@ def get_exif_data(file_path):
     except Exception:
         return None
 
+def hash_file(file_path):
+    """
+    Computes the SHA-256, perceptual and fuzzy hashes of a file.
+
+    Module-level so it can run in a worker process.
+    """
+    return get_sha256_hash(file_path), get_perceptual_hash(file_path), get_fuzzy_hash(file_path)
+
+def known_file_ids(db, file_ids):
+    """
+    Returns the subset of *file_ids* that already have a row in file_hashes.
+    """
+    file_ids = list(file_ids)
+    known = set()
+    for start in range(0, len(file_ids), 500):
+        part = file_ids[start:start + 500]
+        db.cur.execute(
+            f"SELECT file_id FROM file_hashes WHERE file_id IN ({','.join('?' * len(part))})",
+            part,
+        )
+        known.update(row[0] for row in db.cur.fetchall())
+    return known
+
+@dataclass
+class StageStats:
+    """Items, bytes and active wall-clock seconds of one scanner stage."""
+    items: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_second(self):
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+class _StageClock:
+    """Adds the span from the first start to the last end of a stage in one batch."""
+    def __init__(self, stats):
+        self.stats = stats
+        self.first = None
+        self.last = None
+
+    def start(self):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        return now
+
+    def stop(self, items=1, nbytes=0):
+        self.last = time.perf_counter()
+        self.stats.items += items
+        self.stats.bytes += nbytes
+
+    def close(self):
+        if self.first is not None and self.last is not None:
+            self.stats.seconds += self.last - self.first
+
 class ChannelScanner:
     """
     Scans a channel for files and generates hashes for them.
+
+    Each batch runs as a staged pipeline:
+
+    * files whose id already has a row in file_hashes are skipped before
+      anything is downloaded;
+    * downloads run concurrently, at most *download_concurrency* at a time;
+    * each finished download is hashed straight away in a process pool
+      (*hash_workers* processes; ``0`` hashes in a thread of this process);
+    * the batch's hashes are written with one ``add_file_hashes`` call.
+
+    :attr:`stats` holds per-stage throughput; :meth:`report` summarises it.
     """
-    def __init__(self, db, client):
+    def __init__(self, db, client, download_concurrency=4, hash_workers=None):
         self.db = db
         self.client = client
+        self.download_concurrency = max(1, int(download_concurrency))
+        self.hash_workers = hash_workers
+        self._executor = None
+        self._scanning = False
+        self.skipped = 0
+        self.failed = 0
+        self.stats = {
+            "download": StageStats(),
+            "hash": StageStats(),
+            "write": StageStats(),
+        }
+
+    def _get_executor(self):
+        if self._executor is None and self.hash_workers != 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.hash_workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
     async def scan_channel(self, channel, batch_size=100, rate_limit_seconds=1):
         """
         Scans a channel for files, generates hashes, and stores them in the database.
         """
-        import tempfile
-        import os
         import asyncio
 
+        started = time.perf_counter()
         batch = []
-        async for message in self.client.iter_messages(channel):
-            if not message.file:
-                continue
+        self._scanning = True
+        try:
+            async for message in self.client.iter_messages(channel):
+                if not message.file:
+                    continue
 
-            batch.append(message)
+                batch.append(message)
 
-            if len(batch) >= batch_size:
-                await self.process_batch(batch)
-                batch = []
-                await asyncio.sleep(rate_limit_seconds)
+                if len(batch) >= batch_size:
+                    await self.process_batch(batch)
+                    batch = []
+                    await asyncio.sleep(rate_limit_seconds)
 
-        if batch:
-            await self.process_batch(batch)
+            if batch:
+                await self.process_batch(batch)
+        finally:
+            self._scanning = False
+            self.close()
+        return self.report(time.perf_counter() - started)
 
     async def process_batch(self, batch):
-        import tempfile
-        import os
-        import asyncio
+        """
+        Skips, downloads, hashes and stores one batch of messages.
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tasks = []
-            for message in batch:
-                tasks.append(self.process_message(message, tmpdir))
-            await asyncio.gather(*tasks)
+        Outside :meth:`scan_channel` the hashing pool only lives for this call.
+        """
+        try:
+            await self._process_batch(batch)
+        finally:
+            if not self._scanning:
+                self.close()
 
-    async def process_message(self, message, tmpdir):
-        import os
+    async def _process_batch(self, batch):
         import asyncio
+        import tempfile
 
-        file_path = os.path.join(tmpdir, message.file.name)
-        try:
-            await self.client.download_media(message.media, file=file_path)
-        except Exception as e:
-            print(f"Failed to download {message.file.name}: {e}")
-            return
-
-        sha256_hash = await asyncio.to_thread(get_sha256_hash, file_path)
-        if await asyncio.to_thread(is_exact_match, self.db, sha256_hash):
+        known = await asyncio.to_thread(known_file_ids, self.db, {m.file.id for m in batch})
+        pending = []
+        seen = set()
+        for message in batch:
+            if message.file.id in known or message.file.id in seen:
+                self.skipped += 1
+                continue
+            seen.add(message.file.id)
+            pending.append(message)
+        if not pending:
             return
 
-        perceptual_hash = await asyncio.to_thread(get_perceptual_hash, file_path)
-        fuzzy_hash = await asyncio.to_thread(get_fuzzy_hash, file_path)
+        semaphore = asyncio.Semaphore(self.download_concurrency)
+        downloads = _StageClock(self.stats["download"])
+        hashing = _StageClock(self.stats["hash"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = await asyncio.gather(
+                *(self.process_message(m, tmpdir, semaphore, downloads, hashing) for m in pending)
+            )
+        downloads.close()
+        hashing.close()
+
+        rows = [row for row in results if row is not None]
+        if rows:
+            writes = _StageClock(self.stats["write"])
+            writes.start()
+            await asyncio.to_thread(self._write_rows, rows)
+            writes.stop(len(rows))
+            writes.close()
+
+    async def process_message(self, message, tmpdir, semaphore=None, downloads=None, hashing=None):
+        """
+        Downloads one file and hashes it; returns ``(file_id, sha256, phash, fuzzy)`` or None.
+        """
+        import asyncio
+        import os
 
-        await asyncio.to_thread(
-            self.db.add_file_hash,
-            file_id=message.file.id,
-            sha256_hash=sha256_hash,
-            perceptual_hash=perceptual_hash,
-            fuzzy_hash=fuzzy_hash,
+        semaphore = semaphore or asyncio.Semaphore(1)
+        downloads = downloads or _StageClock(self.stats["download"])
+        hashing = hashing or _StageClock(self.stats["hash"])
+
+        file_path = os.path.join(tmpdir, f"{message.id}-{os.path.basename(str(message.file.name))}")
+        async with semaphore:
+            downloads.start()
+            try:
+                await self.client.download_media(message.media, file=file_path)
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Failed to download %s: %s", message.file.name, e)
+                return None
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            downloads.stop(nbytes=size)
+
+        hashing.start()
+        try:
+            loop = asyncio.get_running_loop()
+            sha256_hash, perceptual_hash, fuzzy_hash = await loop.run_in_executor(
+                self._get_executor(), hash_file, file_path
+            )
+        except Exception as e:
+            self.failed += 1
+            logger.warning("Failed to hash %s: %s", message.file.name, e)
+            return None
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        hashing.stop(nbytes=size)
+        return message.file.id, sha256_hash, perceptual_hash, fuzzy_hash
+
+    def _write_rows(self, rows):
+        records = []
+        batch_hashes = set()
+        for file_id, sha256_hash, perceptual_hash, fuzzy_hash in rows:
+            if is_exact_match(self.db, sha256_hash) or sha256_hash in batch_hashes:
+                # content already archived: record the id so rescans skip it,
+                # but keep it out of the near-duplicate indexes
+                perceptual_hash = fuzzy_hash = None
+            batch_hashes.add(sha256_hash)
+            records.append((file_id, sha256_hash, perceptual_hash, fuzzy_hash))
+        if hasattr(self.db, "add_file_hashes"):
+            self.db.add_file_hashes(records)
+        else:
+            for file_id, sha256_hash, perceptual_hash, fuzzy_hash in records:
+                self.db.add_file_hash(
+                    file_id=file_id,
+                    sha256_hash=sha256_hash,
+                    perceptual_hash=perceptual_hash,
+                    fuzzy_hash=fuzzy_hash,
+                )
+
+    def report(self, elapsed=None):
+        """
+        Per-stage throughput so far, also written to the log.
+        """
+        report = {
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "stages": {
+                name: {
+                    "items": stage.items,
+                    "bytes": stage.bytes,
+                    "seconds": round(stage.seconds, 3),
+                    "items_per_second": round(stage.items_per_second, 2),
+                    "bytes_per_second": round(stage.bytes_per_second, 1),
+                }
+                for name, stage in self.stats.items()
+            },
+        }
+        if elapsed is not None:
+            report["elapsed_seconds"] = round(elapsed, 3)
+        logger.info(
+            "Channel scan: %d skipped, %d failed; "
+            + "; ".join(f"{name} {stage.items} in {stage.seconds:.2f}s ({stage.items_per_second:.1f}/s)"
+                        for name, stage in self.stats.items()),
+            self.skipped,
+            self.failed,
         )
+        return report
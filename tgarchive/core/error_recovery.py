@@ -23,7 +23,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
 import json
 
 from telethon import errors  # type: ignore
@@ -145,6 +145,9 @@ class RateLimitHandler:
         self.jitter_factor = jitter_factor
         self.enable_jitter = enable_jitter
         self.rate_limit_events: Dict[str, List[float]] = {}
+        # Per-context flood-wait parking (monotonic resume time) and totals
+        self._parked_until: Dict[str, float] = {}
+        self._wait_totals: Dict[str, Dict[str, float]] = {}
 
     async def handle_flood_wait(self, error: errors.FloodWaitError, context: str = "") -> None:
         """
@@ -201,6 +204,86 @@ class RateLimitHandler:
         await asyncio.sleep(delay)
         return True
 
+    def park(self, context: str, seconds: float) -> float:
+        """
+        Park *context* for a FloodWait of *seconds* without sleeping.
+
+        Unlike :meth:`handle_flood_wait` the full requested wait is always
+        honoured (jitter only lengthens it), because retrying early just
+        earns another FloodWait.
+
+        Returns:
+            Seconds until *context* may be retried
+        """
+        wait_seconds = max(1.0, float(seconds))
+        if self.enable_jitter:
+            wait_seconds += random.uniform(0, self.jitter_factor) * wait_seconds
+
+        resume_at = time.monotonic() + wait_seconds
+        self._parked_until[context] = max(self._parked_until.get(context, 0.0), resume_at)
+
+        totals = self._wait_totals.setdefault(
+            context, {"flood_waits": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        )
+        totals["flood_waits"] += 1
+        totals["total_wait_seconds"] += wait_seconds
+        totals["max_wait_seconds"] = max(totals["max_wait_seconds"], wait_seconds)
+        self.rate_limit_events.setdefault(context, []).append(time.time())
+
+        logger.warning(f"Rate limit hit for {context}. Parked for {wait_seconds:.1f}s (requested: {seconds}s)")
+        return self.ready_in(context)
+
+    def ready_in(self, context: str) -> float:
+        """Seconds until a parked *context* may run again (0 if ready)."""
+        resume_at = self._parked_until.get(context)
+        if resume_at is None:
+            return 0.0
+        remaining = resume_at - time.monotonic()
+        if remaining <= 0:
+            del self._parked_until[context]
+            return 0.0
+        return remaining
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args,
+        context: str = "",
+        max_attempts: int = 5,
+        **kwargs,
+    ) -> T:
+        """
+        Await ``func(*args, **kwargs)``, retrying FloodWait iteratively.
+
+        Only callers sharing *context* wait out a park; other contexts keep
+        running.  The final FloodWaitError is re-raised once *max_attempts*
+        calls have been made.
+        """
+        for attempt in range(max_attempts):
+            wait = self.ready_in(context)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await func(*args, **kwargs)
+            except errors.FloodWaitError as e:
+                self.park(context, e.seconds)
+                if attempt + 1 >= max_attempts:
+                    logger.error(f"Max retry attempts ({max_attempts}) reached for {context}")
+                    raise
+        raise RuntimeError("max_attempts must be at least 1")
+
+    def get_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-context flood-wait statistics for monitoring."""
+        return {
+            context: {
+                "flood_waits": int(totals["flood_waits"]),
+                "total_wait_seconds": round(totals["total_wait_seconds"], 3),
+                "max_wait_seconds": round(totals["max_wait_seconds"], 3),
+                "parked_for_seconds": round(self.ready_in(context), 3),
+            }
+            for context, totals in self._wait_totals.items()
+        }
+
     def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get rate limit statistics for monitoring."""
         stats = {}
@@ -218,6 +301,91 @@ class RateLimitHandler:
         return stats
 
 
+@dataclass
+class _ScheduledItem:
+    index: int
+    context: str
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    attempts: int = 0
+
+
+class RetryScheduler:
+    """
+    Run keyed work items concurrently, parking flood-waited ones.
+
+    Each item is a ``(context, factory)`` pair where *factory* returns a fresh
+    awaitable per attempt.  When an item raises FloodWaitError its context is
+    parked on the shared :class:`RateLimitHandler` and the item is re-queued
+    after the wait; workers meanwhile keep serving items for other contexts.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimitHandler] = None,
+        concurrency: int = 4,
+        max_attempts: int = 5,
+    ):
+        self.rate_limiter = rate_limiter or RateLimitHandler()
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.parked = 0
+
+    async def run(
+        self,
+        items: Iterable[Tuple[str, Callable[[], Awaitable[T]]]],
+    ) -> List[Union[T, BaseException]]:
+        """
+        Run all *items* and return their results in submission order.
+
+        Exceptions (including a FloodWaitError that exhausted its attempts)
+        are returned in place of the result rather than raised.
+        """
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Queue[_ScheduledItem] = asyncio.Queue()
+        scheduled = [
+            _ScheduledItem(i, context, factory, loop.create_future())
+            for i, (context, factory) in enumerate(items)
+        ]
+        for item in scheduled:
+            ready.put_nowait(item)
+
+        def unpark(item: _ScheduledItem) -> None:
+            self.parked -= 1
+            ready.put_nowait(item)
+
+        def park(item: _ScheduledItem, delay: float) -> None:
+            self.parked += 1
+            loop.call_later(delay, unpark, item)
+
+        async def worker() -> None:
+            while True:
+                item = await ready.get()
+                wait = self.rate_limiter.ready_in(item.context)
+                if wait > 0:
+                    park(item, wait)
+                    continue
+                try:
+                    item.future.set_result(await item.factory())
+                except errors.FloodWaitError as e:
+                    item.attempts += 1
+                    delay = self.rate_limiter.park(item.context, e.seconds)
+                    if item.attempts >= self.max_attempts:
+                        item.future.set_exception(e)
+                    else:
+                        park(item, delay)
+                except Exception as e:
+                    item.future.set_exception(e)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(scheduled)))]
+        try:
+            return await asyncio.gather(*(item.future for item in scheduled), return_exceptions=True)
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
 class ErrorCollector:
     """
     Collects errors during batch operations without stopping execution.
@@ -523,6 +691,7 @@ __all__ = [
     "ErrorContext",
     "RecoveryCheckpoint",
     "RateLimitHandler",
+    "RetryScheduler",
     "ErrorCollector",
     "MessageProcessingRecovery",
     "with_recovery",
@@ -0,0 +1,306 @@
+"""
+MinHash LSH Index for SPECTRA
+=============================
+
+Banded locality-sensitive hashing over MinHash signatures of fuzzy hashes,
+persisted in SQLite, so near-duplicate text and document lookups compare
+against a handful of candidates instead of every stored fuzzy hash.
+
+A signature of ``num_perm`` values is cut into ``bands`` bands of ``rows``
+values; each band is hashed to a bucket and stored in ``file_minhash_bands``.
+Two files become candidates when they share a bucket in any band, which
+happens with probability ``1 - (1 - J**rows)**bands`` for Jaccard similarity
+``J``.  ``bands``/``rows`` are chosen from a Jaccard *threshold* and the
+relative weight of false positives (precision) and false negatives (recall).
+Candidates still go through the exact comparison
+(:func:`~tgarchive.core.deduplication.compare_fuzzy_hashes`) afterwards.
+
+Shingles depend on the kind of fuzzy hash:
+
+* ``fallback:`` hashes (normalised text, used when ssdeep is missing) are
+  shingled into word 3-grams;
+* ssdeep hashes ``blocksize:sig1:sig2`` are shingled into the 7-character
+  substrings ssdeep itself requires a match on, tagged with their block size
+  so hashes one block size apart still meet.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import sys
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from datasketch import MinHash
+    HAS_DATASKETCH = True
+except ImportError:
+    HAS_DATASKETCH = False
+
+from tgarchive.db.schema import FILE_MINHASH_SQL
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_PREFIX = "fallback:"
+WORD_SHINGLE = 3
+SSDEEP_SHINGLE = 7
+
+
+def fuzzy_hash_shingles(fuzzy_hash: str) -> Set[str]:
+    """Shingle set of a stored fuzzy hash (see the module docstring)."""
+    if not fuzzy_hash:
+        return set()
+    if fuzzy_hash.startswith(FALLBACK_PREFIX):
+        words = fuzzy_hash[len(FALLBACK_PREFIX):].split()
+        if len(words) < WORD_SHINGLE:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + WORD_SHINGLE]) for i in range(len(words) - WORD_SHINGLE + 1)}
+
+    try:
+        block_size, sig1, sig2 = fuzzy_hash.split(":", 2)
+        block_size = int(block_size)
+    except ValueError:
+        return {fuzzy_hash}
+    shingles = set()
+    for size, sig in ((block_size, sig1), (block_size * 2, sig2.split(",", 1)[0])):
+        if len(sig) < SSDEEP_SHINGLE:
+            if sig:
+                shingles.add(f"{size}:{sig}")
+            continue
+        shingles.update(f"{size}:{sig[i:i + SSDEEP_SHINGLE]}" for i in range(len(sig) - SSDEEP_SHINGLE + 1))
+    return shingles
+
+
+def fuzzy_hash_signature(fuzzy_hash: str, num_perm: int = 128, seed: int = 1) -> Optional[List[int]]:
+    """MinHash signature of *fuzzy_hash*, or ``None`` if it has no shingles or datasketch is missing."""
+    if not HAS_DATASKETCH:
+        return None
+    shingles = fuzzy_hash_shingles(fuzzy_hash)
+    if not shingles:
+        return None
+    minhash = MinHash(num_perm=num_perm, seed=seed)
+    minhash.update_batch([s.encode("utf-8") for s in shingles])
+    return [int(v) for v in minhash.hashvalues]
+
+
+def _integrate(f, a: float, b: float, steps: int = 100) -> float:
+    width = (b - a) / steps
+    return sum(f(a + (i + 0.5) * width) for i in range(steps)) * width
+
+
+@lru_cache(maxsize=None)
+def optimal_bands(
+    threshold: float,
+    num_perm: int,
+    false_positive_weight: float = 0.5,
+    false_negative_weight: float = 0.5,
+) -> Tuple[int, int]:
+    """``(bands, rows)`` with ``bands * rows <= num_perm`` minimising the weighted error.
+
+    The false-positive rate is the candidate probability integrated over
+    Jaccard similarities below *threshold*; the false-negative rate is the
+    miss probability integrated above it.
+    """
+    if not 0.0 < threshold < 1.0:
+        raise ValueError(f"MinHash LSH threshold must be between 0 and 1, got {threshold}")
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+            fn = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+            error = false_positive_weight * fp + false_negative_weight * fn
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def _pack(signature: Sequence[int]) -> bytes:
+    values = array("Q", signature)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(blob: bytes) -> array:
+    values = array("Q")
+    values.frombytes(blob)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Fraction of equal MinHash values, the estimator of Jaccard similarity."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class MinHashLSHIndex:
+    """Banded MinHash LSH over ``file_id`` signatures, stored in the archive database."""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        threshold: float = 0.5,
+        num_perm: int = 128,
+        false_positive_weight: float = 0.5,
+        false_negative_weight: float = 0.5,
+        seed: int = 1,
+    ) -> None:
+        self.conn = conn
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm, false_positive_weight, false_negative_weight)
+        if not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'minhash_lsh_meta'"
+        ).fetchone():
+            # connections not opened through BaseDB have not run the schema migration
+            self.conn.executescript(FILE_MINHASH_SQL)
+        self._check_layout()
+
+    # Layout ------------------------------------------------------------------
+    def _meta(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT key, value FROM minhash_lsh_meta"))
+
+    def _check_layout(self) -> None:
+        """Adopt a fresh database, or re-band stored signatures if the parameters changed."""
+        meta = self._meta()
+        layout = {"num_perm": self.num_perm, "seed": self.seed, "bands": self.bands, "rows": self.rows}
+        if meta == layout:
+            return
+        if meta and (meta.get("num_perm"), meta.get("seed")) != (self.num_perm, self.seed):
+            # signatures of a different permutation family cannot be compared
+            logger.info("MinHash parameters changed; dropping %d stored signatures", self.conn.execute(
+                "SELECT COUNT(*) FROM file_minhashes").fetchone()[0])
+            self.conn.execute("DELETE FROM file_minhashes")
+        self.conn.execute("DELETE FROM file_minhash_bands")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO minhash_lsh_meta(key, value) VALUES (?, ?)", layout.items()
+        )
+        stored = self.conn.execute("SELECT file_id, signature FROM file_minhashes").fetchall()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO file_minhash_bands(band, bucket, file_id) VALUES (?, ?, ?)",
+            (row for file_id, blob in stored for row in self._band_rows(file_id, _unpack(blob))),
+        )
+        self.conn.commit()
+        if stored:
+            logger.info("Re-banded %d MinHash signatures into %d bands of %d rows", len(stored), self.bands, self.rows)
+
+    def _buckets(self, signature: Sequence[int]) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            chunk = _pack(signature[band * self.rows:(band + 1) * self.rows])
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def _band_rows(self, file_id: int, signature: Sequence[int]):
+        return ((band, bucket, file_id) for band, bucket in enumerate(self._buckets(signature)))
+
+    def signature(self, fuzzy_hash: str) -> Optional[List[int]]:
+        return fuzzy_hash_signature(fuzzy_hash, self.num_perm, self.seed)
+
+    # Maintenance -------------------------------------------------------------
+    def add_many(self, items: Iterable[Tuple[int, Sequence[int]]]) -> int:
+        """Index ``(file_id, signature)`` pairs in one transaction; returns how many were written."""
+        written = 0
+        for file_id, signature in items:
+            if len(signature) != self.num_perm:
+                raise ValueError(f"Expected a signature of {self.num_perm} values, got {len(signature)}")
+            self.conn.execute("DELETE FROM file_minhash_bands WHERE file_id = ?", (file_id,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO file_minhashes(file_id, signature) VALUES (?, ?)",
+                (file_id, _pack(signature)),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO file_minhash_bands(band, bucket, file_id) VALUES (?, ?, ?)",
+                self._band_rows(file_id, signature),
+            )
+            written += 1
+        self.conn.commit()
+        return written
+
+    def add(self, file_id: int, fuzzy_hash: str) -> bool:
+        """Index the fuzzy hash of *file_id*; ``False`` if no signature could be computed."""
+        signature = self.signature(fuzzy_hash)
+        if signature is None:
+            return False
+        self.add_many([(file_id, signature)])
+        return True
+
+    def remove(self, file_id: int) -> None:
+        self.conn.execute("DELETE FROM file_minhash_bands WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM file_minhashes WHERE file_id = ?", (file_id,))
+        self.conn.commit()
+
+    def sync_file_hashes(self, batch_size: int = 1000) -> int:
+        """Index every ``file_hashes`` fuzzy hash that has no signature yet; returns the count."""
+        rows = self.conn.execute(
+            "SELECT f.file_id, f.fuzzy_hash FROM file_hashes f "
+            "LEFT JOIN file_minhashes m ON m.file_id = f.file_id "
+            "WHERE f.fuzzy_hash IS NOT NULL AND m.file_id IS NULL"
+        ).fetchall()
+        indexed = 0
+        for start in range(0, len(rows), batch_size):
+            batch = []
+            for file_id, fuzzy_hash in rows[start:start + batch_size]:
+                signature = self.signature(fuzzy_hash)
+                if signature is not None:
+                    batch.append((file_id, signature))
+            indexed += self.add_many(batch)
+        if indexed:
+            logger.info("Indexed %d fuzzy hashes into the MinHash LSH index", indexed)
+        return indexed
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM file_minhashes").fetchone()[0]
+
+    # Lookups -----------------------------------------------------------------
+    def candidates_for_signature(self, signature: Sequence[int]) -> List[int]:
+        """File ids sharing at least one band bucket with *signature*."""
+        if len(signature) != self.num_perm:
+            return []
+        pairs = list(enumerate(self._buckets(signature)))
+        placeholders = ",".join("(?, ?)" for _ in pairs)
+        params = [value for pair in pairs for value in pair]
+        rows = self.conn.execute(
+            f"SELECT DISTINCT file_id FROM file_minhash_bands WHERE (band, bucket) IN (VALUES {placeholders})",
+            params,
+        )
+        return [row[0] for row in rows]
+
+    def candidates(self, fuzzy_hash: str) -> List[int]:
+        signature = self.signature(fuzzy_hash)
+        return [] if signature is None else self.candidates_for_signature(signature)
+
+    def query(self, signature: Sequence[int], min_jaccard: Optional[float] = None) -> List[Tuple[int, float]]:
+        """``(file_id, estimated Jaccard)`` of candidates at or above *min_jaccard* (default: the threshold)."""
+        min_jaccard = self.threshold if min_jaccard is None else min_jaccard
+        ids = self.candidates_for_signature(signature)
+        matches = []
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT file_id, signature FROM file_minhashes WHERE file_id IN ({','.join('?' * len(part))})",
+                part,
+            )
+            for file_id, blob in rows:
+                jaccard = estimate_jaccard(signature, _unpack(blob))
+                if jaccard >= min_jaccard:
+                    matches.append((file_id, jaccard))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+
+__all__ = [
+    "HAS_DATASKETCH",
+    "MinHashLSHIndex",
+    "estimate_jaccard",
+    "fuzzy_hash_shingles",
+    "fuzzy_hash_signature",
+    "optimal_bands",
+]
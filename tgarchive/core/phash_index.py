@@ -0,0 +1,181 @@
+"""
+Perceptual Hash Index for SPECTRA
+=================================
+
+In-memory multi-index hash (MIH) over 64-bit perceptual hashes, answering
+"which stored images are within Hamming distance *r* of this one?" without
+comparing against every stored hash.
+
+Each hash is split into ``CHUNKS`` 16-bit substrings and filed in one bucket
+table per substring.  By the pigeonhole principle two hashes within distance
+*r* agree to within ``r // CHUNKS`` bits on at least one substring, so a
+query only probes the buckets of its own substrings and their
+``r // CHUNKS``-bit neighbours (17 probes per table at the default
+``perceptual_hash_distance_threshold`` of 5), then verifies the candidates
+with a popcount.  Results are exact: the index returns the same matches as a
+linear scan.
+
+The index is built once from ``get_all_perceptual_hashes()`` and kept current
+with :meth:`PerceptualHashIndex.add` as hashes are recorded.
+"""
+
+import logging
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+PHash = Union[str, int]
+
+
+def parse_phash(value: PHash) -> Optional[int]:
+    """Integer form of a stored pHash (``str(imagehash.phash(...))`` hex), or ``None``."""
+    if isinstance(value, int):
+        number = value
+    else:
+        try:
+            number = int(str(value), 16)
+        except ValueError:
+            return None
+    if number < 0 or number.bit_length() > HASH_BITS:
+        return None
+    return number
+
+
+_flip_masks: Dict[int, List[int]] = {}
+
+
+def _chunk_masks(radius: int) -> List[int]:
+    """Every XOR mask of at most *radius* bits within one chunk."""
+    masks = _flip_masks.get(radius)
+    if masks is None:
+        masks = []
+        for k in range(radius + 1):
+            for bits in combinations(range(CHUNK_BITS), k):
+                mask = 0
+                for bit in bits:
+                    mask |= 1 << bit
+                masks.append(mask)
+        _flip_masks[radius] = masks
+    return masks
+
+
+class PerceptualHashIndex:
+    """Radius search over 64-bit perceptual hashes keyed by file id."""
+
+    def __init__(self, items: Iterable[Tuple[Hashable, PHash]] = ()) -> None:
+        self._hashes: List[Optional[int]] = []
+        self._ids: List[Hashable] = []
+        self._slots: Dict[Hashable, int] = {}
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(CHUNKS)]
+        self._dead = 0
+        self.update(items)
+
+    @classmethod
+    def from_db(cls, db, channel_id: Optional[int] = None) -> "PerceptualHashIndex":
+        """Build the index from ``db.get_all_perceptual_hashes(channel_id)``."""
+        index = cls(db.get_all_perceptual_hashes(channel_id))
+        logger.info(f"Loaded {len(index)} perceptual hashes into the near-duplicate index.")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, file_id: object) -> bool:
+        return file_id in self._slots
+
+    # Maintenance -------------------------------------------------------------
+    def add(self, file_id: Hashable, phash: PHash) -> bool:
+        """Index *phash* under *file_id*, replacing any earlier hash of that file.
+
+        Returns ``False`` (and indexes nothing) if *phash* is not a 64-bit hash.
+        """
+        value = parse_phash(phash)
+        if value is None:
+            logger.debug(f"Not indexing perceptual hash {phash!r} of file {file_id}: not a {HASH_BITS}-bit hash.")
+            return False
+        slot = self._slots.get(file_id)
+        if slot is not None:
+            if self._hashes[slot] == value:
+                return True
+            self._kill(slot)
+
+        slot = len(self._hashes)
+        self._hashes.append(value)
+        self._ids.append(file_id)
+        self._slots[file_id] = slot
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket is None:
+                table[chunk] = [slot]
+            else:
+                bucket.append(slot)
+        return True
+
+    def update(self, items: Iterable[Tuple[Hashable, PHash]]) -> None:
+        for file_id, phash in items:
+            if phash is not None:
+                self.add(file_id, phash)
+
+    def remove(self, file_id: Hashable) -> None:
+        slot = self._slots.pop(file_id, None)
+        if slot is not None:
+            self._kill(slot, forget=False)
+
+    def _kill(self, slot: int, forget: bool = True) -> None:
+        # bucket entries of a dead slot are skipped at query time and dropped on compaction
+        if forget:
+            self._slots.pop(self._ids[slot], None)
+        self._hashes[slot] = None
+        self._dead += 1
+        if self._dead > 1024 and self._dead > len(self._slots):
+            self._compact()
+
+    def _compact(self) -> None:
+        live = [(self._ids[slot], self._hashes[slot]) for slot in sorted(self._slots.values())]
+        self.__init__(live)
+
+    @staticmethod
+    def _chunks(value: int) -> List[int]:
+        return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+    # Lookups -----------------------------------------------------------------
+    def query(self, phash: PHash, max_distance: int) -> List[Tuple[Hashable, int]]:
+        """``(file_id, distance)`` of every indexed hash within *max_distance*, nearest first."""
+        value = parse_phash(phash)
+        if value is None or max_distance < 0:
+            return []
+        if max_distance >= HASH_BITS:
+            candidates = range(len(self._hashes))
+        else:
+            masks = _chunk_masks(max_distance // CHUNKS)
+            candidates = set()
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                for mask in masks:
+                    bucket = table.get(chunk ^ mask)
+                    if bucket:
+                        candidates.update(bucket)
+
+        matches = []
+        for slot in candidates:
+            other = self._hashes[slot]
+            if other is None:
+                continue
+            distance = (value ^ other).bit_count()
+            if distance <= max_distance:
+                matches.append((distance, slot))
+        matches.sort()
+        return [(self._ids[slot], distance) for distance, slot in matches]
+
+    def nearest(self, phash: PHash, max_distance: int) -> Optional[Tuple[Hashable, int]]:
+        """The closest ``(file_id, distance)`` within *max_distance*, or ``None``."""
+        matches = self.query(phash, max_distance)
+        return matches[0] if matches else None
+
+
+__all__ = ["PerceptualHashIndex", "parse_phash"]
@@ -34,6 +34,7 @@ import random
 import re
 import sqlite3
 import sys
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -94,8 +95,10 @@ except ImportError:
 
 # Local application imports
 from tgarchive.db import SpectraDB
+from tgarchive.db.pragmas import PRAGMA_PROFILES, apply_profile, defers_foreign_keys
 from tgarchive.forwarding import AttachmentForwarder
 from tgarchive.core.config_models import Config, DEFAULT_CFG # Import Config and DEFAULT_CFG
+from tgarchive.core.error_recovery import RateLimitHandler, RetryScheduler
 
 
 # ── Globals ───────────────────────────────────────────────────────────────
@@ -103,6 +106,8 @@ APP_NAME = "spectra_002_archiver"
 __version__ = "2.4.0"
 TZ = timezone.utc
 console = Console()
+# Shared FloodWait scheduler: parks per-entity contexts instead of blocking everyone
+flood_limiter = RateLimitHandler()
 
 # ── Logging Setup ─────────────────────────────────────────────────────────
 from tgarchive.core.log_engine import setup_log_engine
@@ -130,8 +135,10 @@ class ProxyCycler:
 
 # ── DB handler ────────────────────────────────────────────────────────────
 class DBHandler(contextlib.AbstractContextManager):
-    def __init__(self, db_file: Path):
+    def __init__(self, db_file: Path, profile: str | None = None):
         self.db_file = db_file
+        self.profile = profile
+        self.defer_foreign_keys = defers_foreign_keys(profile)
         self.conn: sqlite3.Connection | None = None
         self.cur: sqlite3.Cursor | None = None
 
@@ -141,6 +148,7 @@ class DBHandler(contextlib.AbstractContextManager):
         self.conn.execute("PRAGMA foreign_keys=ON;")
         self.cur = self.conn.cursor()
         self._schema()
+        apply_profile(self.conn, self.profile)
         return self
 
     def __exit__(self, exc_type, exc, tb):
@@ -215,8 +223,38 @@ class DBHandler(contextlib.AbstractContextManager):
                 date TEXT,
                 source_type TEXT
             );
+
+            CREATE TABLE IF NOT EXISTS archive_checkpoints (
+                entity_id INTEGER NOT NULL,
+                topic_id INTEGER NOT NULL DEFAULT 0,
+                last_message_id INTEGER NOT NULL,
+                updated_at TEXT,
+                PRIMARY KEY (entity_id, topic_id)
+            );
             """
         )
+        has_mention_key = self.cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_username_mentions_key'"
+        ).fetchone()
+        if not has_mention_key:
+            # resumed runs re-archive messages after a held checkpoint; one row per mention
+            self.cur.executescript(
+                """
+                DELETE FROM username_mentions WHERE id NOT IN (
+                    SELECT MIN(id) FROM username_mentions GROUP BY message_id, username, source_type
+                );
+                CREATE UNIQUE INDEX idx_username_mentions_key
+                    ON username_mentions(message_id, username, source_type);
+                """
+            )
+
+    def get_checkpoint(self, entity_id, topic_id=None):
+        """Return the last committed message id for *entity_id*/*topic_id*."""
+        row = self.cur.execute(
+            "SELECT last_message_id FROM archive_checkpoints WHERE entity_id = ? AND topic_id = ?",
+            (entity_id, topic_id or 0),
+        ).fetchone()
+        return row[0] if row else None
 
     def last_message_id(self, topic_id=None):
         if topic_id is not None:
@@ -278,10 +316,154 @@ class DBHandler(contextlib.AbstractContextManager):
 
     def add_username(self, username, msg_id, date, source="mention"):
         self.cur.execute(
-            "INSERT INTO username_mentions(username, message_id, date, source_type) VALUES (?, ?, ?, ?)",
+            "INSERT OR IGNORE INTO username_mentions(username, message_id, date, source_type) VALUES (?, ?, ?, ?)",
             (username, msg_id, date, source),
         )
 
+# ── Batched writer ────────────────────────────────────────────────────────
+class BatchedWriter:
+    """Buffer archive rows and write them to a :class:`DBHandler` in batches.
+
+    Rows are held in memory until ``batch_size`` messages are pending or
+    ``flush_interval`` seconds have passed since the last commit.  Each flush
+    writes users, messages, media and username mentions with ``executemany``
+    and records the resume checkpoint in the same transaction, so a crash
+    loses at most one batch and the checkpoint never runs ahead of the rows.
+    """
+
+    # Upsert rather than REPLACE: REPLACE deletes the parent row, which makes
+    # SQLite scan messages for the foreign key and drops avatar_path.
+    USER_SQL = (
+        "INSERT INTO users(id, username, first_name, last_name) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET username = excluded.username, "
+        "first_name = excluded.first_name, last_name = excluded.last_name"
+    )
+    MESSAGE_SQL = "INSERT OR REPLACE INTO messages(id, user_id, topic_id, date, edit_date, content, reply_to) VALUES (:id, :user_id, :topic_id, :date, :edit_date, :content, :reply_to)"
+    MEDIA_SQL = "INSERT OR REPLACE INTO media(id, message_id, mime_type, file_path) VALUES (:id, :message_id, :mime_type, :file_path)"
+    USERNAME_SQL = "INSERT OR IGNORE INTO username_mentions(username, message_id, date, source_type) VALUES (?, ?, ?, ?)"
+    CHECKPOINT_SQL = (
+        "INSERT INTO archive_checkpoints(entity_id, topic_id, last_message_id, updated_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(entity_id, topic_id) DO UPDATE SET "
+        "last_message_id = MAX(last_message_id, excluded.last_message_id), updated_at = excluded.updated_at"
+    )
+
+    def __init__(
+        self,
+        db: DBHandler,
+        entity_id: int,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
+        self.db = db
+        self.entity_id = entity_id
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.batches_committed = 0
+        self._users: Dict[int, Tuple[Any, ...]] = {}
+        self._messages: List[Dict[str, Any]] = []
+        self._media: List[Dict[str, Any]] = []
+        self._usernames: List[Tuple[Any, ...]] = []
+        # Checkpoint state per topic (0 = main chat), so one writer can be
+        # shared by concurrently archived topics of the same entity.
+        self._last_ids: Dict[int, int] = {}
+        self._written: Dict[int, int] = {}
+        self._held: Dict[int, set[int]] = {}
+        self._last_flush = time.monotonic()
+
+    # buffer helpers (same signatures as DBHandler)
+    def add_user(self, u):
+        self._users[u.id] = (
+            u.id, getattr(u, "username", None), getattr(u, "first_name", None), getattr(u, "last_name", None)
+        )
+
+    def add_message(self, d):
+        self._messages.append(d)
+        key = d.get("topic_id") or 0
+        if d["id"] > self._last_ids.get(key, 0):
+            self._last_ids[key] = d["id"]
+
+    def add_media(self, d):
+        self._media.append(d)
+
+    def add_username(self, username, msg_id, date, source="mention"):
+        self._usernames.append((username, msg_id, date, source))
+
+    def hold(self, msg_id: int, topic_id: Optional[int] = None):
+        """Keep the checkpoint below *msg_id* until :meth:`release` is called.
+
+        Used for messages whose media is still downloading so a resume after
+        a crash re-fetches them.
+        """
+        self._held.setdefault(topic_id or 0, set()).add(msg_id)
+
+    def release(self, msg_id: int, topic_id: Optional[int] = None):
+        self._held.get(topic_id or 0, set()).discard(msg_id)
+
+    def checkpoint(self, topic_id: Optional[int] = None) -> Optional[int]:
+        key = topic_id or 0
+        last_id = self._last_ids.get(key)
+        if last_id is None:
+            return None
+        held = self._held.get(key)
+        if held:
+            return min(last_id, min(held) - 1)
+        return last_id
+
+    @property
+    def pending(self) -> int:
+        return len(self._users) + len(self._messages) + len(self._media) + len(self._usernames)
+
+    def maybe_flush(self) -> bool:
+        """Flush if the row-count or time threshold has been reached."""
+        if len(self._messages) >= self.batch_size or (
+            self.pending and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> int:
+        """Write all buffered rows and the checkpoints in one transaction."""
+        self._last_flush = time.monotonic()
+        checkpoints = {key: self.checkpoint(key) for key in self._last_ids}
+        changed = {k: v for k, v in checkpoints.items() if v is not None and self._written.get(k) != v}
+        if not self.pending and not changed:
+            return 0
+
+        written = self.pending
+        now = datetime.now(TZ).isoformat()
+        conn = self.db.conn
+        with conn:  # commits on success, rolls back on error
+            cur = conn.cursor()
+            if getattr(self.db, "defer_foreign_keys", False):
+                # check references once at COMMIT instead of per row
+                cur.execute("PRAGMA defer_foreign_keys=ON;")
+            # users first so message.user_id references resolve
+            if self._users:
+                cur.executemany(self.USER_SQL, list(self._users.values()))
+            if self._messages:
+                cur.executemany(self.MESSAGE_SQL, self._messages)
+            if self._media:
+                cur.executemany(self.MEDIA_SQL, self._media)
+            if self._usernames:
+                cur.executemany(self.USERNAME_SQL, self._usernames)
+            if changed:
+                cur.executemany(
+                    self.CHECKPOINT_SQL,
+                    [(self.entity_id, key, value, now) for key, value in changed.items()],
+                )
+
+        self._users.clear()
+        self._messages.clear()
+        self._media.clear()
+        self._usernames.clear()
+        self._written.update(changed)
+        self.rows_written += written
+        self.batches_committed += 1
+        logger.debug("Committed batch of %d rows (checkpoints=%s)", written, changed)
+        return written
+
 # ── Helper regexes ───────────────────────────────────────────────────────
 USERNAME_RE = re.compile(r"@([A-Za-z0-9_]{5,32})")
 
@@ -303,42 +485,183 @@ async def write_sidecar(msg: TLMessage, file_path: Path):
     file_path.with_suffix(file_path.suffix + ".json").write_text(json.dumps(meta, indent=2))
 
 # ── Media downloader ─────────────────────────────────────────────────────
-async def safe_download_media(msg: TLMessage, dest: Path, mime_whitelist, sidecar=True):
+async def safe_download_media(msg: TLMessage, dest: Path, mime_whitelist, sidecar=True, max_attempts=5):
     if not msg.media:
         return None
     if mime_whitelist and msg.file.mime_type not in mime_whitelist:
         return None
     dest.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        path = await msg.download_media(file=dest)
-        if path and sidecar:
+    path = await flood_limiter.call(
+        msg.download_media, file=dest, context=f"media:{getattr(msg, 'chat_id', None)}", max_attempts=max_attempts
+    )
+    if path and sidecar:
+        await write_sidecar(msg, Path(path))
+    return path
+
+# ── Media download pool ──────────────────────────────────────────────────
+@dataclass
+class MediaJob:
+    msg: TLMessage
+    dest: Path
+    size: int = 0
+
+
+class MediaDownloadPool:
+    """Bounded producer/consumer stage for media downloads.
+
+    ``archive_messages`` keeps writing message metadata while media jobs go
+    onto a bounded :class:`asyncio.Queue` drained by ``workers`` download
+    tasks.  :meth:`submit` blocks once the queue is full, which throttles
+    message iteration instead of buffering unbounded Telethon objects.
+    FloodWait is handled per worker through the shared
+    :class:`~tgarchive.core.error_recovery.RateLimitHandler`: only the worker
+    that hit it waits and retries its job, the others keep draining the queue.
+
+    A message's checkpoint hold is released only once its media is stored.
+    Failed downloads stay held and are listed in :attr:`failed_ids`, and jobs
+    cancelled or abandoned on error stay held too, so the next resume starts
+    below them and fetches them again.
+    """
+
+    def __init__(
+        self,
+        writer: BatchedWriter,
+        *,
+        topic_id: Optional[int] = None,
+        rate_limiter: Optional[RateLimitHandler] = None,
+        workers: int = 4,
+        queue_size: int = 64,
+        sidecar: bool = True,
+        max_retries: int = 5,
+        progress: Optional[Progress] = None,
+        bytes_task: Any = None,
+    ):
+        self.writer = writer
+        self.topic_id = topic_id
+        self.rate_limiter = rate_limiter or flood_limiter
+        self.workers = max(1, int(workers))
+        self.sidecar = sidecar
+        self.max_retries = max_retries
+        self.progress = progress
+        self.bytes_task = bytes_task
+        self.queue: asyncio.Queue[MediaJob] = asyncio.Queue(maxsize=max(1, int(queue_size)))
+        self._tasks: List[asyncio.Task] = []
+        self.failed_ids: List[int] = []
+        self.stats: Dict[str, int] = {
+            "queued": 0,
+            "downloaded": 0,
+            "failed": 0,
+            "bytes_queued": 0,
+            "bytes_downloaded": 0,
+        }
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.queue.join()
+        # Workers are idle on queue.get() once joined; on error we abandon the rest.
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        return False
+
+    async def submit(self, msg: TLMessage, dest: Path):
+        """Queue *msg* for download, waiting while the queue is full."""
+        size = getattr(msg.file, "size", None) or 0
+        self.writer.hold(msg.id, self.topic_id)
+        await self.queue.put(MediaJob(msg, dest, size))
+        self.stats["queued"] += 1
+        self.stats["bytes_queued"] += size
+        if self.progress is not None and self.bytes_task is not None:
+            self.progress.update(self.bytes_task, total=self.stats["bytes_queued"])
+
+    async def _worker(self, n: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._download(n, job)
+            except Exception:
+                # keep the hold so the checkpoint stays below this message
+                self.stats["failed"] += 1
+                self.failed_ids.append(job.msg.id)
+                logger.exception("Media worker %d failed on message %s", n, job.msg.id)
+            else:
+                self.writer.release(job.msg.id, self.topic_id)
+            finally:
+                self.queue.task_done()
+
+    async def _download(self, n: int, job: MediaJob):
+        msg = job.msg
+        job.dest.parent.mkdir(parents=True, exist_ok=True)
+        path = await self.rate_limiter.call(
+            msg.download_media,
+            file=job.dest,
+            context=f"media:{getattr(msg, 'chat_id', None)}",
+            max_attempts=self.max_retries + 1,
+        )
+        if not path:
+            return
+        if self.sidecar:
             await write_sidecar(msg, Path(path))
-        return path
-    except errors.FloodWaitError as e:
-        await asyncio.sleep(e.seconds + 5)
-        return await safe_download_media(msg, dest, mime_whitelist, sidecar)
+        file_path = Path(path)
+        with contextlib.suppress(ValueError):
+            file_path = file_path.relative_to(Path.cwd())
+        self.writer.add_media({
+            "id": msg.file.id,
+            "message_id": msg.id,
+            "mime_type": msg.file.mime_type,
+            "file_path": str(file_path),
+        })
+        self.stats["downloaded"] += 1
+        self.stats["bytes_downloaded"] += job.size
+        if self.progress is not None and self.bytes_task is not None:
+            self.progress.update(self.bytes_task, advance=job.size)
 
 # ── Topic handler ─────────────────────────────────────────────────────────
 async def get_topics(client, entity):
     """Get all topics in a group if supported."""
     try:
-        topics = await client.get_topics(entity)
+        topics = await flood_limiter.call(client.get_topics, entity, context=f"topics:{getattr(entity, 'id', entity)}")
         if not topics:
             return []
         return topics
-    except (AttributeError, errors.ChatAdminRequiredError, errors.FloodWaitError) as e:
-        if isinstance(e, errors.FloodWaitError):
-            logger.warning("Flood-wait %s s when fetching topics", e.seconds)
-            await asyncio.sleep(e.seconds + 3)
-            return await get_topics(client, entity)
+    except errors.FloodWaitError as e:
+        logger.warning("Giving up on topics after repeated flood-waits (%s s)", e.seconds)
+        return []
+    except (AttributeError, errors.ChatAdminRequiredError):
         logger.info("Topics not supported or accessible for this entity")
         return []
 
 # ── Message archiving ─────────────────────────────────────────────────────
-async def archive_messages(client, entity, topic_id, db, cfg, media_dir, progress, task):
-    """Archive messages for a specific topic or main channel."""
-    last_id = db.last_message_id(topic_id)
-    
+def make_writer(db: DBHandler, entity_id: int, cfg) -> BatchedWriter:
+    return BatchedWriter(
+        db,
+        entity_id,
+        batch_size=cfg.data.get("batch", DEFAULT_CFG["batch"]),
+        flush_interval=cfg.data.get("batch_flush_seconds", DEFAULT_CFG["batch_flush_seconds"]),
+    )
+
+
+async def archive_messages(client, entity, topic_id, db, cfg, media_dir, progress, task, writer: Optional[BatchedWriter] = None):
+    """Archive messages for a specific topic or main channel.
+
+    Rows go through a :class:`BatchedWriter`, which commits every
+    ``cfg["batch"]`` messages (or ``cfg["batch_flush_seconds"]``) together
+    with the resume checkpoint.  Pass *writer* to share one writer between
+    concurrently archived topics.  Media is handed to a
+    :class:`MediaDownloadPool` so iteration never waits on a single file;
+    its byte progress is reported on a separate progress task.
+    """
+    entity_id = entity.id
+    last_id = db.get_checkpoint(entity_id, topic_id)
+    if last_id is None:
+        last_id = db.last_message_id(topic_id)
+    if writer is None:
+        writer = make_writer(db, entity_id, cfg)
+
     kwargs = {
         "offset_id": last_id or 0,
         "reverse": True,
@@ -347,40 +670,63 @@ async def archive_messages(client, entity, topic_id, db, cfg, media_dir, progres
     
     if topic_id is not None:
         kwargs["topic"] = topic_id
-    
-    async for msg in client.iter_messages(entity, **kwargs):
-        d = {
-            "id": msg.id,
-            "user_id": msg.sender_id,
-            "topic_id": topic_id,
-            "date": msg.date.astimezone(TZ).isoformat(),
-            "edit_date": msg.edit_date.astimezone(TZ).isoformat() if msg.edit_date else None,
-            "content": msg.message,
-            "reply_to": msg.reply_to_msg_id,
-        }
-        db.add_message(d)
-
-        if msg.sender:
-            db.add_user(msg.sender)
-
-        if cfg["collect_usernames"]:
-            for uname in extract_usernames(msg.message):
-                db.add_username(uname, msg.id, d["date"])
-
-        if cfg["download_media"] and msg.media:
-            topic_subdir = f"topic_{topic_id}" if topic_id is not None else "main"
-            dest_dir = media_dir / topic_subdir
-            dest = dest_dir / f"{msg.id}_{msg.file.id}"
-            downloaded = await safe_download_media(msg, dest, cfg["media_mime_whitelist"], cfg["sidecar_metadata"])
-            if downloaded:
-                db.add_media({
-                    "id": msg.file.id,
-                    "message_id": msg.id,
-                    "mime_type": msg.file.mime_type,
-                    "file_path": str(Path(downloaded).relative_to(Path.cwd())),
-                })
-
-        progress.update(task, advance=1)
+
+    topic_subdir = f"topic_{topic_id}" if topic_id is not None else "main"
+    bytes_task = None
+    if cfg["download_media"] and progress is not None:
+        bytes_task = progress.add_task(f"[magenta]Media bytes ({topic_subdir})", total=0)
+    pool = MediaDownloadPool(
+        writer,
+        topic_id=topic_id,
+        workers=cfg.data.get("media_download_workers", DEFAULT_CFG["media_download_workers"]),
+        queue_size=cfg.data.get("media_queue_size", DEFAULT_CFG["media_queue_size"]),
+        sidecar=cfg.data.get("sidecar_metadata", True),
+        progress=progress,
+        bytes_task=bytes_task,
+    )
+    mime_whitelist = cfg.data.get("media_mime_whitelist") or []
+
+    try:
+        async with pool:
+            async for msg in client.iter_messages(entity, **kwargs):
+                d = {
+                    "id": msg.id,
+                    "user_id": msg.sender_id,
+                    "topic_id": topic_id,
+                    "date": msg.date.astimezone(TZ).isoformat(),
+                    "edit_date": msg.edit_date.astimezone(TZ).isoformat() if msg.edit_date else None,
+                    "content": msg.message,
+                    "reply_to": msg.reply_to_msg_id,
+                }
+                writer.add_message(d)
+
+                if msg.sender:
+                    writer.add_user(msg.sender)
+
+                if cfg["collect_usernames"]:
+                    for uname in extract_usernames(msg.message):
+                        writer.add_username(uname, msg.id, d["date"])
+
+                if cfg["download_media"] and msg.media and msg.file:
+                    if not mime_whitelist or msg.file.mime_type in mime_whitelist:
+                        dest = media_dir / topic_subdir / f"{msg.id}_{msg.file.id}"
+                        await pool.submit(msg, dest)
+
+                writer.maybe_flush()
+                progress.update(task, advance=1)
+    finally:
+        writer.flush()
+        if pool.stats["queued"]:
+            logger.info(
+                "Media stage: %d/%d downloaded, %d failed, %d bytes",
+                pool.stats["downloaded"], pool.stats["queued"], pool.stats["failed"],
+                pool.stats["bytes_downloaded"],
+            )
+        if pool.failed_ids:
+            logger.warning(
+                "Checkpoint held below message %d; %d media download(s) will be retried on resume: %s",
+                min(pool.failed_ids), len(pool.failed_ids), sorted(pool.failed_ids),
+            )
 
 # ── Core archive pipeline ────────────────────────────────────────────────
 async def archive_channel(cfg: Config, account: Dict[str, Any], proxy_tuple):  # noqa: C901
@@ -397,9 +743,8 @@ async def archive_channel(cfg: Config, account: Dict[str, Any], proxy_tuple):  #
     async with TelegramClient(account["session_name"], account["api_id"], account["api_hash"], proxy=proxy_tuple) as client:  # type: ignore
         logger.info("Connected as %s via proxy=%s", await client.get_me(), proxy_tuple or "none")
         entity = await client.get_entity(cfg["entity"])
-        entity_id = entity.id
 
-        with DBHandler(Path(cfg["db_path"])) as db:
+        with DBHandler(Path(cfg["db_path"]), profile=cfg["db_profile"]) as db:
             # Count approximate total messages (this is an estimate)
             total_msgs = await client.get_messages(entity, limit=0)
             archive_task = progress.add_task("[green]Archiving main chat", total=len(total_msgs))
@@ -413,35 +758,77 @@ async def archive_channel(cfg: Config, account: Dict[str, Any], proxy_tuple):  #
                     topics = await get_topics(client, entity)
                     if topics:
                         logger.info(f"Found {len(topics)} topics to archive")
-                        
-                        for topic in topics:
-                            topic_id = topic.id
-                            topic_title = getattr(topic, "title", f"Topic {topic_id}")
-                            topic_date = datetime.now(TZ).isoformat()
-                            
-                            db.add_topic(topic_id, entity_id, topic_title, topic_date)
-                            
-                            # Get an estimate of messages in this topic
-                            try:
-                                topic_msg_count = await client.get_messages(entity, limit=0, topic=topic_id)
-                                topic_task = progress.add_task(
-                                    f"[cyan]Topic: {topic_title}", 
-                                    total=len(topic_msg_count)
-                                )
-                                
-                                await archive_messages(
-                                    client, entity, topic_id, db, cfg, 
-                                    media_dir, progress, topic_task
-                                )
-                            except Exception as e:
-                                logger.exception(f"Error archiving topic {topic_id}: {e}")
-                                continue
+                        await archive_topics(client, entity, topics, db, cfg, media_dir, progress)
 
             logger.info("Archive complete (%s msgs)", progress.tasks[archive_task].completed)
+            wait_stats = flood_limiter.get_wait_stats()
+            if wait_stats:
+                logger.info("Flood-wait stats: %s", wait_stats)
 
             if cfg["download_avatars"]:
                 await download_avatars(client, db, media_dir / "avatars", cfg["avatar_size"])
 
+def topic_is_current(db: DBHandler, entity_id: int, topic) -> bool:
+    """True if *topic*'s newest message is already covered by its checkpoint.
+
+    Uses the ``top_message`` id Telegram reports for forum topics, so
+    unchanged topics are skipped without any message request.
+    """
+    top_message = getattr(topic, "top_message", None)
+    if not top_message:
+        return False
+    checkpoint = db.get_checkpoint(entity_id, topic.id)
+    return checkpoint is not None and checkpoint >= top_message
+
+
+async def archive_topics(client, entity, topics, db: DBHandler, cfg: Config, media_dir: Path, progress):
+    """Archive forum *topics*, up to ``cfg["topic_concurrency"]`` at a time.
+
+    All topics share one :class:`BatchedWriter`.  Topics are scheduled on a
+    :class:`~tgarchive.core.error_recovery.RetryScheduler`, so a topic that
+    hits FloodWait is parked and resumed from its checkpoint while the other
+    topics keep archiving.
+    """
+    entity_id = entity.id
+    writer = make_writer(db, entity_id, cfg)
+    fan_out = cfg.data.get("topic_concurrency", DEFAULT_CFG["topic_concurrency"])
+    items = []
+    skipped = 0
+
+    for topic in topics:
+        topic_id = topic.id
+        topic_title = getattr(topic, "title", f"Topic {topic_id}")
+        db.add_topic(topic_id, entity_id, topic_title, datetime.now(TZ).isoformat())
+
+        if topic_is_current(db, entity_id, topic):
+            skipped += 1
+            continue
+
+        # Telegram does not report per-topic counts; leave the bar open-ended
+        # rather than spending a get_messages() round-trip per topic.
+        topic_task = progress.add_task(f"[cyan]Topic: {topic_title}", total=None)
+
+        def factory(topic_id=topic_id, topic_task=topic_task):
+            return archive_messages(
+                client, entity, topic_id, db, cfg, media_dir, progress, topic_task, writer=writer
+            )
+
+        items.append((f"topic:{entity_id}:{topic_id}", factory))
+
+    if skipped:
+        logger.info("Skipped %d unchanged topics", skipped)
+
+    scheduler = RetryScheduler(flood_limiter, concurrency=fan_out)
+    try:
+        results = await scheduler.run(items)
+    finally:
+        writer.flush()
+
+    for (context, _), result in zip(items, results):
+        if isinstance(result, BaseException):
+            logger.error("Error archiving %s: %s", context, result)
+
+
 async def download_avatars(client, db: DBHandler, avatar_root: Path, size):
     avatar_root.mkdir(parents=True, exist_ok=True)
     db.cur.execute("SELECT id FROM users WHERE avatar_path IS NULL")
@@ -671,12 +1058,18 @@ def main():
     p.add_argument("--no-tui", action="store_true", help="run without ncurses UI")
     p.add_argument("--auto", action="store_true", help="use auto-selected account and skip TUI")
     p.add_argument("--entity", help="channel or group to archive (e.g. @channel)")
+    p.add_argument("--topic-concurrency", type=int, help="number of forum topics to archive in parallel")
+    p.add_argument("--db-profile", choices=sorted(PRAGMA_PROFILES), help="SQLite pragma profile for the archive DB")
     p.add_argument("--shunt-from", help="Source channel ID for shunting files")
     p.add_argument("--shunt-to", help="Destination channel ID for shunting files")
     p.add_argument("--shunt-account", help="Optional: Account phone number or session name to use for shunting")
     args = p.parse_args()
 
     cfg = Config()
+    if args.topic_concurrency:
+        cfg.data["topic_concurrency"] = max(1, args.topic_concurrency)
+    if args.db_profile:
+        cfg.data["db_profile"] = args.db_profile
 
     if args.shunt_from and args.shunt_to:
         # Shunt mode takes precedence
@@ -0,0 +1,242 @@
+"""
+SPECTRA-004 IVF Approximate Nearest-Neighbour Index
+===================================================
+Pure-NumPy inverted-file (IVF) index over the rows of a
+:class:`~tgarchive.db.vector_matrix.MappedVectorMatrix`.
+
+Rows are clustered around ``nlist`` k-means centroids; a query only scores
+the rows of its ``nprobe`` nearest clusters.  The index is built
+incrementally: until ``min_train`` rows exist every search is exact, then the
+centroids are trained once and new rows are assigned as they arrive.  When
+the collection has grown ``retrain_factor`` times past the training size the
+centroids are retrained.  Assignments are persisted to ``<name>.ivf.npz`` so a
+restart only assigns rows appended since the last save.
+"""
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vector_matrix import DTYPE, MappedVectorMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """Inverted-file ANN index whose posting lists hold matrix row numbers."""
+
+    def __init__(
+        self,
+        vectors: MappedVectorMatrix,
+        *,
+        metric: str = "cosine",
+        nlist: int = 0,
+        nprobe: int = 16,
+        min_train: int = 4096,
+        retrain_factor: float = 4.0,
+        train_iters: int = 10,
+        save_every: int = 50000,
+    ) -> None:
+        self.vectors = vectors
+        self.metric = metric
+        self.nlist = nlist  # 0 = sqrt(n) at training time
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_factor = retrain_factor
+        self.train_iters = train_iters
+        self.save_every = save_every
+        self.path = vectors.base_path.with_name(vectors.base_path.name + ".ivf.npz")
+
+        self.centroids: Optional[np.ndarray] = None
+        self._assign_parts: List[np.ndarray] = []
+        self._lists: List[List[np.ndarray]] = []
+        self._trained_rows = 0
+        self._generation = vectors.generation
+        self._saved_rows = 0
+        self._load()
+
+    # Persistence -------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with np.load(self.path, allow_pickle=False) as data:
+            if int(data["generation"]) != self.vectors.generation:
+                logger.info("Discarding stale IVF index %s (matrix was compacted)", self.path)
+                return
+            self.centroids = data["centroids"]
+            # rows assigned after the matrix's last flush did not survive a restart
+            self._assign = data["assign"][: len(self.vectors.matrix)]
+            self._trained_rows = int(data["trained_rows"])
+        self._saved_rows = len(self._assign)
+        self._rebuild_lists()
+
+    def save(self, force: bool = False) -> None:
+        """Persist centroids and assignments (every ``save_every`` new rows unless *force*)."""
+        if self.centroids is None:
+            return
+        if not force and self._assigned - self._saved_rows < self.save_every:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            centroids=self.centroids,
+            assign=self._assign,
+            trained_rows=np.int64(self._trained_rows),
+            generation=np.int64(self._generation),
+        )
+        os.replace(tmp, self.path)
+        self._saved_rows = len(self._assign)
+
+    # Building ----------------------------------------------------------------
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _prepare(self, block: np.ndarray) -> np.ndarray:
+        """Vectors in the space clustering is done in (unit length unless euclidean)."""
+        block = np.asarray(block, dtype=DTYPE)
+        if self.metric == "euclidean":
+            return block
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return block / norms
+
+    def _nearest(self, prepared: np.ndarray, centroids: np.ndarray, n: int = 1) -> np.ndarray:
+        sims = prepared @ centroids.T
+        if self.metric == "euclidean":
+            sims -= 0.5 * (centroids ** 2).sum(axis=1)
+        if n == 1:
+            return sims.argmax(axis=1).astype(np.int32)
+        n = min(n, centroids.shape[0])
+        top = np.argpartition(-sims, n - 1, axis=1)[:, :n]
+        order = np.argsort(-np.take_along_axis(sims, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1)
+
+    def _assign_rows(self, start: int, stop: int, chunk: int = 16384) -> np.ndarray:
+        out = np.empty(stop - start, dtype=np.int32)
+        for i in range(start, stop, chunk):
+            j = min(i + chunk, stop)
+            out[i - start : j - start] = self._nearest(self._prepare(self.vectors.matrix[i:j]), self.centroids)
+        return out
+
+    def train(self) -> None:
+        """(Re)train centroids with k-means on a sample and reassign every row."""
+        total = len(self.vectors.matrix)
+        k = self.nlist or int(np.clip(round(np.sqrt(total)), 16, 4096))
+        k = min(k, total)
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(total, min(total, k * 40), replace=False))
+        sample = self._prepare(self.vectors.matrix[sample_rows])
+
+        centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+        for _ in range(self.train_iters):
+            assign = self._nearest(sample, centroids)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=k)
+            nonempty = counts > 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+            centroids[nonempty] = np.add.reduceat(sample[order], starts, axis=0) / counts[nonempty, None]
+            if self.metric != "euclidean":
+                centroids = self._prepare(centroids)
+
+        self.centroids = centroids.astype(DTYPE)
+        self._trained_rows = total
+        self._generation = self.vectors.generation
+        self._assign = self._assign_rows(0, total)
+        self._rebuild_lists()
+        self.save(force=True)
+        logger.info("Trained IVF index: %d lists over %d rows", k, total)
+
+    @property
+    def _assigned(self) -> int:
+        return sum(len(part) for part in self._assign_parts)
+
+    @property
+    def _assign(self) -> np.ndarray:
+        """Cluster of every assigned row (consolidated on access)."""
+        if len(self._assign_parts) != 1:
+            self._assign_parts = [np.concatenate(self._assign_parts or [np.zeros(0, dtype=np.int32)])]
+        return self._assign_parts[0]
+
+    @_assign.setter
+    def _assign(self, value: np.ndarray) -> None:
+        self._assign_parts = [value]
+
+    def _append_assign(self, new: np.ndarray) -> None:
+        # appended in parts so incremental batches don't copy the whole array
+        self._assign_parts.append(new)
+
+    def _rebuild_lists(self) -> None:
+        k = self.centroids.shape[0]
+        order = np.argsort(self._assign, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(self._assign[order], np.arange(k + 1))
+        self._lists = [[order[bounds[i] : bounds[i + 1]]] for i in range(k)]
+
+    def sync(self) -> None:
+        """Bring the index up to date with rows appended to (or compacted in) the matrix."""
+        total = len(self.vectors.matrix)
+        if self.vectors.generation != self._generation:
+            # compaction renumbered the rows; keep the centroids, reassign everything
+            self._assign = np.zeros(0, dtype=np.int32)
+            self._generation = self.vectors.generation
+            if self.centroids is not None:
+                self._assign = self._assign_rows(0, total)
+                self._rebuild_lists()
+                self.save(force=True)
+                return
+        if self.centroids is None:
+            if total >= self.min_train:
+                self.train()
+            return
+        if total >= self._trained_rows * self.retrain_factor:
+            self.train()
+            return
+        start = self._assigned
+        if start >= total:
+            return
+        new = self._assign_rows(start, total)
+        self._append_assign(new)
+        rows = np.arange(start, total, dtype=np.int64)
+        order = np.argsort(new, kind="stable")
+        lists, cuts = np.unique(new[order], return_index=True)
+        for lst, part in zip(lists, np.split(rows[order], cuts[1:])):
+            self._lists[lst].append(part)
+        self.save()
+
+    # Query -------------------------------------------------------------------
+    def _list_rows(self, lst: int) -> np.ndarray:
+        chunks = self._lists[lst]
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    def candidates(self, query: Sequence[float] | np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Rows in the *nprobe* clusters nearest to *query*."""
+        probes = self._nearest(self._prepare(np.atleast_2d(query)), self.centroids, nprobe or self.nprobe)
+        return np.concatenate([self._list_rows(int(lst)) for lst in np.ravel(probes)])
+
+    def search(
+        self,
+        query: Sequence[float] | np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Tuple[str, float]]:
+        """Approximate top-*k* ``(id, score)``; *mask* (bool per row) filters candidates before scoring."""
+        self.sync()
+        if not self.trained:
+            rows = None if mask is None else np.flatnonzero(mask)
+            return self.vectors.top_k(query, k, self.metric, rows)
+
+        nprobe = self.nprobe
+        while True:
+            rows = self.candidates(query, nprobe)
+            if mask is not None:
+                rows = rows[mask[rows]]
+            if len(rows) >= k or nprobe >= self.centroids.shape[0]:
+                break
+            nprobe *= 2  # too few matches survived the filter; widen the probe
+        return self.vectors.top_k(query, k, self.metric, rows)
+
+
+__all__ = ["IVFIndex"]
@@ -0,0 +1,164 @@
+"""
+SPECTRA-004 Connection Pool
+===========================
+One writer connection plus N read-only WAL reader connections.
+
+SQLite in WAL mode allows any number of readers alongside a single writer,
+so the pool hands out dedicated read-only connections for queries and
+serialises everything else through the writer.  Blocking calls can be run
+off the event loop on the pool's thread executor.
+"""
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
+
+from .pragmas import apply_profile
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ConnectionPool:
+    """Writer + read-only reader connections for a single SQLite database."""
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        *,
+        writer: sqlite3.Connection,
+        readers: int = 4,
+        executor_workers: Optional[int] = None,
+        vfs: Optional[str] = None,
+        timeout: float = 5.0,
+        write_lock: Optional[threading.RLock] = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.writer = writer
+        self.size = max(0, int(readers))
+        self.vfs = vfs
+        self.timeout = timeout
+        # shared with the owner of *writer* when it also writes outside the pool
+        self._write_lock = write_lock or threading.RLock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers or self.size + 1,
+            thread_name_prefix="spectra-db",
+        )
+        self._closed = False
+
+    # Connections -----------------------------------------------------------
+    def _reader_uri(self) -> str:
+        uri = f"file:{self.db_path.absolute()}?mode=ro"
+        if self.vfs:
+            uri += f"&vfs={self.vfs}"
+        return uri
+
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._reader_uri(),
+            uri=True,
+            timeout=self.timeout,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        )
+        apply_profile(conn, "query")
+        self._all_readers.append(conn)
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Lease a read-only connection; falls back to the writer if the pool is empty."""
+        if self.size == 0:
+            with self.write() as conn:
+                yield conn
+            return
+
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._open_lock:
+                grow = self._opened < self.size
+                if grow:
+                    self._opened += 1
+            if grow:
+                try:
+                    conn = self._open_reader()
+                except Exception:
+                    with self._open_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            # End the implicit read transaction so the reader sees new commits.
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection exclusively for the duration of the block."""
+        with self._write_lock:
+            yield self.writer
+
+    # Blocking helpers --------------------------------------------------------
+    def read(self, sql: str, params: tuple = ()) -> List[Any]:
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def execute_write(self, sql: str, params: tuple = (), *, commit: bool = True) -> int:
+        with self.write() as conn:
+            cur = conn.execute(sql, params)
+            if commit:
+                conn.commit()
+            return cur.rowcount
+
+    # Async helpers -----------------------------------------------------------
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking callable on the pool's executor."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def aread(self, sql: str, params: tuple = ()) -> List[Any]:
+        return await self.run(self.read, sql, params)
+
+    async def aexecute_write(self, sql: str, params: tuple = (), *, commit: bool = True) -> int:
+        return await self.run(lambda: self.execute_write(sql, params, commit=commit))
+
+    # Lifecycle ---------------------------------------------------------------
+    def stats(self) -> dict:
+        return {
+            "readers_max": self.size,
+            "readers_open": self._opened,
+            "readers_idle": self._readers.qsize(),
+        }
+
+    def close(self) -> None:
+        """Close reader connections and the executor (the writer is owned by the caller)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        for conn in self._all_readers:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug("Error closing reader connection: %s", e)
+        self._all_readers.clear()
+
+
+__all__ = ["ConnectionPool"]
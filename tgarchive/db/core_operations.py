@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 from typing import Iterator, List, Optional, Tuple
 
 from .models import Day, Media, Message, Month, User
+from .pagination import page_rows
+from .schema import _columns, epoch_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +69,12 @@ class CoreOperations:
     def upsert_message(self, msg: Message) -> None:
         self._exec_retry(
             """
-            INSERT INTO messages(id, type, date, edit_date, content, reply_to, user_id, media_id, checksum)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO messages(id, type, date, date_ts, edit_date, content, reply_to, user_id, media_id, checksum)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(id) DO UPDATE SET
                 type=excluded.type,
                 date=excluded.date,
+                date_ts=excluded.date_ts,
                 edit_date=excluded.edit_date,
                 content=excluded.content,
                 reply_to=excluded.reply_to,
@@ -83,6 +86,7 @@ class CoreOperations:
                 msg.id,
                 msg.type,
                 msg.date.isoformat(),
+                epoch_seconds(msg.date),
                 msg.edit_date.isoformat() if msg.edit_date else None,
                 msg.content,
                 msg.reply_to,
@@ -91,6 +95,10 @@ class CoreOperations:
                 msg.checksum,
             ),
         )
+        # handed to the time index once the transaction commits
+        written = getattr(self.db, "_written_dates", None)
+        if written is not None:
+            written[msg.id] = msg.date
         
         # Advanced features integration
         if self.advanced_features:
@@ -166,6 +174,125 @@ class CoreOperations:
         self.cur.execute(sql)
         return [(int(row[0]), str(row[1])) for row in self.cur.fetchall()]
 
+    @staticmethod
+    def _channel_filter(search: Optional[str]) -> Tuple[str, list]:
+        """WHERE fragment matching *search* against channel name or ID."""
+        if not search:
+            return "", []
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return (
+            " AND (channel_name LIKE ? ESCAPE '\\' OR CAST(channel_id AS TEXT) LIKE ? ESCAPE '\\')",
+            [pattern, pattern],
+        )
+
+    def count_channels(self, search: Optional[str] = None) -> int:
+        """Number of distinct channels, optionally only those matching *search*."""
+        where, params = self._channel_filter(search)
+        rows = self.db.read(
+            "SELECT COUNT(DISTINCT channel_id) FROM account_channel_access WHERE 1" + where,
+            tuple(params),
+        )
+        return rows[0][0] if rows else 0
+
+    def channels_page(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple[int]] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[tuple], Optional[Tuple[int]]]:
+        """
+        One page of known channels in channel_id order, resuming after *after*.
+
+        Rows are ``(channel_id, channel_name, accounts, last_seen)``; the second
+        value is the key for the next page, ``None`` on the last page.
+        """
+        where, params = self._channel_filter(search)
+        sql = (
+            "SELECT channel_id, max(channel_name), count(*), max(last_seen) "
+            "FROM account_channel_access WHERE 1" + where
+        )
+        if after is not None:
+            sql += " AND channel_id > ?"
+            params.append(after[0])
+        sql += " GROUP BY channel_id ORDER BY channel_id LIMIT ?"
+        params.append(limit + 1)
+        return page_rows(self.db.read(sql, tuple(params)), limit, lambda row: (row[0],))
+
+    def _message_filter(
+        self,
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        channel_id: Optional[int],
+    ) -> Tuple[str, list]:
+        """
+        WHERE fragment shared by :meth:`messages_page` and :meth:`count_messages`.
+
+        The canonical archive holds one channel and records none per message;
+        there *channel_id* only has to be a channel the archive knows
+        (``account_channel_access``) and every message is listed.
+
+        Raises:
+            LookupError: If *channel_id* is not a channel of this archive
+        """
+        where = " AND date_ts IS NOT NULL"
+        params: list = []
+        if channel_id is not None:
+            if "channel_id" in _columns(self.db.conn, "messages"):
+                where += " AND channel_id = ?"
+                params.append(channel_id)
+            elif not self.db.read(
+                "SELECT 1 FROM account_channel_access WHERE channel_id = ? LIMIT 1", (channel_id,)
+            ):
+                raise LookupError(f"Channel {channel_id} is not in this archive")
+        if date_from is not None:
+            where += " AND date_ts >= ?"
+            params.append(epoch_seconds(date_from))
+        if date_to is not None:
+            where += " AND date_ts <= ?"
+            params.append(epoch_seconds(date_to))
+        return where, params
+
+    def count_messages(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        channel_id: Optional[int] = None,
+    ) -> int:
+        """Number of messages :meth:`messages_page` walks through for the same filters."""
+        where, params = self._message_filter(date_from, date_to, channel_id)
+        rows = self.db.read("SELECT COUNT(*) FROM messages WHERE 1" + where, tuple(params))
+        return rows[0][0] if rows else 0
+
+    def messages_page(
+        self,
+        limit: int = 20,
+        before: Optional[Tuple[int, int]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        channel_id: Optional[int] = None,
+    ) -> Tuple[List[tuple], Optional[Tuple[int, int]]]:
+        """
+        One page of messages, newest first, resuming below *before* = ``(date_ts, id)``.
+
+        Walks ``idx_messages_date_ts`` from the cursor, so deep pages cost the
+        same as the first.  Rows are ``(id, type, date, date_ts, edit_date,
+        content, reply_to, user_id, media_id)``.
+
+        Raises:
+            LookupError: If *channel_id* is not in this archive (see :meth:`_message_filter`)
+        """
+        where, params = self._message_filter(date_from, date_to, channel_id)
+        sql = (
+            "SELECT id, type, date, date_ts, edit_date, content, reply_to, user_id, media_id "
+            "FROM messages WHERE 1" + where
+        )
+        if before is not None:
+            sql += " AND (date_ts, id) < (?, ?)"
+            params.extend(before)
+        sql += " ORDER BY date_ts DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        return page_rows(self.db.read(sql, tuple(params)), limit, lambda row: (row[3], row[0]))
+
     # Checkpoints ----------------------------------------------------------
     def save_checkpoint(self, last_id: int, *, context: str = "sync") -> None:
         self._exec_retry(
@@ -184,8 +311,12 @@ class CoreOperations:
 
     # Timeline helpers -----------------------------------------------------
     def months(self) -> Iterator[Month]:
+        # grouped off the covering idx_messages_date_ts scan instead of the table
         for ts, cnt in self.cur.execute(
-            "SELECT strftime('%Y-%m-01T00:00:00Z', date), COUNT(*) FROM messages GROUP BY strftime('%Y-%m', date) ORDER BY 1"
+            """
+            SELECT strftime('%Y-%m-01T00:00:00Z', date_ts, 'unixepoch') AS month, COUNT(*)
+            FROM messages WHERE date_ts IS NOT NULL GROUP BY month ORDER BY month
+            """
         ):
             dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             if self.db.tz:
@@ -193,14 +324,16 @@ class CoreOperations:
             yield Month(dt, dt.strftime("%Y-%m"), dt.strftime("%b %Y"), cnt)
 
     def days(self, year: int, month: int, *, page_size: int = 500) -> Iterator[Day]:
-        ym = f"{year}{month:02d}"
+        start = datetime(year, month, 1, tzinfo=timezone.utc)
+        end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
         for ts, cnt, page in self.cur.execute(
             """
-            SELECT strftime('%Y-%m-%dT00:00:00Z', date), COUNT(*), PAGE(rank, ?) FROM (
-                SELECT ROW_NUMBER() OVER(ORDER BY id) AS rank, date FROM messages WHERE strftime('%Y%m', date)=?
+            SELECT strftime('%Y-%m-%dT00:00:00Z', date_ts, 'unixepoch'), COUNT(*), PAGE(rank, ?) FROM (
+                SELECT ROW_NUMBER() OVER(ORDER BY id) AS rank, date_ts FROM messages
+                WHERE date_ts >= ? AND date_ts < ?
             ) GROUP BY 1 ORDER BY 1;
             """,
-            (page_size, ym),
+            (page_size, int(start.timestamp()), int(end.timestamp())),
         ):
             dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             if self.db.tz:
@@ -6,100 +6,248 @@ Base SQLite connection management with retry logic and WAL mode.
 import logging
 import math
 import sqlite3
+import threading
 import time
 from contextlib import AbstractContextManager, asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, List, Optional
 
 import pytz  # type: ignore
 
-from .schema import SCHEMA_SQL
+from .connection_pool import ConnectionPool
+from .pragmas import apply_profile, defers_foreign_keys
+from .schema import MIGRATIONS, SCHEMA_SQL, SCHEMA_VERSION
 
 logger = logging.getLogger(__name__)
 
+QIHSE_VFS_PATH = Path(__file__).parent.parent.parent / "QIHSE" / "qihse_vfs.so"
+
+_vfs_lock = threading.Lock()
+_vfs_loaded: Optional[bool] = None
+
 
 def _page(n: int, multiple: int) -> int:
     """Return page number (1-indexed) for n with page-size multiple."""
     return math.ceil(n / multiple) if n > 0 else 1
 
 
+def load_qihse_vfs() -> bool:
+    """Register the QIHSE SQLite VFS once per process; return whether it is available.
+
+    VFS registration is process-wide in SQLite, so the extension only needs to
+    be loaded through a throwaway connection the first time a DB is opened.
+    """
+    global _vfs_loaded
+    if _vfs_loaded is not None:
+        return _vfs_loaded
+    with _vfs_lock:
+        if _vfs_loaded is None:
+            loaded = False
+            try:
+                if QIHSE_VFS_PATH.exists():
+                    with sqlite3.connect(":memory:") as dummy:
+                        dummy.enable_load_extension(True)
+                        dummy.load_extension(str(QIHSE_VFS_PATH.resolve().with_suffix("")))
+                    logger.info(f"Loaded QIHSE SQLite VFS from {QIHSE_VFS_PATH}")
+                    loaded = True
+                else:
+                    logger.warning(f"QIHSE VFS not found at {QIHSE_VFS_PATH}, continuing with default VFS.")
+            except Exception as e:
+                logger.warning(f"Failed to load QIHSE VFS: {e}")
+            _vfs_loaded = loaded
+    return _vfs_loaded
+
+
+class _LockedCursor:
+    """Thread-safe stand-in for ``BaseDB.cur``.
+
+    Every statement runs on the writer under the pool's write lock and its
+    rows are fetched before the lock is released, so executor threads and
+    the ``self.cur`` paths never interleave on the shared connection.  The
+    buffered result is kept per thread, which lets several threads use the
+    one ``cur`` attribute the ``*Operations`` helpers hold.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock) -> None:
+        self._conn = conn
+        self._lock = lock
+        self._local = threading.local()
+
+    def _keep(self, cursor: sqlite3.Cursor) -> "_LockedCursor":
+        state = self._local
+        state.rows = cursor.fetchall() if cursor.description else []
+        state.pos = 0
+        state.description = cursor.description
+        state.lastrowid = cursor.lastrowid
+        state.rowcount = cursor.rowcount
+        return self
+
+    def execute(self, sql: str, params: Any = ()) -> "_LockedCursor":
+        with self._lock:
+            return self._keep(self._conn.execute(sql, params))
+
+    def executemany(self, sql: str, seq_of_params: Any) -> "_LockedCursor":
+        with self._lock:
+            return self._keep(self._conn.executemany(sql, seq_of_params))
+
+    def executescript(self, script: str) -> "_LockedCursor":
+        with self._lock:
+            return self._keep(self._conn.executescript(script))
+
+    @property
+    def description(self):
+        return getattr(self._local, "description", None)
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return getattr(self._local, "lastrowid", None)
+
+    @property
+    def rowcount(self) -> int:
+        return getattr(self._local, "rowcount", -1)
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        state = self._local
+        rows = getattr(state, "rows", [])
+        pos = getattr(state, "pos", 0)
+        state.pos = min(len(rows), pos + size)
+        return rows[pos:state.pos]
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self) -> List[Any]:
+        return self.fetchmany(len(getattr(self._local, "rows", [])))
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
 class _AsyncCursor:
-    """Minimal async wrapper around a sqlite3 cursor."""
+    """Result of :meth:`_AsyncConnection.execute`; rows were fetched while the statement ran."""
 
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
-        self._cursor = cursor
+    def __init__(self, rows: List[Any], description, lastrowid: Optional[int], rowcount: int) -> None:
+        self._rows = rows
+        self._pos = 0
+        self.description = description
+        self.lastrowid = lastrowid
+        self.rowcount = rowcount
 
     async def fetchone(self):
-        return self._cursor.fetchone()
+        rows = await self.fetchmany(1)
+        return rows[0] if rows else None
 
     async def fetchall(self):
-        return self._cursor.fetchall()
+        return await self.fetchmany(len(self._rows))
 
     async def fetchmany(self, size: int | None = None):
-        if size is None:
-            return self._cursor.fetchmany()
-        return self._cursor.fetchmany(size)
+        start = self._pos
+        self._pos = min(len(self._rows), start + (1 if size is None else size))
+        return self._rows[start:self._pos]
+
+
+def _is_read(sql: str) -> bool:
+    words = sql.lstrip().split(None, 1)
+    return bool(words) and words[0].upper() == "SELECT"
 
 
 class _AsyncConnection:
-    """Minimal async wrapper around the shared sqlite3 connection."""
+    """Async view over the pool that keeps blocking SQL off the event loop.
 
-    def __init__(self, conn: sqlite3.Connection) -> None:
-        self._conn = conn
+    SELECTs go to a reader connection until the block issues its first
+    write; from then on everything runs on the writer, so the block reads
+    its own uncommitted changes.
+    """
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        self._pool = pool
+        self._wrote = False
+
+    def _execute(self, sql: str, params: tuple) -> _AsyncCursor:
+        if not self._wrote and _is_read(sql):
+            with self._pool.reader() as conn:
+                cursor = conn.execute(sql, params)
+                return _AsyncCursor(cursor.fetchall(), cursor.description, cursor.lastrowid, cursor.rowcount)
+        self._wrote = True
+        with self._pool.write() as conn:
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else []
+            return _AsyncCursor(rows, cursor.description, cursor.lastrowid, cursor.rowcount)
 
     async def execute(self, sql: str, params: tuple = ()) -> _AsyncCursor:
-        return _AsyncCursor(self._conn.execute(sql, params))
+        return await self._pool.run(self._execute, sql, params)
+
+    def _finish(self, commit: bool) -> None:
+        with self._pool.write() as conn:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
 
     async def commit(self) -> None:
-        self._conn.commit()
+        await self._pool.run(self._finish, True)
 
     async def rollback(self) -> None:
-        self._conn.rollback()
+        await self._pool.run(self._finish, False)
 
 
 class BaseDB(AbstractContextManager):
     """Base SQLite wrapper providing WAL mode, foreign keys, and retry logic."""
 
     RETRIES = 3
+    # Read-only WAL connections opened on demand by :attr:`pool`
+    READER_POOL_SIZE = 4
 
-    def __init__(self, db_path: Path | str, *, tz: str | None = None) -> None:
+    def __init__(
+        self,
+        db_path: Path | str,
+        *,
+        tz: str | None = None,
+        readers: int | None = None,
+        executor_workers: int | None = None,
+        profile: str | None = None,
+    ) -> None:
         self.db_path = Path(db_path)
         self.tz = pytz.timezone(tz) if tz else None
         self.conn: sqlite3.Connection
-        self.cur: sqlite3.Cursor
+        self.cur: _LockedCursor
+        # serialises the writer between ``cur``, ``commit`` and the pool executor
+        self._write_lock = threading.RLock()
+        self.vfs: Optional[str] = "qihse"
+        self._pool_readers = self.READER_POOL_SIZE if readers is None else readers
+        self._pool_executor_workers = executor_workers
+        self._pool: Optional[ConnectionPool] = None
+        # Pragma profile from :mod:`.pragmas`; validated here so a typo fails before opening
+        self.profile = profile
+        self.defer_foreign_keys = defers_foreign_keys(profile)
         self._open()
 
     def _open(self) -> None:
-        # Load QIHSE VFS globally before opening main database
-        try:
-            with sqlite3.connect(":memory:") as dummy:
-                dummy.enable_load_extension(True)
-                vfs_path = Path(__file__).parent.parent.parent / "QIHSE" / "qihse_vfs.so"
-                if vfs_path.exists():
-                    dummy.load_extension(str(vfs_path.resolve().with_suffix("")))
-                    logger.info(f"Loaded QIHSE SQLite VFS from {vfs_path}")
-                else:
-                    logger.warning(f"QIHSE VFS not found at {vfs_path}, continuing with default VFS.")
-        except Exception as e:
-            logger.warning(f"Failed to load QIHSE VFS: {e}")
+        if self.vfs and not load_qihse_vfs():
+            self.vfs = None
 
         backoff = 1.0
         for attempt in range(1, self.RETRIES + 1):
             try:
-                uri_path = f"file:{self.db_path.absolute()}?vfs=qihse"
+                uri_path = f"file:{self.db_path.absolute()}"
+                if self.vfs:
+                    uri_path += f"?vfs={self.vfs}"
                 self.conn = sqlite3.connect(
                     uri_path,
                     uri=True,
                     detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
                     timeout=5.0,
+                    # the pool executor may run writes from its worker threads
+                    check_same_thread=False,
                 )
                 self.conn.execute("PRAGMA journal_mode=WAL;")
                 self.conn.execute("PRAGMA foreign_keys=ON;")
                 self.conn.create_function("PAGE", 2, _page)
-                self.cur = self.conn.cursor()
-                self.cur.executescript(SCHEMA_SQL)
-                self.conn.commit()
+                self.cur = _LockedCursor(self.conn, self._write_lock)
+                self._ensure_schema()
+                apply_profile(self.conn, self.profile)
                 logger.info("DB ready at %s", self.db_path)
                 return
             except sqlite3.OperationalError as exc:
@@ -108,24 +256,81 @@ class BaseDB(AbstractContextManager):
                 backoff *= 2
         raise RuntimeError("Failed to open DB after retries")
 
+    @property
+    def schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _ensure_schema(self) -> None:
+        """Create/upgrade the schema only when ``user_version`` is behind SCHEMA_VERSION."""
+        version = self.schema_version
+        if version >= SCHEMA_VERSION:
+            return
+        if version < 1:
+            self.cur.executescript(SCHEMA_SQL)
+            version = 1
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            logger.info("Migrating %s to schema version %d", self.db_path, target)
+            step = MIGRATIONS[target]
+            if callable(step):
+                step(self.conn)
+            else:
+                self.cur.executescript(step)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Commit and close; same as leaving the ``with`` block without an error."""
+        self.__exit__(None, None, None)
+
     def __exit__(self, exc_type, exc, tb):
-        if exc:
-            self.conn.rollback()
-        else:
-            self.conn.commit()
+        with self._write_lock:
+            if exc:
+                self.conn.rollback()
+            else:
+                self.conn.commit()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
         self.conn.close()
         logger.info("Connection closed")
         return False
 
+    @property
+    def pool(self) -> ConnectionPool:
+        """Connection pool sharing this handle's writer; readers open lazily."""
+        if self._pool is None:
+            self._pool = ConnectionPool(
+                self.db_path,
+                writer=self.conn,
+                readers=self._pool_readers,
+                executor_workers=self._pool_executor_workers,
+                vfs=self.vfs,
+                write_lock=self._write_lock,
+            )
+        return self._pool
+
+    def read(self, sql: str, params: tuple = ()) -> List[Any]:
+        """Run a read-only query on a pooled reader connection."""
+        return self.pool.read(sql, params)
+
+    async def aread(self, sql: str, params: tuple = ()) -> List[Any]:
+        """Run a read-only query on a pooled reader without blocking the event loop."""
+        return await self.pool.aread(sql, params)
+
     @asynccontextmanager
     async def connect(self) -> AsyncIterator[_AsyncConnection]:
-        """Provide an async-compatible view over the live SQLite connection."""
-        wrapper = _AsyncConnection(self.conn)
+        """Provide an async connection whose SQL runs on the pool executor.
+
+        Reads use the pooled readers until the block writes (see
+        :class:`_AsyncConnection`); the writer commits on success and rolls
+        back on error.
+        """
+        wrapper = _AsyncConnection(self.pool)
         try:
             yield wrapper
-            self.conn.commit()
+            await wrapper.commit()
         except Exception:
-            self.conn.rollback()
+            await wrapper.rollback()
             raise
 
     def _exec_retry(self, sql: str, params: tuple = ()) -> None:
@@ -156,7 +361,8 @@ class BaseDB(AbstractContextManager):
 
     def commit(self):
         """Explicitly commit the current transaction."""
-        self.conn.commit()
+        with self._write_lock:
+            self.conn.commit()
 
 
-__all__ = ["BaseDB"]
+__all__ = ["BaseDB", "load_qihse_vfs"]
@@ -5,7 +5,7 @@ Operations for tracking content migration progress.
 """
 import logging
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -42,5 +42,40 @@ class MigrationOperations:
         self.cur.execute("SELECT source, destination, last_message_id, status, created_at, updated_at FROM migration_progress WHERE id = ?", (migration_id,))
         return self.cur.fetchone()
 
+    # Parallel migrations: one row per message-id range ------------------
+    def add_migration_ranges(self, migration_id: int, ranges: Iterable[Tuple[int, int]], status: str = "pending") -> None:
+        """Register the ``(range_start, range_end]`` id ranges of *migration_id*."""
+        now = datetime.now(timezone.utc).isoformat()
+        self.db.conn.executemany(
+            "INSERT OR IGNORE INTO migration_ranges(migration_id, range_start, range_end, last_message_id, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(migration_id, start, end, start, status, now) for start, end in ranges],
+        )
+        self.db.commit()
+
+    def update_migration_range(
+        self,
+        migration_id: int,
+        range_start: int,
+        last_message_id: int,
+        status: str,
+        account: Optional[str] = None,
+    ) -> None:
+        self._exec_retry(
+            "UPDATE migration_ranges SET last_message_id = ?, status = ?, account = coalesce(?, account), updated_at = ? "
+            "WHERE migration_id = ? AND range_start = ?",
+            (last_message_id, status, account, datetime.now(timezone.utc).isoformat(), migration_id, range_start),
+        )
+        self.db.commit()
+
+    def get_migration_ranges(self, migration_id: int) -> List[Tuple[int, int, int, Optional[str], str]]:
+        """``(range_start, range_end, last_message_id, account, status)`` rows, lowest range first."""
+        self.cur.execute(
+            "SELECT range_start, range_end, last_message_id, account, status FROM migration_ranges "
+            "WHERE migration_id = ? ORDER BY range_start",
+            (migration_id,),
+        )
+        return self.cur.fetchall()
+
 
 __all__ = ["MigrationOperations"]
@@ -0,0 +1,56 @@
+"""
+Keyset Pagination Cursors
+=========================
+
+Deep ``LIMIT ? OFFSET ?`` pages make SQLite produce and throw away every
+earlier row.  Keyset pagination instead resumes after the sort key of the
+last row served, so every page costs the same.
+
+The sort key travels to API clients as an opaque cursor: URL-safe base64 of a
+small JSON array tagged with the listing it belongs to, so a cursor from one
+listing is rejected by another instead of silently returning wrong rows.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that is malformed or belongs to a different listing."""
+
+
+def encode_cursor(kind: str, key: Sequence[Any]) -> str:
+    """Opaque cursor for sort *key* of listing *kind*."""
+    raw = json.dumps([kind, *key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, kind: str, arity: int) -> Tuple[Any, ...]:
+    """Sort key carried by *cursor*; raises :class:`InvalidCursor` unless it is an *arity*-key cursor of *kind*."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}") from None
+    if not isinstance(value, list) or len(value) != arity + 1 or value[0] != kind:
+        raise InvalidCursor(f"Cursor does not belong to the {kind} listing")
+    key = value[1:]
+    if any(not isinstance(part, (int, float)) or isinstance(part, bool) for part in key):
+        raise InvalidCursor("Cursor keys must be numbers")
+    return tuple(key)
+
+
+def page_rows(rows: List[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[Tuple[Any, ...]]]:
+    """
+    Split a ``limit + 1`` row fetch into the page and the key to resume after.
+
+    The resume key is ``None`` when there is no further page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, tuple(key(rows[-1]))
+
+
+__all__ = ["InvalidCursor", "encode_cursor", "decode_cursor", "page_rows"]
@@ -0,0 +1,76 @@
+"""
+SPECTRA-004 Pragma Profiles
+===========================
+Named SQLite tuning profiles applied when a connection is opened.
+
+WAL mode and foreign keys are always enabled by the callers; a profile only
+layers performance settings on top:
+
+* ``default`` – SQLite's stock settings.
+* ``ingest``  – bulk archiving: fewer fsyncs, bigger cache, larger WAL
+  checkpoints and foreign keys checked at commit rather than per row.
+* ``query``   – read-heavy handles: a large memory map and a read-only
+  connection.
+"""
+import logging
+import sqlite3
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "default"
+
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "ingest": {
+        # In WAL mode NORMAL only syncs at checkpoints; commits survive an app crash
+        "synchronous": "NORMAL",
+        "cache_size": -131072,  # negative = KiB, i.e. 128 MiB
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 10000,
+        # SQLite resets this at every COMMIT; batch writers re-apply it per transaction
+        "defer_foreign_keys": "ON",
+    },
+    "query": {
+        "cache_size": -65536,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+        "query_only": "ON",
+    },
+}
+
+
+def get_profile(name: str | None) -> Dict[str, Any]:
+    """Return the pragma mapping for *name* (``None`` selects the default profile)."""
+    name = name or DEFAULT_PROFILE
+    try:
+        return PRAGMA_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB profile {name!r}; expected one of {', '.join(PRAGMA_PROFILES)}"
+        ) from None
+
+
+def apply_profile(conn: sqlite3.Connection, name: str | None) -> Dict[str, Any]:
+    """Apply the pragmas of profile *name* to *conn* and return them."""
+    pragmas = get_profile(name)
+    for key, value in pragmas.items():
+        conn.execute(f"PRAGMA {key}={value};")
+    if pragmas:
+        logger.debug("Applied DB profile %s: %s", name, pragmas)
+    return pragmas
+
+
+def defers_foreign_keys(name: str | None) -> bool:
+    """Whether writers using profile *name* should defer foreign-key checks per transaction."""
+    return str(get_profile(name).get("defer_foreign_keys", "OFF")).upper() == "ON"
+
+
+__all__ = [
+    "DEFAULT_PROFILE",
+    "PRAGMA_PROFILES",
+    "apply_profile",
+    "defers_foreign_keys",
+    "get_profile",
+]
@@ -3,6 +3,12 @@ SPECTRA-004 SQL Schema
 ======================
 SQLite schema definitions for the SPECTRA archiver database.
 """
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
 
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS users (
@@ -216,4 +222,180 @@ CREATE TABLE IF NOT EXISTS channel_file_inventory (
 );
 """
 
-__all__ = ["SCHEMA_SQL"]
+# Stored in ``PRAGMA user_version``.  Version 1 is the baseline SCHEMA_SQL above;
+# later changes are appended to MIGRATIONS under the version they introduce so
+# existing archives and fresh databases converge on the same layout.
+SCHEMA_VERSION = 7
+
+# ``messages.date_ts`` is the UTC epoch second of ``date``; naive dates count as
+# UTC, matching SQLite's own date functions.
+DATE_TS_SQL = "CAST(strftime('%s', {}) AS INTEGER)"
+
+DATE_TS_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS messages_date_ts_ai AFTER INSERT ON messages
+WHEN NEW.date_ts IS NULL BEGIN
+    UPDATE messages SET date_ts = {DATE_TS_SQL.format("NEW.date")} WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS messages_date_ts_au AFTER UPDATE OF date ON messages
+WHEN NEW.date_ts IS OLD.date_ts BEGIN
+    UPDATE messages SET date_ts = {DATE_TS_SQL.format("NEW.date")} WHERE id = NEW.id;
+END;
+"""
+
+
+# MinHash signatures of ``file_hashes.fuzzy_hash`` and their LSH band buckets,
+# maintained by :class:`tgarchive.core.minhash_lsh.MinHashLSHIndex`.
+FILE_MINHASH_SQL = """
+CREATE TABLE IF NOT EXISTS file_minhashes (
+    file_id             INTEGER PRIMARY KEY,
+    signature           BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS file_minhash_bands (
+    band                INTEGER NOT NULL,
+    bucket              INTEGER NOT NULL,
+    file_id             INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, file_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_file_minhash_bands_file ON file_minhash_bands(file_id);
+
+CREATE TABLE IF NOT EXISTS minhash_lsh_meta (
+    key                 TEXT PRIMARY KEY,
+    value               INTEGER NOT NULL
+);
+"""
+
+# Message-id ranges of a parallel migration.  Each range covers the ids in
+# ``(range_start, range_end]`` and keeps its own checkpoint so a restarted
+# migration only re-runs the ranges that had not finished.
+MIGRATION_RANGES_SQL = """
+CREATE TABLE IF NOT EXISTS migration_ranges (
+    migration_id        INTEGER NOT NULL REFERENCES migration_progress(id),
+    range_start         INTEGER NOT NULL,
+    range_end           INTEGER NOT NULL,
+    last_message_id     INTEGER,
+    account             TEXT,
+    status              TEXT NOT NULL,
+    updated_at          TEXT NOT NULL,
+    PRIMARY KEY (migration_id, range_start)
+);
+"""
+
+# Channel listings page through ``account_channel_access`` in channel_id order.
+CHANNEL_ACCESS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_account_channel_access_channel ON account_channel_access(channel_id);
+"""
+
+
+def epoch_seconds(value: datetime) -> int:
+    """``date_ts`` value for *value* (naive datetimes are taken as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def backfill_date_ts(conn: sqlite3.Connection, chunk: int = 50000) -> int:
+    """Fill ``messages.date_ts`` where it is NULL, committing every *chunk* ids.
+
+    Walks the primary key so each transaction stays short and an interrupted
+    run resumes where it stopped.  Returns the number of rows updated.
+    """
+    updated = 0
+    last = None
+    while True:
+        row = conn.execute(
+            "SELECT id FROM messages WHERE id > coalesce(?, -9223372036854775808) ORDER BY id LIMIT 1 OFFSET ?",
+            (last, chunk - 1),
+        ).fetchone()
+        upper = row[0] if row else None
+        cur = conn.execute(
+            f"UPDATE messages SET date_ts = {DATE_TS_SQL.format('date')} "
+            "WHERE date_ts IS NULL AND id > coalesce(?, -9223372036854775808) "
+            "AND id <= coalesce(?, 9223372036854775807)",
+            (last, upper),
+        )
+        updated += max(cur.rowcount, 0)
+        conn.commit()
+        if upper is None:
+            break
+        last = upper
+    logger.info("Backfilled date_ts for %d messages", updated)
+    return updated
+
+
+def _migrate_2_date_ts(conn: sqlite3.Connection) -> None:
+    """Integer ``date_ts`` on messages plus the indexes the timeline and range queries use."""
+    columns = _columns(conn, "messages")
+    if "date_ts" not in columns:
+        conn.execute("ALTER TABLE messages ADD COLUMN date_ts INTEGER")
+    backfill_date_ts(conn)
+    conn.executescript(
+        DATE_TS_TRIGGERS
+        + """
+        CREATE INDEX IF NOT EXISTS idx_messages_date_ts ON messages(date_ts);
+        CREATE INDEX IF NOT EXISTS idx_messages_user_date_ts ON messages(user_id, date_ts);
+        """
+    )
+    # the canonical table has no channel_id; tables created by the search
+    # tooling do, and their per-channel range queries need this index
+    if "channel_id" in columns:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_channel_date_ts ON messages(channel_id, date_ts)")
+
+
+def _migrate_3_file_hash_key(conn: sqlite3.Connection) -> None:
+    """Key cached content hashes by ``(file_id, access_hash)`` and index SHA-256 lookups."""
+    if "access_hash" not in _columns(conn, "file_hashes"):
+        conn.execute("ALTER TABLE file_hashes ADD COLUMN access_hash INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hashes_sha256 ON file_hashes(sha256_hash)")
+
+
+def _migrate_7_fts(conn: sqlite3.Connection) -> None:
+    """Full-text indexes over messages and users, kept in sync by triggers.
+
+    Indexes built with other tokenizer/prefix options are kept; the older
+    layout without a tokenizer (which the queries no longer match) is rebuilt.
+    """
+    from ..search.hybrid_search import SQLiteFTS5IndexManager
+
+    legacy = any(
+        "tokenize=" not in sql
+        for (sql,) in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN ('messages_fts', 'users_fts')"
+        )
+    )
+    try:
+        SQLiteFTS5IndexManager(conn).migrate(recreate_changed=legacy)
+    except sqlite3.OperationalError as exc:
+        # SQLite built without FTS5: the archive works, keyword search does not
+        logger.warning("Skipping full-text indexes: %s", exc)
+
+
+Migration = Union[str, Callable[[sqlite3.Connection], None]]
+
+# A migration is either an SQL script or a callable for steps that need to look
+# at the existing table or work in batches.  Callables must be safe to re-run.
+MIGRATIONS: dict[int, Migration] = {
+    2: _migrate_2_date_ts,
+    3: _migrate_3_file_hash_key,
+    4: FILE_MINHASH_SQL,
+    5: MIGRATION_RANGES_SQL,
+    6: CHANNEL_ACCESS_INDEX_SQL,
+    7: _migrate_7_fts,
+}
+
+__all__ = [
+    "SCHEMA_SQL",
+    "SCHEMA_VERSION",
+    "MIGRATIONS",
+    "DATE_TS_SQL",
+    "FILE_MINHASH_SQL",
+    "MIGRATION_RANGES_SQL",
+    "CHANNEL_ACCESS_INDEX_SQL",
+    "backfill_date_ts",
+    "epoch_seconds",
+]
@@ -5,7 +5,7 @@ Operations for file sorting, categorization, and hash management.
 """
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 # ── KEYSTONE Integration ────────────────────────────────────────────────
 try:
@@ -124,16 +124,46 @@ class SortingHashOperations:
         self.db.commit()
 
     # File Hashes ----------------------------------------------------------
-    def add_file_hash(self, file_id: int, sha256_hash: Optional[str], perceptual_hash: Optional[str], fuzzy_hash: Optional[str]) -> None:
+    FILE_HASH_SQL = """
+        INSERT INTO file_hashes(file_id, access_hash, sha256_hash, perceptual_hash, fuzzy_hash, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(file_id) DO UPDATE SET
+            access_hash=coalesce(excluded.access_hash, access_hash),
+            sha256_hash=coalesce(excluded.sha256_hash, sha256_hash),
+            perceptual_hash=coalesce(excluded.perceptual_hash, perceptual_hash),
+            fuzzy_hash=coalesce(excluded.fuzzy_hash, fuzzy_hash);
+    """
+
+    def add_file_hash(
+        self,
+        file_id: int,
+        sha256_hash: Optional[str],
+        perceptual_hash: Optional[str],
+        fuzzy_hash: Optional[str],
+        access_hash: Optional[int] = None,
+    ) -> None:
+        """Insert or refresh the hashes of *file_id*; hashes passed as None keep their stored value."""
         self._exec_retry(
-            """
-            INSERT INTO file_hashes(file_id, sha256_hash, perceptual_hash, fuzzy_hash, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (file_id, sha256_hash, perceptual_hash, fuzzy_hash, datetime.now(timezone.utc).isoformat()),
+            self.FILE_HASH_SQL,
+            (file_id, access_hash, sha256_hash, perceptual_hash, fuzzy_hash, datetime.now(timezone.utc).isoformat()),
         )
         self.db.commit()
 
+    def add_file_hashes(
+        self, rows: Iterable[Tuple[int, Optional[str], Optional[str], Optional[str]]]
+    ) -> int:
+        """:meth:`add_file_hash` for many ``(file_id, sha256, perceptual, fuzzy)`` rows in one transaction."""
+        created_at = datetime.now(timezone.utc).isoformat()
+        written = 0
+        for file_id, sha256_hash, perceptual_hash, fuzzy_hash in rows:
+            self._exec_retry(
+                self.FILE_HASH_SQL,
+                (file_id, None, sha256_hash, perceptual_hash, fuzzy_hash, created_at),
+            )
+            written += 1
+        self.db.commit()
+        return written
+
     def get_all_fuzzy_hashes(self, channel_id: Optional[int] = None) -> List[Tuple[int, str]]:
         """
         Retrieves all non-null fuzzy hashes from the database.
@@ -13,13 +13,27 @@ from .forward_operations import ForwardOperations
 from .migration_operations import MigrationOperations
 from .sorting_hash_operations import SortingHashOperations
 from .mirror_operations import MirrorOperations
+from .time_index import MessageTimeIndex
 
 
 class SpectraDB(BaseDB):
     """SQLite wrapper providing all SPECTRA database operations."""
 
-    def __init__(self, db_path: Path | str, *, tz: str | None = None, config: Optional[Dict[str, Any]] = None) -> None:
-        super().__init__(db_path, tz=tz)
+    def __init__(
+        self,
+        db_path: Path | str,
+        *,
+        tz: str | None = None,
+        config: Optional[Dict[str, Any]] = None,
+        readers: int | None = None,
+        executor_workers: int | None = None,
+        profile: str | None = None,
+        vector_store: bool = True,
+        vector_backend: str = "qihse",
+    ) -> None:
+        super().__init__(
+            db_path, tz=tz, readers=readers, executor_workers=executor_workers, profile=profile
+        )
         
         # Initialize advanced features manager if config provided
         self.advanced_features = None
@@ -32,6 +46,10 @@ class SpectraDB(BaseDB):
                 import logging
                 logging.getLogger(__name__).warning(f"Failed to initialize advanced features: {e}")
         
+        self._time_index: Optional[MessageTimeIndex] = None
+        # message dates upserted in the open transaction, noted on commit
+        self._written_dates: Dict[int, Any] = {}
+
         # Initialize operation modules
         self.core = CoreOperations(self, advanced_features_manager=self.advanced_features)
         self.forward = ForwardOperations(self)
@@ -40,10 +58,13 @@ class SpectraDB(BaseDB):
         self.mirror = MirrorOperations(self)
         
         # Integrate QIHSE natively as the root vector DB layer
+        self.vector_store = None
+        if not vector_store:
+            return
         try:
             from .vector_store import VectorStoreManager, VectorStoreConfig
             vstore_config = VectorStoreConfig(
-                backend="qihse",
+                backend=vector_backend,
                 path="./data/vector_store",
                 collection_name="spectra_messages",
             )
@@ -55,6 +76,67 @@ class SpectraDB(BaseDB):
             import logging
             logging.getLogger(__name__).warning(f"Failed to integrate native QIHSE Vector Store: {e}")
 
+    @classmethod
+    def from_config(cls, config: Any, db_path: Path | str | None = None, **kwargs: Any) -> "SpectraDB":
+        """Open *db_path* (default: the config's ``db_path``) with the DB settings of *config*.
+
+        *config* is a :class:`~tgarchive.core.config_models.Config` or its
+        ``data`` dict; ``db_profile``, ``db_pool`` and the vector backend
+        (``advanced_features.vector_database.backend``) are taken from it
+        unless given in *kwargs*.
+        """
+        data = getattr(config, "data", config) or {}
+        pool_cfg = data.get("db_pool") or {}
+        vector_cfg = (data.get("advanced_features") or {}).get("vector_database") or {}
+        kwargs.setdefault("vector_backend", vector_cfg.get("backend", "qihse"))
+        kwargs.setdefault("profile", data.get("db_profile"))
+        kwargs.setdefault("readers", pool_cfg.get("readers"))
+        kwargs.setdefault("executor_workers", pool_cfg.get("executor_workers"))
+        return cls(db_path if db_path is not None else data.get("db_path", "spectra.db"), **kwargs)
+
+    @classmethod
+    def open_fast(cls, db_path: Path | str, *, tz: str | None = None, **kwargs: Any) -> "SpectraDB":
+        """Open the database without vector-store setup.
+
+        For short-lived handles (schedulers, task bookkeeping) that only run SQL;
+        ``index_message``/``semantic_search`` become no-ops on the returned handle.
+        """
+        return cls(db_path, tz=tz, vector_store=False, **kwargs)
+
+    @property
+    def time_index(self) -> MessageTimeIndex:
+        """Sorted timestamp/id index over ``messages``, created on first use."""
+        if self._time_index is None:
+            path = None
+            if self.db_path.name != ":memory:":
+                path = self.db_path.with_name(self.db_path.name + ".timeindex.npz")
+            self._time_index = MessageTimeIndex(self.conn, path)
+        return self._time_index
+
+    def commit(self):
+        """Commit the current transaction and note its messages in :attr:`time_index`."""
+        super().commit()
+        if self._written_dates:
+            written, self._written_dates = self._written_dates, {}
+            self.time_index.note_many(written.items())
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc:
+            self._written_dates.clear()
+        else:
+            self.commit()
+            if self._time_index is not None:
+                self._time_index.save()
+        if self.vector_store is not None:
+            # vectors are buffered independently of the SQL transaction; flush them either way
+            try:
+                self.vector_store.close()
+            except Exception as e:
+                import logging
+                logging.getLogger(__name__).warning(f"Failed to close vector store: {e}")
+            self.vector_store = None
+        return super().__exit__(exc_type, exc, tb)
+
     # Delegate vector store operations
     def index_message(self, message_id: int, content: str, user_id: Optional[int], channel_id: Optional[int], date: datetime):
         if self.vector_store:
@@ -81,6 +163,18 @@ class SpectraDB(BaseDB):
     def get_all_unique_channels(self):
         return self.core.get_all_unique_channels()
 
+    def count_channels(self, *args, **kwargs):
+        return self.core.count_channels(*args, **kwargs)
+
+    def channels_page(self, *args, **kwargs):
+        return self.core.channels_page(*args, **kwargs)
+
+    def count_messages(self, *args, **kwargs):
+        return self.core.count_messages(*args, **kwargs)
+
+    def messages_page(self, *args, **kwargs):
+        return self.core.messages_page(*args, **kwargs)
+
     def save_checkpoint(self, *args, **kwargs):
         return self.core.save_checkpoint(*args, **kwargs)
 
@@ -164,6 +258,9 @@ class SpectraDB(BaseDB):
     def add_file_hash(self, *args, **kwargs):
         return self.sorting_hash.add_file_hash(*args, **kwargs)
 
+    def add_file_hashes(self, *args, **kwargs):
+        return self.sorting_hash.add_file_hashes(*args, **kwargs)
+
     def get_all_fuzzy_hashes(self, *args, **kwargs):
         return self.sorting_hash.get_all_fuzzy_hashes(*args, **kwargs)
 
@@ -186,6 +283,15 @@ class SpectraDB(BaseDB):
     def get_migration_report(self, *args, **kwargs):
         return self.migration.get_migration_report(*args, **kwargs)
 
+    def add_migration_ranges(self, *args, **kwargs):
+        return self.migration.add_migration_ranges(*args, **kwargs)
+
+    def update_migration_range(self, *args, **kwargs):
+        return self.migration.update_migration_range(*args, **kwargs)
+
+    def get_migration_ranges(self, *args, **kwargs):
+        return self.migration.get_migration_ranges(*args, **kwargs)
+
     # Delegate mirror operations
     def add_mirror_progress(self, *args, **kwargs):
         return self.mirror.add_mirror_progress(*args, **kwargs)
@@ -203,25 +309,12 @@ class SpectraDB(BaseDB):
         channel_id: Optional[int] = None,
         cache_manager=None,
     ) -> List[int]:
-        """Compatibility search helper used by integration tests."""
-        query = "SELECT id, date FROM messages"
-        params: tuple = ()
-        if channel_id is not None:
-            query += " WHERE channel_id = ?"
-            params = (channel_id,)
-        query += " ORDER BY date"
-
-        rows = self.cur.execute(query, params).fetchall()
-        results: List[int] = []
-        for message_id, date_value in rows:
-            if isinstance(date_value, str):
-                dt = datetime.fromisoformat(date_value.replace("Z", "+00:00"))
-            else:
-                dt = date_value
-            ts = int(dt.timestamp())
-            if start_time <= ts <= end_time:
-                results.append(message_id)
-        return results
+        """Ids of messages dated within ``[start_time, end_time]`` (epoch seconds), oldest first.
+
+        Served from :attr:`time_index`, so repeated calls bisect resident
+        arrays instead of scanning and parsing every row.
+        """
+        return self.time_index.range(start_time, end_time, channel_id).tolist()
 
     def find_message_by_id_fast(self, message_id: int, channel_id: Optional[int] = None) -> Optional[dict]:
         """Compatibility fast lookup helper used by integration tests."""
@@ -0,0 +1,304 @@
+"""
+SPECTRA-004 Message Time Index
+==============================
+Resident, sorted ``(timestamp, id)`` arrays over the ``messages`` table.
+
+One series is kept for the whole archive and one per channel that has been
+queried (only when the table carries a ``channel_id`` column).  Each series
+holds two aligned int64 arrays sorted by epoch-second timestamp, so a range
+lookup is two :func:`numpy.searchsorted` bisects instead of a full
+``ORDER BY date`` scan with per-row ISO parsing.
+
+The index stays current without rescans:
+
+* rows written through :meth:`note` (called by ``SpectraDB.commit`` for the
+  messages ``upsert_message`` wrote) are buffered and merged before the
+  next lookup;
+* commits from other connections are detected with ``PRAGMA data_version``
+  and picked up by fetching only rows above the series' id watermark.
+  Dates rewritten in place by another connection are not seen until
+  :meth:`invalidate` is called.
+
+Series are persisted to ``<db>.timeindex.npz`` (loaded with
+``allow_pickle=False``) together with the row count and highest id they
+cover; a file that no longer matches the table is discarded and rebuilt.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ALL_CHANNELS = None
+# watermark of an empty table: every id is above it
+NO_ROWS = -(2**63)
+
+
+def parse_timestamp(value: Any) -> Optional[int]:
+    """Epoch seconds for a stored ``messages.date`` value, or ``None`` if unparseable."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    try:
+        return int(value.timestamp())
+    except (AttributeError, OverflowError, ValueError):
+        return None
+
+
+def _key_name(channel_id: Optional[int]) -> str:
+    return "all" if channel_id is None else f"c{channel_id}"
+
+
+class _Series:
+    """Aligned ``ts``/``ids`` arrays sorted by timestamp, plus the id watermark."""
+
+    __slots__ = ("ts", "ids", "watermark", "_sorted_ids")
+
+    def __init__(self, ts: np.ndarray, ids: np.ndarray, watermark: int) -> None:
+        self.ts = ts
+        self.ids = ids
+        self.watermark = watermark
+        self._sorted_ids: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def has(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean mask of which *ids* are already in the series."""
+        if len(self.ids) == 0:
+            return np.zeros(len(ids), dtype=bool)
+        if self._sorted_ids is None:
+            self._sorted_ids = np.sort(self.ids)
+        pos = np.searchsorted(self._sorted_ids, ids)
+        pos[pos == len(self._sorted_ids)] = 0
+        return self._sorted_ids[pos] == ids
+
+    def merge(self, ids: np.ndarray, ts: np.ndarray) -> None:
+        """Insert (or move) rows; one O(n) copy per batch rather than a re-sort.
+
+        The watermark is left alone: it only advances when rows are fetched
+        from the table, so rows committed elsewhere below a locally written
+        id are still picked up.
+        """
+        if len(ids) == 0:
+            return
+        # the last write of a duplicated id wins
+        ids, first = np.unique(ids[::-1], return_index=True)
+        ts = ts[::-1][first]
+        known = ids[self.has(ids)]
+        if len(known):
+            keep = ~np.isin(self.ids, known)
+            self.ts, self.ids = self.ts[keep], self.ids[keep]
+        order = np.lexsort((ids, ts))
+        ids, ts = ids[order], ts[order]
+        pos = np.searchsorted(self.ts, ts, side="right")
+        self.ts = np.insert(self.ts, pos, ts)
+        self.ids = np.insert(self.ids, pos, ids)
+        self._sorted_ids = None
+
+
+class MessageTimeIndex:
+    """Per-channel sorted timestamp/id index over ``messages``, kept in memory."""
+
+    def __init__(self, conn: sqlite3.Connection, path: Optional[Path] = None) -> None:
+        self.conn = conn
+        self.path = path
+        self._series: Dict[Optional[int], _Series] = {}
+        self._pending: Dict[int, int] = {}
+        self._data_version: Optional[int] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    # Persistence -------------------------------------------------------------
+    def _table_state(self) -> Tuple[int, int]:
+        count, max_id = self.conn.execute("SELECT COUNT(*), MAX(id) FROM messages").fetchone()
+        return int(count), NO_ROWS if max_id is None else int(max_id)
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                saved_count, saved_max = int(data["rows"]), int(data["max_id"])
+                series = {}
+                for name in data["keys"].tolist():
+                    key = None if name == "all" else int(name[1:])
+                    series[key] = _Series(data[f"ts_{name}"], data[f"ids_{name}"], int(data[f"wm_{name}"]))
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("Ignoring unreadable time index %s: %s", self.path, exc)
+            return
+
+        count = self._table_state()[0]
+        newer = self.conn.execute("SELECT COUNT(*) FROM messages WHERE id > ?", (saved_max,)).fetchone()[0]
+        if count != saved_count + newer:
+            # rows were deleted or renumbered below the watermark; start over
+            logger.info("Discarding stale time index %s", self.path)
+            return
+        self._series = series
+        logger.info("Loaded time index %s (%d series, %d new rows)", self.path, len(series), newer)
+
+    def save(self) -> None:
+        """Persist every resident series (no-op if nothing changed since the last save)."""
+        if self.path is None:
+            return
+        with self._lock:
+            self._apply_pending()
+            if not self._dirty or not self._series:
+                return
+            arrays: Dict[str, np.ndarray] = {}
+            for key, series in self._series.items():
+                name = _key_name(key)
+                arrays[f"ts_{name}"] = series.ts
+                arrays[f"ids_{name}"] = series.ids
+                arrays[f"wm_{name}"] = np.int64(series.watermark)
+            count = self._table_state()[0]
+            # series are complete up to their watermarks, which never exceed the table's max id
+            watermark = min(series.watermark for series in self._series.values())
+            rows = count - self.conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE id > ?", (watermark,)
+            ).fetchone()[0]
+            tmp = self.path.with_name(self.path.name + ".tmp.npz")
+            np.savez(
+                tmp,
+                keys=np.array([_key_name(k) for k in self._series], dtype=str),
+                rows=np.int64(rows),
+                max_id=np.int64(watermark),
+                **arrays,
+            )
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # Maintenance -------------------------------------------------------------
+    def note(self, message_id: int, date: Any) -> None:
+        """Record a message written through this connection (applied before the next lookup)."""
+        ts = parse_timestamp(date)
+        if ts is None:
+            return
+        with self._lock:
+            self._pending[int(message_id)] = ts
+
+    def note_many(self, rows: Iterable[Tuple[int, Any]]) -> None:
+        for message_id, date in rows:
+            self.note(message_id, date)
+
+    def _apply_pending(self) -> None:
+        if not self._pending:
+            return
+        ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        ts = np.fromiter(self._pending.values(), dtype=np.int64, count=len(self._pending))
+        self._pending.clear()
+        for key, series in self._series.items():
+            if key is ALL_CHANNELS:
+                series.merge(ids, ts)
+                continue
+            # upsert_message does not know the channel: move rows this series
+            # already holds and ask the table (by primary key) about the rest
+            known = series.has(ids)
+            new_ids, new_ts = self._fetch_ids(key, ids[~known].tolist())
+            series.merge(np.concatenate((ids[known], new_ids)), np.concatenate((ts[known], new_ts)))
+        self._dirty = True
+
+    def _fetch_ids(self, channel_id: int, ids: List[int], chunk: int = 500) -> Tuple[np.ndarray, np.ndarray]:
+        found: List[Tuple[int, int]] = []
+        for i in range(0, len(ids), chunk):
+            part = ids[i : i + chunk]
+            rows = self.conn.execute(
+                f"SELECT id, date FROM messages WHERE channel_id = ? AND id IN ({','.join('?' * len(part))})",
+                (channel_id, *part),
+            )
+            found.extend((message_id, ts) for message_id, ts in ((r[0], parse_timestamp(r[1])) for r in rows) if ts is not None)
+        return np.array([f[0] for f in found], dtype=np.int64), np.array([f[1] for f in found], dtype=np.int64)
+
+    def _fetch(self, channel_id: Optional[int], after: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of *channel_id* (or all rows) with ``id > after`` (every row if *after* is None)."""
+        clauses, params = [], []
+        if after is not None:
+            clauses.append("id > ?")
+            params.append(after)
+        if channel_id is not None:
+            clauses.append("channel_id = ?")
+            params.append(channel_id)
+        sql = "SELECT id, date FROM messages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        ids: List[int] = []
+        stamps: List[int] = []
+        for message_id, date in self.conn.execute(sql, params):
+            ts = parse_timestamp(date)
+            if ts is not None:
+                ids.append(message_id)
+                stamps.append(ts)
+        return np.array(ids, dtype=np.int64), np.array(stamps, dtype=np.int64)
+
+    def _build(self, channel_id: Optional[int]) -> _Series:
+        watermark = self._table_state()[1]
+        ids, ts = self._fetch(channel_id)
+        order = np.lexsort((ids, ts))
+        series = _Series(ts[order], ids[order], max(watermark, int(ids.max()) if len(ids) else NO_ROWS))
+        logger.debug("Built time index for %s: %d rows", _key_name(channel_id), len(series))
+        self._dirty = True
+        return series
+
+    def _refresh(self) -> None:
+        """Pull rows committed by other connections since the last lookup."""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        for key, series in self._series.items():
+            ids, ts = self._fetch(key, series.watermark)
+            if len(ids):
+                series.merge(ids, ts)
+                series.watermark = max(series.watermark, int(ids.max()))
+                self._dirty = True
+
+    def series(self, channel_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the up-to-date ``(timestamps, ids)`` arrays, sorted by timestamp.
+
+        The arrays are the resident ones; callers must not modify them.
+        """
+        with self._lock:
+            self._refresh()
+            self._apply_pending()
+            series = self._series.get(channel_id)
+            if series is None:
+                series = self._series[channel_id] = self._build(channel_id)
+            return series.ts, series.ids
+
+    def invalidate(self) -> None:
+        """Drop every resident series (and the persisted file) so the next lookup rebuilds."""
+        with self._lock:
+            self._series.clear()
+            self._pending.clear()
+            self._dirty = False
+            if self.path is not None and self.path.exists():
+                self.path.unlink()
+
+    # Lookups -----------------------------------------------------------------
+    def range(self, start: int, end: int, channel_id: Optional[int] = None) -> np.ndarray:
+        """Ids of messages with ``start <= timestamp <= end``, in timestamp order."""
+        ts, ids = self.series(channel_id)
+        lo = np.searchsorted(ts, start, side="left")
+        hi = np.searchsorted(ts, end, side="right")
+        return ids[lo:hi].copy()
+
+    def __contains__(self, message_id: object) -> bool:
+        with self._lock:
+            self.series(ALL_CHANNELS)
+            return bool(self._series[ALL_CHANNELS].has(np.array([message_id], dtype=np.int64))[0])
+
+
+__all__ = ["MessageTimeIndex", "parse_timestamp"]
@@ -0,0 +1,307 @@
+"""
+SPECTRA-004 Memory-Mapped Vector Matrix
+=======================================
+Append-only float32 embedding storage backed by a memory-mapped file.
+
+Layout for a base path ``<dir>/<name>``:
+
+* ``<name>.f32``     – raw row-major float32 matrix, grown by doubling.
+* ``<name>.idx.npz`` – row count, dimension, row ids, per-row norms, a
+  packed tombstone bitmap and the compaction generation.  Written atomically by :meth:`flush` and loaded
+  with ``allow_pickle=False``.
+
+Updates and deletes only tombstone the old row; :meth:`compact` rewrites the
+live rows once enough of the file is dead.  Rows appended after the last
+:meth:`flush` are not visible after a restart, so callers flush at their
+own batch boundaries.
+
+Compaction never writes into the live files: the new matrix and index are
+written to ``<name>.f32.compact`` and ``<name>.idx.compact.npz`` and then
+swapped in with :func:`os.replace`, data first.  A crash before the data
+swap leaves the old pair untouched; a crash between the two swaps is
+finished on the next open, which installs the pending index.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DTYPE = np.float32
+
+
+class MappedVectorMatrix:
+    """Memory-mapped float32 matrix with an id→row index and tombstones."""
+
+    def __init__(
+        self,
+        base_path: Path | str,
+        dim: int,
+        *,
+        initial_capacity: int = 1024,
+        compact_ratio: float = 0.25,
+    ) -> None:
+        self.base_path = Path(base_path)
+        self.data_path = self.base_path.with_name(self.base_path.name + ".f32")
+        self.index_path = self.base_path.with_name(self.base_path.name + ".idx.npz")
+        self._compact_data_path = self.data_path.with_name(self.data_path.name + ".compact")
+        self._compact_index_path = self.base_path.with_name(self.base_path.name + ".idx.compact.npz")
+        self.dim = int(dim)
+        self.compact_ratio = compact_ratio
+        self.base_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._count = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._norms = np.zeros(0, dtype=DTYPE)
+        self._dead = np.zeros(0, dtype=bool)
+        self._dead_count = 0
+        self._dirty = False
+        # bumped by compact(); row numbers from an older generation are stale
+        self.generation = 0
+        self._load(max(1, initial_capacity))
+
+    # Persistence -------------------------------------------------------------
+    def _recover(self) -> None:
+        """Finish or roll back a compaction interrupted by a crash."""
+        if self._compact_data_path.exists():
+            # the data swap never happened; the live pair is still consistent
+            self._compact_data_path.unlink()
+            self._compact_index_path.unlink(missing_ok=True)
+        elif self._compact_index_path.exists():
+            os.replace(self._compact_index_path, self.index_path)
+            logger.info("Finished interrupted compaction of %s", self.data_path)
+
+    def _load(self, initial_capacity: int) -> None:
+        self._recover()
+        if self.index_path.exists() and self.data_path.exists():
+            with np.load(self.index_path, allow_pickle=False) as idx:
+                self.dim = int(idx["dim"])
+                self._count = int(idx["count"])
+                self._ids = idx["ids"].tolist()
+                self._norms = idx["norms"].astype(DTYPE)
+                self._dead = np.unpackbits(idx["tombstones"], count=self._count).astype(bool)
+                self.generation = int(idx["generation"]) if "generation" in idx.files else 0
+            self._dead_count = int(self._dead.sum())
+            self._rows = {vid: row for row, vid in enumerate(self._ids) if not self._dead[row]}
+            capacity = max(self._count, self.data_path.stat().st_size // (self.dim * DTYPE().itemsize))
+            self._map(capacity)
+            logger.info("Mapped %d vectors (%d dead) from %s", len(self._rows), self._dead_count, self.data_path)
+        else:
+            # No index means nothing was ever flushed; start a fresh file.
+            with open(self.data_path, "wb") as fh:
+                fh.truncate(initial_capacity * self.dim * DTYPE().itemsize)
+            self._map(initial_capacity)
+
+    def _map(self, capacity: int) -> None:
+        self._mm = np.memmap(self.data_path, dtype=DTYPE, mode="r+", shape=(capacity, self.dim))
+        if len(self._norms) < capacity:
+            self._norms = np.resize(self._norms, capacity)
+            self._dead = np.resize(self._dead, capacity)
+            self._norms[self._count:] = 0
+            self._dead[self._count:] = False
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._mm.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._mm.flush()
+        del self._mm
+        with open(self.data_path, "r+b") as fh:
+            fh.truncate(capacity * self.dim * DTYPE().itemsize)
+        self._map(capacity)
+
+    def flush(self) -> None:
+        """Persist appended rows, then atomically rewrite the index."""
+        if not self._dirty:
+            return
+        self._mm.flush()
+        count = self._count
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp.npz")
+        self._write_index(tmp, self._ids, self._norms[:count], self._dead[:count], self.generation)
+        os.replace(tmp, self.index_path)
+        # superseded by the index just written
+        self._compact_index_path.unlink(missing_ok=True)
+        self._dirty = False
+        if count and self._dead_count / count > self.compact_ratio:
+            self.compact()
+
+    def _write_index(self, path: Path, ids: List[str], norms: np.ndarray, dead: np.ndarray, generation: int) -> None:
+        with open(path, "wb") as fh:
+            np.savez(
+                fh,
+                dim=np.int64(self.dim),
+                count=np.int64(len(ids)),
+                ids=np.array(ids, dtype=str),
+                norms=norms,
+                tombstones=np.packbits(dead),
+                generation=np.int64(generation),
+            )
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def compact(self, chunk_rows: int = 65536) -> None:
+        """Rewrite live rows contiguously into a new file, dropping tombstones.
+
+        The live ``.f32`` and index are only ever replaced whole (see the
+        module docstring).  The new :attr:`generation` is recorded only in
+        the replacement index, so it is persisted once both files are in
+        place.  Rows are copied *chunk_rows* at a time.
+        """
+        self._mm.flush()
+        live = np.flatnonzero(~self._dead[: self._count])
+        ids = [self._ids[row] for row in live]
+        norms = self._norms[live].copy()
+        capacity = max(1024, len(live) * 2)
+        generation = self.generation + 1
+
+        with open(self._compact_data_path, "wb") as fh:
+            for start in range(0, len(live), chunk_rows):
+                fh.write(np.ascontiguousarray(self._mm[live[start : start + chunk_rows]]).tobytes())
+            fh.truncate(capacity * self.dim * DTYPE().itemsize)
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._write_index(self._compact_index_path, ids, norms, np.zeros(len(ids), dtype=bool), generation)
+
+        old_capacity = self._mm.shape[0]
+        del self._mm
+        try:
+            os.replace(self._compact_data_path, self.data_path)
+        except OSError:
+            self._map(old_capacity)
+            self._compact_data_path.unlink(missing_ok=True)
+            self._compact_index_path.unlink(missing_ok=True)
+            raise
+
+        self._count = len(live)
+        self._ids = ids
+        self._rows = {vid: row for row, vid in enumerate(ids)}
+        self._norms = np.zeros(0, dtype=DTYPE)
+        self._dead = np.zeros(0, dtype=bool)
+        self._dead_count = 0
+        self._map(capacity)
+        self._norms[: self._count] = norms
+        self.generation = generation
+        try:
+            os.replace(self._compact_index_path, self.index_path)
+        except OSError:
+            # the new data is already live; the next flush or open installs its index
+            self._dirty = True
+            raise
+        self._dirty = False
+        logger.info("Compacted %s to %d live vectors", self.data_path, self._count)
+
+    def close(self) -> None:
+        self.flush()
+        del self._mm
+
+    # Mutation ----------------------------------------------------------------
+    def add(self, ids: Sequence[str], vectors: Iterable[Sequence[float]] | np.ndarray) -> None:
+        """Append *vectors* under *ids*; an existing id is tombstoned and re-appended."""
+        block = np.asarray(vectors, dtype=DTYPE).reshape(len(ids), self.dim)
+        start = self._count
+        self._grow(start + len(ids))
+        for vid in ids:
+            self.delete(vid)
+        rows = range(start, start + len(ids))
+        self._mm[start : start + len(ids)] = block
+        self._norms[start : start + len(ids)] = np.linalg.norm(block, axis=1)
+        self._ids.extend(ids)
+        self._rows.update(zip(ids, rows))
+        self._count += len(ids)
+        self._dirty = True
+        # a duplicate id inside one batch keeps only its last row
+        for vid, row in zip(ids, rows):
+            if self._rows[vid] != row:
+                self._dead[row] = True
+                self._dead_count += 1
+
+    def delete(self, vid: str) -> bool:
+        row = self._rows.pop(vid, None)
+        if row is None:
+            return False
+        self._dead[row] = True
+        self._dead_count += 1
+        self._dirty = True
+        return True
+
+    # Access ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, vid: object) -> bool:
+        return vid in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The used region of the mapped matrix (a view, dead rows included)."""
+        return self._mm[: self._count]
+
+    def row_of(self, vid: str) -> Optional[int]:
+        return self._rows.get(vid)
+
+    def id_of(self, row: int) -> str:
+        return self._ids[row]
+
+    def rows_for(self, ids: Iterable[str]) -> np.ndarray:
+        """Row numbers of the live ids in *ids*."""
+        return np.fromiter((r for r in map(self._rows.get, ids) if r is not None), dtype=np.int64)
+
+    def get(self, vid: str) -> Optional[np.ndarray]:
+        row = self._rows.get(vid)
+        return None if row is None else self._mm[row]
+
+    def scores(
+        self,
+        query: Sequence[float] | np.ndarray,
+        metric: str = "cosine",
+        rows: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Score the used rows (or only *rows*) against *query* with one matrix-vector product.
+
+        Scoring every row reads the mapped file in place; passing *rows*
+        gathers just those rows, so restrictive filters never touch the rest.
+        Dead rows score ``-inf``.  Higher is always more similar.
+        """
+        q = np.asarray(query, dtype=DTYPE)
+        if rows is None:
+            mat, norms, dead = self.matrix, self._norms[: self._count], self._dead[: self._count]
+        else:
+            mat, norms, dead = self._mm[rows], self._norms[rows], self._dead[rows]
+        dots = mat @ q
+        if metric == "cosine":
+            denom = norms * np.linalg.norm(q)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.where(denom > 0, dots / denom, 0.0).astype(DTYPE)
+        elif metric == "dot":
+            scores = dots
+        else:  # euclidean: |a-q|^2 = |a|^2 - 2a.q + |q|^2
+            sq = norms ** 2 - 2 * dots + q @ q
+            scores = (1.0 / (1.0 + np.sqrt(np.maximum(sq, 0)))).astype(DTYPE)
+        scores[dead] = -np.inf
+        return scores
+
+    def top_k(
+        self,
+        query: Sequence[float] | np.ndarray,
+        k: int,
+        metric: str = "cosine",
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return the best *k* ``(id, score)`` pairs, optionally restricted to *rows*."""
+        if self._count == 0 or k <= 0 or (rows is not None and len(rows) == 0):
+            return []
+        scores = self.scores(query, metric, rows)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        row_ids = best if rows is None else rows[best]
+        return [(self._ids[r], float(scores[b])) for b, r in zip(best, row_ids) if np.isfinite(scores[b])]
+
+
+__all__ = ["MappedVectorMatrix"]
@@ -15,15 +15,20 @@ Author: SPECTRA Intelligence System
 """
 
 import os
+import json
 import logging
 import sqlite3
 import pickle
+import threading
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 import numpy as np
 
+from .ann_index import IVFIndex
+from .vector_matrix import MappedVectorMatrix
+
 logger = logging.getLogger(__name__)
 
 # Try to import QIHSE (primary backend)
@@ -76,7 +81,7 @@ class SearchResult:
 @dataclass
 class VectorStoreConfig:
     """Configuration for vector store."""
-    backend: str = "qihse"  # "qihse" (primary), "qdrant", "chromadb", or "numpy"
+    backend: str = "qihse"  # "qihse" (primary), "ivf", "qdrant", "chromadb", or "numpy"
     path: str = "./data/vector_store"
     collection_name: str = "messages"
     vector_size: int = 384  # Dimension of embeddings
@@ -84,43 +89,49 @@ class VectorStoreConfig:
     on_disk: bool = True  # Store vectors on disk (vs memory)
     quantization: Optional[str] = None  # "scalar", "product", or None
     confidence_threshold: float = 0.95  # QIHSE confidence threshold
+    write_buffer_size: int = 1000  # Rows buffered before metadata/index flush
+    ann_nlist: int = 0  # IVF clusters (0 = sqrt of the collection size)
+    ann_nprobe: int = 16  # IVF clusters scanned per query
+    ann_min_train: int = 4096  # Search exactly until this many vectors exist
 
 
-class QIHSEVectorStore:
+class MappedVectorStore:
     """
-    QIHSE-based vector storage (primary backend).
+    Persistent vector storage shared by the QIHSE and IVF backends.
     
-    Stores vectors directly using SQLite for persistence and QIHSE for quantum-inspired search.
-    Replaces Qdrant as the primary vector storage backend.
+    Vectors live in an append-only memory-mapped float32 matrix
+    (:class:`MappedVectorMatrix`); metadata lives in SQLite.
+    Search is exact: one matrix-vector product and an ``argpartition`` top-k.
     """
 
-    def __init__(self, config: VectorStoreConfig):
-        if not QIHSE_AVAILABLE or not qihse_available():
-            raise ImportError("QIHSE not available. Install QIHSE library.")
+    backend_name = "mapped"
 
+    def __init__(self, config: VectorStoreConfig):
         self.config = config
         self.db_path = Path(config.path) / f"{config.collection_name}.db"
-        self.vectors_path = Path(config.path) / f"{config.collection_name}_vectors.npy"
+        # Pre-mmap pickled {"vectors": {...}, "ids": [...]} file, imported once
+        self.legacy_vectors_path = Path(config.path) / f"{config.collection_name}_vectors.npy"
         
         # Create directory if needed
         Path(config.path).mkdir(parents=True, exist_ok=True)
         
-        # Initialize QIHSE search engine
-        self.qihse_engine = QihseSearchEngine(QIHSE_TYPE_DOUBLE, 10000)
-        configure_qihse_for_semantic_search(
-            self.qihse_engine.config, config.vector_size, config.confidence_threshold
-        )
-        
-        # Initialize SQLite for metadata
+        # Long-lived metadata connection; writes are buffered and flushed in batches
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._pending: Dict[str, Tuple[str, Optional[int], str, str]] = {}
+        self._closed = False
         self._init_database()
         
-        # Load vectors into memory (for QIHSE search)
-        self._load_vectors()
+        # Map vectors from disk (no unpickling, no copy into memory)
+        self.vectors = MappedVectorMatrix(
+            Path(config.path) / f"{config.collection_name}_vectors", config.vector_size
+        )
+        self._import_legacy_vectors()
 
     def _init_database(self):
         """Initialize SQLite database for vector metadata."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("""
             CREATE TABLE IF NOT EXISTS vectors (
                 id TEXT PRIMARY KEY,
                 message_id INTEGER,
@@ -128,91 +139,67 @@ class QIHSEVectorStore:
                 created_at TEXT
             )
         """)
-        conn.execute("""
+        self._conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_message_id ON vectors(message_id)
         """)
-        conn.commit()
-        conn.close()
+        self._conn.commit()
 
-    def _load_vectors(self):
-        """Load vectors from disk into memory."""
-        if self.vectors_path.exists():
-            try:
-                data = np.load(self.vectors_path, allow_pickle=True).item()
-                self.vectors = data.get("vectors", {})
-                self.vector_ids = data.get("ids", [])
-                logger.info(f"Loaded {len(self.vectors)} vectors from {self.vectors_path}")
-            except Exception as e:
-                logger.warning(f"Failed to load vectors: {e}")
-                self.vectors = {}
-                self.vector_ids = []
-        else:
-            self.vectors = {}
-            self.vector_ids = []
-
-    def _save_vectors(self):
-        """Save vectors to disk."""
+    def _import_legacy_vectors(self):
+        """One-time import of the old pickled vector file into the mapped matrix."""
+        if not self.legacy_vectors_path.exists() or len(self.vectors):
+            return
         try:
-            data = {
-                "vectors": self.vectors,
-                "ids": self.vector_ids
-            }
-            np.save(self.vectors_path, data, allow_pickle=True)
+            data = np.load(self.legacy_vectors_path, allow_pickle=True).item()
+            legacy = data.get("vectors", {})
+            if legacy:
+                ids = list(legacy)
+                self.vectors.add(ids, np.stack([legacy[i] for i in ids]))
+            self.vectors.flush()
+            self.legacy_vectors_path.rename(self.legacy_vectors_path.with_suffix(".npy.migrated"))
+            logger.info(f"Imported {len(legacy)} legacy vectors from {self.legacy_vectors_path}")
         except Exception as e:
-            logger.error(f"Failed to save vectors: {e}")
+            logger.warning(f"Failed to import legacy vectors: {e}")
 
     def upsert(self, id: str, vector: List[float], payload: Dict[str, Any]):
-        """Insert or update a vector with metadata."""
-        import json
-        
-        # Store vector in memory
-        self.vectors[id] = np.array(vector, dtype=np.float64)
-        if id not in self.vector_ids:
-            self.vector_ids.append(id)
-        
-        # Store metadata in SQLite
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            INSERT OR REPLACE INTO vectors (id, message_id, metadata, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (
-            id,
-            payload.get("message_id"),
-            json.dumps(payload),
-            datetime.now().isoformat()
-        ))
-        conn.commit()
-        conn.close()
-        
-        # Save vectors to disk periodically (could be optimized with batching)
-        if len(self.vectors) % 100 == 0:
-            self._save_vectors()
+        """Insert or update a vector with metadata (buffered until :meth:`flush`)."""
+        self.upsert_batch([(id, vector, payload)])
 
     def upsert_batch(self, points: List[Tuple[str, List[float], Dict[str, Any]]]):
-        """Batch insert/update vectors."""
-        import json
-        
-        conn = sqlite3.connect(self.db_path)
-        for id, vector, payload in points:
-            # Store vector in memory
-            self.vectors[id] = np.array(vector, dtype=np.float64)
-            if id not in self.vector_ids:
-                self.vector_ids.append(id)
-            
-            # Store metadata
-            conn.execute("""
+        """Batch insert/update vectors; flushes once the write buffer is full."""
+        if not points:
+            return
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.vectors.add([p[0] for p in points], [p[1] for p in points])
+            for id, _vector, payload in points:
+                self._pending[id] = (id, payload.get("message_id"), json.dumps(payload), now)
+            if len(self._pending) >= self.config.write_buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Write buffered metadata in one transaction and persist the vector index."""
+        with self._lock:
+            self._flush_metadata()
+            self.vectors.flush()
+
+    def _flush_metadata(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany("""
                 INSERT OR REPLACE INTO vectors (id, message_id, metadata, created_at)
                 VALUES (?, ?, ?, ?)
-            """, (
-                id,
-                payload.get("message_id"),
-                json.dumps(payload),
-                datetime.now().isoformat()
-            ))
-        
-        conn.commit()
-        conn.close()
-        self._save_vectors()
+            """, list(self._pending.values()))
+        self._pending.clear()
+
+    def close(self):
+        """Flush pending writes and close the metadata connection (idempotent)."""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._conn.close()
+            self._closed = True
 
     def search(
         self,
@@ -222,7 +209,10 @@ class QIHSEVectorStore:
         score_threshold: Optional[float] = None
     ) -> List[SearchResult]:
         """
-        Search for similar vectors using QIHSE.
+        Search for similar vectors.
+        
+        Scores every mapped row with a single matrix-vector product and
+        selects the top *limit* with ``argpartition``.
         
         Args:
             vector: Query vector
@@ -233,72 +223,34 @@ class QIHSEVectorStore:
         Returns:
             List of SearchResult objects
         """
-        if not self.vectors:
+        if not len(self.vectors):
             return []
         
-        # Apply filters to get candidate IDs
-        candidate_ids = self._filter_ids(filters) if filters else list(self.vector_ids)
-        
-        if not candidate_ids:
-            return []
-        
-        # Get candidate vectors in order
-        candidate_vectors_list = []
-        valid_ids = []
-        for vector_id in candidate_ids:
-            if vector_id in self.vectors:
-                candidate_vectors_list.append(self.vectors[vector_id])
-                valid_ids.append(vector_id)
-        
-        if not candidate_vectors_list:
-            return []
-        
-        # Convert to numpy array
-        candidate_vectors = np.array(candidate_vectors_list, dtype=np.float64)
-        query_vector = np.array(vector, dtype=np.float64)
-        
-        # Use QIHSE for search
-        try:
-            threshold = score_threshold or self.config.confidence_threshold
-            results = self.qihse_engine.search_vectors(
-                candidate_vectors,
-                query_vector,
-                None,
-                threshold
-            )
-        except Exception as e:
-            logger.error(f"QIHSE search failed: {e}")
-            # Fallback to cosine similarity
-            return self._fallback_search(vector, valid_ids, limit, score_threshold)
+        # Apply filters to get candidate rows
+        rows = None
+        if filters:
+            rows = self.vectors.rows_for(self._filter_ids(filters))
+            if not len(rows):
+                return []
         
-        # Format results
-        search_results = []
-        for idx, confidence in results:
-            if idx >= len(valid_ids):
-                continue
-            
-            vector_id = valid_ids[idx]
-            if score_threshold and confidence < score_threshold:
-                continue
-            
-            # Get metadata
-            payload = self._get_metadata(vector_id)
-            
-            search_results.append(SearchResult(
-                id=vector_id,
-                score=float(confidence),
-                payload=payload
-            ))
+        hits = [
+            (vector_id, score)
+            for vector_id, score in self._top_k(vector, limit, rows)
+            if not (score_threshold and score < score_threshold)
+        ]
+        payloads = self._get_metadata_many([vector_id for vector_id, _ in hits])
         
-        # Sort by score and limit
-        search_results.sort(key=lambda x: x.score, reverse=True)
-        return search_results[:limit]
+        return [
+            SearchResult(id=vector_id, score=score, payload=payloads.get(vector_id, {}))
+            for vector_id, score in hits
+        ]
+
+    def _top_k(self, vector: List[float], limit: int, rows: Optional[np.ndarray]) -> List[Tuple[str, float]]:
+        """Exact top-k over all live rows, or only *rows* when a filter applied."""
+        return self.vectors.top_k(vector, limit, self.config.distance_metric, rows)
 
     def _filter_ids(self, filters: Dict[str, Any]) -> List[str]:
         """Filter vector IDs by metadata."""
-        import json
-        
-        conn = sqlite3.connect(self.db_path)
         query = "SELECT id FROM vectors WHERE 1=1"
         params = []
         
@@ -316,91 +268,134 @@ class QIHSEVectorStore:
                 query += f" AND json_extract(metadata, '$.{key}') = ?"
                 params.append(value)
         
-        cursor = conn.execute(query, params)
-        ids = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        return ids
+        with self._lock:
+            self._flush_metadata()
+            return [row[0] for row in self._conn.execute(query, params)]
 
     def _get_metadata(self, vector_id: str) -> Dict[str, Any]:
         """Get metadata for a vector ID."""
-        import json
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute("SELECT metadata FROM vectors WHERE id = ?", (vector_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return json.loads(row[0])
-        return {}
-
-    def _fallback_search(
-        self,
-        vector: List[float],
-        candidate_ids: List[str],
-        limit: int,
-        score_threshold: Optional[float]
-    ) -> List[SearchResult]:
-        """Fallback to cosine similarity if QIHSE fails."""
-        query_vec = np.array(vector, dtype=np.float64)
-        candidate_vectors = np.array([self.vectors[id] for id in candidate_ids], dtype=np.float64)
-        
-        # Cosine similarity
-        query_norm = np.linalg.norm(query_vec)
-        candidate_norms = np.linalg.norm(candidate_vectors, axis=1)
-        similarities = np.dot(candidate_vectors, query_vec) / (candidate_norms * query_norm)
-        
-        # Sort and filter
-        indices = np.argsort(similarities)[::-1][:limit]
-        
-        results = []
-        for idx in indices:
-            score = float(similarities[idx])
-            if score_threshold and score < score_threshold:
-                continue
-            
-            vector_id = candidate_ids[idx]
-            payload = self._get_metadata(vector_id)
-            
-            results.append(SearchResult(
-                id=vector_id,
-                score=score,
-                payload=payload
-            ))
-        
-        return results
+        return self._get_metadata_many([vector_id]).get(vector_id, {})
+
+    def _get_metadata_many(self, vector_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get metadata for several vector IDs with one ``IN (...)`` query per chunk."""
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            missing = []
+            for vector_id in vector_ids:
+                if vector_id in self._pending:
+                    found[vector_id] = json.loads(self._pending[vector_id][2])
+                else:
+                    missing.append(vector_id)
+            # stay under SQLite's bound-parameter limit
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for vector_id, metadata in self._conn.execute(
+                    f"SELECT id, metadata FROM vectors WHERE id IN ({placeholders})", chunk
+                ):
+                    found[vector_id] = json.loads(metadata)
+        return found
 
     def delete(self, id: str):
-        """Delete a vector by ID."""
-        # Remove from memory
-        self.vectors.pop(id, None)
-        if id in self.vector_ids:
-            self.vector_ids.remove(id)
-        
-        # Remove from SQLite
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("DELETE FROM vectors WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-        
-        self._save_vectors()
+        """Delete a vector by ID (the tombstone is persisted by :meth:`flush`)."""
+        self.delete_many([id])
+
+    def delete_many(self, ids: List[str]):
+        """
+        Delete several vectors, removing their metadata in one transaction.
+
+        The mapped rows are only tombstoned; the index file is rewritten by
+        the next :meth:`flush` or :meth:`close`, not once per deleted ID.
+        """
+        if not ids:
+            return
+        with self._lock:
+            for id in ids:
+                self.vectors.delete(id)
+                self._pending.pop(id, None)
+            with self._conn:
+                # stay under SQLite's bound-parameter limit
+                for i in range(0, len(ids), 500):
+                    chunk = list(ids[i:i + 500])
+                    placeholders = ",".join("?" * len(chunk))
+                    self._conn.execute(f"DELETE FROM vectors WHERE id IN ({placeholders})", chunk)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get collection statistics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute("SELECT COUNT(*) FROM vectors")
-        count = cursor.fetchone()[0]
-        conn.close()
+        with self._lock:
+            self._flush_metadata()
+            count = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
         
         return {
             "points_count": count,
             "vector_size": self.config.vector_size,
-            "backend": "qihse",
+            "backend": self.backend_name,
             "memory_vectors": len(self.vectors)
         }
 
 
+class QIHSEVectorStore(MappedVectorStore):
+    """
+    QIHSE-based vector storage (primary backend).
+    
+    Replaces Qdrant as the primary vector storage backend.
+    """
+
+    backend_name = "qihse"
+
+    def __init__(self, config: VectorStoreConfig):
+        if not QIHSE_AVAILABLE or not qihse_available():
+            raise ImportError("QIHSE not available. Install QIHSE library.")
+        super().__init__(config)
+
+
+class IVFVectorStore(MappedVectorStore):
+    """
+    Approximate nearest-neighbour storage using a NumPy IVF index (:class:`IVFIndex`).
+    
+    The index is extended as batches are upserted.  Metadata filters become a
+    row mask applied to the probed clusters before any vector is scored;
+    small filtered sets are scored exactly instead.
+    """
+
+    backend_name = "ivf"
+
+    # Filtered sets at most this large are cheaper to score exactly
+    EXACT_FILTER_ROWS = 20000
+
+    def __init__(self, config: VectorStoreConfig):
+        super().__init__(config)
+        self.index = IVFIndex(
+            self.vectors,
+            metric=config.distance_metric,
+            nlist=config.ann_nlist,
+            nprobe=config.ann_nprobe,
+            min_train=config.ann_min_train,
+        )
+
+    def upsert_batch(self, points: List[Tuple[str, List[float], Dict[str, Any]]]):
+        super().upsert_batch(points)
+        with self._lock:
+            self.index.sync()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self.index.save(force=True)
+            super().close()
+
+    def _top_k(self, vector: List[float], limit: int, rows: Optional[np.ndarray]) -> List[Tuple[str, float]]:
+        if rows is not None and len(rows) <= self.EXACT_FILTER_ROWS:
+            return super()._top_k(vector, limit, rows)
+        mask = None
+        if rows is not None:
+            mask = np.zeros(len(self.vectors.matrix), dtype=bool)
+            mask[rows] = True
+        return self.index.search(vector, limit, mask)
+
+
 class QdrantVectorStore:
     """
     Qdrant-based vector storage.
@@ -704,8 +699,12 @@ class NumpyVectorStore:
             distances = np.linalg.norm(candidate_vectors - query_vec, axis=1)
             similarities = 1.0 / (1.0 + distances)
 
-        # Sort and filter by threshold
-        indices = np.argsort(similarities)[::-1][:limit]
+        # Top-k selection, then sort only the selected scores
+        k = min(limit, len(similarities))
+        if k <= 0:
+            return []
+        indices = np.argpartition(-similarities, k - 1)[:k]
+        indices = indices[np.argsort(-similarities[indices])]
 
         results = []
         for idx in indices:
@@ -782,6 +781,9 @@ class VectorStoreManager:
         elif self.config.backend == "chromadb" and CHROMADB_AVAILABLE:
             self.store = ChromaDBVectorStore(self.config)
             logger.info("Using ChromaDB vector store")
+        elif self.config.backend == "ivf":
+            self.store = IVFVectorStore(self.config)
+            logger.info("Using IVF approximate vector store")
         elif self.config.backend == "numpy":
             self.store = NumpyVectorStore(self.config)
             logger.warning("Using Numpy vector store (not scalable)")
@@ -853,6 +855,18 @@ class VectorStoreManager:
 
         self.store.upsert_batch(points)
 
+    def flush(self):
+        """Persist buffered writes for backends that batch them."""
+        if hasattr(self.store, "flush"):
+            self.store.flush()
+
+    def close(self):
+        """Persist buffered writes and release the backend's files/connections."""
+        if hasattr(self.store, "close"):
+            self.store.close()
+        else:
+            self.flush()
+
     def semantic_search(
         self,
         query_embedding: np.ndarray,
@@ -982,6 +996,15 @@ class VectorStoreManager:
         """Remove a message from the vector store."""
         self.store.delete(f"msg_{message_id}")
 
+    def delete_messages(self, message_ids: List[int]):
+        """Remove several messages, in one batch where the backend supports it."""
+        ids = [f"msg_{message_id}" for message_id in message_ids]
+        if hasattr(self.store, "delete_many"):
+            self.store.delete_many(ids)
+        else:
+            for id in ids:
+                self.store.delete(id)
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get vector store statistics."""
         return self.store.get_stats()
@@ -1,45 +1,81 @@
 """
-Manages the TelegramClient instance.
+Manages a pool of connected TelegramClient instances, one per account.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 try:
     from telethon import TelegramClient
+    from telethon.errors import FloodWaitError
 except ImportError:  # pragma: no cover - allows logic tests without Telethon installed
     class TelegramClient:  # type: ignore[override]
         def __init__(self, *args, **kwargs):
             raise ImportError("telethon is required to create Telegram clients")
 
+    class FloodWaitError(Exception):  # type: ignore[override]
+        seconds = 0
+
 from tgarchive.core.config_models import Config
+from tgarchive.utils.rotation_strategies import AdvancedAccountRotator
+
 
 class ClientManager:
     """
-    Manages the TelegramClient instance.
+    Keeps one connected, authorised TelegramClient per account and hands them out.
+
+    Clients stay connected between calls, so switching accounts or making
+    several calls in a row costs no reconnect.  ``get_client`` leases a
+    client and ``release`` returns it; ``close`` disconnects the whole pool.
+    When no account is named, the account is picked by
+    :class:`AdvancedAccountRotator`, which also hears about FloodWaits and
+    failures reported through :meth:`lease`.
+
+    A client that has not been used for ``probe_interval`` seconds is checked
+    with a cheap ``get_me`` call before it is handed out again, and replaced
+    if the check fails.  Clients with outstanding leases are in use and are
+    never probed or replaced; only :meth:`close` disconnects them.
     """
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, rotator: Optional[AdvancedAccountRotator] = None, probe_interval: float = 60.0):
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self._client: Optional[TelegramClient] = None
+        self._rotator = rotator
+        self.probe_interval = probe_interval
+        self._clients: Dict[str, TelegramClient] = {}
+        self._last_checked: Dict[str, float] = {}
+        self._leases: Dict[str, int] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
 
-    async def get_client(self, account_identifier: Optional[str] = None) -> TelegramClient:
-        selected_account = None
+    @property
+    def rotator(self) -> AdvancedAccountRotator:
+        if self._rotator is None:
+            self._rotator = AdvancedAccountRotator(self.config.active_accounts, config=self.config.data)
+        return self._rotator
+
+    # Account selection -------------------------------------------------------
+    def _resolve_account(self, account_identifier: Optional[str], channel: Optional[str] = None) -> Dict[str, Any]:
         if account_identifier:
             for acc in self.config.accounts:
                 if acc.get("phone_number") == account_identifier or acc.get("session_name") == account_identifier:
-                    selected_account = acc
-                    break
-            if not selected_account:
-                raise ValueError(f"Account '{account_identifier}' not found in configuration.")
-        elif self.config.accounts:
-            selected_account = self.config.accounts[0]
-            self.logger.info(f"No account specified, using the first configured account: {selected_account.get('session_name')}")
-        else:
+                    return acc
+            raise ValueError(f"Account '{account_identifier}' not found in configuration.")
+        if not self.config.accounts:
             raise ValueError("No accounts configured.")
+        selected_account = self.rotator.get_next_account(channel=channel) if self.rotator.accounts else None
+        if not selected_account:
+            selected_account = self.config.accounts[0]
+        self.logger.info(f"No account specified, using account chosen by rotation: {selected_account.get('session_name')}")
+        return selected_account
 
+    # Leasing -----------------------------------------------------------------
+    async def get_client(self, account_identifier: Optional[str] = None, channel: Optional[str] = None) -> TelegramClient:
+        """Lease the pooled client of *account_identifier* (or of the next rotated account)."""
+        selected_account = self._resolve_account(account_identifier, channel)
         session_name = selected_account.get("session_name")
         api_id = selected_account.get("api_id")
         api_hash = selected_account.get("api_hash")
@@ -47,15 +83,126 @@ class ClientManager:
         if not all([session_name, api_id, api_hash]):
             raise ValueError(f"Account {session_name or 'Unknown'} is missing critical configuration (session_name, api_id, or api_hash).")
 
-        if self._client and self._client.session.filename == str(Config().path.parent / session_name) and self._client.is_connected():
-             if await self._client.is_user_authorized():
-                self.logger.debug(f"Reusing existing connected client for session: {session_name}")
-                return self._client
-             else:
-                self.logger.warning(f"Existing client for {session_name} is no longer authorized. Attempting to reconnect.")
-                await self._client.disconnect()
-                self._client = None
+        async with self._lock_for(session_name):
+            client = self._clients.get(session_name)
+            # a leased client is in use by another task; share it as is
+            if client is not None and not self._leases.get(session_name) and not await self._is_healthy(session_name, client):
+                await self._discard(session_name)
+                client = None
+            if client is None:
+                client = await self._connect(session_name, api_id, api_hash)
+                self._clients[session_name] = client
+                self._last_checked[session_name] = time.monotonic()
+            else:
+                self.logger.debug(f"Reusing pooled client for session: {session_name}")
+            self._leases[session_name] = self._leases.get(session_name, 0) + 1
+        return client
+
+    def release(self, client: Optional[TelegramClient]) -> None:
+        """Return a client leased with :meth:`get_client`; it stays connected in the pool."""
+        session_name = self._session_of(client)
+        if session_name is None:
+            return
+        self._leases[session_name] = max(0, self._leases.get(session_name, 0) - 1)
+        self._last_checked[session_name] = time.monotonic()
+
+    @asynccontextmanager
+    async def lease(self, account_identifier: Optional[str] = None, channel: Optional[str] = None) -> AsyncIterator[TelegramClient]:
+        """``async with`` form of :meth:`get_client`/:meth:`release` that reports the outcome to the rotator."""
+        client = await self.get_client(account_identifier, channel)
+        session_name = self._session_of(client)
+        try:
+            yield client
+        except FloodWaitError as e:
+            if session_name:
+                self.rotator.record_failure(session_name, error="FloodWait", floodwait_seconds=e.seconds)
+            raise
+        except Exception as e:
+            if session_name:
+                self.rotator.record_failure(session_name, error=str(e))
+            raise
+        else:
+            if session_name:
+                self.rotator.record_success(session_name)
+        finally:
+            self.release(client)
+
+    def leases(self) -> Dict[str, int]:
+        """Outstanding leases per pooled session."""
+        return {session_name: self._leases.get(session_name, 0) for session_name in self._clients}
+
+    def _session_of(self, client: Optional[TelegramClient]) -> Optional[str]:
+        if client is None:
+            return None
+        for session_name, pooled in self._clients.items():
+            if pooled is client:
+                return session_name
+        return None
+
+    # Connections -------------------------------------------------------------
+    async def connect_all(self, account_identifiers: Optional[List[str]] = None) -> List[str]:
+        """Connect the given (default: all active) accounts up front; returns the sessions now pooled."""
+        if account_identifiers is None:
+            account_identifiers = [acc.get("session_name") for acc in self.config.active_accounts if acc.get("session_name")]
+
+        async def warm(account_identifier: str) -> None:
+            try:
+                self.release(await self.get_client(account_identifier))
+            except Exception as e:
+                self.logger.warning(f"Could not connect account {account_identifier}: {e}")
+
+        await asyncio.gather(*(warm(identifier) for identifier in account_identifiers))
+        return list(self._clients)
+
+    async def probe(self) -> Dict[str, bool]:
+        """Health-check every idle pooled client now, dropping the ones that fail.
+
+        Leased clients are skipped and left out of the result.
+        """
+        results = {}
+        for session_name in list(self._clients):
+            async with self._lock_for(session_name):
+                client = self._clients.get(session_name)
+                if client is None or self._leases.get(session_name):
+                    continue
+                self._last_checked.pop(session_name, None)
+                healthy = await self._is_healthy(session_name, client)
+                if not healthy:
+                    await self._discard(session_name)
+                results[session_name] = healthy
+        return results
+
+    def _lock_for(self, session_name: str) -> asyncio.Lock:
+        return self._connect_locks.setdefault(session_name, asyncio.Lock())
+
+    async def _is_healthy(self, session_name: str, client: TelegramClient) -> bool:
+        if not client.is_connected():
+            self.logger.warning(f"Pooled client for {session_name} is disconnected.")
+            return False
+        checked = self._last_checked.get(session_name)
+        if checked is not None and time.monotonic() - checked < self.probe_interval:
+            return True
+        try:
+            if await client.get_me(input_peer=True) is None:
+                self.logger.warning(f"Pooled client for {session_name} is no longer authorized.")
+                return False
+        except FloodWaitError:
+            # rate limited, but the connection itself is fine
+            pass
+        except Exception as e:
+            self.logger.warning(f"Health probe failed for {session_name}: {e}")
+            return False
+        self._last_checked[session_name] = time.monotonic()
+        return True
+
+    async def _discard(self, session_name: str) -> None:
+        client = self._clients.pop(session_name, None)
+        self._last_checked.pop(session_name, None)
+        self._leases.pop(session_name, None)
+        if client is not None and client.is_connected():
+            await client.disconnect()
 
+    async def _connect(self, session_name: str, api_id, api_hash) -> TelegramClient:
         proxy = None
         proxy_conf = self.config.data.get("proxy")
         if proxy_conf and proxy_conf.get("enabled"):
@@ -80,27 +227,25 @@ class ClientManager:
                 self.logger.warning("PySocks library not found. Proceeding without proxy.")
 
         client_path = str(Config().path.parent / session_name)
-        self._client = TelegramClient(client_path, api_id, api_hash, proxy=proxy)
+        client = TelegramClient(client_path, api_id, api_hash, proxy=proxy)
 
         self.logger.info(f"Connecting to Telegram with account: {session_name}")
         try:
-            await self._client.connect()
+            await client.connect()
         except ConnectionError as e:
             self.logger.error(f"Failed to connect to Telegram for account {session_name}: {e}")
-            self._client = None
             raise
 
-        if not await self._client.is_user_authorized():
-            await self._client.disconnect()
-            self._client = None
+        if not await client.is_user_authorized():
+            await client.disconnect()
             raise ValueError(f"Account {session_name} is not authorized. Please check credentials or run authorization process.")
 
         self.logger.info(f"Successfully connected and authorized as {session_name}.")
-        return self._client
+        return client
 
     async def close(self):
-        """Closes any active Telegram client connection."""
-        if self._client and self._client.is_connected():
-            self.logger.info("Closing client connection.")
-            await self._client.disconnect()
-            self._client = None
+        """Disconnects every pooled client."""
+        if self._clients:
+            self.logger.info(f"Closing {len(self._clients)} pooled client connection(s).")
+        for session_name in list(self._clients):
+            await self._discard(session_name)
@@ -1,14 +1,32 @@
 """
 Handles deduplication of forwarded attachments.
+
+Content hashes are cached per Telegram file, keyed by ``file.id`` and the
+media ``access_hash``.  A file is downloaded at most once: the SHA-256 is
+computed while the chunks stream in, kept in memory for the rest of the
+session and persisted to ``file_hashes`` when the file is recorded as
+forwarded, so later sightings of the same file are answered without any
+download at all.
+
+Perceptual hashes of recorded images are kept in a
+:class:`~tgarchive.core.phash_index.PerceptualHashIndex`, loaded from the
+database on the first near-duplicate lookup and extended as files are
+recorded, so a lookup does not scan every stored hash.  Fuzzy hashes are
+narrowed to candidates through the SQLite-backed
+:class:`~tgarchive.core.minhash_lsh.MinHashLSHIndex` before the exact
+comparison.
 """
 from __future__ import annotations
 
 import hashlib
 import logging
 import os
+import shutil
 import sqlite3
 import tempfile
-from typing import List, Set
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
 
 try:
     from telethon import TelegramClient
@@ -20,6 +38,9 @@ except ImportError:  # pragma: no cover - allows unit tests without Telethon
     class TLMessage:  # type: ignore[override]
         pass
 
+from tgarchive.core.minhash_lsh import HAS_DATASKETCH, MinHashLSHIndex
+from tgarchive.core.phash_index import PerceptualHashIndex
+
 try:
     from tgarchive.db import SpectraDB
 except ImportError:  # pragma: no cover - optional for unit tests that do not touch the DB
@@ -37,16 +58,43 @@ def get_sha256_hash(file_path, chunk_size=8192):
     return sha256.hexdigest()
 
 
+@dataclass
+class FileHashes:
+    """Hashes known for one Telegram file, plus the spooled copy if one is on disk."""
+    sha256_hash: str
+    perceptual_hash: Optional[str] = None
+    fuzzy_hash: Optional[str] = None
+    path: Optional[str] = None
+
+
+def file_cache_key(message: TLMessage) -> Optional[Tuple[Hashable, Optional[int]]]:
+    """``(file.id, access_hash)`` for the file attached to *message*, or ``None``."""
+    file = getattr(message, "file", None)
+    if not file or getattr(file, "id", None) is None:
+        return None
+    media = getattr(file, "media", None)
+    return file.id, getattr(media, "access_hash", None)
+
+
 class Deduplicator:
     """
     Handles deduplication of forwarded attachments.
     """
 
-    def __init__(self, db: SpectraDB, enable_deduplication: bool):
+    CACHE_SIZE = 4096
+    DOWNLOAD_CHUNK_SIZE = 512 * 1024
+
+    def __init__(self, db: SpectraDB, enable_deduplication: bool, lsh_options: Optional[Dict[str, Any]] = None):
         self.db = db
         self.enable_deduplication = enable_deduplication
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.message_hashes: Set[str] = set()
+        self._file_cache: OrderedDict = OrderedDict()
+        self._spool_dir: Optional[str] = None
+        self._phash_index: Optional[PerceptualHashIndex] = None
+        self._lsh_options = dict(lsh_options or {})
+        self._fuzzy_index: Optional[MinHashLSHIndex] = None
+        self._fuzzy_index_loaded = False
         if self.enable_deduplication:
             if self.db:
                 self._load_existing_hashes()
@@ -70,56 +118,235 @@ class Deduplicator:
         except Exception as e:
             self.logger.error(f"Error loading existing file hashes: {e}", exc_info=True)
 
-    async def is_duplicate(self, message_group: List[TLMessage], client: TelegramClient) -> bool:
+    @property
+    def perceptual_index(self) -> PerceptualHashIndex:
+        """Index of every recorded perceptual hash, loaded on first use."""
+        if self._phash_index is None:
+            index = PerceptualHashIndex()
+            if self.db and hasattr(self.db, "get_all_perceptual_hashes"):
+                try:
+                    index = PerceptualHashIndex.from_db(self.db)
+                except sqlite3.OperationalError as e:
+                    self.logger.warning(f"Could not load perceptual hashes from 'file_hashes'. Error: {e}")
+            self._phash_index = index
+        return self._phash_index
+
+    def find_similar_image(self, perceptual_hash: str, max_distance: int) -> Optional[Tuple[Hashable, int]]:
+        """``(file_id, distance)`` of the closest recorded image within *max_distance*, or ``None``."""
+        return self.perceptual_index.nearest(perceptual_hash, max_distance)
+
+    @property
+    def fuzzy_index(self) -> Optional[MinHashLSHIndex]:
+        """MinHash LSH index of recorded fuzzy hashes, or ``None`` if it cannot be used here.
+
+        Needs a SQLite-backed database and datasketch; otherwise lookups fall
+        back to comparing against every stored fuzzy hash.
+        """
+        if not self._fuzzy_index_loaded:
+            self._fuzzy_index_loaded = True
+            conn = getattr(self.db, "conn", None) if self.db else None
+            if isinstance(conn, sqlite3.Connection) and HAS_DATASKETCH:
+                try:
+                    index = MinHashLSHIndex(conn, **self._lsh_options)
+                    index.sync_file_hashes()
+                    self._fuzzy_index = index
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Could not open the MinHash LSH index; fuzzy lookups will scan every hash. Error: {e}")
+        return self._fuzzy_index
+
+    def fuzzy_candidates(self, fuzzy_hash: str) -> List[Tuple[int, str]]:
+        """``(file_id, fuzzy_hash)`` rows worth an exact comparison against *fuzzy_hash*."""
+        if not self.db:
+            return []
+        index = self.fuzzy_index
+        if index is None:
+            return list(self.db.get_all_fuzzy_hashes()) if hasattr(self.db, "get_all_fuzzy_hashes") else []
+        ids = index.candidates(fuzzy_hash)
+        rows: List[Tuple[int, str]] = []
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            rows.extend(self.db.conn.execute(
+                f"SELECT file_id, fuzzy_hash FROM file_hashes WHERE fuzzy_hash IS NOT NULL AND file_id IN ({','.join('?' * len(part))})",
+                part,
+            ))
+        return rows
+
+    # Content-hash cache -----------------------------------------------------
+    def _remember(self, key, entry: FileHashes) -> FileHashes:
+        self._file_cache[key] = entry
+        self._file_cache.move_to_end(key)
+        while len(self._file_cache) > self.CACHE_SIZE:
+            _, evicted = self._file_cache.popitem(last=False)
+            self._discard_spool(evicted)
+        return entry
+
+    def _lookup_recorded(self, key) -> Optional[FileHashes]:
+        """Hashes persisted for *key* by an earlier :meth:`record_forwarded`."""
+        if not self.db:
+            return None
+        file_id, access_hash = key
+        try:
+            row = self.db.conn.execute(
+                "SELECT sha256_hash, perceptual_hash, fuzzy_hash FROM file_hashes "
+                "WHERE file_id = ? AND (access_hash IS NULL OR access_hash = ?) AND sha256_hash IS NOT NULL",
+                (file_id, access_hash),
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Could not look up cached file hashes, 'file_hashes' may predate the access_hash column. Error: {e}")
+            return None
+        if not row or not isinstance(row[0], str):
+            return None
+        return FileHashes(row[0], row[1], row[2])
+
+    def _spool_path(self, message: TLMessage) -> str:
+        if self._spool_dir is None:
+            self._spool_dir = tempfile.mkdtemp(prefix="spectra-dedup-")
+        name = getattr(message.file, "name", None) or str(message.file.id)
+        return os.path.join(self._spool_dir, f"{message.id}-{os.path.basename(str(name))}")
+
+    async def _download_hashed(self, message: TLMessage, client: TelegramClient, path: str) -> Optional[str]:
+        """Download *message*'s file to *path*, hashing each chunk as it arrives."""
+        sha256 = hashlib.sha256()
+        stream = client.iter_download(message.media, chunk_size=self.DOWNLOAD_CHUNK_SIZE) if hasattr(client, "iter_download") else None
+        if stream is not None and hasattr(stream, "__aiter__"):
+            with open(path, "wb") as fh:
+                async for chunk in stream:
+                    sha256.update(chunk)
+                    fh.write(chunk)
+        else:
+            # clients without a streaming iterator: download, then hash the file
+            if hasattr(stream, "close"):
+                stream.close()
+            await client.download_media(message.media, file=path)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return None
+            return get_sha256_hash(path)
+        if os.path.getsize(path) == 0:
+            return None
+        return sha256.hexdigest()
+
+    async def file_hashes(self, message: TLMessage, client: TelegramClient, *, keep_file: bool = False) -> Optional[FileHashes]:
+        """Return the hashes of *message*'s file, downloading it only if nothing is cached.
+
+        With *keep_file* the spooled download stays on disk (``entry.path``)
+        until :meth:`release` is called; callers that need the bytes for
+        near-duplicate hashing pass it.
+        """
+        key = file_cache_key(message)
+        if key is None:
+            return None
+        entry = self._file_cache.get(key) or self._lookup_recorded(key)
+        if entry is not None:
+            if not keep_file or entry.path or entry.perceptual_hash or entry.fuzzy_hash:
+                return self._remember(key, entry)
+
+        path = self._spool_path(message)
+        try:
+            self.logger.debug(f"Downloading file from Msg ID {message.id} for hash computation.")
+            sha256_hash = await self._download_hashed(message, client, path)
+        except Exception as e:
+            self.logger.error(f"Failed to download file for hashing (Msg ID: {message.id}): {e}", exc_info=True)
+            self._discard_spool(FileHashes("", path=path))
+            return None
+        if sha256_hash is None:
+            self.logger.warning(f"File for hashing (Msg ID: {message.id}) was not downloaded correctly or is empty.")
+            self._discard_spool(FileHashes("", path=path))
+            return None
+        self.logger.debug(f"Computed SHA256 hash for file in Msg ID {message.id}: {sha256_hash[:10]}...")
+
+        entry = FileHashes(sha256_hash, path=path)
+        if not keep_file:
+            self._discard_spool(entry)
+        return self._remember(key, entry)
+
+    @staticmethod
+    def _discard_spool(entry: FileHashes) -> None:
+        if entry.path:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            entry.path = None
+
+    def release(self, message_group: List[TLMessage]) -> None:
+        """Delete spooled downloads kept for *message_group* (hashes stay cached)."""
+        for message in message_group:
+            key = file_cache_key(message)
+            entry = self._file_cache.get(key) if key is not None else None
+            if entry is not None:
+                self._discard_spool(entry)
+
+    def close(self) -> None:
+        """Remove the spool directory."""
+        if self._spool_dir is not None:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            self._spool_dir = None
+            for entry in self._file_cache.values():
+                entry.path = None
+
+    # Duplicate checks ---------------------------------------------------------
+    async def is_duplicate(self, message_group: List[TLMessage], client: TelegramClient, *, keep_files: bool = False) -> bool:
         """
         Check if any file in a message group is a duplicate based on its content hash.
+
+        *keep_files* leaves the downloads spooled for a follow-up near-duplicate
+        check; call :meth:`release` afterwards.
         """
         if not self.enable_deduplication or not message_group:
             return False
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            for message in message_group:
-                if not message.file:
-                    continue
+        for message in message_group:
+            if not message.file:
+                continue
+
+            entry = await self.file_hashes(message, client, keep_file=keep_files)
+            if entry is None:
+                self.logger.warning(f"Skipping duplicate check for the file in Msg ID {message.id}.")
+                continue
+            sha256_hash = entry.sha256_hash
 
-                file_path = os.path.join(tmpdir, str(message.file.id))
+            if sha256_hash in self.message_hashes:
+                self.logger.info(f"Duplicate file found (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) via in-memory cache.")
+                return True
 
+            if self.db:
                 try:
-                    self.logger.debug(f"Downloading file from Msg ID {message.id} for hash computation.")
-                    await client.download_media(message.media, file=file_path)
+                    result = self.db.conn.execute(
+                        "SELECT 1 FROM file_hashes WHERE sha256_hash = ?",
+                        (sha256_hash,)
+                    ).fetchone()
+
+                    if result:
+                        self.logger.info(f"Duplicate file found (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) via database.")
+                        self.message_hashes.add(sha256_hash)
+                        return True
+                except sqlite3.OperationalError as e:
+                    self.logger.warning(f"Could not check for duplicates in 'file_hashes' table, it might not exist yet. Error: {e}")
                 except Exception as e:
-                    self.logger.error(f"Failed to download file for hashing (Msg ID: {message.id}): {e}", exc_info=True)
-                    continue
-
-                if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-                    self.logger.warning(f"File for hashing (Msg ID: {message.id}) was not downloaded correctly or is empty. Skipping duplicate check for this file.")
-                    continue
-
-                sha256_hash = get_sha256_hash(file_path)
-                self.logger.debug(f"Computed SHA256 hash for file in Msg ID {message.id}: {sha256_hash[:10]}...")
-
-                if sha256_hash in self.message_hashes:
-                    self.logger.info(f"Duplicate file found (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) via in-memory cache.")
-                    return True
-
-                if self.db:
-                    try:
-                        result = self.db.conn.execute(
-                            "SELECT 1 FROM file_hashes WHERE sha256_hash = ?",
-                            (sha256_hash,)
-                        ).fetchone()
-
-                        if result:
-                            self.logger.info(f"Duplicate file found (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) via database.")
-                            self.message_hashes.add(sha256_hash)
-                            return True
-                    except sqlite3.OperationalError as e:
-                        self.logger.warning(f"Could not check for duplicates in 'file_hashes' table, it might not exist yet. Error: {e}")
-                    except Exception as e:
-                        self.logger.error(f"Error checking for duplicate file in DB (hash {sha256_hash[:10]}...): {e}", exc_info=True)
+                    self.logger.error(f"Error checking for duplicate file in DB (hash {sha256_hash[:10]}...): {e}", exc_info=True)
 
         return False
 
+    def reserve(self, message_group: List[TLMessage]) -> Set[str]:
+        """Treat the group's files as forwarded before they are recorded.
+
+        Used while a group waits in a batched forward request, so a later
+        group carrying the same file is caught by :meth:`is_duplicate`.
+        Only hashes already cached by :meth:`is_duplicate` are reserved; the
+        returned set goes back to :meth:`unreserve` if the forward fails.
+        """
+        reserved: Set[str] = set()
+        for message in message_group:
+            key = file_cache_key(message)
+            entry = self._file_cache.get(key) if key is not None else None
+            if entry is not None and entry.sha256_hash not in self.message_hashes:
+                self.message_hashes.add(entry.sha256_hash)
+                reserved.add(entry.sha256_hash)
+        return reserved
+
+    def unreserve(self, hashes: Set[str]) -> None:
+        self.message_hashes.difference_update(hashes)
+
     async def record_forwarded(self, message_group: List[TLMessage], origin_id: int, dest_id: str, client: TelegramClient):
         """
         Record that files in a message group were forwarded by storing their content hashes.
@@ -127,38 +354,41 @@ class Deduplicator:
         if not self.enable_deduplication or not self.db or not message_group:
             return
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            for message in message_group:
-                if not message.file:
-                    continue
+        for message in message_group:
+            if not message.file:
+                continue
 
-                file_path = os.path.join(tmpdir, str(message.file.id))
-                try:
-                    await client.download_media(message.media, file=file_path)
-                except Exception as e:
-                    self.logger.error(f"Failed to download file for recording hash (Msg ID: {message.id}): {e}", exc_info=True)
-                    continue
-
-                if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-                    self.logger.warning(f"File for recording hash (Msg ID: {message.id}) not downloaded correctly or empty. Skipping.")
-                    continue
+            # normally cached by the is_duplicate() check that preceded the forward
+            entry = await self.file_hashes(message, client)
+            if entry is None:
+                self.logger.warning(f"Could not hash the file in Msg ID {message.id}; not recording it.")
+                continue
+            sha256_hash = entry.sha256_hash
+            self.message_hashes.add(sha256_hash)
 
-                sha256_hash = get_sha256_hash(file_path)
-                self.message_hashes.add(sha256_hash)
-
-                try:
-                    self.db.add_file_hash(
-                        file_id=message.file.id,
-                        sha256_hash=sha256_hash,
-                        perceptual_hash=None,
-                        fuzzy_hash=None
-                    )
-                    self.db.add_channel_file_inventory(
-                        channel_id=origin_id,
-                        file_id=message.file.id,
-                        message_id=message.id,
-                        topic_id=getattr(message, 'reply_to_top_id', None)
-                    )
-                    self.logger.info(f"Recorded forwarded file (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) to database.")
-                except Exception as e:
-                    self.logger.error(f"Failed to record forwarded file hash for Msg ID {message.id} to DB: {e}", exc_info=True)
+            try:
+                kwargs = {}
+                access_hash = file_cache_key(message)[1]
+                if access_hash is not None:
+                    kwargs["access_hash"] = access_hash
+                self.db.add_file_hash(
+                    file_id=message.file.id,
+                    sha256_hash=sha256_hash,
+                    perceptual_hash=entry.perceptual_hash,
+                    fuzzy_hash=entry.fuzzy_hash,
+                    **kwargs,
+                )
+                self.db.add_channel_file_inventory(
+                    channel_id=origin_id,
+                    file_id=message.file.id,
+                    message_id=message.id,
+                    topic_id=getattr(message, 'reply_to_top_id', None)
+                )
+                if entry.perceptual_hash and self._phash_index is not None:
+                    self._phash_index.add(message.file.id, entry.perceptual_hash)
+                if entry.fuzzy_hash and self._fuzzy_index is not None:
+                    self._fuzzy_index.add(message.file.id, entry.fuzzy_hash)
+                self.logger.info(f"Recorded forwarded file (Msg ID {message.id}, SHA256: {sha256_hash[:10]}...) to database.")
+            except Exception as e:
+                self.logger.error(f"Failed to record forwarded file hash for Msg ID {message.id} to DB: {e}", exc_info=True)
+        self.release(message_group)
@@ -264,8 +264,7 @@ class EnhancedAttachmentForwarder:
             raise
 
         finally:
-            if client and client.is_connected():
-                await self.client_manager.close()
+            self.client_manager.release(client)
 
         return new_last_message_id, stats
 
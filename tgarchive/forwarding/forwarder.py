@@ -4,10 +4,9 @@ The core forwarding logic.
 from __future__ import annotations
 
 import asyncio
+import inspect
 import logging
-import os
-import tempfile
-from typing import List, Optional, Sequence, Tuple
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple
 
 try:
     from telethon.errors import (
@@ -83,6 +82,11 @@ class AttachmentForwarder:
     Manages forwarding of attachments from an origin to a destination Telegram entity.
     """
 
+    # Telegram accepts at most this many message ids per forward request
+    MAX_FORWARD_BATCH = 100
+    # attempts per batched request before its groups are skipped
+    BATCH_FLOOD_RETRIES = 3
+
     def __init__(
         self,
         config: Config,
@@ -99,12 +103,18 @@ class AttachmentForwarder:
         copy_messages_into_destination: bool = False,
         quote_copied_messages: bool = False,
         include_text_messages: bool = False,
+        forward_batch_size: Optional[int] = None,
+        stream_history: Optional[bool] = None,
+        client_manager: Optional[ClientManager] = None,
     ):
         self.config = config
         self.db = db
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self.client_manager = ClientManager(config)
-        self.deduplicator = deduplicator or Deduplicator(db, enable_deduplication)
+        # pass a shared ClientManager to draw from one pool of connected accounts
+        self.client_manager = client_manager or ClientManager(config)
+        self.deduplicator = deduplicator or Deduplicator(
+            db, enable_deduplication, lsh_options=config.data.get("deduplication", {}).get("minhash_lsh")
+        )
         self.grouper = MessageGrouper(grouping_strategy, grouping_time_window_seconds)
         self.attribution_formatter = AttributionFormatter(self.config.data)
 
@@ -117,6 +127,15 @@ class AttachmentForwarder:
         self.copy_messages_into_destination = copy_messages_into_destination
         self.quote_copied_messages = quote_copied_messages
         self.include_text_messages = include_text_messages or source_topic_id is not None
+        if forward_batch_size is None:
+            forward_batch_size = config.data.get("forwarding", {}).get("forward_batch_size", 1)
+        # ids per forward_messages request; 1 forwards message by message
+        self.forward_batch_size = max(1, min(int(forward_batch_size or 1), self.MAX_FORWARD_BATCH))
+        if stream_history is None:
+            stream_history = config.data.get("forwarding", {}).get("stream_history", False)
+        # walk the origin oldest-first and forward as groups complete instead of
+        # loading the whole history before the first forward
+        self.stream_history = bool(stream_history)
 
     @staticmethod
     def _get_message_text(message) -> str:
@@ -169,67 +188,67 @@ class AttachmentForwarder:
         if not self.deduplicator.enable_deduplication or not message_group:
             return False
 
-        if await self.deduplicator.is_duplicate(message_group, client):
-            return True
+        near_duplicates = bool(self.config.data.get("deduplication", {}).get("enable_near_duplicates"))
+        try:
+            # downloads stay spooled so the near-duplicate pass below reuses them
+            if await self.deduplicator.is_duplicate(message_group, client, keep_files=near_duplicates):
+                return True
+            if not near_duplicates:
+                return False
+            return await self._is_near_duplicate(message_group, client)
+        finally:
+            self.deduplicator.release(message_group)
 
-        if not self.config.data.get("deduplication", {}).get("enable_near_duplicates"):
-            return False
+    async def _is_near_duplicate(self, message_group: List[TLMessage], client: TelegramClient) -> bool:
+        import mimetypes
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            for message in message_group:
-                if not message.file:
-                    continue
+        for message in message_group:
+            if not message.file:
+                continue
 
-                file_path = os.path.join(tmpdir, message.file.name or str(message.file.id))
-                try:
-                    await client.download_media(message.media, file=file_path)
-                except Exception as e:
-                    self.logger.error(f"Failed to download file for hashing (Msg ID: {message.id}): {e}", exc_info=True)
-                    continue
+            entry = await self.deduplicator.file_hashes(message, client, keep_file=True)
+            if entry is None:
+                self.logger.warning(f"Skipping near-duplicate check for the file in Msg ID {message.id}.")
+                continue
 
-                if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-                    self.logger.warning(
-                        f"File for hashing (Msg ID: {message.id}) was not downloaded correctly or is empty. "
-                        "Skipping duplicate check for this file."
-                    )
-                    continue
+            name = entry.path or message.file.name or ""
+            mime_type, _ = mimetypes.guess_type(name)
+            if self.db and IMAGEHASH_AVAILABLE and mime_type and mime_type.startswith("image/"):
+                if entry.perceptual_hash is None and entry.path:
+                    entry.perceptual_hash = get_perceptual_hash(entry.path)
+                perceptual_hash = entry.perceptual_hash
+                if perceptual_hash:
+                    distance_threshold = self.config.data.get("deduplication", {}).get("perceptual_hash_distance_threshold", 5)
+                    try:
+                        match = self.deduplicator.find_similar_image(perceptual_hash, distance_threshold)
+                    except Exception as e:
+                        self.logger.error(f"Error comparing perceptual hashes: {e}")
+                        match = None
+                    if match is not None:
+                        file_id, distance = match
+                        self.logger.info(
+                            f"Near-duplicate image found for Msg ID {message.id} "
+                            f"(pHash distance: {distance} <= {distance_threshold}, matches file_id: {file_id})."
+                        )
+                        return True
+                continue
 
-                if self.db and IMAGEHASH_AVAILABLE:
-                    import mimetypes
-
-                    mime_type, _ = mimetypes.guess_type(file_path)
-                    if mime_type and mime_type.startswith("image/"):
-                        perceptual_hash = get_perceptual_hash(file_path)
-                        if perceptual_hash and hasattr(self.db, "get_all_perceptual_hashes"):
-                            distance_threshold = self.config.data.get("deduplication", {}).get("perceptual_hash_distance_threshold", 5)
-                            for file_id, other_phash_str in self.db.get_all_perceptual_hashes():
-                                try:
-                                    other_phash = imagehash.hex_to_hash(other_phash_str)
-                                    distance = imagehash.hex_to_hash(perceptual_hash) - other_phash
-                                    if distance <= distance_threshold:
-                                        self.logger.info(
-                                            f"Near-duplicate image found for Msg ID {message.id} "
-                                            f"(pHash distance: {distance} <= {distance_threshold}, matches file_id: {file_id})."
-                                        )
-                                        return True
-                                except Exception as e:
-                                    self.logger.error(f"Error comparing perceptual hashes: {e}")
-                        continue
-
-                fuzzy_hash = get_fuzzy_hash(file_path)
-                if fuzzy_hash and self.db and hasattr(self.db, "get_all_fuzzy_hashes"):
-                    similarity_threshold = self.config.data.get("deduplication", {}).get("fuzzy_hash_similarity_threshold", 90)
-                    for file_id, other_fhash in self.db.get_all_fuzzy_hashes():
-                        try:
-                            similarity = compare_fuzzy_hashes(fuzzy_hash, other_fhash)
-                            if similarity >= similarity_threshold:
-                                self.logger.info(
-                                    f"Near-duplicate file found for Msg ID {message.id} "
-                                    f"(fuzzy hash similarity: {similarity}% >= {similarity_threshold}%, matches file_id: {file_id})."
-                                )
-                                return True
-                        except Exception as e:
-                            self.logger.error(f"Error comparing fuzzy hashes: {e}")
+            if entry.fuzzy_hash is None and entry.path:
+                entry.fuzzy_hash = get_fuzzy_hash(entry.path)
+            fuzzy_hash = entry.fuzzy_hash
+            if fuzzy_hash and self.db:
+                similarity_threshold = self.config.data.get("deduplication", {}).get("fuzzy_hash_similarity_threshold", 90)
+                for file_id, other_fhash in self.deduplicator.fuzzy_candidates(fuzzy_hash):
+                    try:
+                        similarity = compare_fuzzy_hashes(fuzzy_hash, other_fhash)
+                        if similarity >= similarity_threshold:
+                            self.logger.info(
+                                f"Near-duplicate file found for Msg ID {message.id} "
+                                f"(fuzzy hash similarity: {similarity}% >= {similarity_threshold}%, matches file_id: {file_id})."
+                            )
+                            return True
+                    except Exception as e:
+                        self.logger.error(f"Error comparing fuzzy hashes: {e}")
 
         return False
 
@@ -305,11 +324,23 @@ class AttachmentForwarder:
         destination_id: int | str,
         account_identifier: Optional[str] = None,
         start_message_id: Optional[int] = None,
+        checkpoint: Optional[Callable[[int], Any]] = None,
+        end_message_id: Optional[int] = None,
     ) -> Tuple[Optional[int], dict]:
+        """
+        Forward every forwardable message of *origin_id* newer than *start_message_id*
+        and, if *end_message_id* is given, no newer than that.
+
+        Returns the id of the last forwarded group and the run's stats.
+        *checkpoint*, if given, is called (and awaited if it returns an
+        awaitable) with that id each time it advances, so a long run can be
+        resumed from where it stopped.
+        """
         stats = {
             "messages_forwarded": 0,
             "files_forwarded": 0,
             "bytes_forwarded": 0,
+            "forward_requests": 0,
         }
         new_last_message_id = None
         client = None
@@ -325,38 +356,75 @@ class AttachmentForwarder:
             if not origin_entity or not destination_entity:
                 raise ValueError("Could not resolve one or both Telegram entities.")
 
-            scope = "source topic" if self.source_topic_id is not None else "origin"
-            self.logger.info(
-                "Fetching forwardable messages from %s: %s before grouping and forwarding.",
-                scope,
-                self.source_topic_id if self.source_topic_id is not None else origin_id,
-            )
-            forwardable_messages = []
-            async for msg in client.iter_messages(origin_entity, min_id=start_message_id or 0):
-                if self._message_is_forwardable(msg):
-                    forwardable_messages.append(msg)
-            forwardable_messages.reverse()
-            self.logger.info(
-                "Fetched %s forwardable messages from %s%s.",
-                len(forwardable_messages),
-                origin_id,
-                f" (source topic {self.source_topic_id})" if self.source_topic_id is not None else "",
-            )
-
-            message_groups = self.grouper.group_messages(forwardable_messages)
-            self.logger.info(f"Processing {len(message_groups)} message group(s) after applying '{self.grouper.grouping_strategy}' strategy.")
+            if self.stream_history:
+                self.logger.info(
+                    f"Streaming forwardable messages from {origin_id} oldest first"
+                    f" with '{self.grouper.grouping_strategy}' grouping."
+                )
+                message_groups = self.grouper.stream_groups(
+                    self._iter_forwardable_messages(client, origin_entity, start_message_id, end_message_id)
+                )
+                group_count = None
+            else:
+                scope = "source topic" if self.source_topic_id is not None else "origin"
+                self.logger.info(
+                    "Fetching forwardable messages from %s: %s before grouping and forwarding.",
+                    scope,
+                    self.source_topic_id if self.source_topic_id is not None else origin_id,
+                )
+                forwardable_messages = []
+                async for msg in client.iter_messages(origin_entity, **self._id_bounds(start_message_id, end_message_id)):
+                    if self._message_is_forwardable(msg):
+                        forwardable_messages.append(msg)
+                forwardable_messages.reverse()
+                self.logger.info(
+                    "Fetched %s forwardable messages from %s%s.",
+                    len(forwardable_messages),
+                    origin_id,
+                    f" (source topic {self.source_topic_id})" if self.source_topic_id is not None else "",
+                )
 
-            for group_idx, message_group in enumerate(message_groups):
+                grouped = self.grouper.group_messages(forwardable_messages)
+                self.logger.info(f"Processing {len(grouped)} message group(s) after applying '{self.grouper.grouping_strategy}' strategy.")
+                message_groups = self._iter_groups(grouped)
+                group_count = len(grouped)
+
+            # plain forwards are packed into multi-id requests; copies and
+            # attributed sends are one send_message per message either way
+            batching = (
+                self.forward_batch_size > 1
+                and not self.copy_messages_into_destination
+                and not self.forward_with_attribution
+            )
+            pending: List[Tuple[List[TLMessage], set]] = []
+            pending_size = 0
+            checkpointed_id = new_last_message_id
+            group_idx = -1
+            async for message_group in message_groups:
+                group_idx += 1
+                if new_last_message_id != checkpointed_id:
+                    checkpointed_id = new_last_message_id
+                    await self._checkpoint(checkpoint, checkpointed_id)
                 if not message_group:
                     self.logger.warning(f"Skipping empty message group at index {group_idx}.")
                     continue
                 representative_message = message_group[0]
                 message = representative_message
-                self.logger.debug(f"Processing Group {group_idx + 1}/{len(message_groups)}, Representative Msg ID: {message.id} from {origin_id}. Items in group: {len(message_group)}")
+                self.logger.debug(f"Processing Group {group_idx + 1}/{group_count or '?'}, Representative Msg ID: {message.id} from {origin_id}. Items in group: {len(message_group)}")
 
-                if await self.deduplicator.is_duplicate(message_group, client):
+                # exact hashes, plus near duplicates when deduplication.enable_near_duplicates is set;
+                # runs before the group can join a pending batch, so both paths share it
+                if await self._is_duplicate(message_group, client):
                     self.logger.info(f"Message group starting with ID: {representative_message.id} (from {origin_id}) contains a duplicate file. Skipping forwarding of the entire group.")
                     continue
+                if batching:
+                    if pending and pending_size + len(message_group) > self.forward_batch_size:
+                        last_id = await self._forward_batch(pending, client, origin_entity, destination_entity, stats)
+                        new_last_message_id = last_id or new_last_message_id
+                        pending, pending_size = [], 0
+                    pending.append((message_group, self.deduplicator.reserve(message_group)))
+                    pending_size += len(message_group)
+                    continue
                 self.logger.info(f"Group (representative Msg ID: {message.id}) has media. Attempting to forward to {destination_id}.")
                 successfully_forwarded_main = False
                 main_reply_to_arg = self.destination_topic_id
@@ -416,6 +484,7 @@ class AttachmentForwarder:
                                 from_peer=origin_entity,
                                 reply_to=main_reply_to_arg,
                             )
+                            stats["forward_requests"] += 1
                             log_msg = f"Successfully forwarded Message ID: {current_message_in_group.id} from '{origin_id}' to main destination '{destination_id}'"
                             if main_reply_to_arg:
                                 log_msg += f" (Topic/ReplyTo: {main_reply_to_arg})"
@@ -423,13 +492,7 @@ class AttachmentForwarder:
                         if len(message_group) > 1 and msg_in_group_idx < len(message_group) - 1:
                             await asyncio.sleep(1)
                     successfully_forwarded_main = True
-                    stats["messages_forwarded"] += len(message_group)
-                    stats["files_forwarded"] += sum(1 for grouped_message in message_group if getattr(grouped_message, "file", None))
-                    stats["bytes_forwarded"] += sum(
-                        getattr(grouped_message.file, "size", 0)
-                        for grouped_message in message_group
-                        if getattr(grouped_message, "file", None)
-                    )
+                    self._count_forwarded(stats, message_group)
                     new_last_message_id = message.id
                 except FloodWaitError as e_flood:
                     self.logger.warning(f"Rate limit hit (main destination) while processing group (representative Msg ID: {message.id}). Waiting for {e_flood.seconds} seconds.")
@@ -446,103 +509,12 @@ class AttachmentForwarder:
                     self.logger.exception(f"Unexpected error forwarding Message Group (representative Msg ID: {message.id}) to main destination: {e_fwd}")
                     continue
                 if successfully_forwarded_main:
-                    await self.deduplicator.record_forwarded(message_group, origin_entity.id, str(destination_entity.id), client)
-                    if self.secondary_unique_destination:
-                        self.logger.info(f"Attempting to forward unique Message Group (representative Msg ID: {message.id}) to secondary destination: {self.secondary_unique_destination}")
-                        try:
-                            secondary_dest_entity = await client.get_entity(self.secondary_unique_destination)
-                            for msg_s_idx, msg_in_group_secondary in enumerate(message_group):
-                                if self.copy_messages_into_destination:
-                                    message_text = await self._build_copy_text(
-                                        msg_in_group_secondary,
-                                        origin_entity,
-                                        secondary_dest_entity,
-                                        msg_s_idx,
-                                        len(message_group),
-                                    )
-                                    if not message_text and not msg_in_group_secondary.media:
-                                        self.logger.info(
-                                            f"Skipping copied secondary message {msg_in_group_secondary.id} because it contains no forwardable content."
-                                        )
-                                        continue
-                                    await client.send_message(
-                                        entity=secondary_dest_entity,
-                                        message=message_text,
-                                        file=msg_in_group_secondary.media,
-                                    )
-                                    copy_log = f"  Copied item {msg_s_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_secondary.id}) to secondary dest '{self.secondary_unique_destination}'."
-                                    self.logger.info(copy_log)
-                                else:
-                                    await client.forward_messages(
-                                        entity=secondary_dest_entity,
-                                        messages=[msg_in_group_secondary.id],
-                                        from_peer=origin_entity,
-                                    )
-                                    self.logger.info(f"  Forwarded item {msg_s_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_secondary.id}) of group to secondary_dest '{self.secondary_unique_destination}'.")
-                                if len(message_group) > 1 and msg_s_idx < len(message_group) - 1:
-                                    await asyncio.sleep(1)
-                        except FloodWaitError as e_flood_sec:
-                            self.logger.warning(f"Rate limit hit (secondary destination: {self.secondary_unique_destination}). Waiting for {e_flood_sec.seconds} seconds.")
-                            await asyncio.sleep(e_flood_sec.seconds + 1)
-                            self.logger.info(f"Skipping secondary forward for Message Group (representative Msg ID: {message.id}) due to FloodWait.")
-                        except Exception as e_sec_fwd:
-                            self.logger.error(f"Error forwarding unique Message Group (representative Msg ID: {message.id}) to secondary destination '{self.secondary_unique_destination}': {e_sec_fwd}", exc_info=True)
-                    if self.forward_to_all_saved_messages:
-                        self.logger.info(f"Forwarding Message Group (representative Msg ID: {message.id}) to 'Saved Messages' of all configured accounts.")
-                        original_main_account_id = client.session.filename
-                        for acc_config in self.config.accounts:
-                            saved_messages_account_id = acc_config.get("session_name") or acc_config.get("phone_number")
-                            if not saved_messages_account_id:
-                                self.logger.warning("Skipping an account for 'Saved Messages' forwarding due to missing identifier.")
-                                continue
-                            self.logger.info(f"Attempting to forward Message Group (representative Msg ID: {message.id}) to 'Saved Messages' for account: {saved_messages_account_id}")
-                            try:
-                                if self.client_manager._client and self.client_manager._client.session.filename != str(Config().path.parent / saved_messages_account_id):
-                                    await self.client_manager.close()
-                                target_client = await self.client_manager.get_client(saved_messages_account_id)
-                                for msg_sv_idx, msg_in_group_saved in enumerate(message_group):
-                                    if self.copy_messages_into_destination:
-                                        message_text = await self._build_copy_text(
-                                            msg_in_group_saved,
-                                            origin_entity,
-                                            destination_entity,
-                                            msg_sv_idx,
-                                            len(message_group),
-                                        )
-                                        if not message_text and not msg_in_group_saved.media:
-                                            self.logger.info(
-                                                f"Skipping copied Saved Messages item {msg_in_group_saved.id} because it contains no forwardable content."
-                                            )
-                                            continue
-                                        await target_client.send_message(
-                                            entity='me',
-                                            message=message_text,
-                                            file=msg_in_group_saved.media,
-                                        )
-                                        self.logger.info(
-                                            f"  Copied item {msg_sv_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_saved.id}) of group to Saved Messages for {saved_messages_account_id}."
-                                        )
-                                    else:
-                                        await target_client.forward_messages(
-                                            entity='me',
-                                            messages=[msg_in_group_saved.id],
-                                            from_peer=origin_entity,
-                                        )
-                                        self.logger.info(f"  Forwarded item {msg_sv_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_saved.id}) of group to Saved Messages for {saved_messages_account_id}.")
-                                    if len(message_group) > 1 and msg_sv_idx < len(message_group) - 1:
-                                        await asyncio.sleep(1)
-                                await asyncio.sleep(1)
-                            except FloodWaitError as e_flood_saved:
-                                self.logger.warning(f"Rate limit hit (Saved Messages for {saved_messages_account_id}). Waiting for {e_flood_saved.seconds} seconds.")
-                                await asyncio.sleep(e_flood_saved.seconds + 1)
-                            except (UserDeactivatedError, AuthKeyError) as e_auth_saved:
-                                self.logger.error(f"Auth error for account {saved_messages_account_id} when forwarding to Saved Messages: {e_auth_saved}. Skipping this account.")
-                            except RPCError as e_rpc_saved:
-                                self.logger.error(f"RPCError for account {saved_messages_account_id} when forwarding to Saved Messages: {e_rpc_saved}. Skipping this account.")
-                            except Exception as e_saved:
-                                self.logger.exception(f"Unexpected error for account {saved_messages_account_id} when forwarding to Saved Messages: {e_saved}. Skipping this account.")
-                        if self.client_manager._client and self.client_manager._client.session.filename != original_main_account_id:
-                            await self.client_manager.close()
+                    await self._after_group_forwarded(message_group, client, origin_entity, destination_entity)
+            if pending:
+                last_id = await self._forward_batch(pending, client, origin_entity, destination_entity, stats)
+                new_last_message_id = last_id or new_last_message_id
+            if new_last_message_id != checkpointed_id:
+                await self._checkpoint(checkpoint, new_last_message_id)
             self.logger.info(f"Finished processing all message groups from {origin_id}.")
         except ValueError as e:
             self.logger.error(f"Configuration or resolution error: {e}")
@@ -563,10 +535,219 @@ class AttachmentForwarder:
             self.logger.exception(f"An unexpected error occurred during forwarding: {e}")
             raise
         finally:
-            if client and client.is_connected():
-                await self.client_manager.close()
+            self.client_manager.release(client)
         return new_last_message_id, stats
 
+    @staticmethod
+    def _id_bounds(start_message_id: Optional[int], end_message_id: Optional[int]) -> dict:
+        # iter_messages excludes both bounds; the end id itself is wanted
+        bounds = {"min_id": start_message_id or 0}
+        if end_message_id is not None:
+            bounds["max_id"] = end_message_id + 1
+        return bounds
+
+    async def _iter_forwardable_messages(
+        self, client, origin_entity, start_message_id: Optional[int], end_message_id: Optional[int] = None
+    ) -> AsyncIterator[TLMessage]:
+        async for msg in client.iter_messages(origin_entity, reverse=True, **self._id_bounds(start_message_id, end_message_id)):
+            if self._message_is_forwardable(msg):
+                yield msg
+
+    @staticmethod
+    async def _iter_groups(message_groups: List[List[TLMessage]]) -> AsyncIterator[List[TLMessage]]:
+        for message_group in message_groups:
+            yield message_group
+
+    async def _checkpoint(self, checkpoint: Optional[Callable[[int], Any]], message_id: int) -> None:
+        if checkpoint is None:
+            return
+        try:
+            result = checkpoint(message_id)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e_checkpoint:
+            self.logger.error(f"Failed to checkpoint forwarding progress at Msg ID {message_id}: {e_checkpoint}", exc_info=True)
+
+    @staticmethod
+    def _count_forwarded(stats: dict, message_group) -> None:
+        stats["messages_forwarded"] += len(message_group)
+        stats["files_forwarded"] += sum(1 for grouped_message in message_group if getattr(grouped_message, "file", None))
+        stats["bytes_forwarded"] += sum(
+            getattr(grouped_message.file, "size", 0)
+            for grouped_message in message_group
+            if getattr(grouped_message, "file", None)
+        )
+
+    async def _forward_batch(self, batch, client, origin_entity, destination_entity, stats: dict) -> Optional[int]:
+        """Forward the queued groups with as few ``forward_messages`` requests as possible.
+
+        *batch* holds ``(message_group, reserved_hashes)`` pairs in message
+        order.  Ids go out in chunks of :attr:`forward_batch_size` (a chunk
+        only splits a group when the group alone is larger).  Telethon returns
+        one result per id, ``None`` where a message was not forwarded; a group
+        counts as forwarded only if every one of its messages arrived.
+        Returns the representative id of the last forwarded group.
+        """
+        ids = [grouped_message.id for message_group, _ in batch for grouped_message in message_group]
+        delivered: List[bool] = []
+        for start in range(0, len(ids), self.forward_batch_size):
+            chunk = ids[start:start + self.forward_batch_size]
+            if start:
+                await asyncio.sleep(1)
+            result, sent = None, False
+            for attempt in range(1, self.BATCH_FLOOD_RETRIES + 1):
+                try:
+                    stats["forward_requests"] += 1
+                    result = await client.forward_messages(
+                        entity=destination_entity,
+                        messages=chunk,
+                        from_peer=origin_entity,
+                        reply_to=self.destination_topic_id,
+                    )
+                    sent = True
+                    break
+                except FloodWaitError as e_flood:
+                    self.logger.warning(
+                        f"Rate limit hit (main destination) forwarding {len(chunk)} messages starting at Msg ID {chunk[0]}"
+                        f" (attempt {attempt}/{self.BATCH_FLOOD_RETRIES}). Waiting for {e_flood.seconds} seconds."
+                    )
+                    await asyncio.sleep(e_flood.seconds + 1)
+                except (ChannelPrivateError, ChatAdminRequiredError, UserBannedInChannelError) as e_perm:
+                    self.logger.error(f"Permission error forwarding messages {chunk[0]}-{chunk[-1]} to main destination: {e_perm}")
+                    break
+                except RPCError as rpc_error:
+                    self.logger.error(f"RPCError forwarding messages {chunk[0]}-{chunk[-1]} to main destination: {rpc_error}")
+                    break
+                except Exception as e_fwd:
+                    self.logger.exception(f"Unexpected error forwarding messages {chunk[0]}-{chunk[-1]} to main destination: {e_fwd}")
+                    break
+            if not sent:
+                self.logger.info(f"Skipping messages {chunk[0]}-{chunk[-1]} for main destination.")
+                delivered.extend([False] * len(chunk))
+            elif isinstance(result, (list, tuple)) and len(result) == len(chunk):
+                delivered.extend(item is not None for item in result)
+            else:
+                # no per-id results to go by: the request succeeded as a whole
+                delivered.extend([True] * len(chunk))
+
+        last_forwarded_id = None
+        offset = 0
+        for message_group, reserved in batch:
+            arrived = delivered[offset:offset + len(message_group)]
+            offset += len(message_group)
+            if not all(arrived):
+                self.deduplicator.unreserve(reserved)
+                missing = [m.id for m, ok in zip(message_group, arrived) if not ok]
+                self.logger.warning(f"Message Group (representative Msg ID: {message_group[0].id}) was not fully forwarded; missing Msg IDs: {missing}.")
+                continue
+            self._count_forwarded(stats, message_group)
+            last_forwarded_id = message_group[0].id
+            self.logger.info(
+                f"Successfully forwarded Message Group (representative Msg ID: {message_group[0].id}, {len(message_group)} item(s))"
+                f" to main destination in a batched request."
+            )
+            await self._after_group_forwarded(message_group, client, origin_entity, destination_entity)
+        return last_forwarded_id
+
+    async def _after_group_forwarded(self, message_group, client, origin_entity, destination_entity) -> None:
+        """Record a forwarded group, then send it to the secondary destination and Saved Messages."""
+        message = message_group[0]
+        await self.deduplicator.record_forwarded(message_group, origin_entity.id, str(destination_entity.id), client)
+        if self.secondary_unique_destination:
+            self.logger.info(f"Attempting to forward unique Message Group (representative Msg ID: {message.id}) to secondary destination: {self.secondary_unique_destination}")
+            try:
+                secondary_dest_entity = await client.get_entity(self.secondary_unique_destination)
+                for msg_s_idx, msg_in_group_secondary in enumerate(message_group):
+                    if self.copy_messages_into_destination:
+                        message_text = await self._build_copy_text(
+                            msg_in_group_secondary,
+                            origin_entity,
+                            secondary_dest_entity,
+                            msg_s_idx,
+                            len(message_group),
+                        )
+                        if not message_text and not msg_in_group_secondary.media:
+                            self.logger.info(
+                                f"Skipping copied secondary message {msg_in_group_secondary.id} because it contains no forwardable content."
+                            )
+                            continue
+                        await client.send_message(
+                            entity=secondary_dest_entity,
+                            message=message_text,
+                            file=msg_in_group_secondary.media,
+                        )
+                        copy_log = f"  Copied item {msg_s_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_secondary.id}) to secondary dest '{self.secondary_unique_destination}'."
+                        self.logger.info(copy_log)
+                    else:
+                        await client.forward_messages(
+                            entity=secondary_dest_entity,
+                            messages=[msg_in_group_secondary.id],
+                            from_peer=origin_entity,
+                        )
+                        self.logger.info(f"  Forwarded item {msg_s_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_secondary.id}) of group to secondary_dest '{self.secondary_unique_destination}'.")
+                    if len(message_group) > 1 and msg_s_idx < len(message_group) - 1:
+                        await asyncio.sleep(1)
+            except FloodWaitError as e_flood_sec:
+                self.logger.warning(f"Rate limit hit (secondary destination: {self.secondary_unique_destination}). Waiting for {e_flood_sec.seconds} seconds.")
+                await asyncio.sleep(e_flood_sec.seconds + 1)
+                self.logger.info(f"Skipping secondary forward for Message Group (representative Msg ID: {message.id}) due to FloodWait.")
+            except Exception as e_sec_fwd:
+                self.logger.error(f"Error forwarding unique Message Group (representative Msg ID: {message.id}) to secondary destination '{self.secondary_unique_destination}': {e_sec_fwd}", exc_info=True)
+        if self.forward_to_all_saved_messages:
+            self.logger.info(f"Forwarding Message Group (representative Msg ID: {message.id}) to 'Saved Messages' of all configured accounts.")
+            for acc_config in self.config.accounts:
+                saved_messages_account_id = acc_config.get("session_name") or acc_config.get("phone_number")
+                if not saved_messages_account_id:
+                    self.logger.warning("Skipping an account for 'Saved Messages' forwarding due to missing identifier.")
+                    continue
+                self.logger.info(f"Attempting to forward Message Group (representative Msg ID: {message.id}) to 'Saved Messages' for account: {saved_messages_account_id}")
+                target_client = None
+                try:
+                    target_client = await self.client_manager.get_client(saved_messages_account_id)
+                    for msg_sv_idx, msg_in_group_saved in enumerate(message_group):
+                        if self.copy_messages_into_destination:
+                            message_text = await self._build_copy_text(
+                                msg_in_group_saved,
+                                origin_entity,
+                                destination_entity,
+                                msg_sv_idx,
+                                len(message_group),
+                            )
+                            if not message_text and not msg_in_group_saved.media:
+                                self.logger.info(
+                                    f"Skipping copied Saved Messages item {msg_in_group_saved.id} because it contains no forwardable content."
+                                )
+                                continue
+                            await target_client.send_message(
+                                entity='me',
+                                message=message_text,
+                                file=msg_in_group_saved.media,
+                            )
+                            self.logger.info(
+                                f"  Copied item {msg_sv_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_saved.id}) of group to Saved Messages for {saved_messages_account_id}."
+                            )
+                        else:
+                            await target_client.forward_messages(
+                                entity='me',
+                                messages=[msg_in_group_saved.id],
+                                from_peer=origin_entity,
+                            )
+                            self.logger.info(f"  Forwarded item {msg_sv_idx+1}/{len(message_group)} (Msg ID: {msg_in_group_saved.id}) of group to Saved Messages for {saved_messages_account_id}.")
+                        if len(message_group) > 1 and msg_sv_idx < len(message_group) - 1:
+                            await asyncio.sleep(1)
+                    await asyncio.sleep(1)
+                except FloodWaitError as e_flood_saved:
+                    self.logger.warning(f"Rate limit hit (Saved Messages for {saved_messages_account_id}). Waiting for {e_flood_saved.seconds} seconds.")
+                    await asyncio.sleep(e_flood_saved.seconds + 1)
+                except (UserDeactivatedError, AuthKeyError) as e_auth_saved:
+                    self.logger.error(f"Auth error for account {saved_messages_account_id} when forwarding to Saved Messages: {e_auth_saved}. Skipping this account.")
+                except RPCError as e_rpc_saved:
+                    self.logger.error(f"RPCError for account {saved_messages_account_id} when forwarding to Saved Messages: {e_rpc_saved}. Skipping this account.")
+                except Exception as e_saved:
+                    self.logger.exception(f"Unexpected error for account {saved_messages_account_id} when forwarding to Saved Messages: {e_saved}. Skipping this account.")
+                finally:
+                    self.client_manager.release(target_client)
+
     async def forward_all_accessible_channels(
         self,
         destination_id: int | str,
@@ -617,30 +798,41 @@ class AttachmentForwarder:
             "bytes_forwarded": 0,
         }
 
+        # channels of different accounts are forwarded concurrently over the
+        # client pool; each account works through its own channels in order
+        channels_by_account: dict = {}
         for channel_id, accessing_account_phone in unique_channels_with_accounts:
             account_for_channel = orchestration_account_identifier or accessing_account_phone
-            self.logger.info(
-                f"--- Forwarding channel {channel_id} using account: {account_for_channel} (discovered via {accessing_account_phone}) ---"
-            )
-            try:
-                _, stats = await self.forward_messages(
-                    origin_id=channel_id,
-                    destination_id=destination_id,
-                    account_identifier=account_for_channel,
-                )
-                aggregate_stats["channels_processed"] += 1
-                aggregate_stats["messages_forwarded"] += stats.get("messages_forwarded", 0)
-                aggregate_stats["files_forwarded"] += stats.get("files_forwarded", 0)
-                aggregate_stats["bytes_forwarded"] += stats.get("bytes_forwarded", 0)
+            channels_by_account.setdefault(account_for_channel, []).append((channel_id, accessing_account_phone))
+
+        async def forward_account_channels(account_for_channel, channels) -> None:
+            for channel_id, accessing_account_phone in channels:
                 self.logger.info(
-                    f"Completed channel {channel_id}: {stats.get('messages_forwarded', 0)} message group(s) forwarded."
-                )
-            except Exception as e_fwd_all:
-                self.logger.error(
-                    f"Failed to forward channel {channel_id} with account {account_for_channel}: {e_fwd_all}",
-                    exc_info=True,
+                    f"--- Forwarding channel {channel_id} using account: {account_for_channel} (discovered via {accessing_account_phone}) ---"
                 )
-                continue
+                try:
+                    _, stats = await self.forward_messages(
+                        origin_id=channel_id,
+                        destination_id=destination_id,
+                        account_identifier=account_for_channel,
+                    )
+                    aggregate_stats["channels_processed"] += 1
+                    aggregate_stats["messages_forwarded"] += stats.get("messages_forwarded", 0)
+                    aggregate_stats["files_forwarded"] += stats.get("files_forwarded", 0)
+                    aggregate_stats["bytes_forwarded"] += stats.get("bytes_forwarded", 0)
+                    self.logger.info(
+                        f"Completed channel {channel_id}: {stats.get('messages_forwarded', 0)} message group(s) forwarded."
+                    )
+                except Exception as e_fwd_all:
+                    self.logger.error(
+                        f"Failed to forward channel {channel_id} with account {account_for_channel}: {e_fwd_all}",
+                        exc_info=True,
+                    )
+                    continue
+
+        await asyncio.gather(
+            *(forward_account_channels(account, channels) for account, channels in channels_by_account.items())
+        )
 
         self.logger.info(
             "Total forward mode finished."
@@ -682,7 +874,7 @@ class AttachmentForwarder:
             "bytes_forwarded": 0,
         }
 
-        for account_identifier in accounts:
+        async def sweep_account(account_identifier: str) -> None:
             self.logger.info(f"Starting dialog sweep forwarding using account: {account_identifier}")
             try:
                 _, stats = await self._forward_dialogs_for_account(
@@ -702,6 +894,9 @@ class AttachmentForwarder:
                     exc_info=True,
                 )
 
+        # every account sweeps its own dialogs concurrently over the client pool
+        await asyncio.gather(*(sweep_account(account_identifier) for account_identifier in dict.fromkeys(accounts)))
+
         self.logger.info(
             "Dialog sweep forwarding finished.",
             f" Accounts processed: {aggregate_stats['accounts_processed']},",
@@ -785,11 +980,10 @@ class AttachmentForwarder:
                     continue
 
         finally:
-            if client and client.is_connected():
-                await self.client_manager.close()
+            self.client_manager.release(client)
 
         return account_identifier, stats
 
     async def close(self):
-        """Close the underlying client manager connection."""
+        """Disconnect every client in the underlying client pool."""
         await self.client_manager.close()
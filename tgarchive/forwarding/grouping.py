@@ -5,8 +5,9 @@ from __future__ import annotations
 
 import logging
 import re
+from collections import OrderedDict
 from datetime import timedelta
-from typing import List, Tuple, Optional
+from typing import AsyncIterable, AsyncIterator, List, Tuple, Optional
 
 try:
     from telethon.tl.types import Message as TLMessage
@@ -61,6 +62,114 @@ class MessageGrouper:
         self.logger.warning(f"Unknown grouping strategy '{self.grouping_strategy}'. Defaulting to 'none'.")
         return [[msg] for msg in messages]
 
+    async def stream_groups(
+        self,
+        messages: AsyncIterable[TLMessage],
+        max_buffered_messages: int = 1000,
+    ) -> AsyncIterator[List[TLMessage]]:
+        """
+        Group *messages* (oldest first) incrementally, yielding each group once it is complete.
+
+        Groups come out in the order :meth:`group_messages` would return them
+        for the same input, but only open groups are held in memory:
+
+        - ``none`` yields every message as it arrives.
+        - ``time`` holds the current run of messages from one sender.
+        - ``filename`` holds every group that may still gain parts.  A group
+          stops accepting parts once ``grouping_time_window_seconds`` pass
+          without a new one, and the oldest open group is closed early when
+          more than *max_buffered_messages* messages are waiting.  Parts
+          posted further apart than that are forwarded as separate groups.
+        """
+        if self.grouping_strategy == "time":
+            window = timedelta(seconds=self.grouping_time_window_seconds)
+            current_group: List[TLMessage] = []
+            async for msg in messages:
+                if current_group:
+                    prev_msg = current_group[-1]
+                    if msg.sender_id == prev_msg.sender_id and msg.date - prev_msg.date <= window:
+                        current_group.append(msg)
+                        continue
+                    yield current_group
+                current_group = [msg]
+            if current_group:
+                yield current_group
+        elif self.grouping_strategy == "filename":
+            async for group in self._stream_by_filename(messages, max_buffered_messages):
+                yield group
+        else:
+            async for msg in messages:
+                yield [msg]
+
+    async def _stream_by_filename(self, messages: AsyncIterable[TLMessage], max_buffered_messages: int) -> AsyncIterator[List[TLMessage]]:
+        window = timedelta(seconds=self.grouping_time_window_seconds)
+        # open and finished groups keyed by their first message id, oldest first;
+        # a finished group waits here until every group that started before it is done
+        buffered: "OrderedDict[int, dict]" = OrderedDict()
+        open_by_key: dict = {}
+        buffered_messages = 0
+
+        def close(entry: dict) -> None:
+            entry["done"] = True
+            if open_by_key.get(entry["key"]) is entry:
+                del open_by_key[entry["key"]]
+
+        def drain(last_date) -> List[List[TLMessage]]:
+            nonlocal buffered_messages
+            ready = []
+            while buffered:
+                entry = next(iter(buffered.values()))
+                if not entry["done"]:
+                    stale = last_date is not None and last_date - entry["messages"][-1].date > window
+                    if not stale and buffered_messages <= max_buffered_messages:
+                        break
+                    close(entry)
+                buffered.popitem(last=False)
+                buffered_messages -= len(entry["messages"])
+                ready.append(self._order_filename_group(entry["messages"]))
+            return ready
+
+        async for msg in messages:
+            key = self._filename_group_key(msg)
+            entry = open_by_key.get(key) if key is not None else None
+            if entry is not None and msg.date - entry["messages"][-1].date > window:
+                close(entry)
+                entry = None
+            if entry is not None:
+                entry["messages"].append(msg)
+            else:
+                entry = {"key": key, "messages": [msg], "done": key is None}
+                buffered[msg.id] = entry
+                if key is not None:
+                    open_by_key[key] = entry
+            buffered_messages += 1
+            for group in drain(msg.date):
+                yield group
+
+        for entry in buffered.values():
+            entry["done"] = True
+        for group in drain(None):
+            yield group
+
+    def _filename_group_key(self, msg: TLMessage) -> Optional[Tuple[int, str, str]]:
+        filename = getattr(msg.file, 'name', None)
+        if not msg.sender_id or not filename:
+            return None
+        parsed_info = self._parse_filename_for_grouping(filename)
+        if not parsed_info or not parsed_info[0] or not parsed_info[3]:
+            return None
+        base_name, _, _, extension = parsed_info
+        return msg.sender_id, base_name.lower(), extension.lower()
+
+    def _order_filename_group(self, group_msgs_list: List[TLMessage]) -> List[TLMessage]:
+        if len(group_msgs_list) > 1:
+            group_msgs_list.sort(key=lambda m: (
+                self._parse_filename_for_grouping(getattr(m.file, 'name', ''))[2]
+                    if self._parse_filename_for_grouping(getattr(m.file, 'name', '')) else 0,
+                m.id
+            ))
+        return group_msgs_list
+
     def _group_by_time(self, messages: List[TLMessage]) -> List[List[TLMessage]]:
         if not messages: return []
         groups: List[List[TLMessage]] = []
@@ -84,28 +193,17 @@ class MessageGrouper:
         candidate_keyed_groups: dict[Tuple[int, str, str], list[TLMessage]] = {}
         lone_messages: list[TLMessage] = []
         for msg in messages:
-            filename = getattr(msg.file, 'name', None)
-            if not msg.sender_id or not filename :
-                lone_messages.append(msg)
-                continue
-            parsed_info = self._parse_filename_for_grouping(filename)
-            if not parsed_info or not parsed_info[0] or not parsed_info[3]:
+            key = self._filename_group_key(msg)
+            if key is None:
                 lone_messages.append(msg)
                 continue
-            base_name, _, _, extension = parsed_info
-            key = (msg.sender_id, base_name.lower(), extension.lower())
             if key not in candidate_keyed_groups:
                 candidate_keyed_groups[key] = []
             candidate_keyed_groups[key].append(msg)
         final_groups: List[List[TLMessage]] = []
         for key_tuple, group_msgs_list in candidate_keyed_groups.items():
             if len(group_msgs_list) > 1:
-                group_msgs_list.sort(key=lambda m: (
-                    self._parse_filename_for_grouping(getattr(m.file, 'name', ''))[2]
-                        if self._parse_filename_for_grouping(getattr(m.file, 'name', '')) else 0,
-                    m.id
-                ))
-                final_groups.append(group_msgs_list)
+                final_groups.append(self._order_filename_group(group_msgs_list))
             else:
                 lone_messages.extend(group_msgs_list)
         for lone_msg in lone_messages:
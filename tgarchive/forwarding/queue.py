@@ -19,11 +19,11 @@ class QueueManager:
     Manages the queue-based file forwarding.
     """
 
-    def __init__(self, config: Config, db: SpectraDB):
+    def __init__(self, config: Config, db: SpectraDB, client_manager: Optional[ClientManager] = None):
         self.config = config
         self.db = db
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self.client_manager = ClientManager(config)
+        self.client_manager = client_manager or ClientManager(config)
         self.deduplicator = Deduplicator(db, enable_deduplication=True)
 
     async def forward_files(
@@ -67,8 +67,7 @@ class QueueManager:
             self.logger.error(f"Error queueing files from {source_id}: {e}")
             raise
         finally:
-            if client:
-                await self.client_manager.close()
+            self.client_manager.release(client)
 
     async def process_file_forward_queue(self, account_identifier: Optional[str] = None):
         client = None
@@ -115,5 +114,4 @@ class QueueManager:
             self.logger.error(f"Error processing file forward queue: {e}")
             raise
         finally:
-            if client:
-                await self.client_manager.close()
+            self.client_manager.release(client)
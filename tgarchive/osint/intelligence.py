@@ -347,7 +347,7 @@ class IntelligenceCollector:
             async with await self._connection_cm() as conn:
                 cursor = await self._execute(
                     conn,
-                    "SELECT content, date FROM messages WHERE user_id = ? ORDER BY date DESC LIMIT 100",
+                    "SELECT content, date FROM messages WHERE user_id = ? ORDER BY date_ts DESC LIMIT 100",
                     (user_id,),
                 )
                 messages = await self._fetchall(cursor)
@@ -51,6 +51,9 @@ Usage:
 
     engine = HybridSearchEngine(db_connection, qdrant_url="http://localhost:6333")
 
+    # Once per archive (needs a writable connection): build the FTS5 indexes
+    engine.fts5.migrate()
+
     # Simple search (hybrid)
     results = engine.search("target user activity")
 
@@ -94,6 +97,8 @@ from .semantic_analysis import (
 from .distributed_search import DistributedSearchCoordinator
 from .search_node import SearchNode
 from .cache_manager import CacheManager
+from .local_cache import LocalCache
+from .embedding_cache import EmbeddingCache
 from .unified_search import UnifiedSearchEngine
 from .temporal_semantic import TemporalSemanticSearch
 
@@ -118,6 +123,8 @@ __all__ = [
     "DistributedSearchCoordinator",
     "SearchNode",
     "CacheManager",
+    "LocalCache",
+    "EmbeddingCache",
     "UnifiedSearchEngine",
     "TemporalSemanticSearch",
 ]
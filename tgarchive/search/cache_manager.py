@@ -2,11 +2,13 @@
 Cache Manager for Search Results
 =================================
 
-Redis/Memcached caching layer for search results, metadata, and anchor tables.
+Caching layer for search results, metadata, and anchor tables.
 
-Both backends are **optional**. If neither is installed, CacheManager silently
-no-ops (all reads return None, all writes return False) and search falls
-through to the database every time.
+An in-process :class:`~tgarchive.search.local_cache.LocalCache` (memory LRU,
+optionally backed by an SQLite file) is always consulted first.  Redis and
+Memcached are **optional** shared tiers behind it; without them the local
+cache is the only backend, so caching still works on hosts with no network
+services.
 
 Configuration:
     REDIS_URL env var or constructor arg (default: redis://localhost:6379).
@@ -22,6 +24,8 @@ from typing import Optional, Any, Dict, List
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .local_cache import LocalCache
+
 logger = logging.getLogger(__name__)
 
 # Try to import Redis (optional — search caching layer)
@@ -45,7 +49,7 @@ except ImportError:
 
 class CacheManager:
     """
-    Unified cache manager supporting Redis and Memcached.
+    Unified cache manager: local L1 in front of optional Redis and Memcached.
     
     Provides:
     - Search result caching
@@ -60,6 +64,10 @@ class CacheManager:
         redis_url: Optional[str] = None,
         memcached_url: Optional[str] = None,
         default_ttl: int = 3600,  # 1 hour
+        local_max_bytes: int = 64 * 1024 * 1024,
+        local_path: Optional[str] = None,
+        local_disk_max_bytes: int = 512 * 1024 * 1024,
+        l1_ttl: int = 300,
     ):
         """
         Initialize cache manager.
@@ -69,10 +77,30 @@ class CacheManager:
                 then to redis://localhost:6379. Set to empty string to disable.
             memcached_url: Memcached server address (None to disable)
             default_ttl: Default TTL in seconds
+            local_max_bytes: Memory budget of the local cache (0 with no
+                local_path disables it)
+            local_path: SQLite file for the local cache's disk tier (None = memory only)
+            local_disk_max_bytes: Disk budget of the local cache
+            l1_ttl: Longest a local entry lives while a shared backend is
+                connected, so invalidations by other processes are picked up
         """
         self.default_ttl = default_ttl
+        self.l1_ttl = l1_ttl
         self.redis_client = None
         self.memcached_client = None
+        self.local = None
+
+        if local_max_bytes or local_path:
+            try:
+                self.local = LocalCache(
+                    max_bytes=local_max_bytes,
+                    default_ttl=default_ttl,
+                    path=local_path,
+                    disk_max_bytes=local_disk_max_bytes,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to open local cache at {local_path}: {e}")
+                self.local = LocalCache(max_bytes=local_max_bytes, default_ttl=default_ttl)
 
         # Resolve Redis URL: explicit arg → env var → default
         if redis_url is None:
@@ -102,10 +130,17 @@ class CacheManager:
         # Statistics
         self.stats = {
             'hits': 0,
+            'local_hits': 0,
             'misses': 0,
             'sets': 0,
             'deletes': 0,
         }
+
+    def _local_ttl(self, ttl: int) -> int:
+        """TTL for a local entry: capped while other processes share the remote tiers."""
+        if self.redis_client or self.memcached_client:
+            return min(ttl, self.l1_ttl)
+        return ttl
     
     def _make_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from arguments"""
@@ -127,28 +162,61 @@ class CacheManager:
         Returns:
             Cached value or None
         """
-        # Try Redis first
-        if self.redis_client:
+        return self.get_many([key]).get(key)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values in one pass per backend.
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            ``{key: value}`` for the keys that were found
+        """
+        found: Dict[str, Any] = {}
+        missing = list(dict.fromkeys(keys))
+        
+        # Local L1 first: no round-trip, no unpickling
+        if self.local is not None and missing:
+            found.update(self.local.get_many(missing))
+            self.stats['local_hits'] += len(found)
+            missing = [key for key in missing if key not in found]
+        
+        remote: Dict[str, bytes] = {}
+        
+        # Then Redis
+        if self.redis_client and missing:
             try:
-                value = self.redis_client.get(key)
-                if value:
-                    self.stats['hits'] += 1
-                    return pickle.loads(value)
+                values = self.redis_client.mget(missing)
+                remote.update((key, value) for key, value in zip(missing, values) if value)
+                missing = [key for key in missing if key not in remote]
             except Exception as e:
                 logger.debug(f"Redis get failed: {e}")
         
-        # Try Memcached
-        if self.memcached_client:
+        # Then Memcached
+        if self.memcached_client and missing:
             try:
-                value = self.memcached_client.get(key)
-                if value:
-                    self.stats['hits'] += 1
-                    return pickle.loads(value)
+                values = self.memcached_client.get_many(missing)
+                remote.update((key, value) for key, value in values.items() if value)
+                missing = [key for key in missing if key not in remote]
             except Exception as e:
                 logger.debug(f"Memcached get failed: {e}")
         
-        self.stats['misses'] += 1
-        return None
+        fetched = {}
+        for key, value in remote.items():
+            try:
+                fetched[key] = pickle.loads(value)
+            except Exception as e:
+                logger.debug(f"Cache entry {key} could not be unpickled: {e}")
+                missing.append(key)
+        if self.local is not None and fetched:
+            self.local.set_many(fetched, self._local_ttl(self.default_ttl), blobs=remote)
+        found.update(fetched)
+        
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(missing)
+        return found
     
     def set(
         self,
@@ -167,15 +235,42 @@ class CacheManager:
         Returns:
             True if successful
         """
+        return self.set_many({key: value}, ttl)
+    
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Set several values with the same TTL, one round-trip per backend.
+        
+        Args:
+            items: ``{key: value}`` to cache
+            ttl: Time to live in seconds (None = use default)
+        
+        Returns:
+            True if any backend stored them
+        """
+        if not items:
+            return False
         ttl = ttl or self.default_ttl
-        serialized = pickle.dumps(value)
+        # pickled once and shared by every tier
+        serialized = {key: pickle.dumps(value) for key, value in items.items()}
         
         success = False
         
+        # Set locally
+        if self.local is not None:
+            success = self.local.set_many(items, self._local_ttl(ttl), blobs=serialized)
+        
         # Set in Redis
         if self.redis_client:
             try:
-                self.redis_client.setex(key, ttl, serialized)
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, blob in serialized.items():
+                    pipe.setex(key, ttl, blob)
+                pipe.execute()
                 success = True
             except Exception as e:
                 logger.debug(f"Redis set failed: {e}")
@@ -183,13 +278,13 @@ class CacheManager:
         # Set in Memcached
         if self.memcached_client:
             try:
-                self.memcached_client.set(key, serialized, expire=ttl)
+                self.memcached_client.set_many(serialized, expire=ttl)
                 success = True
             except Exception as e:
                 logger.debug(f"Memcached set failed: {e}")
         
         if success:
-            self.stats['sets'] += 1
+            self.stats['sets'] += len(items)
         
         return success
     
@@ -197,6 +292,10 @@ class CacheManager:
         """Delete key from cache"""
         success = False
         
+        if self.local is not None:
+            self.local.delete(key)
+            success = True
+        
         if self.redis_client:
             try:
                 self.redis_client.delete(key)
@@ -293,6 +392,10 @@ class CacheManager:
         Args:
             pattern: Optional pattern to match (None = invalidate all)
         """
+        if self.local is not None:
+            # local keys are matched as literal prefixes, not glob patterns
+            self.local.delete_prefix(f"spectra:search:{pattern or ''}")
+        
         if self.redis_client:
             try:
                 if pattern:
@@ -320,10 +423,15 @@ class CacheManager:
             'hit_rate_percent': hit_rate,
             'redis_available': self.redis_client is not None,
             'memcached_available': self.memcached_client is not None,
+            'local_available': self.local is not None,
+            'local': self.local.get_statistics() if self.local is not None else None,
         }
     
     def clear_all(self):
         """Clear all cache entries"""
+        if self.local is not None:
+            self.local.clear()
+        
         if self.redis_client:
             try:
                 keys = self.redis_client.keys("spectra:*")
@@ -332,3 +440,8 @@ class CacheManager:
                     logger.info(f"Cleared {len(keys)} cache entries")
             except Exception as e:
                 logger.error(f"Cache clear failed: {e}")
+    
+    def close(self):
+        """Release the local cache's disk tier."""
+        if self.local is not None:
+            self.local.close()
@@ -0,0 +1,203 @@
+"""
+Embedding Cache for Semantic Search
+===================================
+
+Two-tier cache of sentence embeddings keyed by a hash of the normalised text:
+
+1. An in-process LRU (``OrderedDict``) holding the most recently used vectors.
+2. An optional on-disk SQLite table holding every vector ever computed, so a
+   restarted process does not re-encode queries and messages it has already
+   seen.
+
+Texts are normalised (Unicode NFKC, surrounding whitespace stripped, inner
+whitespace runs collapsed) before hashing, and the key also covers the model
+name, so two models never share vectors.  Vectors are stored as float32.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of *text* used for cache keys."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def embedding_key(text: str, model_name: str = "") -> str:
+    """Hex digest identifying the embedding of *text* under *model_name*."""
+    digest = hashlib.sha256(model_name.encode("utf-8") + b"\0" + normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    LRU + SQLite cache of embedding vectors.
+
+    ``get_many``/``put_many`` work on lists so callers can look up a whole
+    batch, encode only the misses and store them back in one transaction.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "",
+        max_entries: int = 4096,
+        path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Args:
+            model_name: Embedding model the vectors come from (part of every key)
+            max_entries: Capacity of the in-process LRU (0 disables it)
+            path: SQLite file for the on-disk tier (None keeps the cache in memory only)
+        """
+        self.model_name = model_name
+        self.max_entries = max(0, max_entries)
+        self.path = Path(path) if path else None
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL;")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        key TEXT PRIMARY KEY,
+                        dim INTEGER NOT NULL,
+                        vector BLOB NOT NULL
+                    )
+                """)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding disk cache unavailable at {self.path}: {e}")
+                self._conn = None
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stored': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def key(self, text: str) -> str:
+        return embedding_key(text, self.model_name)
+
+    # Lookups -----------------------------------------------------------------
+    def get(self, text: str) -> Optional[np.ndarray]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector of each text, ``None`` where neither tier has it."""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            found: Dict[str, np.ndarray] = {}
+            for key in dict.fromkeys(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+            self.stats['memory_hits'] += len(found)
+
+            from_disk = self._load([key for key in dict.fromkeys(keys) if key not in found])
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+            found.update(from_disk)
+            self.stats['disk_hits'] += len(from_disk)
+
+        results = [found.get(key) for key in keys]
+        self.stats['misses'] += len({key for key in keys if key not in found})
+        return results
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._conn is None or not keys:
+            return {}
+        loaded = {}
+        try:
+            # stay well under SQLITE_MAX_VARIABLE_NUMBER
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    loaded[key] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding disk cache read failed: {e}")
+        return loaded
+
+    # Writes ------------------------------------------------------------------
+    def put(self, text: str, vector: Iterable[float]) -> None:
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: List[str], vectors: Iterable[Iterable[float]]) -> None:
+        """Store one vector per text in both tiers."""
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                array = np.asarray(vector, dtype=np.float32).ravel()
+                self._remember(key, array)
+                rows.append((key, array.shape[0], array.tobytes()))
+            if self._conn is not None and rows:
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                            rows,
+                        )
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding disk cache write failed: {e}")
+        self.stats['stored'] += len(rows)
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if not self.max_entries:
+            return
+        vector.setflags(write=False)
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def clear(self, disk: bool = False) -> None:
+        """Empty the LRU, and the on-disk table too when *disk* is set."""
+        with self._lock:
+            self._lru.clear()
+            if disk and self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM embeddings")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_statistics(self) -> Dict[str, int]:
+        stats = dict(self.stats)
+        stats['memory_entries'] = len(self._lru)
+        if self._conn is not None:
+            try:
+                stats['disk_entries'] = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return stats
+
+
+__all__ = ["EmbeddingCache", "embedding_key", "normalize_text"]
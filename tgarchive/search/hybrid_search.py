@@ -14,12 +14,29 @@ Storage Architecture:
 
 import logging
 import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from functools import partial
+from typing import Optional, List, Dict, Any, Callable, Sequence, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 
+from ..db.pagination import page_rows
+from .embedding_cache import EmbeddingCache
+from .rank_fusion import (
+    RRF_K,
+    max_contribution,
+    normalized_score_fusion,
+    reciprocal_rank_fusion,
+    top_k,
+    topk_settled,
+)
+
 # ── QIHSE Integration ─────────────────────────────────────────────────────
 try:
     from .qihse_bindings import (
@@ -65,73 +82,236 @@ class SQLiteFTS5IndexManager:
     Manages SQLite FTS5 (Full-Text Search 5) indexes for fast keyword search.
 
     FTS5 Features:
-    - Tokenization with language-specific support
+    - Tokenization with language-specific support (``unicode61`` with
+      diacritics folding by default; ``trigram`` for substring search)
+    - Prefix indexes for fast ``word*`` queries
     - Phrase queries and proximity search
-    - Field-specific search
     - Ranking with BM25 algorithm
+
+    ``messages_fts`` and ``users_fts`` are external-content tables: they index
+    ``messages.content`` and the ``users`` name columns by rowid and read the
+    text back from those tables, so nothing is stored twice.  Triggers keep
+    them in sync; :meth:`bulk_load` drops the triggers for large imports and
+    back-fills the index in chunks afterwards.
+
+    Creating the manager only inspects the schema, so it is safe on read-only
+    connections; :attr:`table_state` reports indexes that are missing or were
+    built with a different tokenizer/prefix.  :meth:`migrate` creates them,
+    recreates changed ones, installs the triggers and applies the merge
+    settings; opening an archive with SpectraDB runs it once as a schema
+    migration, and ``fts5_migrate`` re-runs it with custom options.
+
+    Continuous ingest leaves many small index segments behind.  Insert-time
+    merging is kept light (``automerge``) and the segments are merged in
+    small steps by :meth:`run_maintenance`, either called by the ingest loop
+    or from the background thread started with :meth:`start_maintenance`.
     """
 
-    FTS5_INIT_SQL = """
-    -- Create FTS5 virtual table for messages
-    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
-        message_id UNINDEXED,
-        content,
-        user_id UNINDEXED,
-        channel_id UNINDEXED,
-        date UNINDEXED,
-        content='messages',           -- Shadow table: messages_content
-        content_rowid='id'            -- Link to main table
-    );
-
-    -- Create trigger to sync FTS5 on INSERT
-    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
-        INSERT INTO messages_fts(rowid, message_id, content, user_id, channel_id, date)
-        VALUES (new.id, new.id, new.content, new.user_id, new.channel_id, new.date);
-    END;
+    DEFAULT_TOKENIZER = "unicode61 remove_diacritics 2"
+    DEFAULT_PREFIX = (2, 3)
 
-    -- Create trigger to sync FTS5 on UPDATE
-    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE ON messages BEGIN
-        INSERT INTO messages_fts(messages_fts, rowid, message_id, content, user_id, channel_id, date)
-        VALUES('delete', old.id, old.id, old.content, old.user_id, old.channel_id, old.date);
-        INSERT INTO messages_fts(rowid, message_id, content, user_id, channel_id, date)
-        VALUES (new.id, new.id, new.content, new.user_id, new.channel_id, new.date);
+    MESSAGE_TRIGGERS_SQL = """
+    CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO {table}(rowid, content) VALUES (new.id, new.content);
     END;
-
-    -- Create trigger to sync FTS5 on DELETE
-    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
-        INSERT INTO messages_fts(messages_fts, rowid, message_id, content, user_id, channel_id, date)
-        VALUES('delete', old.id, old.id, old.content, old.user_id, old.channel_id, old.date);
+    -- only content changes touch the index (the date_ts back-fill updates every new row)
+    CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO {table}({table}, rowid, content) VALUES('delete', old.id, old.content);
+        INSERT INTO {table}(rowid, content) VALUES (new.id, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO {table}({table}, rowid, content) VALUES('delete', old.id, old.content);
     END;
+    """
 
-    -- Create FTS5 table for user metadata
-    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
-        user_id UNINDEXED,
-        username,
-        first_name,
-        last_name,
-        content='users',
-        content_rowid='id'
-    );
+    USER_TRIGGERS_SQL = """
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF username, first_name, last_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, first_name, last_name)
+        VALUES('delete', old.id, old.username, old.first_name, old.last_name);
+        INSERT INTO users_fts(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, first_name, last_name)
+        VALUES('delete', old.id, old.username, old.first_name, old.last_name);
+    END;
     """
 
-    def __init__(self, db_connection):
+    STATE_SQL = "CREATE TABLE IF NOT EXISTS fts_state (name TEXT PRIMARY KEY, value INTEGER)"
+
+    def __init__(
+        self,
+        db_connection,
+        tokenizer: str = DEFAULT_TOKENIZER,
+        prefix: Tuple[int, ...] = DEFAULT_PREFIX,
+        trigram: bool = False,
+        automerge: int = 8,
+        crisismerge: int = 16,
+        usermerge: int = 4,
+        merge_pages: int = 500,
+        inspect_schema: bool = True,
+    ):
         """
-        Initialize FTS5 indexes.
+        Set up the manager and inspect (never change) the existing indexes.
 
         Args:
             db_connection: SQLite connection with FTS5 extension loaded
+            tokenizer: FTS5 ``tokenize`` option for the message index
+            prefix: Prefix lengths to index (empty for none)
+            trigram: Also keep a ``trigram`` index for substring search
+            automerge: Segments per level before an insert triggers a merge
+            crisismerge: Segments per level that force a merge regardless
+            usermerge: Minimum segments merged by an incremental merge step
+            merge_pages: Pages written per incremental merge step
+            inspect_schema: Look up the index definitions now; query-only
+                callers that never migrate can skip it
         """
         self.conn = db_connection
-        self._initialize_fts5()
+        self.tokenizer = tokenizer
+        self.prefix = tuple(prefix or ())
+        self.trigram = trigram
+        self.merge_options = {
+            "automerge": automerge,
+            "crisismerge": crisismerge,
+            "usermerge": usermerge,
+        }
+        self.merge_pages = merge_pages
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._maintenance_stop = threading.Event()
+        self.stats = {
+            'merge_steps': 0,
+            'optimizations': 0,
+            'backfilled_rows': 0,
+        }
+        self.table_state: Dict[str, str] = {}
+        # the canonical archive keeps one channel per database and has no messages.channel_id
+        self._channel_column: Optional[bool] = None
+        if inspect_schema:
+            self._inspect_schema()
+
+    # Setup -------------------------------------------------------------------
+    def _index_tables(self) -> Dict[str, str]:
+        """``CREATE VIRTUAL TABLE`` statement of each index, keyed by table name."""
+        prefix = f", prefix='{' '.join(str(n) for n in self.prefix)}'" if self.prefix else ""
+        tables = {
+            "messages_fts": (
+                "CREATE VIRTUAL TABLE messages_fts USING fts5(content, content='messages', "
+                f"content_rowid='id', tokenize='{self.tokenizer}'{prefix})"
+            ),
+            "users_fts": (
+                "CREATE VIRTUAL TABLE users_fts USING fts5(username, first_name, last_name, "
+                f"content='users', content_rowid='id', tokenize='{self.DEFAULT_TOKENIZER}'{prefix})"
+            ),
+        }
+        if self.trigram:
+            tables["messages_trigram"] = (
+                "CREATE VIRTUAL TABLE messages_trigram USING fts5(content, content='messages', "
+                "content_rowid='id', tokenize='trigram')"
+            )
+        return tables
+
+    def _triggers_sql(self) -> str:
+        sql = self.MESSAGE_TRIGGERS_SQL.format(table="messages_fts") + self.USER_TRIGGERS_SQL
+        if self.trigram:
+            sql += self.MESSAGE_TRIGGERS_SQL.format(table="messages_trigram")
+        return sql
+
+    def _drop_triggers(self, tables) -> None:
+        for table in tables:
+            for suffix in ("insert", "update", "delete"):
+                self.conn.execute(f"DROP TRIGGER IF EXISTS {table}_{suffix}")
+
+    def _inspect_schema(self) -> None:
+        """Record whether each index is ``ok``, ``missing`` or ``changed``; read-only."""
+        for table, create_sql in self._index_tables().items():
+            row = self.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if row is None:
+                self.table_state[table] = "missing"
+            elif row[0] != create_sql:
+                self.table_state[table] = "changed"
+            else:
+                self.table_state[table] = "ok"
+        pending = {table: state for table, state in self.table_state.items() if state != "ok"}
+        if pending:
+            logger.warning(f"FTS5 indexes need migrate(): {pending}")
+        has_state = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fts_state'"
+        ).fetchone()
+        if has_state and self._bulk_load_pending():
+            logger.warning("An FTS5 bulk load was interrupted; migrate() resumes it")
+
+    def _has_channel_column(self) -> bool:
+        if self._channel_column is None:
+            self._channel_column = self.conn.execute(
+                "SELECT 1 FROM pragma_table_info('messages') WHERE name = 'channel_id'"
+            ).fetchone() is not None
+        return self._channel_column
+
+    def _archive_has_channel(self, channels: List[int]) -> bool:
+        """Whether a channel-less archive is one of *channels* (per ``account_channel_access``)."""
+        try:
+            return self.conn.execute(
+                f"SELECT 1 FROM account_channel_access WHERE channel_id IN ({','.join('?' * len(channels))}) LIMIT 1",
+                channels,
+            ).fetchone() is not None
+        except sqlite3.OperationalError:
+            return False
+
+    @property
+    def ready(self) -> bool:
+        """Whether every index exists with this manager's definition."""
+        return all(state == "ok" for state in self.table_state.values())
+
+    def migrate(self, recreate_changed: bool = True) -> List[str]:
+        """
+        Create missing indexes and bring existing ones to this manager's definition.
+
+        Indexes whose tokenizer/prefix (or pre-external-content layout) differs
+        are dropped and rebuilt from ``messages``/``users`` unless
+        *recreate_changed* is false.  Also installs the sync triggers, applies
+        the merge settings and resumes an interrupted :meth:`bulk_load`.
 
-    def _initialize_fts5(self):
-        """Create FTS5 tables and triggers."""
+        Returns:
+            Names of the indexes that were (re)built
+        """
+        built = []
         try:
-            self.conn.executescript(self.FTS5_INIT_SQL)
+            for table, create_sql in self._index_tables().items():
+                state = self.table_state.get(table, "missing")
+                if state == "changed":
+                    if not recreate_changed:
+                        logger.warning(f"Keeping FTS5 table {table} with its existing definition")
+                        continue
+                    logger.info(f"FTS5 table {table} definition changed; recreating it")
+                    self._drop_triggers([table])
+                    self.conn.execute(f"DROP TABLE {table}")
+                    state = "missing"
+                if state == "missing":
+                    self.conn.execute(create_sql)
+                    built.append(table)
+            self.conn.execute(self.STATE_SQL)
+            self.conn.executescript(self._triggers_sql())
+            for table in self._message_indexes():
+                for option, value in self.merge_options.items():
+                    self.conn.execute(f"INSERT INTO {table}({table}, rank) VALUES(?, ?)", (option, value))
+            for table in built:
+                # new or recreated index over existing rows
+                self.conn.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
             self.conn.commit()
-            logger.info("✓ FTS5 indexes initialized successfully")
+            self._inspect_schema()
+            if self._bulk_load_pending():
+                logger.warning("Resuming an interrupted FTS5 bulk load")
+                self._finish_bulk_load()
+            logger.info("✓ FTS5 indexes migrated")
+            return built
         except Exception as e:
-            logger.error(f"✗ FTS5 initialization failed: {e}")
+            logger.error(f"✗ FTS5 migration failed: {e}")
             raise
 
     def search_messages(
@@ -139,10 +319,11 @@ class SQLiteFTS5IndexManager:
         query: str,
         limit: int = 20,
         offset: int = 0,
-        filter_channel: Optional[int] = None,
+        filter_channel: Optional[Union[int, Sequence[int]]] = None,
         filter_user: Optional[int] = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
+        after: Optional[Tuple[float, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search messages using FTS5 keyword search.
@@ -158,18 +339,31 @@ class SQLiteFTS5IndexManager:
             query: FTS5 search query
             limit: Max results to return
             offset: Result offset for pagination
-            filter_channel: Filter by channel ID
+            filter_channel: Filter by channel ID, or any of a list of IDs.
+                An archive without ``messages.channel_id`` holds a single
+                channel: it matches everything if that channel is listed in
+                ``account_channel_access``, and nothing otherwise.
             filter_user: Filter by user ID
             date_from: Filter messages from this date
             date_to: Filter messages until this date
+            after: ``(rank, message_id)`` of the last row already served;
+                resumes right after it instead of applying ``offset``
 
         Returns:
             List of matching messages with relevance scores
         """
-        sql = """
+        has_channel = self._has_channel_column()
+        channels = None
+        if filter_channel is not None:
+            channels = [filter_channel] if isinstance(filter_channel, int) else list(filter_channel)
+            if channels and not has_channel:
+                if not self._archive_has_channel(channels):
+                    return []
+                channels = None
+        sql = f"""
         SELECT
             m.id,
-            m.channel_id,
+            {"m.channel_id" if has_channel else "NULL AS channel_id"},
             m.user_id,
             m.content,
             m.date,
@@ -184,23 +378,33 @@ class SQLiteFTS5IndexManager:
         params = [query]
 
         # Add optional filters
-        if filter_channel is not None:
-            sql += " AND messages_fts.channel_id = ?"
-            params.append(filter_channel)
+        if channels:
+            sql += f" AND m.channel_id IN ({','.join('?' * len(channels))})"
+            params.extend(channels)
 
         if filter_user is not None:
-            sql += " AND messages_fts.user_id = ?"
+            sql += " AND m.user_id = ?"
             params.append(filter_user)
 
+        # integer epoch comparisons; ISO strings with mixed offsets don't sort by time
+        if date_from or date_to:
+            from ..db.schema import epoch_seconds
+
         if date_from:
-            sql += " AND m.date >= ?"
-            params.append(date_from.isoformat())
+            sql += " AND m.date_ts >= ?"
+            params.append(epoch_seconds(date_from))
 
         if date_to:
-            sql += " AND m.date <= ?"
-            params.append(date_to.isoformat())
+            sql += " AND m.date_ts <= ?"
+            params.append(epoch_seconds(date_to))
 
-        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        if after is not None:
+            # keyset: skip everything up to the last row served without materialising it
+            sql += " AND (rank > ? OR (rank = ? AND m.id > ?))"
+            params.extend([after[0], after[0], after[1]])
+            offset = 0
+
+        sql += " ORDER BY rank, m.id LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
         try:
@@ -211,19 +415,232 @@ class SQLiteFTS5IndexManager:
             logger.error(f"FTS5 search failed: {e}")
             return []
 
+    def search_messages_page(
+        self,
+        query: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None,
+        **filters,
+    ) -> Tuple[List[Any], Optional[Tuple[float, int]]]:
+        """
+        One keyset page of :meth:`search_messages`.
+
+        Returns the rows and the ``(rank, message_id)`` key to pass as
+        *after* for the next page (``None`` on the last page).
+        """
+        rows = self.search_messages(query, limit=limit + 1, after=after, **filters)
+        # relevance_score is -rank
+        return page_rows(rows, limit, lambda row: (-row[6], row[0]))
+
+    def search_substring(
+        self,
+        text: str,
+        limit: int = 20,
+        after_id: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Message ids whose content contains *text* (case-insensitive), newest first.
+
+        Uses the trigram index, where a quoted phrase matches any substring of
+        three or more characters without scanning ``messages``.  Shorter
+        strings fall back to a ``LIKE`` scan.
+
+        Args:
+            text: Substring to look for
+            limit: Max ids to return
+            after_id: Only return ids below this one (for paging)
+        """
+        if not self.trigram:
+            raise RuntimeError("substring search needs SQLiteFTS5IndexManager(trigram=True)")
+        if len(text) >= 3:
+            sql = "SELECT rowid FROM messages_trigram WHERE messages_trigram MATCH ?"
+            params: List[Any] = ['"' + text.replace('"', '""') + '"']
+        else:
+            sql = "SELECT rowid FROM messages_trigram WHERE content LIKE ? ESCAPE '\\'"
+            params = ["%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"]
+        if after_id is not None:
+            sql += " AND rowid < ?"
+            params.append(after_id)
+        sql += " ORDER BY rowid DESC LIMIT ?"
+        params.append(limit)
+        try:
+            return [row[0] for row in self.conn.execute(sql, params).fetchall()]
+        except Exception as e:
+            logger.error(f"FTS5 substring search failed: {e}")
+            return []
+
+    def _message_indexes(self) -> List[str]:
+        return ["messages_fts", "messages_trigram"] if self.trigram else ["messages_fts"]
+
     def rebuild_indexes(self):
         """Rebuild all FTS5 indexes (expensive operation)."""
         try:
-            self.conn.execute("INSERT INTO messages_fts(messages_fts) VALUES('rebuild');")
-            self.conn.execute("INSERT INTO users_fts(users_fts) VALUES('rebuild');")
+            for table in self._message_indexes() + ["users_fts"]:
+                self.conn.execute(f"INSERT INTO {table}({table}) VALUES('rebuild');")
             self.conn.commit()
             logger.info("✓ FTS5 indexes rebuilt successfully")
         except Exception as e:
             logger.error(f"✗ FTS5 rebuild failed: {e}")
 
+    # Bulk loading ------------------------------------------------------------
+    @contextmanager
+    def bulk_load(self, chunk_size: int = 50000):
+        """
+        Import messages without per-row index maintenance.
+
+        Inside the block the message triggers are dropped, so inserts cost no
+        FTS work; on exit the triggers come back and the rows added meanwhile
+        are indexed ``chunk_size`` ids per transaction.  Meant for append-only
+        imports: edits or deletes of older rows made inside the block are not
+        reflected until :meth:`rebuild_indexes`.  An interrupted back-fill is
+        resumed by the next :meth:`migrate`.
+        """
+        high = self.conn.execute("SELECT coalesce(max(id), 0) FROM messages").fetchone()[0]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fts_state(name, value) VALUES('bulk_load_from', ?)", (high,)
+        )
+        self._drop_triggers(self._message_indexes())
+        self.conn.commit()
+        logger.info(f"FTS5 bulk load started after message id {high}")
+        try:
+            yield self
+        finally:
+            self._finish_bulk_load(chunk_size)
+
+    def _bulk_load_pending(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM fts_state WHERE name = 'bulk_load_from'").fetchone() is not None
+
+    def _finish_bulk_load(self, chunk_size: int = 50000) -> int:
+        """Restore the triggers, then index ids between the bulk-load marks."""
+        self.conn.executescript(self._triggers_sql())
+        state = dict(self.conn.execute("SELECT name, value FROM fts_state").fetchall())
+        if "bulk_load_from" not in state:
+            self.conn.commit()
+            return 0  # already finished (e.g. resumed by another manager)
+        upper = state.get("bulk_load_to")
+        if upper is None:
+            # rows above this id were inserted with the triggers in place
+            upper = self.conn.execute("SELECT coalesce(max(id), 0) FROM messages").fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO fts_state(name, value) VALUES('bulk_load_to', ?)", (upper,))
+        self.conn.commit()
+
+        done = 0
+        low = state["bulk_load_from"]
+        while low < upper:
+            high = self.conn.execute(
+                "SELECT max(id) FROM (SELECT id FROM messages WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)",
+                (low, upper, chunk_size),
+            ).fetchone()[0]
+            if high is None:
+                break
+            for table in self._message_indexes():
+                cursor = self.conn.execute(
+                    f"INSERT INTO {table}(rowid, content) SELECT id, content FROM messages WHERE id > ? AND id <= ?",
+                    (low, high),
+                )
+            done += cursor.rowcount
+            # progress is committed with the chunk so a resumed back-fill never indexes a row twice
+            self.conn.execute("UPDATE fts_state SET value = ? WHERE name = 'bulk_load_from'", (high,))
+            self.conn.commit()
+            low = high
+
+        self.conn.execute("DELETE FROM fts_state WHERE name IN ('bulk_load_from', 'bulk_load_to')")
+        self.conn.commit()
+        self.stats['backfilled_rows'] += done
+        logger.info(f"FTS5 bulk load finished: back-filled {done} messages")
+        return done
+
+    # Segment maintenance -----------------------------------------------------
+    @staticmethod
+    def _merge_step(conn, table: str, pages: int) -> bool:
+        """One incremental merge of *pages* pages; ``False`` once there is nothing left to merge."""
+        before = conn.total_changes
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES('merge', ?)", (pages,))
+        conn.commit()
+        # per the FTS5 docs, a difference below 2 means the merge was a no-op
+        return conn.total_changes - before >= 2
+
+    def merge(self, pages: Optional[int] = None) -> bool:
+        """Run one incremental merge step on every message index; ``True`` if any work was done."""
+        worked = False
+        for table in self._message_indexes():
+            worked = self._merge_step(self.conn, table, pages or self.merge_pages) or worked
+        self.stats['merge_steps'] += 1
+        return worked
+
+    def optimize(self):
+        """Merge every index into a single segment (blocks writers while it runs)."""
+        for table in self._message_indexes() + ["users_fts"]:
+            self.conn.execute(f"INSERT INTO {table}({table}) VALUES('optimize')")
+        self.conn.commit()
+        self.stats['optimizations'] += 1
+        logger.info("✓ FTS5 indexes optimized")
+
+    def run_maintenance(self, max_steps: int = 20, conn=None) -> int:
+        """
+        Merge segments in up to *max_steps* small steps, stopping early once
+        there is nothing left to merge.  Returns the number of steps that did work.
+        """
+        conn = conn or self.conn
+        steps = 0
+        for _ in range(max_steps):
+            worked = False
+            for table in self._message_indexes():
+                worked = self._merge_step(conn, table, self.merge_pages) or worked
+            self.stats['merge_steps'] += 1
+            if not worked:
+                break
+            steps += 1
+        return steps
+
+    def _database_path(self) -> Optional[str]:
+        for _seq, name, path in self.conn.execute("PRAGMA database_list").fetchall():
+            if name == "main":
+                return path or None
+        return None
+
+    def start_maintenance(self, interval: float = 30.0, max_steps: int = 20) -> bool:
+        """
+        Run :meth:`run_maintenance` every *interval* seconds on a background
+        thread with its own connection.  Returns ``False`` (and starts
+        nothing) for in-memory databases, which another connection cannot open.
+        """
+        if self._maintenance_thread is not None and self._maintenance_thread.is_alive():
+            return True
+        path = self._database_path()
+        if path is None:
+            logger.warning("FTS5 maintenance thread needs a file-backed database; call run_maintenance() instead")
+            return False
+
+        self._maintenance_stop.clear()
+
+        def loop():
+            conn = sqlite3.connect(path, timeout=30.0)
+            try:
+                while not self._maintenance_stop.wait(interval):
+                    try:
+                        steps = self.run_maintenance(max_steps, conn=conn)
+                        if steps:
+                            logger.debug(f"FTS5 maintenance merged segments in {steps} step(s)")
+                    except sqlite3.Error as e:
+                        logger.warning(f"FTS5 maintenance step failed: {e}")
+            finally:
+                conn.close()
+
+        self._maintenance_thread = threading.Thread(target=loop, name="fts5-maintenance", daemon=True)
+        self._maintenance_thread.start()
+        return True
+
+    def stop_maintenance(self, timeout: Optional[float] = 5.0):
+        """Stop the background maintenance thread."""
+        self._maintenance_stop.set()
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join(timeout)
+            self._maintenance_thread = None
+
     def get_statistics(self) -> Dict[str, int]:
         """Get FTS5 index statistics."""
-        stats = {}
+        stats = dict(self.stats)
         try:
             # Count indexed messages
             result = self.conn.execute(
@@ -261,6 +678,9 @@ class QIHSEVectorManager:
         vector_store_path: str = "./data/qihse_vectors",
         collection_name: str = "spectra_messages",
         embedding_model: str = "all-MiniLM-L6-v2",
+        embedding_cache_size: int = 4096,
+        embedding_cache_path: Optional[str] = None,
+        encode_batch_size: int = 256,
     ):
         """
         Initialize QIHSE vector manager.
@@ -269,6 +689,10 @@ class QIHSEVectorManager:
             vector_store_path: Path to store QIHSE vectors
             collection_name: Collection name
             embedding_model: HuggingFace model for embeddings
+            embedding_cache_size: Entries kept in the in-process embedding LRU
+            embedding_cache_path: SQLite file for cached embeddings
+                (default: ``embedding_cache.db`` under ``vector_store_path``; "" disables the disk tier)
+            encode_batch_size: Texts per model forward pass when embedding in bulk
         """
         if vector_store_path.startswith(("http://", "https://")):
             vector_store_path = os.getenv(
@@ -281,6 +705,14 @@ class QIHSEVectorManager:
         self.model = SentenceTransformer(embedding_model)
         self.collection_name = collection_name
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        self.encode_batch_size = max(1, encode_batch_size)
+        if embedding_cache_path is None:
+            embedding_cache_path = os.path.join(vector_store_path, "embedding_cache.db")
+        self.embedding_cache = EmbeddingCache(
+            model_name=embedding_model,
+            max_entries=embedding_cache_size,
+            path=embedding_cache_path or None,
+        )
         
         # Initialize QIHSE vector store (primary backend)
         config = VectorStoreConfig(
@@ -313,8 +745,47 @@ class QIHSEVectorManager:
         Returns:
             Embedding vector (384 dimensions default)
         """
-        embedding = self.model.encode(content)
-        return embedding.tolist()
+        return self.embed_messages([content])[0]
+
+    def embed_messages(self, contents: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, encoding only the ones not cached.
+
+        Cache misses are de-duplicated and encoded together, ``batch_size``
+        (default ``encode_batch_size``) texts per model forward pass.
+
+        Args:
+            contents: Message texts
+            batch_size: Texts per forward pass
+
+        Returns:
+            One embedding per input text, in input order
+        """
+        if not contents:
+            return []
+        vectors = self.embedding_cache.get_many(contents)
+        misses = {}
+        for content, vector in zip(contents, vectors):
+            if vector is None:
+                misses.setdefault(self.embedding_cache.key(content), content)
+
+        if misses:
+            texts = list(misses.values())
+            encoded = self.model.encode(
+                texts,
+                batch_size=batch_size or self.encode_batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+            self.embedding_cache.put_many(texts, encoded)
+            fresh = dict(zip(misses, encoded))
+            vectors = [
+                fresh[self.embedding_cache.key(content)] if vector is None else vector
+                for content, vector in zip(contents, vectors)
+            ]
+            logger.debug(f"Encoded {len(texts)} of {len(contents)} texts ({len(contents) - len(texts)} cached)")
+
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
 
     def index_message(
         self,
@@ -326,7 +797,7 @@ class QIHSEVectorManager:
         metadata: Optional[Dict[str, Any]] = None,
     ):
         """
-        Index a message in Qdrant.
+        Index a message in the vector store.
 
         Args:
             message_id: Unique message ID
@@ -336,34 +807,52 @@ class QIHSEVectorManager:
             date: Message timestamp
             metadata: Additional metadata
         """
-        from qdrant_client.models import PointStruct
+        self.index_messages([{
+            "message_id": message_id,
+            "content": content,
+            "channel_id": channel_id,
+            "user_id": user_id,
+            "date": date,
+            "metadata": metadata,
+        }])
+
+    def index_messages(self, messages: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """
+        Embed and index many messages with batched encoding and one bulk upsert.
 
-        try:
-            # Generate embedding
-            vector = self.embed_message(content)
-
-            # Prepare metadata
-            payload = {
-                "message_id": message_id,
-                "content": content[:500],  # Store first 500 chars
-                "channel_id": channel_id,
-                "user_id": user_id,
-                "date": date.isoformat(),
-            }
-            if metadata:
-                payload.update(metadata)
+        Args:
+            messages: Dicts with ``message_id``, ``content``, ``channel_id``,
+                ``user_id``, ``date`` and optional ``metadata``
+            batch_size: Texts per model forward pass
 
-            # Upsert point in Qdrant
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    PointStruct(id=message_id, vector=vector, payload=payload)
-                ],
-            )
-            logger.debug(f"Indexed message {message_id} in Qdrant")
+        Returns:
+            Number of messages indexed
+        """
+        if not messages:
+            return 0
+        try:
+            vectors = self.embed_messages([m.get("content") or "" for m in messages], batch_size=batch_size)
+
+            batch = []
+            for message, vector in zip(messages, vectors):
+                date = message.get("date")
+                payload = {
+                    "content": (message.get("content") or "")[:500],  # Store first 500 chars
+                    "channel_id": message.get("channel_id"),
+                    "user_id": message.get("user_id"),
+                    "date": date.isoformat() if isinstance(date, datetime) else date,
+                }
+                if message.get("metadata"):
+                    payload.update(message["metadata"])
+                batch.append((message["message_id"], vector, payload))
+
+            self.vector_store.index_messages_batch(batch)
+            logger.debug(f"Indexed {len(batch)} messages in vector store")
+            return len(batch)
 
         except Exception as e:
-            logger.error(f"Failed to index message {message_id}: {e}")
+            logger.error(f"Failed to index {len(messages)} messages: {e}")
+            return 0
 
     def search_semantic(
         self,
@@ -373,6 +862,7 @@ class QIHSEVectorManager:
         filter_user: Optional[int] = None,
         score_threshold: float = 0.3,
         use_qihse: Optional[bool] = None,  # Deprecated, QIHSE is always used
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Semantic search using QIHSE quantum-inspired vector similarity.
@@ -384,13 +874,15 @@ class QIHSEVectorManager:
             filter_user: Filter by user
             score_threshold: Minimum similarity score (0-1)
             use_qihse: Deprecated (QIHSE is always used)
+            query_embedding: Precomputed embedding of ``query`` (skips encoding)
 
         Returns:
             List of similar messages with scores
         """
         try:
             # Generate query embedding
-            query_embedding = self.embed_message(query)
+            if query_embedding is None:
+                query_embedding = self.embed_message(query)
 
             # Build filters
             filters = {}
@@ -518,13 +1010,21 @@ class HybridSearchEngine:
     Enhanced hybrid search engine combining KEYSTONE + QIHSE + FTS5.
 
     Strategy:
-    1. Execute KEYSTONE for structured data (timestamps, IDs)
-    2. Execute QIHSE for semantic/vector searches
-    3. Execute FTS5 for keyword searches
-    4. Intelligently combine and rank results
-    5. Return unified result set with algorithm metadata
+    1. Fan the query out to KEYSTONE (timestamps, IDs), QIHSE (semantic) and
+       FTS5 (keyword) concurrently, each with its own deadline
+    2. Fuse the per-backend rankings with reciprocal rank fusion (the
+       default), which waits for every backend or its deadline; min-max
+       score normalisation instead returns early once slower backends can
+       no longer change the top-k
+    3. Return unified result set with algorithm metadata
+
+    FTS5 runs on the calling thread because it shares the caller's SQLite
+    connection; its deadline is enforced with ``Connection.interrupt()``.
+    KEYSTONE and QIHSE run in a small thread pool.
     """
 
+    BACKEND_WEIGHTS = {"keystone": 1.0, "fts5": 1.0, "qihse": 1.0}
+
     def __init__(
         self,
         db_connection,
@@ -532,6 +1032,14 @@ class HybridSearchEngine:
         use_keystone: bool = True,
         use_qihse: bool = True,  # QIHSE is primary, always enabled
         cache_manager=None,
+        fusion: str = "rrf",
+        rrf_k: int = RRF_K,
+        backend_timeout: float = 2.0,
+        backend_timeouts: Optional[Dict[str, float]] = None,
+        backend_weights: Optional[Dict[str, float]] = None,
+        max_workers: int = 4,
+        fts5_options: Optional[Dict[str, Any]] = None,
+        fts5_migrate: bool = False,
     ):
         """
         Initialize enhanced hybrid search engine.
@@ -542,10 +1050,42 @@ class HybridSearchEngine:
             use_keystone: Enable KEYSTONE optimizations
             use_qihse: Enable QIHSE (always True, QIHSE is primary)
             cache_manager: Optional CacheManager instance
+            fusion: "rrf" (reciprocal rank fusion) or "normalized" (min-max scores)
+            rrf_k: RRF rank constant
+            backend_timeout: Seconds each backend may take before it is dropped
+            backend_timeouts: Per-backend overrides of ``backend_timeout``
+                (keys: "keystone", "fts5", "qihse")
+            backend_weights: Per-backend fusion weights (default 1.0 each)
+            max_workers: Threads used for the concurrent backends
+            fts5_options: Keyword arguments for SQLiteFTS5IndexManager
+                (tokenizer, prefix, trigram, merge tuning)
+            fts5_migrate: Create/recreate the FTS5 indexes to match
+                *fts5_options* (writes to the database; off for read paths)
         """
-        self.fts5 = SQLiteFTS5IndexManager(db_connection)
+        if fusion not in ("rrf", "normalized"):
+            raise ValueError(f"Unknown fusion strategy: {fusion}")
+        self.fts5 = SQLiteFTS5IndexManager(db_connection, **(fts5_options or {}))
+        if fts5_migrate:
+            self.fts5.migrate()
         self.vector = QIHSEVectorManager(vector_store_path=vector_store_path)
         self.cache = cache_manager
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.backend_timeouts = {name: backend_timeout for name in self.BACKEND_WEIGHTS}
+        self.backend_timeouts.update(backend_timeouts or {})
+        self.backend_weights = dict(self.BACKEND_WEIGHTS)
+        self.backend_weights.update(backend_weights or {})
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # backend name -> call still running after it was given up on
+        self._abandoned: Dict[str, Future] = {}
+        self.stats = {
+            'searches': 0,
+            'early_returns': 0,
+            'backend_timeouts': 0,
+            'backend_errors': 0,
+            'backend_skips': 0,
+        }
         
         # Initialize KEYSTONE engines
         self.keystone_timestamp = None
@@ -565,6 +1105,18 @@ class HybridSearchEngine:
             except ImportError:
                 logger.warning("KEYSTONE not available for hybrid search")
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hybrid-search")
+        return self._executor
+
+    def close(self):
+        """Stop the backend thread pool (queued backend calls are cancelled)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._abandoned.clear()
+
     def search(
         self,
         query: str,
@@ -607,132 +1159,55 @@ class HybridSearchEngine:
             if cached_results:
                 logger.debug("Cache hit for search query")
                 return cached_results
-        
-        results = {}
 
-        # 1. KEYSTONE for structured data (timestamps, IDs)
-        if (date_from or date_to) and self.keystone_timestamp:
-            try:
-                from ..db import SpectraDB
-                if isinstance(self.fts5.db, SpectraDB):
-                    start_ts = int(date_from.timestamp()) if date_from else None
-                    end_ts = int(date_to.timestamp()) if date_to else None
-                    
-                    if start_ts and end_ts:
-                        message_ids = self.fts5.db.find_messages_by_timestamp_range(
-                            start_ts, end_ts, filter_channel
-                        )
-                        
-                        # Get message data and add to results
-                        for msg_id in message_ids[:limit * 2]:
-                            msg_data = self.fts5.db.find_message_by_id_fast(msg_id, filter_channel)
-                            if msg_data:
-                                results[msg_id] = {
-                                    "message_id": msg_data['id'],
-                                    "channel_id": filter_channel,
-                                    "user_id": msg_data.get('user_id'),
-                                    "content": msg_data.get('content', ''),
-                                    "date": msg_data['date'],
-                                    "keystone_score": 1.0,  # Perfect match for temporal
-                                }
-            except Exception as e:
-                logger.debug(f"KEYSTONE temporal search failed: {e}")
+        self.stats['searches'] += 1
 
-        # Message ID lookup with KEYSTONE
-        if query.isdigit() and self.keystone_message_id:
-            try:
-                from ..db import SpectraDB
-                if isinstance(self.fts5.db, SpectraDB):
-                    msg_id = int(query)
-                    msg_data = self.fts5.db.find_message_by_id_fast(msg_id, filter_channel)
-                    if msg_data:
-                        results[msg_id] = {
-                            "message_id": msg_data['id'],
-                            "channel_id": filter_channel,
-                            "user_id": msg_data.get('user_id'),
-                            "content": msg_data.get('content', ''),
-                            "date": msg_data['date'],
-                            "keystone_score": 1.0,
-                        }
-            except Exception as e:
-                logger.debug(f"KEYSTONE ID search failed: {e}")
+        # 1. KEYSTONE (structured data) and QIHSE (semantic) run in the pool
+        pooled = {}
+        if ((date_from or date_to) and self.keystone_timestamp) or (query.isdigit() and self.keystone_message_id):
+            pooled["keystone"] = partial(self._search_keystone, query, limit, filter_channel, date_from, date_to)
+        if search_type in (SearchType.SEMANTIC, SearchType.HYBRID):
+            pooled["qihse"] = partial(self._search_qihse, query, limit, filter_channel, filter_user)
 
-        # 2. FTS5 keyword search
+        # 2. FTS5 keyword search on this thread (shares the caller's connection)
+        inline = None
         if search_type in (SearchType.KEYWORD, SearchType.HYBRID):
-            fts5_results = self.fts5.search_messages(
-                query,
-                limit=limit * 2,
-                filter_channel=filter_channel,
-                filter_user=filter_user,
-            )
+            inline = ("fts5", partial(self._search_fts5, query, limit, filter_channel, filter_user))
 
-            for row in fts5_results:
-                msg_id = row[0]
-                if msg_id in results:
-                    results[msg_id]["keyword_score"] = abs(row[6])
-                else:
-                    results[msg_id] = {
-                        "message_id": row[0],
-                        "channel_id": row[1],
-                        "user_id": row[2],
-                        "content": row[3],
-                        "date": row[4],
-                        "type": row[5],
-                        "keyword_score": abs(row[6]),
-                    }
-
-        # 3. QIHSE/Qdrant semantic search
-        if search_type in (SearchType.SEMANTIC, SearchType.HYBRID):
-            vector_results = self.vector.search_semantic(
-                query,
-                limit=limit * 2,
-                filter_channel=filter_channel,
-                filter_user=filter_user,
-                use_qihse=True,  # Use QIHSE acceleration
-            )
+        rankings = self._run_backends(pooled, inline, limit)
 
-            for result in vector_results:
-                msg_id = result["message_id"]
-                if msg_id in results:
-                    results[msg_id]["qihse_score"] = result["relevance_score"]
-                else:
-                    results[msg_id] = result.copy()
-                    results[msg_id]["qihse_score"] = result["relevance_score"]
+        # 3. Fuse the per-backend rankings
+        docs: Dict[Any, Dict[str, Any]] = {}
+        for backend, hits in rankings.items():
+            for hit in hits:
+                data = docs.setdefault(hit["message_id"], {"scores": {}})
+                for key, value in hit.items():
+                    if key != "score":
+                        data.setdefault(key, value)
+                data["scores"].setdefault(backend, hit["score"])
 
-        # Combine and rank results with intelligent weighting
+        fused = self._fuse(rankings)
         combined = []
-        for msg_id, data in results.items():
-            # Normalize scores
-            keystone_score = data.get("keystone_score", 0) * 0.2
-            keyword_score = data.get("keyword_score", 0) / 100.0 * 0.3
-            qihse_score = data.get("qihse_score", 0) * 0.5
-
-            # Combined relevance score
-            combined_score = keystone_score + keyword_score + qihse_score
-
+        for msg_id, score in top_k(fused, limit):
+            data = docs[msg_id]
+            scores = data["scores"]
             combined.append(SearchResult(
                 message_id=data["message_id"],
                 channel_id=data.get("channel_id"),
                 user_id=data.get("user_id"),
                 content=data.get("content", ""),
                 date=datetime.fromisoformat(data["date"]) if isinstance(data["date"], str) else data["date"],
-                relevance_score=combined_score,
+                relevance_score=score,
                 match_type=search_type,
                 metadata={
-                    "keystone_score": keystone_score,
-                    "keyword_score": keyword_score,
-                    "qihse_score": qihse_score,
-                    "algorithms": [
-                        "keystone" if data.get("keystone_score") else None,
-                        "fts5" if data.get("keyword_score") else None,
-                        "qihse" if data.get("qihse_score") else None,
-                    ],
+                    "keystone_score": scores.get("keystone", 0.0),
+                    "keyword_score": scores.get("fts5", 0.0),
+                    "qihse_score": scores.get("qihse", 0.0),
+                    "fusion": self.fusion,
+                    "algorithms": [backend for backend in ("keystone", "fts5", "qihse") if backend in scores],
                 },
             ))
-
-        # Sort by combined relevance and return top results
-        combined.sort(key=lambda x: x.relevance_score, reverse=True)
-        final_results = combined[:limit]
+        final_results = combined
         
         # Cache results
         if self.cache:
@@ -753,6 +1228,200 @@ class HybridSearchEngine:
         
         return final_results
 
+    # Fan-out -----------------------------------------------------------------
+    def _fuse(self, rankings: Dict[str, List[Dict[str, Any]]]) -> Dict[Any, float]:
+        lists = {
+            backend: [(hit["message_id"], hit["score"]) for hit in hits]
+            for backend, hits in rankings.items()
+        }
+        if self.fusion == "rrf":
+            return reciprocal_rank_fusion(lists, k=self.rrf_k, weights=self.backend_weights)
+        return normalized_score_fusion(lists, weights=self.backend_weights)
+
+    def _run_backends(
+        self,
+        pooled: Dict[str, Callable[[], List[Dict[str, Any]]]],
+        inline: Optional[Tuple[str, Callable[[], List[Dict[str, Any]]]]],
+        limit: int,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run *pooled* backends concurrently and *inline* on this thread.
+
+        Backends past their deadline are dropped.  With normalized fusion the
+        remaining ones are also abandoned as soon as they can no longer change
+        the fused top-*limit*; under RRF any pending backend can still lift an
+        outsider by ``weight / (k + 1)``, which no realistic gap exceeds, so
+        every backend is waited for until its deadline.
+
+        A backend whose abandoned call from an earlier search is still running
+        is skipped, so hung calls hold at most one worker each.
+        """
+        start = time.monotonic()
+        futures = {}
+        for name, fn in pooled.items():
+            stuck = self._abandoned.get(name)
+            if stuck is not None and not stuck.done():
+                self.stats['backend_skips'] += 1
+                logger.warning(f"Skipping {name} search; its previous call is still running")
+                continue
+            self._abandoned.pop(name, None)
+            futures[self._get_executor().submit(fn)] = name
+        rankings: Dict[str, List[Dict[str, Any]]] = {}
+        if inline is not None:
+            rankings[inline[0]] = self._run_inline(*inline)
+
+        pending = set(futures)
+        while pending:
+            bound = sum(
+                max_contribution(self.fusion, self.backend_weights.get(futures[f], 1.0), self.rrf_k)
+                for f in pending
+            )
+            if self.fusion != "rrf" and rankings and topk_settled(self._fuse(rankings), limit, bound):
+                self.stats['early_returns'] += 1
+                logger.debug(f"Top-{limit} settled; not waiting for {sorted(futures[f] for f in pending)}")
+                break
+
+            deadline = min(start + self.backend_timeouts.get(futures[f], 0.0) for f in pending)
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    rankings[name] = future.result()
+                except Exception as e:
+                    self.stats['backend_errors'] += 1
+                    logger.warning(f"{name} search failed: {e}")
+                    rankings[name] = []
+
+            now = time.monotonic()
+            for future in list(pending):
+                name = futures[future]
+                if now >= start + self.backend_timeouts.get(name, 0.0):
+                    pending.discard(future)
+                    self._abandon(name, future)
+                    self.stats['backend_timeouts'] += 1
+                    logger.warning(f"{name} search exceeded its {self.backend_timeouts.get(name, 0.0):.2f}s deadline")
+
+        for future in pending:
+            self._abandon(futures[future], future)
+        return rankings
+
+    def _abandon(self, name: str, future: Future) -> None:
+        """Cancel *future*, or remember it if it is already running."""
+        if not future.cancel():
+            self._abandoned[name] = future
+
+    def _run_inline(self, name: str, fn: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        timeout = self.backend_timeouts.get(name, 0.0)
+        conn = getattr(self.fts5.conn, "conn", self.fts5.conn)
+        interrupt = getattr(conn, "interrupt", None)
+        timer = None
+        if callable(interrupt) and timeout > 0:
+            timer = threading.Timer(timeout, interrupt)
+            timer.daemon = True
+            timer.start()
+        start = time.monotonic()
+        try:
+            return fn()
+        except Exception as e:
+            self.stats['backend_errors'] += 1
+            logger.warning(f"{name} search failed: {e}")
+            return []
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if timeout > 0 and time.monotonic() - start >= timeout:
+                self.stats['backend_timeouts'] += 1
+                logger.warning(f"{name} search exceeded its {timeout:.2f}s deadline")
+
+    # Backends ----------------------------------------------------------------
+    def _search_keystone(
+        self,
+        query: str,
+        limit: int,
+        filter_channel: Optional[int],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+    ) -> List[Dict[str, Any]]:
+        """KEYSTONE temporal range and message ID lookups, exact matches scored 1.0."""
+        from ..db import SpectraDB
+
+        db = getattr(self.fts5, "db", None)
+        if not isinstance(db, SpectraDB):
+            return []
+        hits = []
+
+        # Message ID lookup first: an exact ID is the strongest signal
+        if query.isdigit() and self.keystone_message_id:
+            msg_data = db.find_message_by_id_fast(int(query), filter_channel)
+            if msg_data:
+                hits.append(self._keystone_hit(msg_data, filter_channel))
+
+        if date_from and date_to and self.keystone_timestamp:
+            message_ids = db.find_messages_by_timestamp_range(
+                int(date_from.timestamp()), int(date_to.timestamp()), filter_channel
+            )
+            for msg_id in message_ids[:limit * 2]:
+                msg_data = db.find_message_by_id_fast(msg_id, filter_channel)
+                if msg_data:
+                    hits.append(self._keystone_hit(msg_data, filter_channel))
+        return hits
+
+    @staticmethod
+    def _keystone_hit(msg_data: Dict[str, Any], filter_channel: Optional[int]) -> Dict[str, Any]:
+        return {
+            "message_id": msg_data['id'],
+            "channel_id": filter_channel,
+            "user_id": msg_data.get('user_id'),
+            "content": msg_data.get('content', ''),
+            "date": msg_data['date'],
+            "score": 1.0,
+        }
+
+    def _search_fts5(
+        self,
+        query: str,
+        limit: int,
+        filter_channel: Optional[int],
+        filter_user: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        """FTS5 keyword search, BM25 ranked."""
+        rows = self.fts5.search_messages(
+            query,
+            limit=limit * 2,
+            filter_channel=filter_channel,
+            filter_user=filter_user,
+        )
+        return [
+            {
+                "message_id": row[0],
+                "channel_id": row[1],
+                "user_id": row[2],
+                "content": row[3],
+                "date": row[4],
+                "type": row[5],
+                "score": abs(row[6]),
+            }
+            for row in rows
+        ]
+
+    def _search_qihse(
+        self,
+        query: str,
+        limit: int,
+        filter_channel: Optional[int],
+        filter_user: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        """QIHSE semantic search, cosine ranked."""
+        hits = self.vector.search_semantic(
+            query,
+            limit=limit * 2,
+            filter_channel=filter_channel,
+            filter_user=filter_user,
+            use_qihse=True,  # Use QIHSE acceleration
+        )
+        return [dict(hit, score=hit["relevance_score"]) for hit in hits]
+
     def search_batch(
         self,
         queries: List[str],
@@ -796,24 +1465,8 @@ class HybridSearchEngine:
             try:
                 from ..db import SpectraDB
                 if isinstance(self.fts5.db, SpectraDB):
-                    # Get sorted timestamps
-                    query_sql = "SELECT id, date FROM messages ORDER BY date"
-                    if filter_channel:
-                        query_sql = "SELECT id, date FROM messages WHERE channel_id = ? ORDER BY date"
-                    
-                    rows = self.fts5.db.cur.execute(
-                        query_sql, (filter_channel,) if filter_channel else ()
-                    ).fetchall()
-                    
-                    timestamps = []
-                    message_ids = []
-                    for row_id, date_str in rows:
-                        try:
-                            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                            timestamps.append(int(dt.timestamp()))
-                            message_ids.append(row_id)
-                        except:
-                            continue
+                    # Sorted int64 timestamps resident in the DB's time index
+                    timestamps, message_ids = self.fts5.db.time_index.series(filter_channel or None)
                     
                     # Use KEYSTONE batch parallel search
                     for query in timestamp_queries:
@@ -836,7 +1489,7 @@ class HybridSearchEngine:
                             query_results = []
                             for idx in batch_results:
                                 if idx is not None and idx < len(message_ids):
-                                    msg_id = message_ids[idx]
+                                    msg_id = int(message_ids[idx])
                                     msg_data = self.fts5.db.find_message_by_id_fast(msg_id, filter_channel)
                                     if msg_data:
                                         query_results.append(SearchResult(
@@ -860,15 +1513,15 @@ class HybridSearchEngine:
         # Process semantic queries with QIHSE batch search
         if semantic_queries:
             try:
-                # Use QIHSE vector store for batch search
-                # Batch search processes queries individually
-                # QIHSEVectorStore supports batch operations via batch_search_vectors when available
-                for query in semantic_queries:
+                # Encode every semantic query in one forward pass, then search per query
+                query_embeddings = self.vector.embed_messages(semantic_queries)
+                for query, query_embedding in zip(semantic_queries, query_embeddings):
                     query_results = self.vector.search_semantic(
                         query,
                         limit=limit_per_query,
                         filter_channel=filter_channel,
                         filter_user=filter_user,
+                        query_embedding=query_embedding,
                     )
                     
                     # Convert to SearchResult format
@@ -900,6 +1553,8 @@ class HybridSearchEngine:
         stats = {
             "fts5": self.fts5.get_statistics(),
             "vector": self.vector.get_statistics(),
+            "embedding_cache": self.vector.embedding_cache.get_statistics(),
+            "fusion": dict(self.stats, strategy=self.fusion),
         }
         
         if self.keystone_timestamp:
@@ -18,9 +18,11 @@ from ctypes import (
     POINTER, Structure, c_int, c_bool, byref
 )
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Constants from keystone.h
@@ -235,6 +237,13 @@ if _lib is not None:
     _lib.keystone_build_info.restype = ctypes.c_char_p
 
 
+def _c_int64_array(arr: Sequence[int]):
+    """C view of *arr*: zero-copy for contiguous int64 NumPy arrays, copied otherwise."""
+    if isinstance(arr, np.ndarray) and arr.dtype == np.int64 and arr.flags["C_CONTIGUOUS"]:
+        return arr.ctypes.data_as(POINTER(c_int64))
+    return (c_int64 * len(arr))(*arr)
+
+
 def keystone_available() -> bool:
     """Check if KEYSTONE library is available"""
     return _lib is not None
@@ -272,24 +281,24 @@ class KeystoneSearchEngine:
         if self.anchor_table and _lib:
             _lib.keystone_anchor_table_destroy(self.anchor_table)
     
-    def search(self, arr: List[int], key: int, tolerance: int = 8) -> Optional[int]:
+    def search(self, arr: Sequence[int], key: int, tolerance: int = 8) -> Optional[int]:
         """
         Search for key in sorted array using KEYSTONE
         
         Args:
-            arr: Sorted array of integers
+            arr: Sorted array of integers (int64 NumPy arrays are passed without copying)
             key: Value to search for
             tolerance: Search tolerance (8-16 recommended)
         
         Returns:
             Index of found element, or None if not found
         """
-        if not arr or not self.anchor_table:
+        if len(arr) == 0 or not self.anchor_table:
             return None
         
         # Convert Python list to C array
         n = len(arr)
-        c_arr = (c_int64 * n)(*arr)
+        c_arr = _c_int64_array(arr)
         
         # Perform search
         result = _lib.keystone_search(
@@ -301,19 +310,19 @@ class KeystoneSearchEngine:
         
         return int(result)
     
-    def search_enhanced(self, arr: List[int], key: int, config: Optional[dict] = None) -> Optional[int]:
+    def search_enhanced(self, arr: Sequence[int], key: int, config: Optional[dict] = None) -> Optional[int]:
         """
         Enhanced search with configuration
         
         Args:
-            arr: Sorted array of integers
+            arr: Sorted array of integers (int64 NumPy arrays are passed without copying)
             key: Value to search for
             config: Optional configuration dict
         
         Returns:
             Index of found element, or None if not found
         """
-        if not arr or not self.anchor_table:
+        if len(arr) == 0 or not self.anchor_table:
             return None
         
         # Create config structure
@@ -326,7 +335,7 @@ class KeystoneSearchEngine:
             keystone_config.enable_anchor_learning = 1
         
         n = len(arr)
-        c_arr = (c_int64 * n)(*arr)
+        c_arr = _c_int64_array(arr)
         
         result = _lib.keystone_search_enhanced(
             c_arr, n, c_int64(key), self.anchor_table, byref(keystone_config)
@@ -337,26 +346,26 @@ class KeystoneSearchEngine:
         
         return int(result)
     
-    def search_batch(self, arr: List[int], keys: List[int], tolerance: int = 8) -> List[Optional[int]]:
+    def search_batch(self, arr: Sequence[int], keys: List[int], tolerance: int = 8) -> List[Optional[int]]:
         """
         Batch search for multiple keys
         
         Args:
-            arr: Sorted array of integers
+            arr: Sorted array of integers (int64 NumPy arrays are passed without copying)
             keys: List of keys to search for
             tolerance: Search tolerance
         
         Returns:
             List of indices (None if not found)
         """
-        if not arr or not keys or not self.anchor_table:
+        if len(arr) == 0 or not keys or not self.anchor_table:
             return [None] * len(keys)
         
         n = len(arr)
         num_keys = len(keys)
         
         # Create C array for data
-        c_arr = (c_int64 * n)(*arr)
+        c_arr = _c_int64_array(arr)
         
         # Create batch items
         batch_items = (KeystoneBatchItem * num_keys)()
@@ -379,13 +388,13 @@ class KeystoneSearchEngine:
         
         return results
     
-    def search_parallel(self, arr: List[int], keys: List[int], 
+    def search_parallel(self, arr: Sequence[int], keys: List[int], 
                        num_threads: int = 0, tolerance: int = 8) -> List[Optional[int]]:
         """
         Parallel batch search across multiple threads
         
         Args:
-            arr: Sorted array of integers
+            arr: Sorted array of integers (int64 NumPy arrays are passed without copying)
             keys: List of keys to search for
             num_threads: Number of threads (0 = auto-detect)
             tolerance: Search tolerance
@@ -393,14 +402,14 @@ class KeystoneSearchEngine:
         Returns:
             List of indices (None if not found)
         """
-        if not arr or not keys or not self.anchor_table:
+        if len(arr) == 0 or not keys or not self.anchor_table:
             return [None] * len(keys)
         
         n = len(arr)
         num_keys = len(keys)
         
         # Create C array for data
-        c_arr = (c_int64 * n)(*arr)
+        c_arr = _c_int64_array(arr)
         
         # Create batch items
         batch_items = (KeystoneBatchItem * num_keys)()
@@ -0,0 +1,328 @@
+"""
+Local Tiered Cache
+==================
+
+In-process cache backend for :class:`~tgarchive.search.cache_manager.CacheManager`.
+
+- **Memory tier**: an LRU of live Python objects with per-entry TTLs, bounded
+  by an approximate byte budget (the pickled size of each value).  A hit
+  returns the cached object itself, with no network round-trip or unpickling,
+  so callers must treat cached values as read-only.
+- **Disk tier** (optional): an SQLite table of pickled values with its own
+  byte budget.  It is read through ``PRAGMA mmap_size`` so hot pages come
+  straight from the page cache.  Entries evicted from memory stay there, and
+  the tier survives restarts.
+
+Works without Redis or Memcached, e.g. on air-gapped analysis hosts, and
+sits in front of them as an L1 when they are available.
+"""
+
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Byte-bounded two-tier (memory LRU + SQLite) cache with TTLs.
+
+    Thread-safe; the hybrid engine reads it from its backend worker pool.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: int = 3600,
+        path: Optional[Union[str, Path]] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        mmap_size: int = 256 * 1024 * 1024,
+    ):
+        """
+        Initialize the local cache.
+
+        Args:
+            max_bytes: Memory tier budget in bytes (0 disables the memory tier)
+            default_ttl: TTL in seconds for entries set without one
+            path: SQLite file for the disk tier (None = memory only)
+            disk_max_bytes: Disk tier budget in bytes
+            mmap_size: Bytes of the disk tier SQLite maps into memory for reads
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key         TEXT PRIMARY KEY,
+                    value       BLOB NOT NULL,
+                    size        INTEGER NOT NULL,
+                    expires_at  REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache(accessed_at);
+            """)
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'expired': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    # Reads ----------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for *key*, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Cached values for those of *keys* that are present and fresh."""
+        now = time.time()
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                value = self._memory_get(key, now)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
+                    self.stats['memory_hits'] += 1
+
+            if missing and self._conn is not None:
+                for key, blob, size, expires_at in self._disk_get(missing, now):
+                    try:
+                        value = pickle.loads(blob)
+                    except Exception as e:
+                        logger.debug(f"Dropping unreadable local cache entry {key}: {e}")
+                        self._disk_delete([key])
+                        continue
+                    found[key] = value
+                    self.stats['disk_hits'] += 1
+                    self._memory_put(key, value, expires_at, size)
+
+            self.stats['misses'] += sum(1 for key in missing if key not in found)
+        return found
+
+    # Writes ---------------------------------------------------------------
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, blob: Optional[bytes] = None) -> bool:
+        """
+        Cache *value* under *key* for *ttl* seconds.
+
+        *blob* is ``pickle.dumps(value)`` when the caller already has it.
+        """
+        return self.set_many({key: value}, ttl, blobs={key: blob} if blob is not None else None)
+
+    def set_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Optional[int] = None,
+        blobs: Optional[Mapping[str, bytes]] = None,
+    ) -> bool:
+        """Cache every ``key -> value`` of *items* with the same TTL."""
+        now = time.time()
+        expires_at = now + (ttl or self.default_ttl)
+        rows = []
+        with self._lock:
+            for key, value in items.items():
+                blob = blobs.get(key) if blobs else None
+                if blob is None:
+                    try:
+                        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    except Exception as e:
+                        logger.debug(f"Value for {key} is not cacheable: {e}")
+                        continue
+                self._memory_put(key, value, expires_at, len(blob))
+                rows.append((key, blob, len(blob), expires_at))
+                self.stats['sets'] += 1
+            if rows and self._conn is not None:
+                self._disk_put(rows, now)
+        return bool(rows)
+
+    def delete(self, key: str) -> bool:
+        """Remove *key* from both tiers."""
+        with self._lock:
+            found = self._memory_drop(key)
+            if self._conn is not None:
+                found = self._disk_delete([key]) or found
+        return found
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with *prefix*; returns how many were removed."""
+        with self._lock:
+            keys = [key for key in self._memory if key.startswith(prefix)]
+            for key in keys:
+                self._memory_drop(key)
+            removed = set(keys)
+            if self._conn is not None:
+                rows = self._conn.execute(
+                    "SELECT key FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                ).fetchall()
+                self._disk_delete([row[0] for row in rows])
+                removed.update(row[0] for row in rows)
+        return len(removed)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM cache")
+                self._conn.commit()
+                self._disk_bytes = 0
+
+    def close(self) -> None:
+        """Close the disk tier; the memory tier stays usable."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit counters and tier occupancy."""
+        return {
+            **self.stats,
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'max_bytes': self.max_bytes,
+            'disk_bytes': self._disk_bytes,
+            'disk_max_bytes': self.disk_max_bytes if self._conn is not None else 0,
+        }
+
+    # Memory tier (callers hold the lock) ------------------------------------
+
+    def _memory_get(self, key: str, now: float) -> Any:
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at, _size = entry
+        if expires_at <= now:
+            self._memory_drop(key)
+            self.stats['expired'] += 1
+            return _MISSING
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Any, expires_at: float, size: int) -> None:
+        self._memory_drop(key)
+        if size > self.max_bytes:
+            # larger than the whole tier; leave it to disk
+            return
+        self._memory[key] = (value, expires_at, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_bytes:
+            _key, (_value, _expires_at, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted
+            self.stats['evictions'] += 1
+
+    def _memory_drop(self, key: str) -> bool:
+        entry = self._memory.pop(key, None)
+        if entry is None:
+            return False
+        self._memory_bytes -= entry[2]
+        return True
+
+    # Disk tier (callers hold the lock) --------------------------------------
+
+    def _disk_get(self, keys: List[str], now: float) -> List[Tuple[str, bytes, int, float]]:
+        rows = []
+        # stay under SQLite's default host parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows.extend(self._conn.execute(
+                f"SELECT key, value, size, expires_at FROM cache WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        fresh = [row for row in rows if row[3] > now]
+        stale = [row[0] for row in rows if row[3] <= now]
+        if stale:
+            self.stats['expired'] += len(stale)
+            self._disk_delete(stale, commit=False)
+        if fresh:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", [(now, row[0]) for row in fresh]
+            )
+        if fresh or stale:
+            self._conn.commit()
+        return fresh
+
+    def _disk_put(self, rows: List[Tuple[str, bytes, int, float]], now: float) -> None:
+        rows = [row for row in rows if row[2] <= self.disk_max_bytes]
+        if not rows:
+            return
+        self._disk_delete([row[0] for row in rows], commit=False)
+        self._conn.executemany(
+            "INSERT INTO cache(key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            [(*row, now) for row in rows],
+        )
+        self._disk_bytes += sum(row[2] for row in rows)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._disk_evict(now)
+        self._conn.commit()
+
+    def _disk_evict(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM cache WHERE expires_at <= ? RETURNING size", (now,))
+        freed = [row[0] for row in cur.fetchall()]
+        self.stats['expired'] += len(freed)
+        self._disk_bytes -= sum(freed)
+        while self._disk_bytes > self.disk_max_bytes:
+            # least recently read first, only as many as the budget needs
+            excess = self._disk_bytes - self.disk_max_bytes
+            victims = []
+            for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT 64"):
+                victims.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            if not victims:
+                self._disk_bytes = 0
+                break
+            self.stats['evictions'] += len(victims)
+            self._disk_delete(victims, commit=False)
+
+    def _disk_delete(self, keys: List[str], commit: bool = True) -> bool:
+        removed = False
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cur = self._conn.execute(
+                f"DELETE FROM cache WHERE key IN ({','.join('?' * len(chunk))}) RETURNING size", chunk
+            )
+            freed = [row[0] for row in cur.fetchall()]
+            self._disk_bytes -= sum(freed)
+            removed = removed or bool(freed)
+        if commit:
+            self._conn.commit()
+        return removed
+
+
+__all__ = ["LocalCache"]
@@ -0,0 +1,109 @@
+"""
+Rank Fusion for Hybrid Search
+=============================
+
+Combines the ranked result lists of several search backends (KEYSTONE, FTS5,
+QIHSE) into one ranking without comparing their raw scores, which live on
+unrelated scales (BM25 is unbounded, cosine similarity is 0-1).
+
+Two strategies are provided:
+
+- Reciprocal rank fusion (RRF): a document at 1-based rank *r* in a backend's
+  list contributes ``weight / (k + r)``.  Only ranks matter, so no backend
+  can dominate by score magnitude.
+- Score normalisation: each backend's scores are min-max scaled to 0-1 and
+  summed with the backend weights.
+
+:func:`topk_settled` tells whether results still outstanding from slower
+backends could change the membership of the current top-k, which lets the
+hybrid engine return early.
+"""
+
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+RRF_K = 60
+
+Ranking = Sequence[Tuple[Hashable, float]]
+
+
+def reciprocal_rank_fusion(
+    rankings: Mapping[str, Ranking],
+    k: int = RRF_K,
+    weights: Optional[Mapping[str, float]] = None,
+) -> Dict[Hashable, float]:
+    """Fused RRF score per document from ``{backend: [(doc_id, score), ...]}`` (best first)."""
+    fused: Dict[Hashable, float] = {}
+    for backend, ranking in rankings.items():
+        weight = weights.get(backend, 1.0) if weights else 1.0
+        seen = set()
+        rank = 0
+        for doc_id, _score in ranking:
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            rank += 1
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return fused
+
+
+def normalized_score_fusion(
+    rankings: Mapping[str, Ranking],
+    weights: Optional[Mapping[str, float]] = None,
+) -> Dict[Hashable, float]:
+    """Fused score per document after min-max scaling each backend's scores to 0-1."""
+    fused: Dict[Hashable, float] = {}
+    for backend, ranking in rankings.items():
+        if not ranking:
+            continue
+        weight = weights.get(backend, 1.0) if weights else 1.0
+        best: Dict[Hashable, float] = {}
+        for doc_id, score in ranking:
+            if doc_id not in best or score > best[doc_id]:
+                best[doc_id] = score
+        low, high = min(best.values()), max(best.values())
+        span = high - low
+        for doc_id, score in best.items():
+            # a single-valued list carries no spread; every hit counts fully
+            scaled = (score - low) / span if span else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * scaled
+    return fused
+
+
+def top_k(fused: Mapping[Hashable, float], limit: int) -> List[Tuple[Hashable, float]]:
+    """The *limit* best ``(doc_id, score)`` pairs, highest score first."""
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def topk_settled(fused: Mapping[Hashable, float], limit: int, pending_bound: float) -> bool:
+    """
+    Whether the top-*limit* membership of *fused* is final.
+
+    *pending_bound* is the most any single document can still gain from the
+    backends that have not answered yet.  The top-k cannot change if its
+    weakest member already beats the strongest outsider (an unseen document
+    counts as 0) by more than that.
+    """
+    if pending_bound <= 0:
+        return True
+    ranked = sorted(fused.values(), reverse=True)
+    if len(ranked) < limit:
+        return False
+    outsider = ranked[limit] if len(ranked) > limit else 0.0
+    return ranked[limit - 1] - outsider > pending_bound
+
+
+def max_contribution(strategy: str, weight: float = 1.0, k: int = RRF_K) -> float:
+    """Upper bound on what one backend can add to a document's fused score."""
+    if strategy == "rrf":
+        return weight / (k + 1)
+    return weight
+
+
+__all__ = [
+    "RRF_K",
+    "reciprocal_rank_fusion",
+    "normalized_score_fusion",
+    "top_k",
+    "topk_settled",
+    "max_contribution",
+]
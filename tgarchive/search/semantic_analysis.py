@@ -616,28 +616,25 @@ class CorrelationEngine:
         try:
             # Get source message timestamp
             result = self.db.execute(
-                "SELECT date FROM messages WHERE id = ?",
+                "SELECT date_ts FROM messages WHERE id = ?",
                 (message_id,),
             ).fetchone()
 
-            if not result:
+            if not result or result[0] is None:
                 logger.warning(f"Message {message_id} not found in database")
                 return []
 
-            source_date = result[0]
+            source_ts = result[0]
 
             # Find messages in time window
-            from datetime import timedelta
-            start_time = source_date - timedelta(hours=time_window_hours / 2)
-            end_time = source_date + timedelta(hours=time_window_hours / 2)
-
+            half_window = int(time_window_hours * 3600 / 2)
             results = self.db.execute(
                 """
                 SELECT id FROM messages
-                WHERE id != ? AND date BETWEEN ? AND ?
+                WHERE id != ? AND date_ts BETWEEN ? AND ?
                 LIMIT ?
                 """,
-                (message_id, start_time, end_time, limit),
+                (message_id, source_ts - half_window, source_ts + half_window, limit),
             ).fetchall()
 
             # Create correlation objects
@@ -121,11 +121,13 @@ class TemporalSemanticSearch:
         # Fallback to SQL if KEYSTONE unavailable
         if not message_ids:
             try:
+                from ..db.schema import epoch_seconds
+
                 query_sql = """
                     SELECT id FROM messages 
-                    WHERE date >= ? AND date <= ?
+                    WHERE date_ts >= ? AND date_ts <= ?
                 """
-                params = [start_time.isoformat(), end_time.isoformat()]
+                params = [epoch_seconds(start_time), epoch_seconds(end_time)]
                 if channel_id:
                     query_sql += " AND channel_id = ?"
                     params.append(channel_id)
@@ -23,6 +23,7 @@ from telethon.errors import (
 )
 from tgarchive.core.config_models import Config
 from tgarchive.db.spectra_db import SpectraDB
+from tgarchive.forwarding.client import ClientManager
 
 if not hasattr(functions.channels, "GetForumTopicsRequest"):
     class GetForumTopicsRequest:  # pragma: no cover - compatibility shim
@@ -50,7 +51,14 @@ class GroupMirrorManager:
     Manages the mirroring of one group to another using two separate accounts.
     """
 
-    def __init__(self, config: Config, db: SpectraDB, source_account_id: str, dest_account_id: str):
+    def __init__(
+        self,
+        config: Config,
+        db: SpectraDB,
+        source_account_id: str,
+        dest_account_id: str,
+        client_manager: Optional[ClientManager] = None,
+    ):
         """
         Initializes the GroupMirrorManager.
 
@@ -58,11 +66,14 @@ class GroupMirrorManager:
         :param db: The application's database object.
         :param source_account_id: The session name or phone number for the source account.
         :param dest_account_id: The session name or phone number for the destination account.
+        :param client_manager: Optional client pool to lease both clients from; they are
+            returned to the pool, still connected, on :meth:`close`.
         """
         self.config = config
         self.db = db
         self.source_account_id = source_account_id
         self.dest_account_id = dest_account_id
+        self.client_manager = client_manager
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.source_client: Optional[TelegramClient] = None
         self.dest_client: Optional[TelegramClient] = None
@@ -71,6 +82,8 @@ class GroupMirrorManager:
         """
         Creates and connects a Telethon client for a specific account identifier.
         """
+        if self.client_manager is not None:
+            return await self.client_manager.get_client(account_identifier)
         selected_account = next((acc for acc in self.config.accounts if acc.get("phone_number") == account_identifier or acc.get("session_name") == account_identifier), None)
         if not selected_account:
             raise ValueError(f"Account '{account_identifier}' not found in configuration.")
@@ -101,6 +114,11 @@ class GroupMirrorManager:
 
     async def close(self):
         """Gracefully disconnects both clients."""
+        if self.client_manager is not None:
+            self.client_manager.release(self.source_client)
+            self.client_manager.release(self.dest_client)
+            return
+
         if self.source_client and self.source_client.is_connected():
             self.logger.info(f"Disconnecting source client ({self.source_account_id}).")
             await self.source_client.disconnect()
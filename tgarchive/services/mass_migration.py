@@ -7,10 +7,29 @@ This module contains the MassMigrationManager class for managing mass migrations
 
 import asyncio
 import logging
+from typing import Dict, List, Optional, Tuple
+
 from tgarchive.forwarding import AttachmentForwarder
 
 logger = logging.getLogger(__name__)
 
+
+def split_id_range(low: int, high: int, parts: int) -> List[Tuple[int, int]]:
+    """Split the message ids in ``(low, high]`` into at most *parts* contiguous ``(start, end]`` ranges."""
+    span = high - low
+    if span <= 0:
+        return []
+    parts = max(1, min(parts, span))
+    step, extra = divmod(span, parts)
+    ranges = []
+    start = low
+    for index in range(parts):
+        end = start + step + (1 if index < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
 class MassMigrationManager:
     """
     A class for managing mass migrations.
@@ -26,72 +45,40 @@ class MassMigrationManager:
             self.db_path = db._db_path
         else:
             self.db_path = None
-        self.forwarder = AttachmentForwarder(
-            config=config,
-            db=db,
-            prepend_origin_info=config.data.get("forwarding", {}).get("always_prepend_origin_info", False)
+        self.forwarder = self._make_forwarder()
+
+    def _make_forwarder(self, **kwargs):
+        return AttachmentForwarder(
+            config=self.config,
+            db=self.db,
+            prepend_origin_info=self.config.data.get("forwarding", {}).get("always_prepend_origin_info", False),
+            **kwargs,
         )
 
     async def one_time_migration(self, source, destination, dry_run=False, parallel=False):
         """
         Performs a one-time migration from a source to a destination.
+
+        The forwarder's client pool is disconnected when the migration ends,
+        whether it succeeded or not.
         """
-        use_parallel = parallel or self.config.data.get("migration_mode", {}).get("use_parallel", False)
+        try:
+            await self._one_time_migration(source, destination, dry_run, parallel)
+        finally:
+            await self.forwarder.close()
+
+    async def _one_time_migration(self, source, destination, dry_run, parallel):
+        migration_mode = self.config.data.get("migration_mode", {})
+        use_parallel = parallel or migration_mode.get("use_parallel", False)
 
         progress = self.db.get_migration_progress(source, destination)
         if progress:
             migration_id, last_message_id = progress
+            last_message_id = last_message_id or 0
         else:
             migration_id = self.db.add_migration_progress(source, destination, "in_progress")
             last_message_id = 0
 
-        if use_parallel:
-            # Parallel migration: split messages into batches and process concurrently
-            logger.info("Starting parallel migration")
-            
-            # Get message count to determine batch size
-            try:
-                from telethon.tl.types import InputPeerChannel, InputPeerChat
-                entity = await self.client.get_entity(source)
-                total_messages = 0
-                async for message in self.client.iter_messages(entity, limit=None):
-                    total_messages += 1
-                    if total_messages > 1000:  # Sample first 1000 to estimate
-                        break
-                
-                # Use multiple forwarders for parallel processing
-                batch_size = max(100, total_messages // 4)  # 4 parallel workers
-                logger.info(f"Parallel migration: {total_messages} messages, batch size: {batch_size}")
-                
-                # Create multiple migration tasks
-                tasks = []
-                for batch_start in range(0, total_messages, batch_size):
-                    task = self._migrate_batch(source, destination, batch_start, batch_size, migration_id)
-                    tasks.append(task)
-                
-                # Run tasks in parallel
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Check for errors
-                errors = [r for r in results if isinstance(r, Exception)]
-                if errors:
-                    logger.error(f"Parallel migration completed with {len(errors)} errors")
-                    for error in errors:
-                        logger.error(f"Migration error: {error}")
-                else:
-                    logger.info("Parallel migration completed successfully")
-                
-                # Update progress with the furthest successful message ID we observed.
-                completed_message_id = max(
-                    [r for r in results if isinstance(r, int) and r is not None],
-                    default=last_message_id,
-                )
-                self.db.update_migration_progress(migration_id, completed_message_id, "completed")
-                return
-            except Exception as e:
-                logger.error(f"Parallel migration failed, falling back to sequential: {e}")
-                # Fall through to sequential migration
-
         if progress:
             print(f"Resuming migration from message ID: {last_message_id}")
 
@@ -99,11 +86,33 @@ class MassMigrationManager:
             print(f"DRY RUN: Would migrate files from {source} to {destination} starting from message ID {last_message_id}")
             return
 
+        if use_parallel:
+            try:
+                ranges = self.db.get_migration_ranges(migration_id)
+                if all(row[4] == "completed" for row in ranges):
+                    # first run, or every earlier range is done: split what is new since then
+                    last_message_id = max([last_message_id] + [row[1] for row in ranges])
+                    ranges = await self._plan_ranges(source, migration_id, last_message_id, migration_mode.get("parallel_ranges"))
+            except Exception as e:
+                logger.error(f"Could not split {source} into id ranges, falling back to sequential migration: {e}")
+            else:
+                if ranges:
+                    await self._parallel_migration(source, destination, migration_id, ranges)
+                else:
+                    self.db.update_migration_progress(migration_id, last_message_id, "completed")
+                return
+
+        def checkpoint(message_id):
+            nonlocal last_message_id
+            last_message_id = message_id
+            self.db.update_migration_progress(migration_id, message_id, "in_progress")
+
         try:
             new_last_message_id, _ = await self.forwarder.forward_messages(
                 origin_id=source,
                 destination_id=destination,
-                start_message_id=last_message_id
+                start_message_id=last_message_id,
+                checkpoint=checkpoint,
             )
             if new_last_message_id:
                 self.db.update_migration_progress(migration_id, new_last_message_id, "completed")
@@ -111,18 +120,98 @@ class MassMigrationManager:
             self.db.update_migration_progress(migration_id, last_message_id, f"error: {e}")
             raise
 
-    async def _migrate_batch(self, source, destination, start_id, batch_size, migration_id):
-        """Migrate a batch of messages (used for parallel migration)."""
+    # Parallel migration ----------------------------------------------------
+    async def _plan_ranges(self, source, migration_id, after_id, parts=None):
+        """Split the source's ids newer than *after_id* into ranges and record them."""
+        entity = await self.client.get_entity(source)
+        newest = await self.client.get_messages(entity, limit=1)
+        oldest = await self.client.get_messages(entity, limit=1, min_id=after_id, reverse=True)
+        if not newest or not oldest:
+            logger.info(f"No messages in {source} newer than ID {after_id}; nothing to split.")
+            return []
+        low = max(after_id, oldest[0].id - 1)
+        high = newest[0].id
+        parts = parts or max(1, len(self.config.active_accounts))
+        ranges = split_id_range(low, high, parts)
+        self.db.add_migration_ranges(migration_id, ranges)
+        logger.info(f"Split message ids {low + 1}-{high} of {source} into {len(ranges)} range(s).")
+        return self.db.get_migration_ranges(migration_id)
+
+    async def _parallel_migration(self, source, destination, migration_id, ranges):
+        """Migrate every unfinished range concurrently, one account per running range."""
+        from tgarchive.utils.rotation_strategies import AdvancedAccountRotator
+
+        pending = [row for row in ranges if row[4] != "completed"]
+        logger.info(f"Starting parallel migration: {len(pending)} of {len(ranges)} range(s) left to migrate.")
+        rotator = AdvancedAccountRotator(self.config.active_accounts, config=self.config.data)
+        # ranges that land on the same account take turns rather than
+        # doubling that account's request rate
+        account_locks: Dict[Optional[str], asyncio.Lock] = {}
+        progress = {row[0]: row for row in ranges}
+
+        async def run(row):
+            range_start, range_end, last_message_id, _, _ = row
+            selected = rotator.get_next_account(channel=f"{source}:{range_start}")
+            account = selected.get("session_name") if selected else None
+            try:
+                async with account_locks.setdefault(account, asyncio.Lock()):
+                    await self._migrate_range(source, destination, migration_id, range_start, range_end, last_message_id, account, progress)
+            except Exception as e:
+                if account:
+                    rotator.record_failure(account, error=str(e))
+                raise
+            if account:
+                rotator.record_success(account)
+
+        results = await asyncio.gather(*(run(row) for row in pending), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+
+        # every id up to the first unfinished range's checkpoint has been handled
+        low_water = ranges[-1][1]
+        for range_start, range_end, last_message_id, _, status in (progress[row[0]] for row in ranges):
+            if status != "completed":
+                low_water = last_message_id
+                break
+        if errors:
+            for error in errors:
+                logger.error(f"Migration error: {error}")
+            self.db.update_migration_progress(migration_id, low_water, f"error: {len(errors)} range(s) failed")
+            logger.error(f"Parallel migration finished with {len(errors)} failed range(s); rerun to resume them.")
+        else:
+            self.db.update_migration_progress(migration_id, low_water, "completed")
+            logger.info("Parallel migration completed successfully")
+
+    async def _migrate_range(self, source, destination, migration_id, range_start, range_end, last_message_id, account, progress):
+        """Forward the ids in ``(last_message_id, range_end]`` with *account*, checkpointing the range."""
+        def checkpoint(message_id):
+            nonlocal last_message_id
+            last_message_id = message_id
+            self.db.update_migration_range(migration_id, range_start, message_id, "in_progress", account)
+            progress[range_start] = (range_start, range_end, message_id, account, "in_progress")
+
+        logger.info(f"Migrating ids {last_message_id + 1}-{range_end} of {source} with account {account or 'default'}.")
+        self.db.update_migration_range(migration_id, range_start, last_message_id, "in_progress", account)
+        # ranges draw their clients from one pool, and share the deduplicator
+        # so they see each other's forwarded files
+        forwarder = self._make_forwarder(
+            deduplicator=self.forwarder.deduplicator,
+            client_manager=self.forwarder.client_manager,
+        )
         try:
-            new_last_message_id, _ = await self.forwarder.forward_messages(
+            await forwarder.forward_messages(
                 origin_id=source,
                 destination_id=destination,
-                start_message_id=start_id
+                account_identifier=account,
+                start_message_id=last_message_id,
+                end_message_id=range_end,
+                checkpoint=checkpoint,
             )
-            return new_last_message_id
         except Exception as e:
-            logger.error(f"Batch migration failed (start_id={start_id}): {e}")
+            self.db.update_migration_range(migration_id, range_start, last_message_id, f"error: {e}", account)
+            progress[range_start] = (range_start, range_end, last_message_id, account, f"error: {e}")
             raise
+        self.db.update_migration_range(migration_id, range_start, range_end, "completed", account)
+        progress[range_start] = (range_start, range_end, range_end, account, "completed")
 
     def rollback_migration(self, migration_id):
         """
@@ -76,7 +76,7 @@ class SchedulerDaemon:
         The main loop for the scheduler daemon.
         """
         self.start_health_check()
-        db = SpectraDB(self.config.data.get("db", {}).get("path", "spectra.db"))
+        db = SpectraDB.open_fast(self.config.data.get("db", {}).get("path", "spectra.db"))
 
         while not self._stop_event.is_set():
             now = datetime.now(self.timezone)
@@ -157,7 +157,7 @@ class SchedulerDaemon:
         """
         Processes the file forwarding queue.
         """
-        db = SpectraDB(self.config.data.get("db", {}).get("path", "spectra.db"))
+        db = SpectraDB.open_fast(self.config.data.get("db", {}).get("path", "spectra.db"))
         forwarder = AttachmentForwarder(config=self.config, db=db)
         try:
             asyncio.run(forwarder.process_file_forward_queue())
@@ -205,7 +205,7 @@ async def scheduled_channel_forward(config_path, db_path, schedule_id, channel_i
     with open(config_path, 'r') as f:
         config = json.load(f)
 
-    db = SpectraDB(db_path)
+    db = SpectraDB.open_fast(db_path)
     forwarder = AttachmentForwarder(config=config, db=db)
 
     started_at = datetime.now().isoformat()
@@ -239,7 +239,7 @@ async def scheduled_file_forward(config_path, db_path, schedule_id, source, dest
     with open(config_path, 'r') as f:
         config = json.load(f)
 
-    db = SpectraDB(db_path)
+    db = SpectraDB.open_fast(db_path)
     forwarder = AttachmentForwarder(config=config, db=db)
 
     started_at = datetime.now().isoformat()
@@ -0,0 +1,68 @@
+import inspect
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from tgarchive.db import SpectraDB
+
+try:
+    from flask import Flask
+
+    from tgarchive.api.routes import messages as messages_routes
+    from tgarchive.api.services import DatabaseService
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+
+@unittest.skipUnless(FLASK_AVAILABLE, "Flask is not installed")
+class TestMessagesRoute(unittest.TestCase):
+    """``/api/messages/<channel_id>`` against the canonical (channel-less) messages table."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        db_path = self.temp_dir / "spectra.db"
+        with SpectraDB(db_path, vector_store=False) as db:
+            db.conn.executemany(
+                "INSERT INTO messages(id, type, date, content) VALUES (?, 'message', ?, ?)",
+                [(i, f"2024-01-{i:02d}T00:00:00", f"message {i}") for i in range(1, 8)],
+            )
+            db.upsert_account_channel_access("+100", 10, "chan 10", None, "2024-01-01")
+
+        self.service = DatabaseService({"db_path": str(db_path), "advanced_features": {}})
+        self.service.db.vector_store = None
+        self.addCleanup(self.service.db.close)
+        previous = messages_routes._database_service
+        messages_routes._database_service = self.service
+        self.addCleanup(setattr, messages_routes, "_database_service", previous)
+        self.app = Flask(__name__)
+        # skip the auth and rate-limit decorators
+        self.view = inspect.unwrap(messages_routes.get_messages)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get(self, channel_id, query=""):
+        with self.app.test_request_context(f"/api/messages/{channel_id}{query}"):
+            response, status = self.view(channel_id)
+            return status, response.get_json()
+
+    def test_known_channel_pages_through_the_archive(self):
+        status, first = self.get("10", "?limit=4")
+        self.assertEqual(status, 200)
+        self.assertEqual(first["total"], 7)
+        self.assertEqual([m["message_id"] for m in first["messages"]], [7, 6, 5, 4])
+
+        status, second = self.get("10", f"?limit=4&cursor={first['next_cursor']}")
+        self.assertEqual(status, 200)
+        self.assertEqual([m["message_id"] for m in second["messages"]], [3, 2, 1])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_unknown_or_malformed_channel(self):
+        self.assertEqual(self.get("99")[0], 404)
+        self.assertEqual(self.get("abc")[0], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Performance Benchmarks for the Archive Pipeline
+===============================================
+
+Benchmark suite comparing the per-row ``DBHandler`` write path with the
+batched ``BatchedWriter`` used by ``archive_messages``.
+"""
+
+import logging
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+from tgarchive.core.sync import BatchedWriter, DBHandler
+
+logger = logging.getLogger(__name__)
+
+
+def generate_rows(count: int, users: int = 500) -> List[Dict]:
+    """Generate synthetic message rows with a rotating set of senders."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_id": i % users + 1,
+            "topic_id": None,
+            "date": (start + timedelta(seconds=i)).isoformat(),
+            "edit_date": None,
+            "content": f"synthetic message {i} mentioning @user_{i % users:05d}",
+            "reply_to": None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _sender(row: Dict):
+    return SimpleNamespace(id=row["user_id"], username=f"user_{row['user_id']:05d}", first_name=None, last_name=None)
+
+
+def benchmark_per_row(db_path: Path, rows: List[Dict]) -> float:
+    """Write *rows* one statement at a time; return rows per second."""
+    start = time.perf_counter()
+    with DBHandler(db_path) as db:
+        for row in rows:
+            db.add_user(_sender(row))
+            db.add_message(row)
+            db.add_username(f"user_{row['user_id']:05d}", row["id"], row["date"])
+    elapsed = time.perf_counter() - start
+    return len(rows) / elapsed if elapsed > 0 else 0.0
+
+
+def benchmark_batched(db_path: Path, rows: List[Dict], batch_size: int = 500) -> float:
+    """Write *rows* through ``BatchedWriter``; return rows per second."""
+    start = time.perf_counter()
+    with DBHandler(db_path) as db:
+        writer = BatchedWriter(db, entity_id=1, batch_size=batch_size, flush_interval=3600)
+        for row in rows:
+            writer.add_user(_sender(row))
+            writer.add_message(row)
+            writer.add_username(f"user_{row['user_id']:05d}", row["id"], row["date"])
+            writer.maybe_flush()
+        writer.flush()
+    elapsed = time.perf_counter() - start
+    return len(rows) / elapsed if elapsed > 0 else 0.0
+
+
+def run_writer_benchmarks(count: int = 100000, batch_sizes=(100, 500, 2000)):
+    """Run the writer benchmarks and print a rows/second table."""
+    rows = generate_rows(count)
+    results = {"rows": count, "per_row": None, "batched": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results["per_row"] = benchmark_per_row(Path(tmp) / "per_row.sqlite3", rows)
+        for size in batch_sizes:
+            results["batched"][size] = benchmark_batched(Path(tmp) / f"batched_{size}.sqlite3", rows, size)
+
+    print(f"Archive writer results ({count} messages):")
+    print(f"  Per-row:            {results['per_row']:>12,.0f} rows/s")
+    for size, rate in results["batched"].items():
+        speedup = rate / results["per_row"] if results["per_row"] else 0
+        print(f"  Batched ({size:>5}):    {rate:>12,.0f} rows/s  ({speedup:.2f}x)")
+
+    return results
+
+
+if __name__ == "__main__":
+    results = run_writer_benchmarks()
+    print("\nBenchmark Results:")
+    print(results)
@@ -0,0 +1,303 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from telethon import errors
+
+from tgarchive.core.error_recovery import RateLimitHandler
+from tgarchive.core.sync import BatchedWriter, DBHandler, MediaDownloadPool, archive_messages, archive_topics
+
+
+def make_row(msg_id, user_id=1, topic_id=None):
+    return {
+        "id": msg_id,
+        "user_id": user_id,
+        "topic_id": topic_id,
+        "date": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "edit_date": None,
+        "content": f"message {msg_id} @someuser",
+        "reply_to": None,
+    }
+
+
+class StubConfig:
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+
+class TestBatchedWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "archive.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_flushes_on_row_count_with_checkpoint(self):
+        with DBHandler(self.db_path) as db:
+            writer = BatchedWriter(db, entity_id=42, batch_size=10, flush_interval=3600)
+            user = SimpleNamespace(id=1, username="someuser", first_name=None, last_name=None)
+            for i in range(1, 26):
+                writer.add_user(user)
+                writer.add_message(make_row(i))
+                writer.maybe_flush()
+
+            self.assertEqual(writer.batches_committed, 2)
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 20)
+            self.assertEqual(db.get_checkpoint(42), 20)
+
+            writer.flush()
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 25)
+            self.assertEqual(db.get_checkpoint(42), 25)
+
+    def test_flushes_on_time_threshold(self):
+        with DBHandler(self.db_path) as db:
+            writer = BatchedWriter(db, entity_id=42, batch_size=1000, flush_interval=0)
+            writer.add_message(make_row(1, user_id=None))
+            self.assertTrue(writer.maybe_flush())
+            self.assertEqual(writer.pending, 0)
+
+    def test_committed_batches_survive_crash(self):
+        with self.assertRaises(RuntimeError):
+            with DBHandler(self.db_path) as db:
+                db.add_topic(3, 7, "Topic 3", None)
+                writer = BatchedWriter(db, entity_id=7, batch_size=5, flush_interval=3600)
+                for i in range(1, 8):
+                    writer.add_message(make_row(i, user_id=None, topic_id=3))
+                    writer.maybe_flush()
+                raise RuntimeError("simulated crash")
+
+        with DBHandler(self.db_path) as db:
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 5)
+            self.assertEqual(db.get_checkpoint(7, 3), 5)
+            self.assertIsNone(db.get_checkpoint(7))
+
+    def test_archive_messages_resumes_from_checkpoint(self):
+        offsets = []
+
+        async def iter_messages(entity, **kwargs):
+            offsets.append(kwargs["offset_id"])
+            for i in range(kwargs["offset_id"] + 1, 13):
+                yield SimpleNamespace(
+                    id=i,
+                    sender_id=None,
+                    sender=None,
+                    date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    edit_date=None,
+                    message=f"hello {i}",
+                    reply_to_msg_id=None,
+                    media=None,
+                )
+
+        client = MagicMock()
+        client.iter_messages = iter_messages
+        cfg = StubConfig({
+            "batch": 4,
+            "batch_flush_seconds": 3600,
+            "sleep_between_batches": 0,
+            "collect_usernames": False,
+            "download_media": False,
+        })
+        entity = SimpleNamespace(id=99)
+
+        with DBHandler(self.db_path) as db:
+            db.cur.execute(
+                "INSERT INTO archive_checkpoints(entity_id, topic_id, last_message_id) VALUES (99, 0, 8)"
+            )
+            asyncio.run(archive_messages(client, entity, None, db, cfg, Path(self.tmp.name), MagicMock(), None))
+            self.assertEqual(offsets, [8])
+            self.assertEqual(db.get_checkpoint(99), 12)
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 4)
+
+    def test_resumed_run_does_not_duplicate_mentions(self):
+        async def iter_messages(entity, **kwargs):
+            for i in range(kwargs["offset_id"] + 1, 11):
+                yield SimpleNamespace(
+                    id=i,
+                    sender_id=None,
+                    sender=None,
+                    date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    edit_date=None,
+                    message=f"hello {i} @someuser @otheruser",
+                    reply_to_msg_id=None,
+                    media=None,
+                )
+
+        client = MagicMock()
+        client.iter_messages = iter_messages
+        cfg = StubConfig({
+            "batch": 4,
+            "batch_flush_seconds": 3600,
+            "sleep_between_batches": 0,
+            "collect_usernames": True,
+            "download_media": False,
+        })
+        entity = SimpleNamespace(id=99)
+
+        with DBHandler(self.db_path) as db:
+            asyncio.run(archive_messages(client, entity, None, db, cfg, Path(self.tmp.name), MagicMock(), None))
+            # a held checkpoint (e.g. a failed download) makes the next run start over from message 5
+            db.cur.execute("UPDATE archive_checkpoints SET last_message_id = 4 WHERE entity_id = 99")
+            asyncio.run(archive_messages(client, entity, None, db, cfg, Path(self.tmp.name), MagicMock(), None))
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM username_mentions").fetchone()[0], 20)
+
+
+    def test_checkpoint_held_behind_pending_media(self):
+        with DBHandler(self.db_path) as db:
+            writer = BatchedWriter(db, entity_id=5, batch_size=100, flush_interval=3600)
+            for i in range(1, 6):
+                writer.add_message(make_row(i, user_id=None))
+            writer.hold(3)
+            writer.flush()
+            self.assertEqual(db.get_checkpoint(5), 2)
+            writer.release(3)
+            writer.flush()
+            self.assertEqual(db.get_checkpoint(5), 5)
+
+    def test_archive_topics_in_parallel_skips_unchanged(self):
+        requested = []
+
+        async def iter_messages(entity, **kwargs):
+            topic = kwargs["topic"]
+            requested.append(topic)
+            base = topic * 100
+            for i in range(max(kwargs["offset_id"], base) + 1, base + 6):
+                await asyncio.sleep(0)
+                yield SimpleNamespace(
+                    id=i, sender_id=None, sender=None,
+                    date=datetime(2024, 1, 1, tzinfo=timezone.utc), edit_date=None,
+                    message=f"topic {topic}", reply_to_msg_id=None, media=None,
+                )
+
+        client = MagicMock()
+        client.iter_messages = iter_messages
+        cfg = StubConfig({
+            "batch": 3,
+            "batch_flush_seconds": 3600,
+            "topic_concurrency": 3,
+            "sleep_between_batches": 0,
+            "collect_usernames": False,
+            "download_media": False,
+        })
+        topics = [SimpleNamespace(id=t, title=f"T{t}", top_message=t * 100 + 5) for t in (1, 2, 3)]
+
+        with DBHandler(self.db_path) as db:
+            db.cur.execute(
+                "INSERT INTO archive_checkpoints(entity_id, topic_id, last_message_id) VALUES (99, 2, 205)"
+            )
+            asyncio.run(archive_topics(client, SimpleNamespace(id=99), topics, db, cfg, Path(self.tmp.name), MagicMock()))
+            self.assertEqual(sorted(requested), [1, 3])
+            self.assertEqual(db.get_checkpoint(99, 1), 105)
+            self.assertEqual(db.get_checkpoint(99, 3), 305)
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 10)
+
+
+class TestMediaDownloadPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_media_message(self, msg_id, flood_once=False):
+        calls = {"n": 0}
+
+        async def download_media(file):
+            calls["n"] += 1
+            if flood_once and calls["n"] == 1:
+                raise errors.FloodWaitError(request=None, capture=0)
+            Path(file).write_bytes(b"x" * 10)
+            return str(file)
+
+        return SimpleNamespace(
+            id=msg_id,
+            file=SimpleNamespace(id=1000 + msg_id, size=10, mime_type="image/jpeg"),
+            download_media=download_media,
+            calls=calls,
+        )
+
+    @patch("tgarchive.core.error_recovery.asyncio.sleep", new_callable=AsyncMock)
+    def test_workers_drain_queue_and_retry_flood_wait(self, mock_sleep):
+        messages = [self.make_media_message(i, flood_once=(i == 2)) for i in range(1, 11)]
+
+        limiter = RateLimitHandler(enable_jitter=False)
+
+        async def run():
+            with DBHandler(self.root / "archive.sqlite3") as db:
+                writer = BatchedWriter(db, entity_id=1, batch_size=100, flush_interval=3600)
+                pool = MediaDownloadPool(writer, rate_limiter=limiter, workers=3, queue_size=2, sidecar=False)
+                async with pool:
+                    for msg in messages:
+                        writer.add_message(make_row(msg.id, user_id=None))
+                        await pool.submit(msg, self.root / "media" / str(msg.id))
+                writer.flush()
+                rows = db.cur.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+                return pool.stats, rows, db.get_checkpoint(1)
+
+        stats, rows, checkpoint = asyncio.run(run())
+        self.assertEqual(rows, 10)
+        self.assertEqual(checkpoint, 10)
+        self.assertEqual(stats["downloaded"], 10)
+        self.assertEqual(limiter.get_wait_stats()["media:None"]["flood_waits"], 1)
+        self.assertEqual(stats["bytes_downloaded"], 100)
+        self.assertEqual(messages[1].calls["n"], 2)
+        mock_sleep.assert_awaited()
+
+    def test_failed_download_keeps_checkpoint_hold(self):
+        messages = [self.make_media_message(i) for i in range(1, 6)]
+
+        async def broken(file):
+            raise ConnectionError("connection reset")
+
+        messages[2].download_media = broken
+
+        async def run():
+            with DBHandler(self.root / "archive.sqlite3") as db:
+                writer = BatchedWriter(db, entity_id=1, batch_size=100, flush_interval=3600)
+                pool = MediaDownloadPool(writer, workers=2, sidecar=False, max_retries=0)
+                async with pool:
+                    for msg in messages:
+                        writer.add_message(make_row(msg.id, user_id=None))
+                        await pool.submit(msg, self.root / "media" / str(msg.id))
+                writer.flush()
+                return pool, db.get_checkpoint(1)
+
+        pool, checkpoint = asyncio.run(run())
+        self.assertEqual(pool.stats["failed"], 1)
+        self.assertEqual(pool.failed_ids, [3])
+        # a resume starts again from message 3
+        self.assertEqual(checkpoint, 2)
+
+    def test_abandoned_jobs_stay_held(self):
+        writer = BatchedWriter(MagicMock(), entity_id=1)
+        started = asyncio.Event()
+
+        async def slow(file):
+            started.set()
+            await asyncio.sleep(3600)
+
+        async def run():
+            pool = MediaDownloadPool(writer, workers=1, sidecar=False)
+            with self.assertRaises(RuntimeError):
+                async with pool:
+                    msg = self.make_media_message(7)
+                    msg.download_media = slow
+                    writer.add_message(make_row(7, user_id=None))
+                    await pool.submit(msg, self.root / "media" / "7")
+                    await started.wait()
+                    raise RuntimeError("iteration failed")
+
+        asyncio.run(run())
+        self.assertEqual(writer.checkpoint(), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
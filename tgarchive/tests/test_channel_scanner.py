@@ -1,14 +1,44 @@
 import unittest
 from unittest.mock import Mock, AsyncMock, patch
 import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
 
 from tgarchive.core.deduplication import ChannelScanner
+from tgarchive.db import SpectraDB
+
+
+def _message(message_id, file_id, name="file.txt"):
+    return SimpleNamespace(id=message_id, file=SimpleNamespace(id=file_id, name=name), media=f"media-{message_id}")
+
+
+class FakeClient:
+    """Writes the content registered for each media to the download path."""
+
+    def __init__(self, messages, contents):
+        self.messages = messages
+        self.contents = contents
+        self.downloaded = []
+
+    async def iter_messages(self, channel):
+        for message in self.messages:
+            yield message
+
+    async def download_media(self, media, file):
+        self.downloaded.append(media)
+        with open(file, "wb") as fh:
+            fh.write(self.contents[media])
+        return file
 
 class TestChannelScanner(unittest.TestCase):
     def setUp(self):
         self.db = Mock()
         self.client = Mock()
-        self.scanner = ChannelScanner(self.db, self.client)
+        self.db.cur.fetchall.return_value = []  # no file ids hashed yet
+        # hash in this process so the patched helpers are used
+        self.scanner = ChannelScanner(self.db, self.client, hash_workers=0)
 
     @patch("tgarchive.deduplication.get_sha256_hash")
     @patch("tgarchive.deduplication.is_exact_match")
@@ -49,7 +79,70 @@ class TestChannelScanner(unittest.TestCase):
         self.assertEqual(mock_is_exact_match.call_count, 2)
         self.assertEqual(mock_get_perceptual_hash.call_count, 2)
         self.assertEqual(mock_get_fuzzy_hash.call_count, 2)
-        self.assertEqual(self.db.add_file_hash.call_count, 2)
+        self.db.add_file_hashes.assert_called_once()
+        self.assertEqual(len(self.db.add_file_hashes.call_args[0][0]), 2)
+
+
+class TestChannelScannerPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = SpectraDB.open_fast(Path(self.tmp.name) / "scan.sqlite3")
+
+    def tearDown(self):
+        self.db.conn.close()
+        self.tmp.cleanup()
+
+    def _scan(self, client, **kwargs):
+        scanner = ChannelScanner(self.db, client, download_concurrency=2, **kwargs)
+        return scanner, asyncio.run(scanner.scan_channel("channel", batch_size=3, rate_limit_seconds=0))
+
+    def test_process_pool_hashes_and_batches_writes(self):
+        messages = [_message(i, 100 + i) for i in range(5)]
+        contents = {m.media: f"content {m.id}".encode() for m in messages}
+        client = FakeClient(messages, contents)
+
+        scanner, report = self._scan(client, hash_workers=2)
+
+        rows = dict(self.db.conn.execute("SELECT file_id, sha256_hash FROM file_hashes"))
+        self.assertEqual(rows, {m.file.id: hashlib.sha256(contents[m.media]).hexdigest() for m in messages})
+        for stage in ("download", "hash", "write"):
+            self.assertEqual(report["stages"][stage]["items"], 5)
+        self.assertGreater(report["stages"]["download"]["bytes"], 0)
+        self.assertIsNone(scanner._executor)
+
+    def test_known_file_ids_are_not_downloaded(self):
+        self.db.add_file_hash(file_id=100, sha256_hash="old", perceptual_hash=None, fuzzy_hash=None)
+        messages = [_message(1, 100), _message(2, 101), _message(3, 101)]
+        client = FakeClient(messages, {m.media: b"same bytes" for m in messages})
+
+        scanner, report = self._scan(client, hash_workers=0)
+
+        self.assertEqual(client.downloaded, ["media-2"])
+        self.assertEqual(report["skipped"], 2)
+
+    def test_exact_match_recorded_without_near_duplicate_hashes(self):
+        messages = [_message(1, 100), _message(2, 101)]
+        client = FakeClient(messages, {m.media: b"identical content" for m in messages})
+
+        self._scan(client, hash_workers=0)
+
+        rows = self.db.conn.execute(
+            "SELECT file_id, fuzzy_hash IS NOT NULL FROM file_hashes ORDER BY file_id"
+        ).fetchall()
+        self.assertEqual(rows, [(100, 1), (101, 0)])
+
+    def test_direct_batch_shuts_down_pool_and_logs_failures(self):
+        messages = [_message(1, 100), _message(2, 101)]
+        client = FakeClient(messages, {"media-1": b"fine"})  # media-2 fails to download
+        scanner = ChannelScanner(self.db, client, hash_workers=2)
+
+        with self.assertLogs("tgarchive.core.deduplication", level="WARNING") as logs:
+            asyncio.run(scanner.process_batch(messages))
+
+        self.assertIsNone(scanner._executor)
+        self.assertEqual(scanner.failed, 1)
+        self.assertIn("Failed to download file.txt", logs.output[0])
+        self.assertEqual(self.db.conn.execute("SELECT file_id FROM file_hashes").fetchall(), [(100,)])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from telethon.errors import FloodWaitError
+
+from tgarchive.core.config_models import Config
+from tgarchive.forwarding.client import ClientManager
+
+
+class FakeClient:
+    def __init__(self, session_name):
+        self.session_name = session_name
+        self.connected = True
+        self.get_me = AsyncMock(return_value=MagicMock())
+
+    def is_connected(self):
+        return self.connected
+
+    async def disconnect(self):
+        self.connected = False
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        mock_path = MagicMock(spec=Path)
+        mock_path.exists.return_value = False
+        self.config = Config(path=mock_path)
+        self.config.data["accounts"] = [
+            {"api_id": 1, "api_hash": "a", "session_name": "acc1"},
+            {"api_id": 2, "api_hash": "b", "session_name": "acc2"},
+        ]
+        self.manager = ClientManager(self.config, probe_interval=60.0)
+        self.manager._connect = AsyncMock(side_effect=lambda session_name, api_id, api_hash: FakeClient(session_name))
+
+    def test_clients_are_reused_across_leases(self):
+        async def run():
+            first = await self.manager.get_client("acc1")
+            self.manager.release(first)
+            second = await self.manager.get_client("acc1")
+            other = await self.manager.get_client("acc2")
+            return first, second, other
+
+        first, second, other = asyncio.run(run())
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(self.manager._connect.await_count, 2)
+        self.assertEqual(self.manager.leases(), {"acc1": 1, "acc2": 1})
+
+    def test_unhealthy_client_is_replaced(self):
+        async def run():
+            first = await self.manager.get_client("acc1")
+            self.manager.release(first)
+            first.connected = False
+            return first, await self.manager.get_client("acc1")
+
+        first, second = asyncio.run(run())
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.manager._connect.await_count, 2)
+
+    def test_idle_client_is_probed_before_reuse(self):
+        self.manager.probe_interval = 0
+
+        async def run():
+            client = await self.manager.get_client("acc1")
+            self.manager.release(client)
+            client.get_me.return_value = None  # session lost its authorisation
+            return client, await self.manager.get_client("acc1")
+
+        first, second = asyncio.run(run())
+
+        first.get_me.assert_awaited()
+        self.assertIsNot(first, second)
+        self.assertFalse(first.connected)
+
+    def test_leased_client_is_never_probed_or_replaced(self):
+        self.manager.probe_interval = 0
+
+        async def run():
+            first = await self.manager.get_client("acc1")
+            first.get_me.return_value = None
+            shared = await self.manager.get_client("acc1")
+            probed = await self.manager.probe()
+            return first, shared, probed
+
+        first, shared, probed = asyncio.run(run())
+
+        self.assertIs(first, shared)
+        self.assertTrue(first.connected)
+        first.get_me.assert_not_awaited()
+        self.assertEqual(probed, {})
+        self.assertEqual(self.manager.leases(), {"acc1": 2})
+
+    def test_unnamed_leases_rotate_and_report_flood_waits(self):
+        async def run():
+            sessions = []
+            for _ in range(2):
+                async with self.manager.lease() as client:
+                    sessions.append(client.session_name)
+            with self.assertRaises(FloodWaitError):
+                async with self.manager.lease("acc1"):
+                    raise FloodWaitError(request=None, capture=30)
+            return sessions
+
+        sessions = asyncio.run(run())
+
+        self.assertEqual(sorted(sessions), ["acc1", "acc2"])
+        self.assertFalse(self.manager.rotator.floodwait.is_available("acc1"))
+        self.assertEqual(self.manager.leases(), {"acc1": 0, "acc2": 0})
+
+    def test_close_disconnects_the_pool(self):
+        async def run():
+            clients = [await self.manager.get_client("acc1"), await self.manager.get_client("acc2")]
+            await self.manager.close()
+            return clients
+
+        clients = asyncio.run(run())
+
+        self.assertTrue(all(not client.connected for client in clients))
+        self.assertEqual(self.manager.leases(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from tgarchive.db.connection_pool import ConnectionPool
+from tgarchive.db.db_base import BaseDB
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "pool.sqlite3"
+        self.writer = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.writer.execute("PRAGMA journal_mode=WAL;")
+        self.writer.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, content TEXT)")
+        self.writer.commit()
+        self.pool = ConnectionPool(self.db_path, writer=self.writer, readers=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def test_readers_are_read_only_and_bounded(self):
+        with self.pool.reader() as a, self.pool.reader() as b:
+            self.assertIsNot(a, b)
+            with self.assertRaises(sqlite3.OperationalError):
+                a.execute("INSERT INTO messages(content) VALUES ('x')")
+        self.assertEqual(self.pool.stats()["readers_open"], 2)
+
+        with self.pool.reader() as c:
+            self.assertIn(c, (a, b))
+        self.assertEqual(self.pool.stats()["readers_open"], 2)
+
+    def test_readers_see_committed_writes(self):
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 0)
+        self.pool.execute_write("INSERT INTO messages(content) VALUES (?)", ("hello",))
+        self.assertEqual(self.pool.read("SELECT COUNT(*) FROM messages")[0][0], 1)
+
+    def test_async_reads_run_off_the_event_loop(self):
+        loop_thread = []
+
+        def where():
+            return threading.current_thread().name
+
+        async def run():
+            loop_thread.append(threading.current_thread().name)
+            await self.pool.aexecute_write("INSERT INTO messages(content) VALUES ('a')")
+            rows = await asyncio.gather(*(self.pool.aread("SELECT COUNT(*) FROM messages") for _ in range(5)))
+            return rows, await self.pool.run(where)
+
+        rows, worker = asyncio.run(run())
+        self.assertTrue(all(r[0][0] == 1 for r in rows))
+        self.assertNotEqual(worker, loop_thread[0])
+        self.assertTrue(worker.startswith("spectra-db"))
+
+    def test_zero_readers_falls_back_to_writer(self):
+        pool = ConnectionPool(self.db_path, writer=self.writer, readers=0)
+        try:
+            with pool.reader() as conn:
+                self.assertIs(conn, self.writer)
+        finally:
+            pool.close()
+
+
+class TestBaseDBLocking(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = BaseDB(Path(self.tmp.name) / "base.sqlite3")
+        self.db.cur.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, thread INTEGER)")
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_pool_shares_the_cursor_write_lock(self):
+        self.assertIs(self.db.pool._write_lock, self.db._write_lock)
+
+    def test_cursor_results_are_per_thread(self):
+        errors = []
+
+        def work(n):
+            try:
+                for _ in range(50):
+                    self.db.cur.execute("INSERT INTO items(thread) VALUES (?)", (n,))
+                    row_id = self.db.cur.lastrowid
+                    self.db.cur.execute("SELECT thread FROM items WHERE id = ?", (row_id,))
+                    self.assertEqual(self.db.cur.fetchone(), (n,))
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.cur.execute("SELECT COUNT(*) FROM items").fetchone(), (200,))
+
+    def test_connect_reads_from_readers_until_it_writes(self):
+        async def run():
+            async with self.db.connect() as conn:
+                self.assertEqual(self.db.pool.stats()["readers_open"], 0)
+                before = await (await conn.execute("SELECT COUNT(*) FROM items")).fetchone()
+                self.assertEqual(self.db.pool.stats()["readers_idle"], 1)
+                await conn.execute("INSERT INTO items(thread) VALUES (1)")
+                during = await (await conn.execute("SELECT COUNT(*) FROM items")).fetchone()
+            return before, during
+
+        before, during = asyncio.run(run())
+
+        self.assertEqual(before, (0,))
+        self.assertEqual(during, (1,))
+        self.assertEqual(self.db.read("SELECT COUNT(*) FROM items"), [(1,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
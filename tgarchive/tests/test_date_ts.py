@@ -0,0 +1,85 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tgarchive.db import Message, SpectraDB
+from tgarchive.db.schema import SCHEMA_SQL, SCHEMA_VERSION, backfill_date_ts, epoch_seconds
+
+START = datetime(2024, 1, 30, 12, tzinfo=timezone.utc)
+
+
+def _plan(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> str:
+    return " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+class TestDateTs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "archive.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _create_v1_archive(self, count: int = 10) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(SCHEMA_SQL)
+            conn.executemany(
+                "INSERT INTO messages(id, type, date) VALUES (?, 'message', ?)",
+                [(i, (START + timedelta(days=i)).isoformat()) for i in range(1, count + 1)],
+            )
+            conn.execute("PRAGMA user_version = 1")
+
+    def test_epoch_seconds_treats_naive_as_utc(self):
+        self.assertEqual(epoch_seconds(START), epoch_seconds(START.replace(tzinfo=None)))
+
+    def test_migration_backfills_and_indexes(self):
+        self._create_v1_archive()
+        with SpectraDB.open_fast(self.db_path) as db:
+            self.assertEqual(db.schema_version, SCHEMA_VERSION)
+            rows = db.conn.execute("SELECT id, date_ts FROM messages ORDER BY id").fetchall()
+            self.assertEqual(rows, [(i, epoch_seconds(START + timedelta(days=i))) for i in range(1, 11)])
+            indexes = {row[1] for row in db.conn.execute("PRAGMA index_list(messages)")}
+            self.assertTrue({"idx_messages_date_ts", "idx_messages_user_date_ts"} <= indexes)
+
+    def test_backfill_is_chunked_and_resumable(self):
+        self._create_v1_archive(25)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("ALTER TABLE messages ADD COLUMN date_ts INTEGER")
+            conn.execute("UPDATE messages SET date_ts = 0 WHERE id <= 5")
+            conn.commit()
+            self.assertEqual(backfill_date_ts(conn, chunk=4), 20)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM messages WHERE date_ts IS NULL").fetchone()[0], 0)
+
+    def test_upsert_and_raw_writes_keep_date_ts(self):
+        with SpectraDB.open_fast(self.db_path) as db:
+            db.upsert_message(Message(1, "message", START, None, "hi", None, None, None, ""))
+            db.upsert_message(Message(1, "message", START + timedelta(hours=1), None, "hi", None, None, None, ""))
+            # writers that bypass upsert_message are covered by triggers
+            db.conn.execute("INSERT INTO messages(id, type, date) VALUES (2, 'message', ?)", (START.isoformat(),))
+            db.conn.execute("UPDATE messages SET date = ? WHERE id = 2", ((START + timedelta(days=1)).isoformat(),))
+            rows = dict(db.conn.execute("SELECT id, date_ts FROM messages"))
+        self.assertEqual(rows, {1: epoch_seconds(START) + 3600, 2: epoch_seconds(START) + 86400})
+
+    def test_timeline_helpers_use_date_ts(self):
+        self._create_v1_archive()
+        with SpectraDB.open_fast(self.db_path) as db:
+            months = [(m.slug, m.count) for m in db.months()]
+            self.assertEqual(months, [("2024-01", 1), ("2024-02", 9)])
+            days = [(d.slug, d.count) for d in db.days(2024, 2)]
+            self.assertEqual(days, [(f"2024-02-{d:02d}", 1) for d in range(1, 10)])
+
+            plan = _plan(
+                db.conn,
+                "SELECT ROW_NUMBER() OVER(ORDER BY id), date_ts FROM messages WHERE date_ts >= ? AND date_ts < ?",
+                (0, 1),
+            )
+            self.assertIn("idx_messages_date_ts", plan)
+            plan = _plan(db.conn, "SELECT id FROM messages WHERE user_id = ? ORDER BY date_ts", (1,))
+            self.assertIn("idx_messages_user_date_ts", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
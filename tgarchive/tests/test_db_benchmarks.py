@@ -0,0 +1,342 @@
+"""
+Performance Benchmarks for the Database Layer
+=============================================
+
+Benchmark suite for SQLite access patterns used by ``BaseDB``/``SpectraDB``:
+read throughput through the connection pool while the archiver is writing,
+the latency of opening a database handle, ingest/query throughput per
+pragma profile, timestamp-range lookups through the resident time index, and
+timeline queries on TEXT ``date`` versus the integer ``date_ts`` indexes.
+"""
+
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+from tgarchive.db import SpectraDB
+from tgarchive.db.connection_pool import ConnectionPool
+from tgarchive.db.db_base import BaseDB
+from tgarchive.db.pragmas import PRAGMA_PROFILES
+from tgarchive.db.time_index import MessageTimeIndex, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+READ_SQL = "SELECT COUNT(*), MAX(id) FROM messages WHERE user_id = ?"
+
+
+def create_message_db(db_path: Path, count: int = 200000, users: int = 1000) -> sqlite3.Connection:
+    """Create a WAL database with *count* synthetic messages; return the writer."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS messages ("
+        "id INTEGER PRIMARY KEY, user_id INTEGER, date TEXT NOT NULL, content TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_user ON messages(user_id)")
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    conn.executemany(
+        "INSERT INTO messages(id, user_id, date, content) VALUES (?, ?, ?, ?)",
+        (
+            (i, i % users, (start + timedelta(seconds=i)).isoformat(), f"synthetic message {i}")
+            for i in range(1, count + 1)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def _writer_loop(conn: sqlite3.Connection, stop: threading.Event, lock: threading.RLock, first_id: int) -> int:
+    """Simulate the archiver: commit small batches until *stop* is set."""
+    next_id = first_id
+    while not stop.is_set():
+        with lock:
+            conn.executemany(
+                "INSERT INTO messages(id, user_id, date, content) VALUES (?, ?, ?, ?)",
+                [(next_id + i, i, datetime.now(timezone.utc).isoformat(), "live") for i in range(100)],
+            )
+            conn.commit()
+        next_id += 100
+    return next_id - first_id
+
+
+def benchmark_reads(pool: ConnectionPool, threads: int, duration: float = 2.0) -> float:
+    """Run READ_SQL from *threads* threads for *duration* seconds; return queries/second."""
+    deadline = time.perf_counter() + duration
+    counts = [0] * threads
+
+    def reader(n: int):
+        user = n
+        while time.perf_counter() < deadline:
+            pool.read(READ_SQL, (user % 1000,))
+            counts[n] += 1
+            user += 7
+
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(reader, range(threads)))
+    return sum(counts) / duration
+
+
+def run_pool_benchmarks(count: int = 200000, reader_counts=(0, 1, 2, 4, 8), duration: float = 2.0) -> Dict:
+    """Measure read throughput per reader-pool size while a writer thread commits."""
+    results: Dict = {"messages": count, "reads_per_second": {}, "rows_written": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = create_message_db(Path(tmp) / "bench.sqlite3", count)
+        next_id = count + 1
+        for readers in reader_counts:
+            pool = ConnectionPool(Path(tmp) / "bench.sqlite3", writer=writer, readers=readers)
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                written = ex.submit(_writer_loop, writer, stop, pool._write_lock, next_id)
+                try:
+                    qps = benchmark_reads(pool, max(1, readers), duration)
+                finally:
+                    stop.set()
+                rows = written.result()
+            next_id += rows
+            pool.close()
+            results["reads_per_second"][readers] = qps
+            results["rows_written"][readers] = rows
+        writer.close()
+
+    print(f"Connection pool results ({count} messages, concurrent writer):")
+    base = results["reads_per_second"].get(reader_counts[0]) or 0
+    for readers, qps in results["reads_per_second"].items():
+        label = "writer only" if readers == 0 else f"{readers} readers"
+        scale = qps / base if base else 0
+        print(f"  {label:<12} {qps:>10,.0f} reads/s  ({scale:.2f}x)  writer rows: {results['rows_written'][readers]:,}")
+
+    return results
+
+
+def benchmark_open(db_path: Path, opener, runs: int = 20, reset_version: bool = False) -> float:
+    """Open and close *db_path* with *opener* *runs* times; return mean milliseconds per open.
+
+    ``reset_version`` clears ``user_version`` before each open, reproducing the
+    old behaviour of re-running the full schema script on every instantiation.
+    """
+    total = 0.0
+    for _ in range(runs):
+        if reset_version:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("PRAGMA user_version = 0")
+        start = time.perf_counter()
+        db = opener(db_path)
+        total += time.perf_counter() - start
+        db.conn.close()
+    return total / runs * 1000
+
+
+def run_open_benchmarks(runs: int = 20) -> Dict:
+    """Compare DB-open latency: schema replay, versioned schema, and ``open_fast``."""
+    results: Dict = {"runs": runs, "ms_per_open": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "open.sqlite3"
+        SpectraDB.open_fast(db_path).conn.close()
+        cases = {
+            "schema replay": (SpectraDB, True),
+            "SpectraDB()": (SpectraDB, False),
+            "open_fast()": (SpectraDB.open_fast, False),
+        }
+        for name, (opener, reset) in cases.items():
+            results["ms_per_open"][name] = benchmark_open(db_path, opener, runs, reset)
+
+    print(f"DB open latency (mean of {runs} opens):")
+    base = results["ms_per_open"]["schema replay"]
+    for name, ms in results["ms_per_open"].items():
+        print(f"  {name:<14} {ms:>8.2f} ms  ({base / ms if ms else 0:.1f}x)")
+
+    return results
+
+
+MESSAGE_SQL = (
+    "INSERT INTO messages(id, type, date, content, user_id, checksum) VALUES (?, 'message', ?, ?, ?, ?)"
+)
+PROFILE_QUERIES = (
+    ("SELECT * FROM messages WHERE id = ?", lambda i, n: (i % n + 1,)),
+    ("SELECT COUNT(*) FROM messages WHERE user_id = ?", lambda i, n: (i % 1000,)),
+    ("SELECT id, content FROM messages WHERE date >= ? ORDER BY date LIMIT 100",
+     lambda i, n: ((datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i * 997 % n)).isoformat(),)),
+)
+
+
+def benchmark_ingest(db_path: Path, profile: str, count: int, batch: int = 500, users: int = 1000) -> float:
+    """Insert *count* messages in *batch*-sized transactions with *profile*; return rows/second."""
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with BaseDB(db_path, profile=profile) as db:
+        conn = db.conn
+        start = time.perf_counter()
+        with conn:
+            conn.executemany("INSERT INTO users(id, username) VALUES (?, ?)", ((u, f"user{u}") for u in range(users)))
+        for first in range(1, count + 1, batch):
+            with conn:
+                if db.defer_foreign_keys:
+                    conn.execute("PRAGMA defer_foreign_keys=ON;")
+                conn.executemany(
+                    MESSAGE_SQL,
+                    [
+                        (i, (start_date + timedelta(seconds=i)).isoformat(), f"synthetic message {i}", i % users, "")
+                        for i in range(first, min(first + batch, count + 1))
+                    ],
+                )
+        return count / (time.perf_counter() - start)
+
+
+def benchmark_queries(db_path: Path, profile: str, count: int, duration: float = 2.0) -> float:
+    """Run a point/index/range query mix on *db_path* with *profile*; return queries/second."""
+    with BaseDB(db_path, profile=profile) as db:
+        done = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            sql, params = PROFILE_QUERIES[done % len(PROFILE_QUERIES)]
+            db.conn.execute(sql, params(done, count)).fetchall()
+            done += 1
+    return done / duration
+
+
+def run_profile_benchmarks(count: int = 1_000_000, duration: float = 2.0) -> Dict:
+    """Compare ingest and query throughput of each pragma profile on a synthetic archive."""
+    results: Dict = {"messages": count, "ingest_rows_per_second": {}, "queries_per_second": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PRAGMA_PROFILES:
+            if profile == "query":
+                continue  # read-only connections cannot ingest
+            results["ingest_rows_per_second"][profile] = benchmark_ingest(Path(tmp) / f"{profile}.sqlite3", profile, count)
+
+        query_db = Path(tmp) / "default.sqlite3"
+        for profile in PRAGMA_PROFILES:
+            results["queries_per_second"][profile] = benchmark_queries(query_db, profile, count, duration)
+
+    print(f"Pragma profile results ({count:,} messages):")
+    for profile, rate in results["ingest_rows_per_second"].items():
+        print(f"  ingest {profile:<8} {rate:>12,.0f} rows/s")
+    for profile, qps in results["queries_per_second"].items():
+        print(f"  query  {profile:<8} {qps:>12,.0f} queries/s")
+
+    return results
+
+
+def _scan_range(conn: sqlite3.Connection, start: int, end: int) -> list:
+    """The pre-index lookup: scan and parse every row ordered by date."""
+    ids = []
+    for message_id, date in conn.execute("SELECT id, date FROM messages ORDER BY date"):
+        ts = parse_timestamp(date)
+        if ts is not None and start <= ts <= end:
+            ids.append(message_id)
+    return ids
+
+
+def run_time_index_benchmarks(count: int = 1_000_000, lookups: int = 1000) -> Dict:
+    """Compare timestamp-range lookups: full scan vs. cold index build vs. resident bisects."""
+    results: Dict = {"messages": count, "ms": {}}
+    t0 = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "time.sqlite3"
+        conn = create_message_db(db_path, count)
+
+        start = time.perf_counter()
+        expected = _scan_range(conn, t0 + 1000, t0 + 2000)
+        results["ms"]["scan per lookup"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        index = MessageTimeIndex(conn, Path(tmp) / "time.sqlite3.timeindex.npz")
+        index.series()
+        results["ms"]["index build"] = (time.perf_counter() - start) * 1000
+        assert index.range(t0 + 1000, t0 + 2000).tolist() == expected
+        index.save()
+
+        start = time.perf_counter()
+        MessageTimeIndex(conn, index.path).series()
+        results["ms"]["index load"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(lookups):
+            lo = t0 + i * 997 % count
+            index.range(lo, lo + 1000)
+        results["ms"]["index per lookup"] = (time.perf_counter() - start) * 1000 / lookups
+        conn.close()
+
+    print(f"Timestamp range lookups ({count:,} messages):")
+    for name, ms in results["ms"].items():
+        print(f"  {name:<18} {ms:>10.3f} ms")
+
+    return results
+
+
+# (name, before: TEXT date, after: integer date_ts, params)
+DATE_QUERIES = (
+    (
+        "months",
+        "SELECT strftime('%Y-%m', date), COUNT(*) FROM messages GROUP BY 1",
+        "SELECT strftime('%Y-%m', date_ts, 'unixepoch'), COUNT(*) FROM messages WHERE date_ts IS NOT NULL GROUP BY 1",
+        (),
+    ),
+    (
+        "days of a month",
+        "SELECT strftime('%Y-%m-%d', date), COUNT(*) FROM messages WHERE strftime('%Y%m', date) = '202401' GROUP BY 1",
+        "SELECT strftime('%Y-%m-%d', date_ts, 'unixepoch'), COUNT(*) FROM messages "
+        "WHERE date_ts >= 1704067200 AND date_ts < 1706745600 GROUP BY 1",
+        (),
+    ),
+    (
+        "user in range",
+        "SELECT COUNT(*) FROM messages WHERE user_id = ? AND date >= '2024-01-02' AND date < '2024-01-03'",
+        "SELECT COUNT(*) FROM messages WHERE user_id = ? AND date_ts >= 1704153600 AND date_ts < 1704240000",
+        (7,),
+    ),
+)
+
+
+def run_date_ts_benchmarks(count: int = 1_000_000, runs: int = 5) -> Dict:
+    """Time each timeline query on TEXT ``date`` and on ``date_ts``, printing both query plans."""
+    results: Dict = {"messages": count, "ms": {}}
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with BaseDB(Path(tmp) / "dates.sqlite3", profile="ingest") as db:
+            conn = db.conn
+            with conn:
+                conn.executemany("INSERT INTO users(id, username) VALUES (?, ?)", ((u, f"user{u}") for u in range(1000)))
+                conn.executemany(
+                    "INSERT INTO messages(id, type, date, date_ts, user_id) VALUES (?, 'message', ?, ?, ?)",
+                    (
+                        (i, (start_date + timedelta(seconds=i * 7)).isoformat(), int(start_date.timestamp()) + i * 7, i % 1000)
+                        for i in range(1, count + 1)
+                    ),
+                )
+            conn.execute("ANALYZE")
+
+            print(f"Timeline queries ({count:,} messages):")
+            for name, before, after, params in DATE_QUERIES:
+                timings = {}
+                for label, sql in (("date", before), ("date_ts", after)):
+                    plan = " | ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+                    start = time.perf_counter()
+                    for _ in range(runs):
+                        conn.execute(sql, params).fetchall()
+                    timings[label] = (time.perf_counter() - start) * 1000 / runs
+                    print(f"  {name:<16} {label:<8} {timings[label]:>10.2f} ms  {plan}")
+                results["ms"][name] = timings
+
+    return results
+
+
+if __name__ == "__main__":
+    results = {
+        "pool": run_pool_benchmarks(),
+        "open": run_open_benchmarks(),
+        "profiles": run_profile_benchmarks(),
+        "time_index": run_time_index_benchmarks(),
+        "date_ts": run_date_ts_benchmarks(),
+    }
+    print("\nBenchmark Results:")
+    print(results)
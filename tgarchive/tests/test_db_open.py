@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tgarchive.db import SpectraDB
+from tgarchive.db import db_base
+from tgarchive.db.schema import SCHEMA_VERSION
+from tgarchive.search.hybrid_search import SQLiteFTS5IndexManager
+
+
+class TestDBOpen(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "open.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_schema_script_runs_only_when_version_is_behind(self):
+        with SpectraDB.open_fast(self.db_path) as db:
+            self.assertEqual(db.schema_version, SCHEMA_VERSION)
+
+        with patch.object(db_base, "SCHEMA_SQL", "SELECT raise_error();"):
+            # An up-to-date database never re-executes the schema script.
+            with SpectraDB.open_fast(self.db_path) as db:
+                self.assertEqual(db.schema_version, SCHEMA_VERSION)
+
+    def test_pending_migrations_are_applied_in_order(self):
+        SpectraDB.open_fast(self.db_path).conn.close()
+        migrations = {
+            SCHEMA_VERSION + 1: "CREATE TABLE extra (id INTEGER PRIMARY KEY);",
+            SCHEMA_VERSION + 2: "ALTER TABLE extra ADD COLUMN note TEXT;",
+        }
+        with patch.object(db_base, "MIGRATIONS", migrations), \
+                patch.object(db_base, "SCHEMA_VERSION", SCHEMA_VERSION + 2):
+            with SpectraDB.open_fast(self.db_path) as db:
+                self.assertEqual(db.schema_version, SCHEMA_VERSION + 2)
+                cols = [r[1] for r in db.conn.execute("PRAGMA table_info(extra)")]
+        self.assertEqual(cols, ["id", "note"])
+
+    def test_fresh_archive_answers_keyword_search(self):
+        with SpectraDB.open_fast(self.db_path) as db:
+            db.conn.executemany(
+                "INSERT INTO messages(id, type, date, content) VALUES (?, 'message', '2024-01-01', ?)",
+                [(1, "alpha bravo"), (2, "charlie"), (3, "alphabet soup")],
+            )
+            db.commit()
+
+            fts = SQLiteFTS5IndexManager(db.conn)
+            self.assertTrue(fts.ready)
+            self.assertEqual(sorted(row[0] for row in fts.search_messages("alpha*")), [1, 3])
+
+    def test_fts_migration_keeps_custom_index_options(self):
+        with SpectraDB.open_fast(self.db_path) as db:
+            SQLiteFTS5IndexManager(db.conn, prefix=()).migrate()
+            db.conn.execute("PRAGMA user_version = 6")
+            db.commit()
+
+        with SpectraDB.open_fast(self.db_path) as db:
+            sql = db.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'").fetchone()[0]
+        self.assertNotIn("prefix=", sql)
+
+    def test_vfs_is_loaded_once_per_process(self):
+        with patch.object(db_base, "_vfs_loaded", None), \
+                patch.object(db_base, "QIHSE_VFS_PATH") as vfs_path:
+            vfs_path.exists.return_value = False
+            self.assertFalse(db_base.load_qihse_vfs())
+            self.assertFalse(db_base.load_qihse_vfs())
+            self.assertEqual(vfs_path.exists.call_count, 1)
+
+    def test_open_fast_skips_vector_store(self):
+        with patch("tgarchive.db.vector_store.VectorStoreManager") as manager:
+            with SpectraDB.open_fast(self.db_path) as db:
+                self.assertIsNone(db.vector_store)
+                self.assertEqual(db.semantic_search("anything"), [])
+            manager.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
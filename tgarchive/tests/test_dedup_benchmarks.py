@@ -0,0 +1,81 @@
+"""
+Performance Benchmarks for Deduplication
+========================================
+
+Near-duplicate image lookups: a linear Hamming scan over every stored
+perceptual hash (the pre-index ``_is_near_duplicate`` loop) against the
+multi-index hash in :class:`~tgarchive.core.phash_index.PerceptualHashIndex`.
+"""
+
+import logging
+import random
+import time
+from typing import Dict, List, Tuple
+
+from tgarchive.core.phash_index import PerceptualHashIndex
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_phashes(count: int, seed: int = 0) -> List[Tuple[int, str]]:
+    """``(file_id, hex pHash)`` rows: random hashes plus a near-duplicate of every 100th."""
+    rng = random.Random(seed)
+    rows = []
+    for file_id in range(count):
+        if file_id % 100 == 99:
+            value = int(rows[file_id - 1][1], 16)
+            for bit in rng.sample(range(64), rng.randint(1, 6)):
+                value ^= 1 << bit
+        else:
+            value = rng.getrandbits(64)
+        rows.append((file_id, f"{value:016x}"))
+    return rows
+
+
+def _scan(rows: List[Tuple[int, int]], query: int, radius: int) -> List[Tuple[int, int]]:
+    matches = []
+    for file_id, value in rows:
+        distance = (query ^ value).bit_count()
+        if distance <= radius:
+            matches.append((distance, file_id))
+    matches.sort()
+    return [(file_id, distance) for distance, file_id in matches]
+
+
+def run_phash_benchmarks(count: int = 1_000_000, queries: int = 200, scan_queries: int = 5,
+                         radii=(5, 8, 10)) -> Dict:
+    """Time index build and radius queries against a linear scan at *count* hashes."""
+    results: Dict = {"hashes": count, "ms": {}}
+    rows = synthetic_phashes(count)
+    rng = random.Random(1)
+    probes = [rows[rng.randrange(count)][1] for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = PerceptualHashIndex(rows)
+    results["build_seconds"] = time.perf_counter() - start
+
+    ints = [(file_id, int(value, 16)) for file_id, value in rows]
+    start = time.perf_counter()
+    for probe in probes[:scan_queries]:
+        _scan(ints, int(probe, 16), radii[0])
+    results["ms"]["scan"] = (time.perf_counter() - start) / scan_queries * 1000
+
+    for radius in radii:
+        for probe in probes[:scan_queries]:
+            assert index.query(probe, radius) == _scan(ints, int(probe, 16), radius)
+        start = time.perf_counter()
+        for probe in probes:
+            index.query(probe, radius)
+        results["ms"][f"index r={radius}"] = (time.perf_counter() - start) / queries * 1000
+
+    print(f"pHash radius lookups ({count:,} hashes, index build {results['build_seconds']:.1f}s):")
+    for name, ms in results["ms"].items():
+        speedup = results["ms"]["scan"] / ms if ms else 0
+        print(f"  {name:<14} {ms:>9.3f} ms/query  ({speedup:.0f}x)")
+    return results
+
+
+if __name__ == "__main__":
+    results = run_phash_benchmarks()
+    print("\nBenchmark Results:")
+    print(results)
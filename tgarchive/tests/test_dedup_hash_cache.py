@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from tgarchive.db import SpectraDB
+from tgarchive.forwarding.deduplication import Deduplicator, file_cache_key
+
+CONTENT = b"streamed attachment bytes " * 1000
+
+
+class StreamingClient:
+    """Telethon-like client whose iter_download yields chunks and counts downloads."""
+
+    def __init__(self, content: bytes = CONTENT):
+        self.content = content
+        self.downloads = 0
+
+    async def _chunks(self, chunk_size):
+        self.downloads += 1
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def iter_download(self, media, chunk_size=None):
+        return self._chunks(chunk_size or 1024)
+
+
+def _message(message_id: int, file_id: str = "doc-1", access_hash: int = 42, name: str = "a.bin"):
+    file = SimpleNamespace(id=file_id, name=name, media=SimpleNamespace(access_hash=access_hash))
+    return SimpleNamespace(id=message_id, file=file, media=object(), reply_to_top_id=None)
+
+
+class TestDedupHashCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = SpectraDB.open_fast(Path(self.tmp.name) / "dedup.sqlite3")
+        self.expected = hashlib.sha256(CONTENT).hexdigest()
+
+    def tearDown(self):
+        self.db.conn.close()
+        self.tmp.cleanup()
+
+    def test_cache_key(self):
+        self.assertEqual(file_cache_key(_message(1)), ("doc-1", 42))
+        self.assertIsNone(file_cache_key(SimpleNamespace(id=1, file=None)))
+
+    def test_check_and_record_download_once(self):
+        client = StreamingClient()
+        dedup = Deduplicator(self.db, enable_deduplication=True)
+        group = [_message(1)]
+
+        async def run():
+            self.assertFalse(await dedup.is_duplicate(group, client))
+            await dedup.record_forwarded(group, origin_id=7, dest_id="dest", client=client)
+            self.assertTrue(await dedup.is_duplicate(group, client))
+
+        asyncio.run(run())
+        self.assertEqual(client.downloads, 1)
+        row = self.db.conn.execute("SELECT file_id, access_hash, sha256_hash FROM file_hashes").fetchone()
+        self.assertEqual(row, ("doc-1", 42, self.expected))
+        dedup.close()
+
+    def test_recorded_hash_serves_later_sessions_without_download(self):
+        self.db.add_file_hash(file_id="doc-1", sha256_hash=self.expected, perceptual_hash=None, fuzzy_hash=None, access_hash=42)
+        client = StreamingClient()
+        dedup = Deduplicator(self.db, enable_deduplication=True)
+        dedup.message_hashes.clear()
+
+        self.assertTrue(asyncio.run(dedup.is_duplicate([_message(5)], client)))
+        self.assertEqual(client.downloads, 0)
+
+        # a different access hash is a different key and is fetched
+        self.assertTrue(asyncio.run(dedup.is_duplicate([_message(6, access_hash=99)], client)))
+        self.assertEqual(client.downloads, 1)
+        dedup.close()
+
+    def test_keep_files_until_release(self):
+        client = StreamingClient()
+        dedup = Deduplicator(self.db, enable_deduplication=True)
+        group = [_message(1)]
+
+        self.assertFalse(asyncio.run(dedup.is_duplicate(group, client, keep_files=True)))
+        entry = asyncio.run(dedup.file_hashes(group[0], client, keep_file=True))
+        self.assertEqual(client.downloads, 1)
+        with open(entry.path, "rb") as fh:
+            self.assertEqual(fh.read(), CONTENT)
+
+        path = entry.path
+        dedup.release(group)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(asyncio.run(dedup.file_hashes(group[0], client)).sha256_hash, self.expected)
+        self.assertEqual(client.downloads, 1)
+        dedup.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from tgarchive.search.embedding_cache import EmbeddingCache, embedding_key
+from tgarchive.search.hybrid_search import HybridSearchEngine, QIHSEVectorManager
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer that records each encode call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "embeddings.db"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_keys_normalise_whitespace_and_include_model(self):
+        self.assertEqual(embedding_key("  hello \n world ", "m"), embedding_key("hello world", "m"))
+        self.assertNotEqual(embedding_key("hello world", "m"), embedding_key("hello world", "other"))
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = EmbeddingCache(max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_disk_tier_survives_restart(self):
+        cache = EmbeddingCache(model_name="m", max_entries=8, path=self.path)
+        cache.put_many(["alpha", "beta"], [[1.0, 2.0], [3.0, 4.0]])
+        cache.close()
+
+        reopened = EmbeddingCache(model_name="m", max_entries=8, path=self.path)
+        vectors = reopened.get_many(["beta", "alpha", "gamma"])
+        reopened.close()
+
+        np.testing.assert_array_equal(vectors[0], [3.0, 4.0])
+        np.testing.assert_array_equal(vectors[1], [1.0, 2.0])
+        self.assertIsNone(vectors[2])
+        self.assertEqual(reopened.stats["disk_hits"], 2)
+        self.assertEqual(reopened.stats["misses"], 1)
+
+
+class TestBatchedEmbedding(unittest.TestCase):
+    def _make_manager(self, **cache_kwargs):
+        manager = QIHSEVectorManager.__new__(QIHSEVectorManager)
+        manager.model = FakeModel()
+        manager.encode_batch_size = 64
+        manager.embedding_cache = EmbeddingCache(model_name="fake", **cache_kwargs)
+        manager.vector_store = MagicMock()
+        return manager
+
+    def test_embed_messages_encodes_only_unique_misses_in_one_pass(self):
+        manager = self._make_manager()
+        manager.embed_message("cached")
+
+        vectors = manager.embed_messages(["one", "cached", "two", "one "])
+
+        self.assertEqual(manager.model.calls, [["cached"], ["one", "two"]])
+        self.assertEqual(len(vectors), 4)
+        self.assertEqual(vectors[0], vectors[3])
+        self.assertEqual(vectors[1], manager.embed_message("cached"))
+        self.assertEqual(len(manager.model.calls), 2)
+
+    def test_index_messages_upserts_one_batch(self):
+        manager = self._make_manager()
+        date = datetime(2024, 1, 1)
+        messages = [
+            {"message_id": i, "content": f"message {i}", "channel_id": 7, "user_id": 1, "date": date}
+            for i in range(5)
+        ]
+
+        indexed = manager.index_messages(messages)
+
+        self.assertEqual(indexed, 5)
+        self.assertEqual(len(manager.model.calls), 1)
+        manager.vector_store.index_messages_batch.assert_called_once()
+        batch = manager.vector_store.index_messages_batch.call_args.args[0]
+        self.assertEqual([row[0] for row in batch], list(range(5)))
+        self.assertEqual(batch[0][2]["date"], date.isoformat())
+
+    def test_search_batch_encodes_semantic_queries_together(self):
+        manager = self._make_manager()
+        manager.vector_store.semantic_search.return_value = []
+        engine = HybridSearchEngine.__new__(HybridSearchEngine)
+        engine.vector = manager
+        engine.keystone_timestamp = None
+
+        results = engine.search_batch(["similar to alpha", "related beta", "like gamma"])
+
+        self.assertEqual(len(manager.model.calls), 1)
+        self.assertEqual(len(manager.model.calls[0]), 3)
+        self.assertEqual(manager.vector_store.semantic_search.call_count, 3)
+        self.assertEqual(set(results), {"similar to alpha", "related beta", "like gamma"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from telethon import errors
+
+from tgarchive.core.error_recovery import RateLimitHandler, RetryScheduler
+
+
+def flood_wait(seconds=0):
+    return errors.FloodWaitError(request=None, capture=seconds)
+
+
+class TestRateLimitHandler(unittest.TestCase):
+    def test_park_tracks_per_context_stats(self):
+        limiter = RateLimitHandler(enable_jitter=False)
+        limiter.park("entity:1", 30)
+        limiter.park("entity:1", 10)
+
+        self.assertGreater(limiter.ready_in("entity:1"), 29)
+        self.assertEqual(limiter.ready_in("entity:2"), 0.0)
+        stats = limiter.get_wait_stats()["entity:1"]
+        self.assertEqual(stats["flood_waits"], 2)
+        self.assertEqual(stats["total_wait_seconds"], 40)
+        self.assertEqual(stats["max_wait_seconds"], 30)
+
+    @patch("tgarchive.core.error_recovery.asyncio.sleep", new_callable=AsyncMock)
+    def test_call_retries_without_recursion_and_caps_attempts(self, mock_sleep):
+        limiter = RateLimitHandler(enable_jitter=False)
+        func = AsyncMock(side_effect=[flood_wait(), flood_wait(), "ok"])
+        self.assertEqual(asyncio.run(limiter.call(func, context="c", max_attempts=3)), "ok")
+        self.assertEqual(func.await_count, 3)
+
+        always = AsyncMock(side_effect=flood_wait())
+        with self.assertRaises(errors.FloodWaitError):
+            asyncio.run(limiter.call(always, context="d", max_attempts=2))
+        self.assertEqual(always.await_count, 2)
+
+
+class TestRetryScheduler(unittest.TestCase):
+    def test_parked_context_does_not_block_others(self):
+        limiter = RateLimitHandler(enable_jitter=False)
+        scheduler = RetryScheduler(limiter, concurrency=1)
+        completed = []
+        attempts = {"a": 0}
+
+        async def flaky():
+            attempts["a"] += 1
+            if attempts["a"] == 1:
+                raise flood_wait()
+            completed.append("a")
+            return "a"
+
+        def steady(name):
+            async def run():
+                completed.append(name)
+                return name
+            return run
+
+        items = [("entity:a", flaky), ("entity:b", steady("b1")), ("entity:b", steady("b2"))]
+        results = asyncio.run(scheduler.run(items))
+
+        self.assertEqual(results, ["a", "b1", "b2"])
+        self.assertEqual(completed, ["b1", "b2", "a"])
+        self.assertEqual(limiter.get_wait_stats()["entity:a"]["flood_waits"], 1)
+
+    def test_exhausted_attempts_return_exception(self):
+        scheduler = RetryScheduler(RateLimitHandler(enable_jitter=False), max_attempts=1)
+
+        async def always_flooded():
+            raise flood_wait()
+
+        results = asyncio.run(scheduler.run([("x", always_flooded)]))
+        self.assertIsInstance(results[0], errors.FloodWaitError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from tgarchive.core.config_models import Config
+from tgarchive.core.deduplication import get_fuzzy_hash, get_perceptual_hash
+from tgarchive.core.minhash_lsh import HAS_DATASKETCH
+from tgarchive.db import SpectraDB
+from tgarchive.forwarding.deduplication import Deduplicator, FileHashes, file_cache_key
+from tgarchive.forwarding.forwarder import IMAGEHASH_AVAILABLE, AttachmentForwarder
+
+
+class MockFile:
+    def __init__(self, file_id: int, size: int = 0):
+        self.id = file_id
+        self.name = f"file-{file_id}.bin"
+        self.size = size
+        self.media = None
+
+
+class MockMessage:
+    def __init__(self, message_id: int, *, file_id=None, size: int = 0):
+        self.id = message_id
+        self.text = ""
+        self.message = ""
+        self.date = datetime.now(timezone.utc)
+        self.sender_id = 1
+        self.reply_to_top_id = None
+        self.media = MagicMock(name=f"media-{message_id}") if file_id is not None else None
+        self.file = MockFile(file_id, size=size) if file_id is not None else None
+
+
+class TestBatchedForwarding(unittest.TestCase):
+    def setUp(self):
+        mock_path = MagicMock(spec=Path)
+        mock_path.exists.return_value = False
+        self.config = Config(path=mock_path)
+        self.config.data["accounts"] = [{"api_id": 1, "api_hash": "hash", "session_name": "test"}]
+        self.config.data.setdefault("forwarding", {})
+        self.config.data["forwarding"]["forward_with_attribution"] = False
+
+    def _make_client(self, messages, forward_result=None):
+        client = MagicMock()
+        client.is_connected.return_value = True
+        client.get_entity = AsyncMock(side_effect=[MagicMock(id=10), MagicMock(id=20)])
+        client.forward_messages = AsyncMock(side_effect=forward_result)
+        client.send_message = AsyncMock()
+
+        async def iter_messages(*args, **kwargs):
+            # Telegram returns history newest first
+            for message in reversed(messages):
+                yield message
+
+        client.iter_messages = iter_messages
+        return client
+
+    def _make_forwarder(self, client, **kwargs):
+        forwarder = AttachmentForwarder(config=self.config, db=None, **kwargs)
+        forwarder.grouper.grouping_strategy = "none"
+        forwarder.client_manager.get_client = AsyncMock(return_value=client)
+        forwarder.client_manager.close = AsyncMock()
+        return forwarder
+
+    def test_batch_size_defaults_to_config_and_is_clamped(self):
+        self.config.data["forwarding"]["forward_batch_size"] = 25
+        self.assertEqual(AttachmentForwarder(config=self.config, db=None).forward_batch_size, 25)
+        self.assertEqual(AttachmentForwarder(config=self.config, db=None, forward_batch_size=500).forward_batch_size, 100)
+        self.assertEqual(AttachmentForwarder(config=self.config, db=None, forward_batch_size=0).forward_batch_size, 1)
+
+    def test_groups_are_packed_into_one_request(self):
+        asyncio.run(self._test_groups_are_packed_into_one_request())
+
+    async def _test_groups_are_packed_into_one_request(self):
+        messages = [MockMessage(i, file_id=100 + i, size=10) for i in range(1, 6)]
+        client = self._make_client(messages, forward_result=lambda **kw: [MagicMock() for _ in kw["messages"]])
+        forwarder = self._make_forwarder(client, enable_deduplication=False, forward_batch_size=3)
+
+        last_message_id, stats = await forwarder.forward_messages(origin_id="@origin", destination_id="@destination")
+
+        sent = [call.kwargs["messages"] for call in client.forward_messages.await_args_list]
+        self.assertEqual(sent, [[1, 2, 3], [4, 5]])
+        self.assertEqual(stats["forward_requests"], 2)
+        self.assertEqual(stats["messages_forwarded"], 5)
+        self.assertEqual(stats["bytes_forwarded"], 50)
+        self.assertEqual(last_message_id, 5)
+
+    def test_unforwarded_ids_skip_only_their_group(self):
+        asyncio.run(self._test_unforwarded_ids_skip_only_their_group())
+
+    async def _test_unforwarded_ids_skip_only_their_group(self):
+        messages = [MockMessage(i, file_id=100 + i, size=10) for i in range(1, 4)]
+        client = self._make_client(messages, forward_result=[[MagicMock(), MagicMock(), None]])
+        forwarder = self._make_forwarder(client, enable_deduplication=False, forward_batch_size=10)
+
+        last_message_id, stats = await forwarder.forward_messages(origin_id="@origin", destination_id="@destination")
+
+        self.assertEqual(client.forward_messages.await_count, 1)
+        self.assertEqual(stats["messages_forwarded"], 2)
+        self.assertEqual(last_message_id, 2)
+
+    def test_duplicate_within_pending_batch_is_skipped(self):
+        asyncio.run(self._test_duplicate_within_pending_batch_is_skipped())
+
+    async def _test_duplicate_within_pending_batch_is_skipped(self):
+        # messages 1 and 2 carry the same content under different Telegram file ids
+        messages = [MockMessage(1, file_id=101), MockMessage(2, file_id=102), MockMessage(3, file_id=103)]
+        client = self._make_client(messages, forward_result=lambda **kw: [MagicMock() for _ in kw["messages"]])
+        forwarder = self._make_forwarder(client, enable_deduplication=True, forward_batch_size=10)
+        dedup = forwarder.deduplicator
+        contents = {101: "aa", 102: "aa", 103: "bb"}
+
+        async def file_hashes(message, client, keep_file=False):
+            return dedup._remember(file_cache_key(message), FileHashes(sha256_hash=contents[message.file.id]))
+
+        dedup.file_hashes = file_hashes
+
+        _, stats = await forwarder.forward_messages(origin_id="@origin", destination_id="@destination")
+
+        sent = [call.kwargs["messages"] for call in client.forward_messages.await_args_list]
+        self.assertEqual(sent, [[1, 3]])
+        self.assertEqual(stats["messages_forwarded"], 2)
+
+    def _forward_near_duplicate_case(self, tmp, batch_size, sources, recorded):
+        """Forward messages 1 and 2 whose files are copies of *sources* against an archive holding *recorded*."""
+        db = SpectraDB(tmp / f"archive-{batch_size}.db")
+        self.addCleanup(db.close)
+        db.add_file_hash(900, "seen", *recorded)
+        db.commit()
+        messages = [MockMessage(1, file_id=101), MockMessage(2, file_id=102)]
+        client = self._make_client(messages, forward_result=lambda **kw: [MagicMock() for _ in kw["messages"]])
+        forwarder = AttachmentForwarder(config=self.config, db=db, forward_batch_size=batch_size)
+        forwarder.client_manager.get_client = AsyncMock(return_value=client)
+        dedup = forwarder.deduplicator
+
+        async def file_hashes(message, client, keep_file=False):
+            # stand-in for the spooled download
+            source = tmp / sources[message.file.id]
+            spooled = tmp / f"spool-{batch_size}-{message.id}{source.suffix}"
+            shutil.copy(source, spooled)
+            entry = FileHashes(sha256_hash=f"sha-{message.file.id}", path=str(spooled))
+            return dedup._remember(file_cache_key(message), entry)
+
+        dedup.file_hashes = file_hashes
+        _, stats = asyncio.run(forwarder.forward_messages(origin_id="@origin", destination_id="@destination"))
+        sent = [call.kwargs["messages"] for call in client.forward_messages.await_args_list]
+        return sent, stats, dedup
+
+    @unittest.skipUnless(IMAGEHASH_AVAILABLE, "imagehash is not installed")
+    def test_near_identical_image_is_skipped(self):
+        from PIL import Image
+
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        gradient = Image.linear_gradient("L").resize((64, 64))
+        gradient.save(tmp / "seen.png")
+        gradient.point(lambda v: min(255, v + 3)).save(tmp / "near.png")
+        Image.effect_noise((64, 64), 80).save(tmp / "other.png")
+        self.config.data["deduplication"] = {"enable_near_duplicates": True}
+
+        for batch_size in (1, 10):
+            with self.subTest(forward_batch_size=batch_size):
+                sent, stats, _ = self._forward_near_duplicate_case(
+                    tmp, batch_size, {101: "near.png", 102: "other.png"},
+                    (get_perceptual_hash(tmp / "seen.png"), None),
+                )
+                self.assertEqual(sent, [[2]])
+                self.assertEqual(stats["messages_forwarded"], 1)
+
+    def test_near_identical_document_is_skipped_through_lsh_candidates(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        words = (
+            "the archive keeps every forwarded report so analysts can trace where a file "
+            "first surfaced and which channels carried it later on"
+        ).split()
+        (tmp / "seen.txt").write_text(" ".join(words))
+        (tmp / "near.txt").write_text(" ".join(words[:10] + ["edited"] + words[11:]))
+        (tmp / "other.txt").write_text("quarterly budget figures for the regional office, second draft")
+        self.config.data["deduplication"] = {"enable_near_duplicates": True}
+
+        for batch_size in (1, 10):
+            with self.subTest(forward_batch_size=batch_size):
+                with patch.object(Deduplicator, "fuzzy_candidates", autospec=True, side_effect=Deduplicator.fuzzy_candidates) as candidates:
+                    sent, stats, dedup = self._forward_near_duplicate_case(
+                        tmp, batch_size, {101: "near.txt", 102: "other.txt"},
+                        (None, get_fuzzy_hash(tmp / "seen.txt")),
+                    )
+                self.assertEqual(sent, [[2]])
+                self.assertEqual(stats["messages_forwarded"], 1)
+                self.assertEqual(candidates.call_count, 2)
+                if HAS_DATASKETCH:
+                    # the unrelated document never reached an exact comparison
+                    self.assertIsNotNone(dedup.fuzzy_index)
+                    self.assertEqual(dedup.fuzzy_candidates(get_fuzzy_hash(tmp / "other.txt")), [])
+
+    def test_attribution_mode_is_not_batched(self):
+        asyncio.run(self._test_attribution_mode_is_not_batched())
+
+    async def _test_attribution_mode_is_not_batched(self):
+        messages = [MockMessage(i, file_id=100 + i) for i in range(1, 4)]
+        client = self._make_client(messages)
+        forwarder = self._make_forwarder(
+            client,
+            enable_deduplication=False,
+            forward_batch_size=10,
+            copy_messages_into_destination=True,
+        )
+
+        _, stats = await forwarder.forward_messages(origin_id="@origin", destination_id="@destination")
+
+        client.forward_messages.assert_not_called()
+        self.assertEqual(client.send_message.await_count, 3)
+        self.assertEqual(stats["messages_forwarded"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
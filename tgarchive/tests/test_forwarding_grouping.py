@@ -231,6 +231,56 @@ class TestAttachmentForwarderGrouping(unittest.TestCase):
         self.assertIn([12], group_ids)      # report_final.docx (user 2)
         self.assertIn([13], group_ids)      # notes_part1
 
+    def _stream(self, grouper, messages, **kwargs):
+        async def source():
+            for message in messages:
+                yield message
+
+        async def collect():
+            return [[m.id for m in group] async for group in grouper.stream_groups(source(), **kwargs)]
+
+        return asyncio.run(collect())
+
+    def test_stream_groups_matches_batch_grouping(self):
+        now = datetime.now(tz=timezone.utc)
+        messages = [
+            MockMessage(id=1, date=now, sender_id=1, filename="archive_part1.rar"),
+            MockMessage(id=2, date=now + timedelta(seconds=1), sender_id=1, filename="document.pdf"),
+            MockMessage(id=3, date=now + timedelta(seconds=2), sender_id=1, filename="archive_part3.rar"),
+            MockMessage(id=4, date=now + timedelta(seconds=3), sender_id=2, filename="video_01.mp4"),
+            MockMessage(id=5, date=now + timedelta(seconds=4), sender_id=1, filename="archive_part2.rar"),
+            MockMessage(id=6, date=now + timedelta(seconds=90), sender_id=2, filename="video_02.mp4"),
+            MockMessage(id=7, date=now + timedelta(seconds=95), sender_id=3, text="no file"),
+        ]
+        for strategy in ("none", "time", "filename"):
+            grouper = MessageGrouper(grouping_strategy=strategy, grouping_time_window_seconds=300)
+            expected = [[m.id for m in group] for group in grouper.group_messages(messages)]
+            self.assertEqual(self._stream(grouper, messages), expected, strategy)
+
+    def test_stream_groups_closes_filename_groups_after_window(self):
+        grouper = MessageGrouper(grouping_strategy="filename", grouping_time_window_seconds=60)
+        now = datetime.now(tz=timezone.utc)
+        messages = [
+            MockMessage(id=1, date=now, sender_id=1, filename="archive_part1.rar"),
+            MockMessage(id=2, date=now + timedelta(seconds=30), sender_id=1, filename="archive_part2.rar"),
+            MockMessage(id=3, date=now + timedelta(seconds=600), sender_id=1, filename="archive_part3.rar"),
+        ]
+        self.assertEqual(self._stream(grouper, messages), [[1, 2], [3]])
+
+    def test_stream_groups_bounds_buffered_messages(self):
+        grouper = MessageGrouper(grouping_strategy="filename", grouping_time_window_seconds=3600)
+        now = datetime.now(tz=timezone.utc)
+        messages = [MockMessage(id=1, date=now, sender_id=1, filename="archive_part1.rar")]
+        messages += [
+            MockMessage(id=i, date=now + timedelta(seconds=i), sender_id=2, filename=f"photo{i}.jpg")
+            for i in range(2, 6)
+        ]
+        messages.append(MockMessage(id=6, date=now + timedelta(seconds=6), sender_id=1, filename="archive_part2.rar"))
+
+        # the open archive group is flushed once more than 3 messages wait behind it
+        self.assertEqual(self._stream(grouper, messages, max_buffered_messages=3), [[1], [2], [3], [4], [5], [6]])
+        self.assertEqual(self._stream(grouper, messages), [[1, 6], [2], [3], [4], [5]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -125,6 +125,50 @@ class TestForwardingTopics(unittest.TestCase):
         self.assertEqual(send_call.kwargs["message"], "copy me")
         self.assertEqual(send_call.kwargs["reply_to"], 707)
 
+    def test_stream_history_forwards_oldest_first_and_checkpoints(self):
+        asyncio.run(self._test_stream_history_forwards_oldest_first_and_checkpoints())
+
+    async def _test_stream_history_forwards_oldest_first_and_checkpoints(self):
+        forwarder = AttachmentForwarder(
+            config=self.config,
+            db=None,
+            enable_deduplication=False,
+            stream_history=True,
+        )
+
+        client = MagicMock()
+        client.is_connected.return_value = True
+        client.get_entity = AsyncMock(side_effect=[MagicMock(id=10), MagicMock(id=20)])
+        client.forward_messages = AsyncMock()
+        client.send_message = AsyncMock()
+
+        messages = [MockMessage(i, has_media=True, size=10) for i in range(6, 9)]
+        iter_kwargs = {}
+
+        async def iter_messages(*args, **kwargs):
+            iter_kwargs.update(kwargs)
+            for message in messages:
+                yield message
+
+        client.iter_messages = iter_messages
+        forwarder.client_manager.get_client = AsyncMock(return_value=client)
+        forwarder.client_manager.close = AsyncMock()
+        checkpoints = []
+
+        last_message_id, stats = await forwarder.forward_messages(
+            origin_id="@origin",
+            destination_id="@destination",
+            start_message_id=5,
+            checkpoint=checkpoints.append,
+        )
+
+        self.assertEqual(iter_kwargs, {"min_id": 5, "reverse": True})
+        forwarded = [call.kwargs["messages"] for call in client.forward_messages.await_args_list]
+        self.assertEqual(forwarded, [[6], [7], [8]])
+        self.assertEqual(checkpoints, [6, 7, 8])
+        self.assertEqual(last_message_id, 8)
+        self.assertEqual(stats["messages_forwarded"], 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,198 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from tgarchive.search.hybrid_search import SQLiteFTS5IndexManager
+
+TABLES_SQL = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, first_name TEXT, last_name TEXT);
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY, type TEXT, date TEXT, date_ts INTEGER,
+    content TEXT, user_id INTEGER, channel_id INTEGER
+);
+"""
+
+OLD_LAYOUT_SQL = """
+CREATE VIRTUAL TABLE messages_fts USING fts5(
+    message_id UNINDEXED, content, user_id UNINDEXED, channel_id UNINDEXED, date UNINDEXED,
+    content='messages', content_rowid='id'
+);
+CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, message_id, content, user_id, channel_id, date)
+    VALUES (new.id, new.id, new.content, new.user_id, new.channel_id, new.date);
+END;
+"""
+
+
+def migrated(conn, **kwargs):
+    fts = SQLiteFTS5IndexManager(conn, **kwargs)
+    fts.migrate()
+    return fts
+
+
+def insert_messages(conn, rows):
+    conn.executemany(
+        "INSERT INTO messages(id, type, date, content, user_id, channel_id) VALUES (?, 'message', '2024-01-01', ?, 1, 1)",
+        rows,
+    )
+    conn.commit()
+
+
+class TestFTS5IndexManager(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript(TABLES_SQL)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def ids(self, fts, query):
+        return sorted(row[0] for row in fts.search_messages(query))
+
+    def assertIndexConsistent(self, table="messages_fts"):
+        # raises SQLITE_CORRUPT_VTAB if the index disagrees with messages
+        self.conn.execute(f"INSERT INTO {table}({table}, rank) VALUES('integrity-check', 1)")
+
+    def test_prefix_and_diacritic_folding(self):
+        fts = migrated(self.conn)
+        insert_messages(self.conn, [(1, "Crème brûlée recipe"), (2, "Über das Wetter"), (3, "creme fraiche")])
+
+        self.assertEqual(self.ids(fts, "creme"), [1, 3])
+        self.assertEqual(self.ids(fts, "uber"), [2])
+        self.assertEqual(self.ids(fts, "rec*"), [1])
+        sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'").fetchone()[0]
+        self.assertIn("prefix='2 3'", sql)
+
+    def test_triggers_follow_content_changes_only(self):
+        fts = migrated(self.conn)
+        insert_messages(self.conn, [(1, "alpha"), (2, "beta")])
+        self.conn.execute("UPDATE messages SET date_ts = 1 WHERE id = 1")
+        self.conn.execute("UPDATE messages SET content = 'gamma' WHERE id = 2")
+        self.conn.execute("DELETE FROM messages WHERE id = 1")
+        self.conn.commit()
+
+        self.assertEqual(self.ids(fts, "alpha"), [])
+        self.assertEqual(self.ids(fts, "beta"), [])
+        self.assertEqual(self.ids(fts, "gamma"), [2])
+        self.assertIndexConsistent()
+
+    def test_old_layout_is_replaced_and_rebuilt(self):
+        self.conn.executescript(OLD_LAYOUT_SQL)
+        insert_messages(self.conn, [(1, "legacy row")])
+
+        fts = migrated(self.conn)
+
+        self.assertEqual(self.ids(fts, "legacy"), [1])
+        self.assertIndexConsistent()
+
+    def test_changed_tokenizer_recreates_index(self):
+        migrated(self.conn)
+        insert_messages(self.conn, [(1, "naïve")])
+
+        fts = migrated(self.conn, tokenizer="unicode61 remove_diacritics 0", prefix=())
+
+        self.assertEqual(self.ids(fts, "naive"), [])
+        self.assertEqual(self.ids(fts, "naïve"), [1])
+
+    def test_bulk_load_backfills_in_chunks(self):
+        fts = migrated(self.conn, trigram=True)
+        insert_messages(self.conn, [(1, "before bulk")])
+
+        with fts.bulk_load(chunk_size=3):
+            insert_messages(self.conn, [(i, f"bulk row {i}") for i in range(2, 12)])
+            self.assertEqual(self.ids(fts, "bulk"), [1])
+
+        self.assertEqual(self.ids(fts, "bulk"), list(range(1, 12)))
+        self.assertEqual(fts.stats["backfilled_rows"], 10)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM fts_state").fetchone()[0], 0)
+        insert_messages(self.conn, [(12, "after bulk")])
+        self.assertEqual(self.ids(fts, "after"), [12])
+        self.assertIndexConsistent()
+        self.assertIndexConsistent("messages_trigram")
+
+    def test_interrupted_bulk_load_resumes(self):
+        fts = migrated(self.conn)
+        load = fts.bulk_load()
+        load.__enter__()
+        insert_messages(self.conn, [(1, "orphaned row")])
+        # process dies here: triggers dropped, nothing indexed
+
+        fts = migrated(self.conn)
+
+        self.assertEqual(self.ids(fts, "orphaned"), [1])
+        self.assertIndexConsistent()
+
+    def test_trigram_substring_search(self):
+        fts = migrated(self.conn, trigram=True)
+        insert_messages(self.conn, [(1, "wallet 0xABCDEF12"), (2, "no match"), (3, "see abcdef")])
+
+        self.assertEqual(fts.search_substring("cdef"), [3, 1])
+        self.assertEqual(fts.search_substring("cdef", after_id=3), [1])
+        self.assertEqual(fts.search_substring("0x"), [1])
+        with self.assertRaises(RuntimeError):
+            migrated(self.conn).search_substring("abc")
+
+    def test_incremental_merge_until_done(self):
+        fts = migrated(self.conn, automerge=0, merge_pages=8)
+        for i in range(1, 41):
+            # one transaction per row leaves one segment each
+            insert_messages(self.conn, [(i, f"message number {i}")])
+
+        self.assertGreater(fts.run_maintenance(max_steps=100), 0)
+        self.assertEqual(fts.run_maintenance(), 0)
+        self.assertEqual(len(fts.search_messages("message", limit=100)), 40)
+        self.assertFalse(fts.start_maintenance(interval=0.01))
+
+
+class TestFTS5Maintenance(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.conn = sqlite3.connect(self.temp_dir / "fts.db")
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.executescript(TABLES_SQL)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_constructor_only_reads_the_schema(self):
+        migrated(self.conn, prefix=(2, 3, 4))
+        insert_messages(self.conn, [(1, "readonly archive"), (2, "another row")])
+        ro = sqlite3.connect(f"file:{self.temp_dir / 'fts.db'}?mode=ro", uri=True)
+        self.addCleanup(ro.close)
+
+        fts = SQLiteFTS5IndexManager(ro)
+
+        self.assertEqual(fts.table_state["messages_fts"], "changed")
+        self.assertFalse(fts.ready)
+        self.assertEqual([row[0] for row in fts.search_messages("readonly")], [1])
+        self.assertEqual(ro.total_changes, 0)
+
+        before = self.conn.total_changes
+        SQLiteFTS5IndexManager(self.conn)
+        self.assertEqual(self.conn.total_changes, before)
+        sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'").fetchone()[0]
+        self.assertIn("prefix='2 3 4'", sql)
+
+    def test_background_thread_merges_segments(self):
+        fts = migrated(self.conn, automerge=0, merge_pages=8)
+        for i in range(1, 21):
+            insert_messages(self.conn, [(i, f"message number {i}")])
+
+        self.assertTrue(fts.start_maintenance(interval=0.01))
+        try:
+            for _ in range(200):
+                if fts.stats["merge_steps"] >= 2:
+                    break
+                fts._maintenance_stop.wait(0.01)
+        finally:
+            fts.stop_maintenance()
+
+        self.assertGreaterEqual(fts.stats["merge_steps"], 2)
+        self.assertEqual(fts.run_maintenance(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
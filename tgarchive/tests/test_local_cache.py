@@ -0,0 +1,122 @@
+import itertools
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from tgarchive.search.cache_manager import CacheManager
+from tgarchive.search.local_cache import LocalCache
+
+
+def blob_size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class TestLocalCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "cache.db"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_memory_hit_returns_same_object(self):
+        cache = LocalCache()
+        value = {"results": [1, 2, 3]}
+        cache.set("k", value)
+
+        self.assertIs(cache.get("k"), value)
+        self.assertEqual(cache.stats["memory_hits"], 1)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        value = "x" * 100
+        cache = LocalCache(max_bytes=blob_size(value) * 2)
+        cache.set("a", value)
+        cache.set("b", value)
+        cache.get("a")
+        cache.set("c", value)
+
+        self.assertEqual(sorted(cache.get_many(["a", "b", "c"])), ["a", "c"])
+        self.assertLessEqual(cache.get_statistics()["memory_bytes"], cache.max_bytes)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_entries_expire(self):
+        cache = LocalCache()
+        with patch("tgarchive.search.local_cache.time.time", return_value=1000.0):
+            cache.set("k", "v", ttl=10)
+        with patch("tgarchive.search.local_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("k"))
+
+        self.assertEqual(cache.stats["expired"], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_disk_tier_survives_restart_and_promotes(self):
+        cache = LocalCache(path=self.path)
+        cache.set_many({"a": [1], "b": [2]})
+        cache.close()
+
+        reopened = LocalCache(path=self.path)
+        self.assertEqual(reopened.get_many(["a", "b", "c"]), {"a": [1], "b": [2]})
+        self.assertEqual(reopened.get("a"), [1])
+        reopened.close()
+
+        self.assertEqual(reopened.stats["disk_hits"], 2)
+        self.assertEqual(reopened.stats["memory_hits"], 1)
+        self.assertEqual(reopened.stats["misses"], 1)
+
+    def test_disk_budget_evicts_least_recently_read(self):
+        value = "y" * 1000
+        cache = LocalCache(max_bytes=0, path=self.path, disk_max_bytes=blob_size(value) * 2)
+        with patch("tgarchive.search.local_cache.time.time", side_effect=itertools.count(1.0)):
+            cache.set("a", value)
+            cache.set("b", value)
+            cache.get("a")
+            cache.set("c", value)
+            self.assertEqual(sorted(cache.get_many(["a", "b", "c"])), ["a", "c"])
+
+        self.assertLessEqual(cache.get_statistics()["disk_bytes"], cache.disk_max_bytes)
+        self.assertEqual(cache.stats["evictions"], 1)
+        cache.close()
+
+    def test_delete_prefix(self):
+        cache = LocalCache(path=self.path)
+        cache.set_many({"spectra:search:a": 1, "spectra:search:b": 2, "spectra:metadata:c": 3})
+
+        self.assertEqual(cache.delete_prefix("spectra:search:"), 2)
+        self.assertEqual(cache.get_many(["spectra:search:a", "spectra:metadata:c"]), {"spectra:metadata:c": 3})
+        cache.close()
+
+
+class TestCacheManagerTiers(unittest.TestCase):
+    def test_works_without_remote_backends(self):
+        manager = CacheManager(redis_url="")
+
+        self.assertTrue(manager.cache_search_result("q", "hybrid", [1, 2], limit=5))
+        self.assertEqual(manager.get_cached_search_result("q", "hybrid", limit=5), [1, 2])
+        self.assertEqual(manager.get_statistics()["local_hits"], 1)
+
+    def test_local_l1_in_front_of_redis(self):
+        manager = CacheManager(redis_url="", l1_ttl=60)
+        redis_client = MagicMock()
+        redis_client.mget.return_value = [pickle.dumps("remote"), None]
+        manager.redis_client = redis_client
+
+        self.assertEqual(manager.get_many(["k1", "k2"]), {"k1": "remote"})
+        # second read is served locally
+        self.assertEqual(manager.get("k1"), "remote")
+        redis_client.mget.assert_called_once_with(["k1", "k2"])
+        self.assertEqual(manager.stats["local_hits"], 1)
+
+        manager.set_many({"k3": 3, "k4": 4}, ttl=600)
+        pipe = redis_client.pipeline.return_value
+        self.assertEqual(pipe.setex.call_count, 2)
+        pipe.setex.assert_any_call("k3", 600, pickle.dumps(3))
+        pipe.execute.assert_called_once()
+        self.assertEqual(manager.get_many(["k3", "k4"]), {"k3": 3, "k4": 4})
+        self.assertEqual(redis_client.mget.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
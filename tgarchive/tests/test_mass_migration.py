@@ -1,8 +1,9 @@
 import unittest
 import os
 import asyncio
-from unittest.mock import AsyncMock, MagicMock
-from tgarchive.services.mass_migration import MassMigrationManager
+from unittest.mock import AsyncMock, MagicMock, patch
+from tgarchive.forwarding import AttachmentForwarder
+from tgarchive.services.mass_migration import MassMigrationManager, split_id_range
 from tgarchive.db import SpectraDB
 from tgarchive.core.config_models import Config
 
@@ -26,6 +27,83 @@ class TestMassMigration(unittest.TestCase):
             self.assertEqual(progress[1], 123)
         asyncio.run(run_test())
 
+    def test_one_time_migration_closes_the_client_pool(self):
+        async def run_test():
+            self.manager.forwarder.forward_messages = AsyncMock(side_effect=RuntimeError("connection lost"))
+            self.manager.forwarder.client_manager.close = AsyncMock()
+            with self.assertRaises(RuntimeError):
+                await self.manager.one_time_migration("source", "destination")
+            self.manager.forwarder.client_manager.close.assert_awaited_once()
+        asyncio.run(run_test())
+
+    def test_split_id_range(self):
+        self.assertEqual(split_id_range(0, 10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(split_id_range(5, 7, 4), [(5, 6), (6, 7)])
+        self.assertEqual(split_id_range(7, 7, 4), [])
+
+    def _parallel_setup(self):
+        self.config.data["accounts"] = [
+            {"api_id": 1, "api_hash": "a", "session_name": "acc1"},
+            {"api_id": 2, "api_hash": "b", "session_name": "acc2"},
+        ]
+        self.client.get_entity = AsyncMock(return_value=MagicMock(id=1))
+
+        async def get_messages(entity, limit=None, min_id=0, reverse=False):
+            return [MagicMock(id=1 if reverse else 100)]
+
+        self.client.get_messages = get_messages
+
+    def test_parallel_migration_splits_ids_across_accounts(self):
+        self._parallel_setup()
+        calls = []
+
+        async def forward_messages(forwarder, **kwargs):
+            calls.append(kwargs)
+            kwargs["checkpoint"](kwargs["end_message_id"])
+            return kwargs["end_message_id"], {}
+
+        async def run_test():
+            with patch.object(AttachmentForwarder, "forward_messages", new=forward_messages):
+                await self.manager.one_time_migration("source", "destination", parallel=True)
+
+        asyncio.run(run_test())
+
+        spans = sorted((c["start_message_id"], c["end_message_id"], c["account_identifier"]) for c in calls)
+        self.assertEqual(spans, [(0, 50, "acc1"), (50, 100, "acc2")])
+        migration_id, last_message_id = self.db.get_migration_progress("source", "destination")
+        self.assertEqual(last_message_id, 100)
+        self.assertTrue(all(row[4] == "completed" for row in self.db.get_migration_ranges(migration_id)))
+
+    def test_parallel_migration_resumes_unfinished_ranges(self):
+        self._parallel_setup()
+        calls = []
+
+        async def failing_forward(forwarder, **kwargs):
+            calls.append(kwargs["start_message_id"])
+            if kwargs["end_message_id"] == 100:
+                kwargs["checkpoint"](70)
+                raise RuntimeError("connection lost")
+            return kwargs["end_message_id"], {}
+
+        async def run_test(fake):
+            with patch.object(AttachmentForwarder, "forward_messages", new=fake):
+                await self.manager.one_time_migration("source", "destination", parallel=True)
+
+        asyncio.run(run_test(failing_forward))
+        migration_id, last_message_id = self.db.get_migration_progress("source", "destination")
+        self.assertEqual(last_message_id, 70)
+        self.assertEqual(self.db.get_migration_report(migration_id)[3], "error: 1 range(s) failed")
+
+        calls.clear()
+
+        async def forward(forwarder, **kwargs):
+            calls.append(kwargs["start_message_id"])
+            return kwargs["end_message_id"], {}
+
+        asyncio.run(run_test(forward))
+        self.assertEqual(calls, [70])
+        self.assertEqual(self.db.get_migration_progress("source", "destination")[1], 100)
+
     def test_rollback_migration(self):
         # This is a placeholder test, as the rollback logic is not yet implemented.
         self.manager.rollback_migration(1)
@@ -0,0 +1,101 @@
+import random
+import sqlite3
+import unittest
+from unittest.mock import Mock
+
+from tgarchive.core.deduplication import find_near_duplicates
+from tgarchive.core.minhash_lsh import (
+    MinHashLSHIndex,
+    estimate_jaccard,
+    fuzzy_hash_shingles,
+    fuzzy_hash_signature,
+    optimal_bands,
+)
+
+TEXT = "the quick brown fox jumps over the lazy dog near the riverbank " * 20
+
+
+def _signature(rng, base=None, keep=0.0):
+    if base is None:
+        return [rng.getrandbits(64) for _ in range(128)]
+    return [value if rng.random() < keep else rng.getrandbits(64) for value in base]
+
+
+class TestMinHashLSH(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE file_hashes (file_id INTEGER PRIMARY KEY, fuzzy_hash TEXT)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_shingles(self):
+        self.assertEqual(fuzzy_hash_shingles("fallback:a b c d"), {"a b c", "b c d"})
+        self.assertEqual(fuzzy_hash_shingles("fallback:a b"), {"a b"})
+        shingles = fuzzy_hash_shingles("3:abcdefgh:abcdefg")
+        self.assertEqual(shingles, {"3:abcdefg", "3:bcdefgh", "6:abcdefg"})
+        # a hash one block size up shares the 6-byte-block shingles
+        self.assertTrue(shingles & fuzzy_hash_shingles("6:abcdefg:xyz"))
+
+    def test_optimal_bands_follow_weights(self):
+        bands, rows = optimal_bands(0.5, 128)
+        self.assertLessEqual(bands * rows, 128)
+        recall_bands, recall_rows = optimal_bands(0.5, 128, 0.1, 0.9)
+        # favouring recall means more, shorter bands
+        self.assertLess(recall_rows, rows + 1)
+        self.assertGreater(recall_bands, bands - 1)
+        with self.assertRaises(ValueError):
+            optimal_bands(1.5, 128)
+
+    def test_query_finds_similar_signature(self):
+        rng = random.Random(0)
+        index = MinHashLSHIndex(self.conn, threshold=0.5)
+        base = _signature(rng)
+        items = [(i, _signature(rng)) for i in range(500)]
+        items.append((1000, _signature(rng, base, keep=0.9)))
+        self.assertEqual(index.add_many(items), 501)
+
+        self.assertEqual(len(index), 501)
+        self.assertEqual(index.candidates_for_signature(base), [1000])
+        [(file_id, jaccard)] = index.query(base)
+        self.assertEqual(file_id, 1000)
+        self.assertAlmostEqual(jaccard, estimate_jaccard(base, items[-1][1]))
+
+        index.remove(1000)
+        self.assertEqual(index.query(base), [])
+
+    def test_parameters_change_rebands(self):
+        rng = random.Random(1)
+        base = _signature(rng)
+        MinHashLSHIndex(self.conn, threshold=0.5).add_many([(1, base)])
+        index = MinHashLSHIndex(self.conn, threshold=0.9)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.candidates_for_signature(base), [1])
+        # a different permutation count invalidates stored signatures
+        self.assertEqual(len(MinHashLSHIndex(self.conn, num_perm=64)), 0)
+
+    def test_sync_and_find_near_duplicates(self):
+        self.assertIsNotNone(fuzzy_hash_signature("fallback:" + TEXT))
+        self.conn.executemany(
+            "INSERT INTO file_hashes VALUES (?, ?)",
+            [
+                (1, "fallback:" + TEXT),
+                (2, "fallback:" + TEXT.replace("lazy dog", "lazy cat", 1)),
+                (3, "fallback:an unrelated document about something else entirely"),
+            ],
+        )
+        index = MinHashLSHIndex(self.conn)
+        self.assertEqual(index.sync_file_hashes(), 3)
+        self.assertEqual(index.sync_file_hashes(), 0)
+        self.assertEqual(sorted(index.candidates("fallback:" + TEXT)), [1, 2])
+
+        db = Mock()
+        db.cur = self.conn.cursor()
+        # threshold 0: file 3 is only left out because it is not an LSH candidate
+        duplicates = find_near_duplicates(db, "fallback:" + TEXT, threshold=0, lsh=index)
+        self.assertEqual(sorted(file_id for file_id, _ in duplicates), [1, 2])
+        self.assertEqual(len(find_near_duplicates(db, "fallback:" + TEXT, threshold=0)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from tgarchive.db import SpectraDB
+from tgarchive.db.pagination import InvalidCursor, decode_cursor, encode_cursor
+from tgarchive.search.hybrid_search import SQLiteFTS5IndexManager
+
+
+class TestCursors(unittest.TestCase):
+    def test_round_trip(self):
+        cursor = encode_cursor("fts", (-1.25, 42))
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor, "fts", 2), (-1.25, 42))
+
+    def test_rejects_foreign_or_malformed_cursors(self):
+        for cursor in (
+            encode_cursor("channels", (7,)),
+            encode_cursor("messages", (1,)),
+            encode_cursor("messages", ("x", 1)),
+            "not base64!",
+            "bm90IGpzb24",
+        ):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, "messages", 2)
+
+
+class TestFTSKeysetPages(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, first_name TEXT, last_name TEXT);
+            CREATE TABLE messages (
+                id INTEGER PRIMARY KEY, type TEXT, date TEXT, date_ts INTEGER,
+                content TEXT, user_id INTEGER, channel_id INTEGER
+            );
+        """)
+        self.fts = SQLiteFTS5IndexManager(self.conn)
+        self.fts.migrate()
+        # repeated contents give rank ties that only the id breaks
+        self.conn.executemany(
+            "INSERT INTO messages(id, type, date, content, user_id, channel_id) VALUES (?, 'message', '2024-01-01', ?, 1, 1)",
+            [(i, "alpha " * (1 + i % 4) + "filler " * (i % 3)) for i in range(1, 48)],
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_pages_match_offset_paging(self):
+        expected = [row[0] for row in self.fts.search_messages("alpha", limit=100)]
+        seen, after = [], None
+        while True:
+            rows, after = self.fts.search_messages_page("alpha", limit=10, after=after)
+            seen.extend(row[0] for row in rows)
+            if after is None:
+                break
+
+        self.assertEqual(len(expected), 47)
+        self.assertEqual(seen, expected)
+
+    def test_channel_list_filter(self):
+        self.conn.execute("UPDATE messages SET channel_id = id % 3")
+        rows = self.fts.search_messages("alpha", limit=100, filter_channel=[0, 1])
+
+        self.assertEqual(sorted(row[0] for row in rows), [i for i in range(1, 48) if i % 3 != 2])
+        self.assertTrue(all(row[1] in (0, 1) for row in rows))
+
+    def test_query_only_manager_touches_no_schema(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        fts = SQLiteFTS5IndexManager(self.conn, inspect_schema=False)
+        self.assertEqual(statements, [])
+
+        rows, _ = fts.search_messages_page("alpha", limit=5)
+
+        self.assertEqual(len(rows), 5)
+        # FTS5 traces its own data_version probes as "-- PRAGMA" comments
+        issued = [sql.strip() for sql in statements if not sql.lstrip().startswith("--")]
+        self.assertTrue(issued)
+        self.assertTrue(all(sql.upper().startswith("SELECT") for sql in issued))
+
+
+class TestListingPages(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db = SpectraDB(self.temp_dir / "spectra.db")
+        self.db.conn.executemany(
+            "INSERT INTO messages(id, type, date, content) VALUES (?, 'message', ?, ?)",
+            [(i, f"2024-01-{1 + i // 5:02d}T00:00:00", f"message {i}") for i in range(1, 31)],
+        )
+        for channel_id in (30, 10, 20, 40):
+            self.db.upsert_account_channel_access("+100", channel_id, f"chan {channel_id}", None, "2024-01-01")
+        self.db.upsert_account_channel_access("+200", 10, "chan 10", None, "2024-01-02")
+        self.db.conn.commit()
+
+    def tearDown(self):
+        self.db.__exit__(None, None, None)
+        shutil.rmtree(self.temp_dir)
+
+    def test_messages_walk_newest_first(self):
+        seen, before = [], None
+        while True:
+            rows, before = self.db.messages_page(limit=7, before=before)
+            seen.extend(row[0] for row in rows)
+            if before is None:
+                break
+
+        expected = [row[0] for row in self.db.conn.execute("SELECT id FROM messages ORDER BY date_ts DESC, id DESC")]
+        self.assertEqual(seen, expected)
+
+    def test_message_count_and_channel_filter(self):
+        self.assertEqual(self.db.count_messages(), 30)
+        self.assertEqual(self.db.count_messages(date_to=datetime(2024, 1, 2)), 9)
+        # the canonical archive holds one channel: a known channel lists every message
+        rows, _ = self.db.messages_page(limit=50, channel_id=10)
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(self.db.count_messages(channel_id=10), 30)
+        with self.assertRaises(LookupError):
+            self.db.messages_page(limit=5, channel_id=123)
+
+        self.db.conn.execute("ALTER TABLE messages ADD COLUMN channel_id INTEGER")
+        self.db.conn.execute("UPDATE messages SET channel_id = id % 2")
+        self.db.conn.commit()
+        rows, _ = self.db.messages_page(limit=50, channel_id=1)
+        self.assertEqual(sorted(row[0] for row in rows), list(range(1, 31, 2)))
+        self.assertEqual(self.db.count_messages(channel_id=1), 15)
+
+    def test_fulltext_channel_filter_on_single_channel_archive(self):
+        fts = SQLiteFTS5IndexManager(self.db.conn, inspect_schema=False)
+
+        self.assertEqual(len(fts.search_messages("message", limit=50, filter_channel=[99, 10])), 30)
+        self.assertEqual(fts.search_messages("message", limit=50, filter_channel=99), [])
+
+    def test_channels_page_groups_accounts(self):
+        first, after = self.db.channels_page(limit=2)
+        second, end = self.db.channels_page(limit=2, after=after)
+
+        self.assertEqual([(row[0], row[2]) for row in first], [(10, 2), (20, 1)])
+        self.assertEqual([row[0] for row in second], [30, 40])
+        self.assertIsNone(end)
+        self.assertEqual(self.db.count_channels("chan 1"), 1)
+        self.assertEqual(self.db.channels_page(limit=5, search="%")[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
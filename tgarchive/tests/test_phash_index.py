@@ -0,0 +1,71 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from tgarchive.core.phash_index import PerceptualHashIndex, parse_phash
+
+
+def _flip(value: int, bits) -> int:
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def _scan(pairs, query: int, radius: int):
+    return sorted(
+        ((file_id, (query ^ value).bit_count()) for file_id, value in pairs if (query ^ value).bit_count() <= radius),
+        key=lambda match: (match[1], match[0]),
+    )
+
+
+class TestPerceptualHashIndex(unittest.TestCase):
+    def test_parse_phash(self):
+        self.assertEqual(parse_phash("ffffffffffffffff"), 2**64 - 1)
+        self.assertEqual(parse_phash(5), 5)
+        self.assertIsNone(parse_phash("not hex"))
+        self.assertIsNone(parse_phash("1" + "0" * 16))  # 65 bits
+
+    def test_query_matches_linear_scan(self):
+        rng = random.Random(0)
+        pairs = [(i, rng.getrandbits(64)) for i in range(2000)]
+        # planted neighbours at every distance up to 12
+        base = pairs[0][1]
+        for distance in range(1, 13):
+            pairs.append((10000 + distance, _flip(base, rng.sample(range(64), distance))))
+        index = PerceptualHashIndex(pairs)
+
+        for query in (base, pairs[5][1], rng.getrandbits(64)):
+            for radius in (0, 3, 5, 8, 12):
+                self.assertEqual(index.query(query, radius), _scan(pairs, query, radius))
+
+    def test_hex_strings_and_nearest(self):
+        index = PerceptualHashIndex([(1, "00000000000000ff"), (2, "000000000000000f")])
+        self.assertEqual(index.nearest("000000000000000e", 5), (2, 1))
+        self.assertIsNone(index.nearest("ff00000000000000", 5))
+
+    def test_add_replaces_and_remove(self):
+        index = PerceptualHashIndex([(1, 0)])
+        index.add(1, 2**64 - 1)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.query(0, 5), [])
+        self.assertEqual(index.query(2**64 - 1, 0), [(1, 0)])
+        index.remove(1)
+        self.assertNotIn(1, index)
+        self.assertEqual(index.query(2**64 - 1, 64), [])
+
+    def test_compaction_keeps_live_entries(self):
+        index = PerceptualHashIndex()
+        for round_ in range(3):
+            for file_id in range(1000):
+                index.add(file_id, file_id * 7919 + round_)
+        self.assertEqual(len(index), 1000)
+        self.assertEqual(index.query(999 * 7919 + 2, 0), [(999, 0)])
+
+    def test_from_db(self):
+        db = SimpleNamespace(get_all_perceptual_hashes=lambda channel_id=None: [(1, "000000000000000f"), (2, "bogus")])
+        index = PerceptualHashIndex.from_db(db)
+        self.assertEqual(len(index), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
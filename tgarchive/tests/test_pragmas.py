@@ -0,0 +1,113 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from tgarchive.core.sync import BatchedWriter, DBHandler
+from tgarchive.core.config_models import Config
+from tgarchive.db import SpectraDB
+from tgarchive.db.db_base import BaseDB
+from tgarchive.db.pragmas import get_profile
+from tgarchive.tests.test_batched_writer import make_row
+
+try:
+    from tgarchive.__main__ import load_config, setup_parser
+    CLI_AVAILABLE = True
+except ImportError:  # the CLI pulls in optional UI/plotting dependencies
+    CLI_AVAILABLE = False
+
+
+def pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+class TestPragmaProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "profiles.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ingest_profile_tunes_writer(self):
+        with BaseDB(self.db_path, profile="ingest") as db:
+            self.assertEqual(pragma(db.conn, "synchronous"), 1)  # NORMAL
+            self.assertEqual(pragma(db.conn, "temp_store"), 2)  # MEMORY
+            self.assertEqual(pragma(db.conn, "cache_size"), get_profile("ingest")["cache_size"])
+            self.assertEqual(pragma(db.conn, "wal_autocheckpoint"), 10000)
+            self.assertEqual(pragma(db.conn, "foreign_keys"), 1)
+            self.assertTrue(db.defer_foreign_keys)
+
+    def test_query_profile_is_read_only(self):
+        BaseDB(self.db_path).conn.close()
+        with BaseDB(self.db_path, profile="query") as db:
+            self.assertEqual(pragma(db.conn, "query_only"), 1)
+            self.assertFalse(db.defer_foreign_keys)
+            with self.assertRaises(sqlite3.OperationalError):
+                db.conn.execute("INSERT INTO users(id) VALUES (1)")
+            self.assertEqual(db.read("SELECT COUNT(*) FROM users")[0][0], 0)
+
+    def test_spectra_db_takes_profile_and_pool_from_config(self):
+        cfg = Config(path=Path(self.tmp.name) / "missing.json")
+        cfg.data.update(db_path=str(self.db_path), db_profile="ingest", db_pool={"readers": 2, "executor_workers": 3})
+
+        db = SpectraDB.from_config(cfg, vector_store=False)
+        try:
+            self.assertEqual(db.db_path, self.db_path)
+            self.assertEqual(db.profile, "ingest")
+            self.assertEqual(pragma(db.conn, "wal_autocheckpoint"), 10000)
+            self.assertEqual(db.pool.size, 2)
+        finally:
+            db.close()
+
+        # explicit arguments win over the config
+        with SpectraDB.from_config(cfg.data, self.db_path, profile="default", vector_store=False) as db:
+            self.assertIsNone(db.vector_store)
+            self.assertEqual(db.profile, "default")
+            self.assertFalse(db.defer_foreign_keys)
+
+    def test_spectra_db_takes_vector_backend_from_config(self):
+        cfg = Config(path=Path(self.tmp.name) / "missing.json")
+        cfg.data["advanced_features"]["vector_database"]["backend"] = "ivf"
+
+        with patch("tgarchive.db.vector_store.VectorStoreManager") as manager:
+            SpectraDB.from_config(cfg, self.db_path).close()
+            SpectraDB.from_config(cfg, self.db_path, vector_backend="numpy").close()
+            SpectraDB(self.db_path).close()
+
+        backends = [call.args[0].backend for call in manager.call_args_list]
+        self.assertEqual(backends, ["ivf", "numpy", "qihse"])
+
+    @unittest.skipUnless(CLI_AVAILABLE, "CLI dependencies are not installed")
+    def test_cli_db_profile_overrides_config(self):
+        config_path = Path(self.tmp.name) / "cli.json"
+        args = setup_parser().parse_args(["--config", str(config_path), "--db-profile", "query"])
+
+        cfg = load_config(args)
+
+        self.assertEqual(cfg.path, config_path)
+        self.assertEqual(cfg.db_profile, "query")
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            BaseDB(self.db_path, profile="turbo")
+        self.assertFalse(self.db_path.exists())
+
+    def test_deferred_foreign_keys_still_enforced_at_commit(self):
+        with DBHandler(self.db_path, profile="ingest") as db:
+            writer = BatchedWriter(db, entity_id=1, batch_size=100, flush_interval=3600)
+            user = SimpleNamespace(id=1, username=None, first_name=None, last_name=None)
+            writer.add_user(user)
+            writer.add_message(make_row(1))
+            writer.flush()
+
+            writer.add_message(make_row(2, user_id=99))  # no such user
+            with self.assertRaises(sqlite3.IntegrityError):
+                writer.flush()
+            self.assertEqual(db.cur.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tgarchive.search.hybrid_search import HybridSearchEngine, SearchType
+from tgarchive.search.rank_fusion import (
+    normalized_score_fusion,
+    reciprocal_rank_fusion,
+    top_k,
+    topk_settled,
+)
+
+
+def fts_row(message_id, score):
+    return (message_id, 1, 1, f"message {message_id}", "2024-01-01T00:00:00", "text", -score)
+
+
+def semantic_hit(message_id, score):
+    return {
+        "message_id": message_id,
+        "content": f"message {message_id}",
+        "channel_id": 1,
+        "user_id": 1,
+        "date": "2024-01-01T00:00:00",
+        "relevance_score": score,
+        "match_type": SearchType.SEMANTIC,
+    }
+
+
+class TestFusion(unittest.TestCase):
+    def test_rrf_ignores_score_scale(self):
+        fused = reciprocal_rank_fusion({
+            "fts5": [(1, 250.0), (2, 90.0)],
+            "qihse": [(2, 0.9), (3, 0.8)],
+        }, k=60)
+
+        self.assertEqual([doc for doc, _ in top_k(fused, 3)], [2, 1, 3])
+        self.assertAlmostEqual(fused[2], 1 / 62 + 1 / 61)
+
+    def test_normalized_fusion_scales_each_backend(self):
+        fused = normalized_score_fusion({
+            "fts5": [(1, 300.0), (2, 100.0)],
+            "qihse": [(2, 0.9), (3, 0.5)],
+        })
+
+        self.assertEqual(fused, {1: 1.0, 2: 1.0, 3: 0.0})
+
+    def test_topk_settled(self):
+        fused = {1: 0.05, 2: 0.04, 3: 0.001}
+        self.assertTrue(topk_settled(fused, 2, pending_bound=1 / 61))
+        self.assertFalse(topk_settled(fused, 3, pending_bound=1 / 61))
+        self.assertFalse(topk_settled({1: 0.05}, 2, pending_bound=1 / 61))
+
+
+class TestParallelHybridSearch(unittest.TestCase):
+    def setUp(self):
+        fts_patch = patch("tgarchive.search.hybrid_search.SQLiteFTS5IndexManager")
+        vector_patch = patch("tgarchive.search.hybrid_search.QIHSEVectorManager")
+        self.addCleanup(fts_patch.stop)
+        self.addCleanup(vector_patch.stop)
+        fts_patch.start()
+        vector_patch.start()
+
+    def _make_engine(self, **kwargs):
+        engine = HybridSearchEngine(MagicMock(), use_keystone=False, **kwargs)
+        self.addCleanup(engine.close)
+        engine.fts5.conn = MagicMock(spec=[])  # no interrupt()
+        return engine
+
+    def test_backends_run_concurrently(self):
+        engine = self._make_engine(backend_timeout=5.0)
+        semantic_started = threading.Event()
+
+        def keyword(query, **kwargs):
+            # only returns once the semantic backend is running alongside it
+            self.assertTrue(semantic_started.wait(2.0))
+            return [fts_row(1, 12.0), fts_row(2, 8.0)]
+
+        def semantic(query, **kwargs):
+            semantic_started.set()
+            return [semantic_hit(2, 0.9), semantic_hit(3, 0.7)]
+
+        engine.fts5.search_messages.side_effect = keyword
+        engine.vector.search_semantic.side_effect = semantic
+
+        results = engine.search("query", limit=3)
+
+        self.assertEqual([r.message_id for r in results], [2, 1, 3])
+        self.assertEqual(results[0].metadata["algorithms"], ["fts5", "qihse"])
+        self.assertEqual(results[0].metadata["keyword_score"], 8.0)
+
+    def test_slow_backend_is_dropped_at_its_deadline(self):
+        engine = self._make_engine(backend_timeouts={"qihse": 0.05})
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def semantic(query, **kwargs):
+            release.wait(5.0)
+            return [semantic_hit(9, 0.99)]
+
+        engine.fts5.search_messages.return_value = [fts_row(1, 12.0)]
+        engine.vector.search_semantic.side_effect = semantic
+
+        started = time.monotonic()
+        results = engine.search("query", limit=5)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual([r.message_id for r in results], [1])
+        self.assertEqual(engine.stats["backend_timeouts"], 1)
+
+    def test_returns_early_when_topk_is_settled(self):
+        # scaled keyword scores put message 1 three points clear; semantic adds at most one
+        engine = self._make_engine(fusion="normalized", backend_timeout=5.0, backend_weights={"fts5": 3.0})
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def semantic(query, **kwargs):
+            release.wait(5.0)
+            return []
+
+        engine.fts5.search_messages.return_value = [fts_row(1, 12.0), fts_row(2, 8.0)]
+        engine.vector.search_semantic.side_effect = semantic
+
+        started = time.monotonic()
+        results = engine.search("query", limit=1)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual([r.message_id for r in results], [1])
+        self.assertEqual(engine.stats["early_returns"], 1)
+
+    def test_rrf_waits_for_pending_backends(self):
+        engine = self._make_engine(backend_timeout=5.0)
+
+        def semantic(query, **kwargs):
+            time.sleep(0.1)
+            return [semantic_hit(3, 0.9)]
+
+        engine.fts5.search_messages.return_value = [fts_row(1, 12.0), fts_row(2, 8.0)]
+        engine.vector.search_semantic.side_effect = semantic
+
+        results = engine.search("query", limit=2)
+
+        # any unseen document could still top the semantic ranking
+        self.assertEqual(sorted(r.message_id for r in results), [1, 3])
+        self.assertEqual(engine.stats["early_returns"], 0)
+
+    def test_hung_backend_is_skipped_until_it_finishes(self):
+        engine = self._make_engine(backend_timeouts={"qihse": 0.05})
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def semantic(query, **kwargs):
+            calls.append(query)
+            release.wait(5.0)
+            return [semantic_hit(9, 0.99)]
+
+        engine.fts5.search_messages.return_value = [fts_row(1, 12.0)]
+        engine.vector.search_semantic.side_effect = semantic
+
+        engine.search("first", limit=5)
+        engine.search("second", limit=5)
+        self.assertEqual(calls, ["first"])
+        self.assertEqual(engine.stats["backend_skips"], 1)
+
+        release.set()
+        engine._abandoned["qihse"].result(timeout=1.0)
+        engine.search("third", limit=5)
+        self.assertEqual(calls, ["first", "third"])
+        self.assertEqual(engine._abandoned, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
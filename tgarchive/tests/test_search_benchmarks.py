@@ -8,7 +8,11 @@ from KEYSTONE and QIHSE integrations.
 
 import time
 import logging
-from typing import List, Tuple
+import random
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 import bisect
 
@@ -151,7 +155,118 @@ def run_comprehensive_benchmarks():
     return results
 
 
+# Word pools for a synthetic multilingual corpus (Latin with diacritics, Cyrillic, Greek, Arabic)
+FTS_VOCABULARY = (
+    "channel message forward archive wallet transfer meeting tomorrow address payment "
+    "über straße grüße münchen zürich café crème résumé naïve façade garçon "
+    "канал сообщение адрес перевод встреча завтра кошелёк "
+    "κανάλι μήνυμα διεύθυνση πληρωμή "
+    "قناة رسالة عنوان تحويل"
+).split()
+
+FTS_QUERIES = (
+    ("term", "search_messages", "wallet"),
+    ("folded diacritics", "search_messages", "creme"),
+    ("prefix", "search_messages", "mün*"),
+    ("phrase", "search_messages", '"payment address"'),
+    ("cyrillic", "search_messages", "перевод"),
+    ("substring", "search_substring", "0x4f2"),
+)
+
+
+def synthetic_corpus(count: int, seed: int = 7):
+    """Yield ``(id, content)`` rows of 8-20 random words, some with a hex address."""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        words = rng.choices(FTS_VOCABULARY, k=rng.randint(8, 20))
+        if i % 50 == 0:
+            words.append(f"0x{rng.getrandbits(64):016x}")
+        yield i, " ".join(words)
+
+
+def _fts_db(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, first_name TEXT, last_name TEXT);
+        CREATE TABLE messages (id INTEGER PRIMARY KEY, type TEXT, date TEXT, date_ts INTEGER,
+                               content TEXT, user_id INTEGER, channel_id INTEGER);
+    """)
+    return conn
+
+
+def _ingest(conn: sqlite3.Connection, rows, batch: int) -> None:
+    rows = list(rows)
+    for start in range(0, len(rows), batch):
+        conn.executemany(
+            "INSERT INTO messages(id, type, date, content, user_id, channel_id) VALUES (?, 'message', '2024-01-01', ?, 1, 1)",
+            rows[start:start + batch],
+        )
+        conn.commit()
+
+
+def _time_queries(fts, runs: int) -> Dict[str, float]:
+    timings = {}
+    for name, method, query in FTS_QUERIES:
+        search = getattr(fts, method)
+        start = time.perf_counter()
+        for _ in range(runs):
+            search(query, limit=20)
+        timings[name] = (time.perf_counter() - start) * 1000 / runs
+    return timings
+
+
+def run_fts_benchmarks(count: int = 200000, batch: int = 100, runs: int = 20) -> Dict:
+    """
+    FTS5 ingest and query benchmark over a synthetic multilingual corpus.
+
+    Compares trigger-maintained ingest in small commits (continuous archiving)
+    with :meth:`SQLiteFTS5IndexManager.bulk_load`, and query latency on the
+    fragmented index left by continuous ingest versus after incremental
+    merging.
+    """
+    from tgarchive.search.hybrid_search import SQLiteFTS5IndexManager
+
+    results: Dict = {"messages": count, "ingest_rows_per_second": {}, "query_ms": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = _fts_db(Path(tmp) / "triggers.sqlite3")
+        fts = SQLiteFTS5IndexManager(conn, trigram=True, automerge=0)
+        fts.migrate()
+        start = time.perf_counter()
+        _ingest(conn, synthetic_corpus(count), batch)
+        results["ingest_rows_per_second"]["triggers"] = count / (time.perf_counter() - start)
+        results["query_ms"]["fragmented"] = _time_queries(fts, runs)
+
+        start = time.perf_counter()
+        steps = fts.run_maintenance(max_steps=10000)
+        results["merge_seconds"] = time.perf_counter() - start
+        results["merge_steps"] = steps
+        results["query_ms"]["merged"] = _time_queries(fts, runs)
+        conn.close()
+
+        conn = _fts_db(Path(tmp) / "bulk.sqlite3")
+        fts = SQLiteFTS5IndexManager(conn, trigram=True)
+        fts.migrate()
+        start = time.perf_counter()
+        with fts.bulk_load():
+            _ingest(conn, synthetic_corpus(count), batch)
+        results["ingest_rows_per_second"]["bulk_load"] = count / (time.perf_counter() - start)
+        conn.close()
+
+    print(f"FTS5 results ({count:,} messages, {batch}-row commits):")
+    for mode, rate in results["ingest_rows_per_second"].items():
+        print(f"  ingest {mode:<10} {rate:>12,.0f} rows/s")
+    print(f"  incremental merge: {results['merge_steps']} steps in {results['merge_seconds']:.2f}s")
+    for name in results["query_ms"]["fragmented"]:
+        before = results["query_ms"]["fragmented"][name]
+        after = results["query_ms"]["merged"][name]
+        print(f"  query {name:<18} {before:>8.3f} ms fragmented  {after:>8.3f} ms merged")
+
+    return results
+
+
 if __name__ == "__main__":
     results = run_comprehensive_benchmarks()
+    results['fts5'] = run_fts_benchmarks()
     print("\nBenchmark Results:")
     print(results)
@@ -0,0 +1,145 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tgarchive.db import Message, SpectraDB
+from tgarchive.db.time_index import MessageTimeIndex, parse_timestamp
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+T0 = int(START.timestamp())
+
+
+def _message(message_id: int, seconds: int) -> Message:
+    return Message(
+        id=message_id,
+        type="message",
+        date=START + timedelta(seconds=seconds),
+        edit_date=None,
+        content=f"message {message_id}",
+        reply_to=None,
+        user=None,
+        media=None,
+        checksum="",
+    )
+
+
+class TestMessageTimeIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "archive.sqlite3"
+        self.index_path = self.db_path.with_name(self.db_path.name + ".timeindex.npz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _open(self) -> SpectraDB:
+        return SpectraDB.open_fast(self.db_path)
+
+    def test_parse_timestamp(self):
+        self.assertEqual(parse_timestamp("2024-01-01T00:00:00Z"), T0)
+        self.assertEqual(parse_timestamp(START), T0)
+        self.assertEqual(parse_timestamp(T0), T0)
+        self.assertIsNone(parse_timestamp("not a date"))
+        self.assertIsNone(parse_timestamp(None))
+
+    def test_range_follows_upserts(self):
+        with self._open() as db:
+            # inserted out of date order
+            for message_id, seconds in ((1, 30), (2, 10), (3, 20)):
+                db.upsert_message(_message(message_id, seconds))
+            db.commit()
+            self.assertEqual(db.find_messages_by_timestamp_range(T0, T0 + 100), [2, 3, 1])
+            self.assertEqual(db.find_messages_by_timestamp_range(T0 + 15, T0 + 25), [3])
+
+            db.upsert_message(_message(4, 15))
+            db.upsert_message(_message(2, 50))  # edited date moves the row
+            db.commit()
+            self.assertEqual(db.find_messages_by_timestamp_range(T0, T0 + 100), [4, 3, 1, 2])
+            self.assertIn(4, db.time_index)
+            self.assertNotIn(99, db.time_index)
+
+    def test_only_committed_upserts_are_noted(self):
+        with self._open() as db:
+            db.upsert_message(_message(1, 10))
+            db.commit()
+            self.assertEqual(db.find_messages_by_timestamp_range(T0, T0 + 100), [1])
+
+        with self.assertRaises(RuntimeError):
+            with self._open() as db:
+                db.upsert_message(_message(2, 20))
+                raise RuntimeError("abort the transaction")
+
+        db = self._open()
+        db.upsert_message(_message(3, 30))
+        self.assertEqual(db._written_dates.keys(), {3})  # noted on commit
+        db.close()  # commits, notes and saves the index
+        conn = sqlite3.connect(self.db_path)
+        saved = MessageTimeIndex(conn, self.index_path)
+        self.assertEqual(saved._series[None].ids.tolist(), [1, 3])
+        conn.close()
+
+    def test_persisted_index_picks_up_external_writes(self):
+        with self._open() as db:
+            for message_id in range(1, 11):
+                db.upsert_message(_message(message_id, message_id))
+            db.find_messages_by_timestamp_range(T0, T0 + 100)
+        self.assertTrue(self.index_path.exists())
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO messages(id, type, date, content) VALUES (11, 'message', ?, 'late')",
+                ((START + timedelta(seconds=5, milliseconds=500)).isoformat(),),
+            )
+
+        with self._open() as db:
+            index = db.time_index
+            self.assertIsNone(index._series[None]._sorted_ids)
+            self.assertEqual(len(index._series[None]), 10)  # loaded, not rebuilt
+            self.assertEqual(db.find_messages_by_timestamp_range(T0 + 5, T0 + 6), [5, 11, 6])
+
+            # a commit from another connection while this one is open
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT INTO messages(id, type, date, content) VALUES (12, 'message', ?, 'live')",
+                    ((START + timedelta(seconds=200)).isoformat(),),
+                )
+            self.assertEqual(db.find_messages_by_timestamp_range(T0 + 100, T0 + 300), [12])
+
+    def test_stale_file_is_rebuilt(self):
+        with self._open() as db:
+            for message_id in range(1, 6):
+                db.upsert_message(_message(message_id, message_id))
+            db.find_messages_by_timestamp_range(T0, T0 + 100)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM messages WHERE id = 3")
+
+        with self._open() as db:
+            self.assertEqual(db.time_index._series, {})
+            self.assertEqual(db.find_messages_by_timestamp_range(T0, T0 + 100), [1, 2, 4, 5])
+
+    def test_channel_series(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, date TEXT, channel_id INTEGER)")
+        conn.executemany(
+            "INSERT INTO messages VALUES (?, ?, ?)",
+            [(i, (START + timedelta(seconds=i)).isoformat(), i % 2) for i in range(1, 11)],
+        )
+        index = MessageTimeIndex(conn)
+        self.assertEqual(index.range(T0, T0 + 100, channel_id=1).tolist(), [1, 3, 5, 7, 9])
+        self.assertEqual(index.range(T0, T0 + 4).tolist(), [1, 2, 3, 4])
+
+        conn.execute("UPDATE messages SET date = ? WHERE id = 2", ((START + timedelta(seconds=99)).isoformat(),))
+        conn.execute("INSERT INTO messages VALUES (11, ?, 1)", (START.isoformat(),))
+        index.note(2, START + timedelta(seconds=99))
+        index.note(11, START)
+        self.assertEqual(index.range(T0 + 50, T0 + 100).tolist(), [2])
+        # the channel series only gains the row that belongs to its channel
+        self.assertEqual(index.range(T0, T0 + 100, channel_id=1).tolist(), [11, 1, 3, 5, 7, 9])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
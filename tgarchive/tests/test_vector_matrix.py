@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from tgarchive.db.vector_matrix import MappedVectorMatrix
+from tgarchive.db import SpectraDB
+from tgarchive.db.vector_store import QIHSEVectorStore, VectorStoreConfig, VectorStoreManager
+
+
+class TestMappedVectorMatrix(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name) / "vecs"
+        self.rng = np.random.default_rng(7)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_top_k_matches_exact_cosine(self):
+        m = MappedVectorMatrix(self.base, 16, initial_capacity=4)
+        data = self.rng.normal(size=(300, 16)).astype(np.float32)
+        ids = [f"v{i}" for i in range(300)]
+        m.add(ids, data)  # grows past the initial capacity
+
+        q = self.rng.normal(size=16).astype(np.float32)
+        cos = data @ q / (np.linalg.norm(data, axis=1) * np.linalg.norm(q))
+        expected = [ids[i] for i in np.argsort(-cos)[:5]]
+        hits = m.top_k(q, 5)
+        self.assertEqual([vid for vid, _ in hits], expected)
+        self.assertAlmostEqual(hits[0][1], float(cos.max()), places=5)
+
+        rows = m.rows_for(["v1", "v2", "missing"])
+        self.assertEqual(sorted(vid for vid, _ in m.top_k(q, 10, rows=rows)), ["v1", "v2"])
+
+    def test_reload_without_pickle_and_unflushed_rows_are_dropped(self):
+        m = MappedVectorMatrix(self.base, 4)
+        m.add(["a", "b"], np.eye(4, dtype=np.float32)[:2])
+        m.flush()
+        m.add(["c"], [[0, 0, 1, 0]])  # never flushed
+
+        with patch("numpy.load", wraps=np.load) as load:
+            reopened = MappedVectorMatrix(self.base, 4)
+        self.assertFalse(load.call_args.kwargs["allow_pickle"])
+        self.assertEqual(len(reopened), 2)
+        self.assertNotIn("c", reopened)
+        np.testing.assert_array_equal(reopened.get("b"), [0, 1, 0, 0])
+
+    def test_upsert_and_delete_tombstone_then_compact(self):
+        m = MappedVectorMatrix(self.base, 4, compact_ratio=0.5)
+        m.add(["a", "b", "c", "d"], np.eye(4, dtype=np.float32))
+        m.add(["a"], [[0, 0, 0, 2]])
+        m.delete("b")
+        self.assertEqual(len(m), 3)
+        self.assertEqual(m.matrix.shape[0], 5)
+        self.assertNotIn("b", [vid for vid, _ in m.top_k([0, 1, 0, 0], 5)])
+
+        m.delete("c")
+        m.flush()  # 3 of 5 rows dead -> compacts
+        self.assertEqual(m.matrix.shape[0], 2)
+        self.assertEqual(sorted(vid for vid, _ in m.top_k([0, 0, 0, 1], 5)), ["a", "d"])
+
+        reopened = MappedVectorMatrix(self.base, 4)
+        np.testing.assert_array_equal(reopened.get("a"), [0, 0, 0, 2])
+        self.assertEqual(len(reopened), 2)
+
+    def _crash_compaction(self, fail_on_call):
+        m = MappedVectorMatrix(self.base, 4, compact_ratio=1.0)
+        m.add(["a", "b", "c"], np.eye(4, dtype=np.float32)[:3])
+        m.delete("b")
+        m.flush()
+        real_replace, calls = os.replace, []
+
+        def replace(src, dst):
+            calls.append(dst)
+            if len(calls) == fail_on_call:
+                raise OSError("power cut")
+            real_replace(src, dst)
+
+        with patch("tgarchive.db.vector_matrix.os.replace", side_effect=replace):
+            with self.assertRaises(OSError):
+                m.compact()
+        # the failed instance still serves reads
+        np.testing.assert_array_equal(m.get("c"), [0, 0, 1, 0])
+        return MappedVectorMatrix(self.base, 4)
+
+    def test_compaction_interrupted_before_data_swap_keeps_old_files(self):
+        reopened = self._crash_compaction(fail_on_call=1)
+
+        self.assertEqual(reopened.generation, 0)
+        self.assertEqual(reopened.matrix.shape[0], 3)
+        np.testing.assert_array_equal(reopened.get("c"), [0, 0, 1, 0])
+        self.assertEqual(list(Path(self.tmp.name).glob("*.compact*")), [])
+
+    def test_compaction_interrupted_between_swaps_is_finished_on_open(self):
+        reopened = self._crash_compaction(fail_on_call=2)
+
+        self.assertEqual(reopened.generation, 1)
+        self.assertEqual(reopened.matrix.shape[0], 2)
+        np.testing.assert_array_equal(reopened.get("a"), [1, 0, 0, 0])
+        np.testing.assert_array_equal(reopened.get("c"), [0, 0, 1, 0])
+        self.assertEqual(list(Path(self.tmp.name).glob("*.compact*")), [])
+
+
+@patch("tgarchive.db.vector_store.qihse_available", return_value=True)
+class TestQIHSEVectorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = VectorStoreConfig(path=self.tmp.name, collection_name="t", vector_size=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_with_filters_and_legacy_import(self, _available):
+        legacy = {"vectors": {"msg_9": np.array([1.0, 0, 0, 0])}, "ids": ["msg_9"]}
+        np.save(Path(self.tmp.name) / "t_vectors.npy", legacy, allow_pickle=True)
+
+        store = QIHSEVectorStore(self.config)
+        self.assertIn("msg_9", store.vectors)
+        store.upsert_batch([
+            ("msg_1", [1.0, 0.1, 0, 0], {"message_id": 1, "threat_score": 9}),
+            ("msg_2", [0, 1.0, 0, 0], {"message_id": 2, "threat_score": 2}),
+        ])
+
+        hits = store.search([1.0, 0, 0, 0], limit=2)
+        self.assertEqual([h.id for h in hits], ["msg_9", "msg_1"])
+        hits = store.search([1.0, 0, 0, 0], limit=5, filters={"threat_score": {"lte": 5}})
+        self.assertEqual([h.id for h in hits], ["msg_2"])
+        self.assertEqual(hits[0].payload["message_id"], 2)
+
+        store.delete("msg_9")
+        store.close()
+        reopened = QIHSEVectorStore(self.config)
+        self.assertEqual(len(reopened.vectors), 2)
+        self.assertNotIn("msg_9", reopened.vectors)
+
+    def test_upserts_are_buffered_and_hits_fetch_metadata_once(self, _available):
+        store = QIHSEVectorStore(self.config)
+        for i in range(5):
+            store.upsert(f"msg_{i}", [1.0, i, 0, 0], {"message_id": i})
+
+        def persisted():
+            with sqlite3.connect(store.db_path) as conn:
+                return conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+        self.assertEqual(persisted(), 0)
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+        hits = store.search([1.0, 0, 0, 0], limit=3)
+        self.assertEqual([h.payload["message_id"] for h in hits], [0, 1, 2])
+        self.assertEqual(statements, [])  # served from the write buffer
+
+        store.flush()
+        statements.clear()
+        hits = store.search([1.0, 0, 0, 0], limit=3)
+        self.assertEqual([h.payload["message_id"] for h in hits], [0, 1, 2])
+        self.assertEqual(len(statements), 1)
+        self.assertIn("WHERE id IN (", statements[0])
+        self.assertEqual(persisted(), 5)
+        store.close()
+
+    def test_partial_batch_survives_close_and_reopen(self, _available):
+        manager = VectorStoreManager(self.config)
+        rows = [(i, np.array([1.0, i, 0, 0]), {"user_id": 7}) for i in range(10)]
+        manager.index_messages_batch(rows)  # well under write_buffer_size
+        manager.close()
+        manager.close()  # idempotent
+
+        reopened = VectorStoreManager(self.config)
+        self.assertEqual(len(reopened.store.vectors), 10)
+        hits = reopened.semantic_search(np.array([1.0, 0, 0, 0]), top_k=3)
+        self.assertEqual([h.payload["message_id"] for h in hits], [0, 1, 2])
+        self.assertEqual(hits[0].payload["user_id"], 7)
+        reopened.close()
+
+    def test_bulk_delete_defers_index_rewrite_to_flush(self, _available):
+        manager = VectorStoreManager(self.config)
+        manager.index_messages_batch([(i, np.array([1.0, i, 0, 0]), {}) for i in range(6)])
+        manager.flush()
+        store = manager.store
+        index_mtime = os.stat(store.vectors.index_path).st_mtime_ns
+
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+        manager.delete_messages([1, 2, 3])
+        manager.delete_message(4)
+        self.assertEqual(os.stat(store.vectors.index_path).st_mtime_ns, index_mtime)
+        self.assertEqual(sum(s.startswith("DELETE") for s in statements), 2)
+        self.assertEqual(store.get_stats()["points_count"], 2)
+        manager.close()
+
+        reopened = VectorStoreManager(self.config)
+        self.assertEqual(len(reopened.store.vectors), 2)
+        self.assertNotIn("msg_4", reopened.store.vectors)
+        reopened.close()
+
+    def test_spectra_db_close_closes_vector_store(self, _available):
+        db = SpectraDB(Path(self.tmp.name) / "spectra.db", vector_store=False)
+        store = db.vector_store = MagicMock()
+
+        db.close()
+
+        store.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
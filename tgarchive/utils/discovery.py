@@ -382,7 +382,7 @@ class AccountRotator:
         """Set up account usage database if not exists"""
         from ..db import SpectraDB
         try:
-            self.db = SpectraDB(self.db_path)
+            self.db = SpectraDB.open_fast(self.db_path)
             
             # Create accounts table if not exists
             self.db.conn.execute("""
@@ -1134,7 +1134,7 @@ class ParallelTaskScheduler:
         
         try:
             # Open DB connection
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             # Create tasks table
             db.conn.execute("""
@@ -1164,7 +1164,7 @@ class ParallelTaskScheduler:
         from ..db import SpectraDB
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             # Convert dict values to strings for storage
             task_dict = {k: str(v) if not isinstance(v, (str, bool, int, float)) else v 
@@ -1605,7 +1605,7 @@ class SpectraCrawlerManager:
         
         try:
             # Open DB connection
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             # Create discovered_groups table
             db.conn.execute("""
@@ -1660,7 +1660,7 @@ class SpectraCrawlerManager:
         from ..db import SpectraDB
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             for group in groups:
                 # Determine group type
@@ -1696,7 +1696,7 @@ class SpectraCrawlerManager:
         from ..db import SpectraDB
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             db.conn.execute("""
                 INSERT INTO discovery_sources
@@ -1722,7 +1722,7 @@ class SpectraCrawlerManager:
         from ..db import SpectraDB
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             for target in target_groups:
                 db.conn.execute("""
@@ -1822,7 +1822,7 @@ class SpectraCrawlerManager:
         import networkx as nx
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             # Build network from database
             G = nx.DiGraph()
@@ -1868,7 +1868,7 @@ class SpectraCrawlerManager:
         from ..db import SpectraDB
         
         try:
-            db = SpectraDB(self.db_path)
+            db = SpectraDB.open_fast(self.db_path)
             
             rows = db.conn.execute("""
                 SELECT 
@@ -1926,7 +1926,7 @@ class SpectraCrawlerManager:
             from ..db import SpectraDB
             
             try:
-                db = SpectraDB(self.db_path)
+                db = SpectraDB.open_fast(self.db_path)
                 
                 for target in targets:
                     group_link = target["id"]
@@ -1980,7 +1980,7 @@ class SpectraCrawlerManager:
             from ..db import SpectraDB
             
             try:
-                db = SpectraDB(self.db_path)
+                db = SpectraDB.open_fast(self.db_path)
                 
                 for link, success in results.items():
                     if success: